@@ -35,6 +35,8 @@ try:
 except ImportError:
     pass
 
+from partitioned_store import open_monitoring_reader
+
 # Try to import AI components
 try:
     from verify_ai_intelligence import AIIntelligenceDashboard
@@ -792,7 +794,7 @@ class MasterAIDashboard:
         }
 
         try:
-            with sqlite3.connect(browser_db) as conn:
+            with open_monitoring_reader(browser_db) as conn:
                 cursor = conn.cursor()
                 for table in counts:
                     try:
@@ -1097,7 +1099,7 @@ class MasterAIDashboard:
             full_monitor_db = self._locate_full_monitor_database()
             if full_monitor_db and full_monitor_db.exists():
                 try:
-                    conn = sqlite3.connect(full_monitor_db)
+                    conn = open_monitoring_reader(full_monitor_db)
                     cursor = conn.cursor()
                     cursor.execute("SELECT COUNT(*) FROM screen_recordings")
                     screen_count = cursor.fetchone()[0]
@@ -22,6 +22,7 @@ from datetime import datetime
 from typing import Dict, Optional, Any
 
 from llm.llm_service import LLMService
+from monitoring.partitioned_store import open_monitoring_reader
 
 try:  # Allow import when executed as package or standalone script
     from .workflow_pattern_repository import WorkflowPattern, WorkflowPatternRepository
@@ -189,7 +190,7 @@ class AutomationPrototypeGenerator:
         
         # Get browser activity from browser_activity.db (Selenium-controlled browser)
         if browser_db.exists():
-            with sqlite3.connect(browser_db) as conn:
+            with open_monitoring_reader(browser_db) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute(
@@ -211,7 +212,7 @@ class AutomationPrototypeGenerator:
         
         # Get Excel and browser activity from full_monitoring.db (any Excel/browser)
         if full_monitoring_db.exists():
-            with sqlite3.connect(full_monitoring_db) as conn:
+            with open_monitoring_reader(full_monitoring_db) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -253,7 +254,7 @@ class AutomationPrototypeGenerator:
             # Check what session IDs actually exist in the database
             if full_monitoring_db.exists():
                 try:
-                    with sqlite3.connect(full_monitoring_db) as conn:
+                    with open_monitoring_reader(full_monitoring_db) as conn:
                         cursor = conn.cursor()
                         cursor.execute("SELECT DISTINCT session_id FROM browser_activity ORDER BY session_id DESC LIMIT 10")
                         existing_sessions = [row[0] for row in cursor.fetchall()]
@@ -347,7 +348,7 @@ class AutomationPrototypeGenerator:
             if full_monitoring_db.exists():
                 # Check what session IDs exist in the database
                 try:
-                    with sqlite3.connect(full_monitoring_db) as conn:
+                    with open_monitoring_reader(full_monitoring_db) as conn:
                         cursor = conn.cursor()
                         cursor.execute("SELECT DISTINCT session_id FROM browser_activity LIMIT 10")
                         existing_sessions = [row[0] for row in cursor.fetchall()]
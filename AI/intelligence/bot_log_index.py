@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Offset-tracking index of bot GUI log files.
+
+Each known log file is remembered with its inode, size and the byte offset
+up to which it has been parsed.  A refresh only reads bytes appended since
+the previous refresh (a shrunk or replaced file is re-read from the start),
+and parsed entries land in a timestamp-indexed table so a session window is
+one range query.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+def parse_bot_log_line(line: str) -> Optional[Tuple[str, str, str, datetime]]:
+    """Parse one log line into ``(timestamp_str, level, message, timestamp)``.
+
+    Supports ``"<iso timestamp> | LEVEL | message"`` and the standard logging
+    format ``"YYYY-MM-DD HH:MM:SS,ms - logger - LEVEL - message"``.  Returns
+    ``None`` for lines without a usable timestamp.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    timestamp_str: Optional[str] = None
+    level = "INFO"
+    message = line
+
+    if " | " in line:
+        parts = line.split(" | ", 2)
+        if len(parts) >= 3:
+            timestamp_str, level, message = parts[0], parts[1], parts[2]
+    else:
+        try:
+            ts_part, remainder = line.split(" - ", 1)
+            parsed_ts = datetime.strptime(ts_part, "%Y-%m-%d %H:%M:%S,%f")
+            timestamp_str = parsed_ts.isoformat()
+            remainder_parts = remainder.split(" - ")
+            if len(remainder_parts) >= 2:
+                level = remainder_parts[1].strip()
+                message = " - ".join(remainder_parts[2:]) if len(remainder_parts) > 2 else ""
+            else:
+                message = remainder
+        except Exception:
+            timestamp_str = None
+
+    if not timestamp_str:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(timestamp_str)
+    except ValueError:
+        return None
+    return timestamp_str, level, message, timestamp
+
+
+def bot_name_for(log_path: Path) -> str:
+    """Name used for a log file's entries on the activity timeline."""
+    bot_name = log_path.parent.name
+    if not bot_name.lower().endswith("bot") and "_bots" in str(log_path):
+        bot_name = log_path.stem
+    return bot_name
+
+
+class BotLogIndexer:
+    """Maintain ``bot_log_entries`` from the bot log files under an installation."""
+
+    # Directory trees are only re-walked for new files this often (seconds);
+    # known files are stat'ed on every refresh.
+    DISCOVERY_INTERVAL = 300.0
+
+    def __init__(self, installation_dir: Path, db_path: Path) -> None:
+        self.installation_dir = Path(installation_dir)
+        self.db_path = Path(db_path)
+        self._last_discovery = 0.0
+        self._init_schema()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def refresh(self, force_discovery: bool = False) -> int:
+        """Parse newly appended lines of every known log file; return entries added."""
+        with self._connect() as conn:
+            now = time.monotonic()
+            if force_discovery or not self._last_discovery or now - self._last_discovery >= self.DISCOVERY_INTERVAL:
+                self._register_files(conn, self._discover())
+                self._last_discovery = now
+
+            added = 0
+            files = conn.execute(
+                "SELECT file_id, path, inode, size, byte_offset, line_count FROM bot_log_files"
+            ).fetchall()
+            for file_row in files:
+                added += self._refresh_file(conn, *file_row)
+        return added
+
+    def entries_between(self, start: datetime, end: datetime) -> List[Dict]:
+        """Return timeline entries whose timestamp falls inside ``[start, end]``."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                SELECT e.timestamp, e.line_no, e.level, e.message, f.path, f.bot_name
+                FROM bot_log_entries e
+                JOIN bot_log_files f ON f.file_id = e.file_id
+                WHERE e.ts_key BETWEEN ? AND ?
+                ORDER BY e.ts_key
+                """,
+                (start.isoformat(), end.isoformat()),
+            )
+            return [
+                {
+                    "id": f"botlog_{Path(path).stem}_{line_no}",
+                    "type": "bot-log",
+                    "timestamp": timestamp,
+                    "level": level,
+                    "message": message,
+                    "bot_name": bot_name,
+                    "log_file": path,
+                }
+                for timestamp, line_no, level, message, path, bot_name in cursor
+            ]
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bot_log_files (
+                    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path TEXT NOT NULL UNIQUE,
+                    bot_name TEXT,
+                    inode INTEGER,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    byte_offset INTEGER NOT NULL DEFAULT 0,
+                    line_count INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bot_log_entries (
+                    file_id INTEGER NOT NULL,
+                    line_no INTEGER NOT NULL,
+                    ts_key TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    level TEXT,
+                    message TEXT,
+                    PRIMARY KEY (file_id, line_no)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bot_log_entries_ts ON bot_log_entries(ts_key)")
+
+    def _discover(self) -> List[Path]:
+        candidates: List[Path] = []
+        secure_log_dir = self.installation_dir / "_secure_data" / "bot_logs"
+        if secure_log_dir.exists():
+            candidates.extend(secure_log_dir.glob("*.log"))
+        bots_dir = self.installation_dir / "_bots"
+        if bots_dir.exists():
+            candidates.extend(bots_dir.rglob("*.log"))
+        return candidates
+
+    @staticmethod
+    def _register_files(conn: sqlite3.Connection, paths: Iterable[Path]) -> None:
+        rows = []
+        for log_path in paths:
+            try:
+                resolved = log_path.resolve()
+            except Exception:
+                resolved = log_path
+            rows.append((str(resolved), bot_name_for(log_path)))
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO bot_log_files (path, bot_name) VALUES (?, ?)", rows)
+
+    def _refresh_file(
+        self,
+        conn: sqlite3.Connection,
+        file_id: int,
+        path: str,
+        inode: Optional[int],
+        size: int,
+        offset: int,
+        line_count: int,
+    ) -> int:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with conn:
+                conn.execute("DELETE FROM bot_log_entries WHERE file_id = ?", (file_id,))
+                conn.execute("DELETE FROM bot_log_files WHERE file_id = ?", (file_id,))
+            return 0
+
+        if (inode is not None and stat.st_ino != inode) or stat.st_size < offset:
+            # Rotated, replaced or truncated: start over for this file.
+            with conn:
+                conn.execute("DELETE FROM bot_log_entries WHERE file_id = ?", (file_id,))
+            offset = 0
+            line_count = 0
+        elif stat.st_size == offset:
+            return 0
+
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(offset)
+                chunk = fh.read(stat.st_size - offset)
+        except OSError as exc:
+            LOGGER.error("Error reading bot log %s: %s", path, exc)
+            return 0
+
+        # Only consume complete lines; a partially written last line is
+        # picked up on the next refresh.
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return 0
+        chunk = chunk[:end + 1]
+
+        entries = []
+        for raw_line in chunk.split(b"\n")[:-1]:
+            line_no = line_count
+            line_count += 1
+            parsed = parse_bot_log_line(raw_line.decode("utf-8", errors="replace"))
+            if parsed is None:
+                continue
+            timestamp_str, level, message, timestamp = parsed
+            entries.append((file_id, line_no, timestamp.isoformat(), timestamp_str, level, message))
+
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO bot_log_entries
+                (file_id, line_no, ts_key, timestamp, level, message)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                entries,
+            )
+            conn.execute(
+                "UPDATE bot_log_files SET inode = ?, size = ?, byte_offset = ?, line_count = ? WHERE file_id = ?",
+                (stat.st_ino, stat.st_size, offset + len(chunk), line_count, file_id),
+            )
+        return len(entries)
+
+
+__all__ = ["BotLogIndexer", "bot_name_for", "parse_bot_log_line"]
@@ -24,6 +24,21 @@ except ImportError:
     ANALYZER_AVAILABLE = False
     AIActivityAnalyzer = None
 
+try:
+    from .bot_log_index import BotLogIndexer
+except ImportError:
+    from bot_log_index import BotLogIndexer
+
+try:
+    from .session_timeline import KIND_BROWSER, KIND_DESKTOP, SessionTimelineStore
+except ImportError:
+    from session_timeline import KIND_BROWSER, KIND_DESKTOP, SessionTimelineStore
+
+try:
+    from monitoring.partitioned_store import monitoring_database_files
+except ImportError:
+    from partitioned_store import monitoring_database_files
+
 try:
     from pattern_extraction_engine import PatternExtractionEngine
     PATTERN_ENGINE_AVAILABLE = True
@@ -62,6 +77,13 @@ class ContextUnderstandingEngine:
         self.context_db = self.intelligence_dir / "context_understanding.db"
         self._init_context_database()
         
+        # Materialized activity timeline (lives alongside the context tables);
+        # it keeps monitoring rows no longer than the monitoring store does
+        self.timeline = SessionTimelineStore(self.context_db, retention_days=self._monitoring_retention_days())
+        
+        # Offset-tracking index over the bot GUI logs
+        self.bot_log_index = BotLogIndexer(self.installation_dir, self.context_db)
+        
         # Setup logging
         self.log_file = self.intelligence_dir / "context_understanding.log"
         self._setup_logging()
@@ -340,12 +362,13 @@ class ContextUnderstandingEngine:
             ]
         }
     
-    def understand_session(self, session_id: str) -> Dict:
+    def understand_session(self, session_id: str, refresh_timeline: bool = True) -> Dict:
         """
         Understand a complete session - extract intent, context, dependencies, and goals
         
         Args:
             session_id: Session ID to understand
+            refresh_timeline: Pull newly recorded rows into the session timeline first
             
         Returns:
             Dictionary with:
@@ -359,7 +382,7 @@ class ContextUnderstandingEngine:
             self.logger.info(f"Understanding session: {session_id}")
             
             # Get session data
-            session_data = self._get_session_data(session_id)
+            session_data = self._get_session_data(session_id, refresh=refresh_timeline)
             if not session_data:
                 self.logger.warning(f"No data found for session: {session_id}")
                 return {}
@@ -404,90 +427,65 @@ class ContextUnderstandingEngine:
             traceback.print_exc()
             return {}
     
-    def _get_session_data(self, session_id: str) -> List[Dict]:
-        """Get all activity data for a session"""
+    def _monitoring_retention_days(self) -> int:
+        """Retention window from the full monitoring config (7 days if unset)"""
+        config_path = self.installation_dir / "AI" / "monitoring" / "full_monitoring_config.json"
         try:
-            activities: List[Dict] = []
-            session_times: List[datetime] = []
+            if config_path.exists():
+                config = json.loads(config_path.read_text(encoding="utf-8"))
+                if isinstance(config, dict):
+                    return int(config.get("retention_days") or 7)
+        except Exception:
+            pass
+        return 7
 
-            # Helper to capture timestamps safely
-            def _remember_time(ts_str: Optional[str]):
-                if not ts_str:
-                    return
-                try:
-                    session_times.append(datetime.fromisoformat(ts_str))
-                except Exception:
-                    pass
+    def _timeline_sources(self) -> Tuple[List[Path], List[Path]]:
+        """Desktop and browser databases that feed the session timeline
 
-            # Try full monitoring database (desktop activity)
-            db_paths = [
+        Each monitor database is followed by its day/week partition files,
+        which the timeline tracks with their own watermarks.
+        """
+        desktop_dbs = [
+            path
+            for db_path in (
                 self.data_dir / "full_monitoring" / "full_monitoring.db",
                 self.installation_dir / "_secure_data" / "full_monitoring" / "full_monitoring.db",
-            ]
-
-            for db_path in db_paths:
-                if not db_path.exists():
-                    continue
-
-                initial_count = len(activities)
+            )
+            for path in monitoring_database_files(db_path)
+        ]
+        browser_dbs = [
+            path
+            for db_path in (
+                self.data_dir / "browser_activity.db",
+                self.installation_dir / "_secure_data" / "browser_activity.db",
+            )
+            for path in monitoring_database_files(db_path)
+        ]
+        return desktop_dbs, browser_dbs
 
-                with sqlite3.connect(db_path) as conn:
-                        cursor = conn.cursor()
+    def _refresh_timeline(self) -> None:
+        """Append new monitoring rows to the session timeline (watermark based)"""
+        try:
+            self.timeline.refresh(*self._timeline_sources())
+        except Exception as e:
+            self.logger.error(f"Error refreshing session timeline: {e}")
 
-                        cursor.execute("""
-                            SELECT timestamp, window_title, active_app
-                            FROM screen_recordings
-                            WHERE session_id = ?
-                            ORDER BY timestamp
-                        """, (session_id,))
-                        for row in cursor.fetchall():
-                            activities.append({
-                                "id": f"screen_{row[0]}",
-                                "type": "screen",
-                                "timestamp": row[0],
-                                "window_title": row[1],
-                                "active_app": row[2]
-                            })
-                            _remember_time(row[0])
+    def _get_session_data(self, session_id: str, refresh: bool = True) -> List[Dict]:
+        """Get all activity data for a session"""
+        try:
+            if refresh:
+                self._refresh_timeline()
 
-                        cursor.execute("""
-                            SELECT timestamp, key_pressed, active_app, window_title
-                            FROM keyboard_input
-                            WHERE session_id = ?
-                            ORDER BY timestamp
-                        """, (session_id,))
-                        for row in cursor.fetchall():
-                            activities.append({
-                                "id": f"keyboard_{row[0]}",
-                                "type": "keyboard",
-                                "timestamp": row[0],
-                                "key": row[1],
-                                "active_app": row[2],
-                                "window_title": row[3]
-                            })
-                            _remember_time(row[0])
+            # One ordered range scan over the materialized timeline
+            grouped = self.timeline.session_activities(session_id)
+            activities: List[Dict] = list(grouped.get(KIND_DESKTOP, []))
 
-                        cursor.execute("""
-                            SELECT timestamp, event_type, x_position, y_position, active_app, window_title
-                            FROM mouse_activity
-                            WHERE session_id = ?
-                            ORDER BY timestamp
-                        """, (session_id,))
-                        for row in cursor.fetchall():
-                            activities.append({
-                                "id": f"mouse_{row[0]}",
-                                "type": "mouse",
-                                "timestamp": row[0],
-                                "event_type": row[1],
-                                "x": row[2],
-                                "y": row[3],
-                                "active_app": row[4],
-                                "window_title": row[5]
-                            })
-                            _remember_time(row[0])
-                # Only stop searching if we actually found any records for this session
-                if len(activities) > initial_count:
-                    break
+            session_times: List[datetime] = []
+            for activity in activities:
+                try:
+                    session_times.append(datetime.fromisoformat(activity["timestamp"]))
+                except Exception:
+                    pass
 
             session_start = None
             session_end = None
@@ -500,172 +498,23 @@ class ContextUnderstandingEngine:
             bot_logs = self._get_bot_log_entries(session_start, session_end)
             activities.extend(bot_logs)
 
-            # Helper to check whether a browser timestamp should be merged
-            def _within_session(ts_str: Optional[str]) -> bool:
-                if not ts_str:
-                    return False
+            # Browser telemetry: same session id first, else the session's time window
+            browser_rows = grouped.get(KIND_BROWSER, [])
+            if not browser_rows and session_start and session_end:
+                browser_rows = self.timeline.window_activities(
+                    KIND_BROWSER, session_start.isoformat(), session_end.isoformat()
+                )
+
+            for activity in browser_rows:
                 if not session_start or not session_end:
-                    return True
+                    activities.append(activity)
+                    continue
                 try:
-                    ts = datetime.fromisoformat(ts_str)
-                    return session_start <= ts <= session_end
+                    ts = datetime.fromisoformat(activity["timestamp"])
                 except Exception:
-                    return False
-
-            # Try browser activity database (web automation telemetry)
-            browser_db_paths = [
-                self.data_dir / "browser_activity.db",
-                self.installation_dir / "_secure_data" / "browser_activity.db",
-            ]
-
-            for browser_db in browser_db_paths:
-                if not browser_db.exists():
                     continue
-
-                before_browser = len(activities)
-
-                with sqlite3.connect(browser_db) as conn:
-                    cursor = conn.cursor()
-
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                    tables = {row[0] for row in cursor.fetchall()}
-
-                    # Legacy single-table schema
-                    if "browser_activity" in tables:
-                        cursor.execute("""
-                            SELECT timestamp, event_type, url, element_type, element_text
-                            FROM browser_activity
-                            WHERE session_id = ?
-                            ORDER BY timestamp
-                        """, (session_id,))
-                        rows = cursor.fetchall()
-                        # If no direct matches, fall back to time window
-                        if not rows and session_start and session_end:
-                            cursor.execute("""
-                                SELECT timestamp, event_type, url, element_type, element_text
-                                FROM browser_activity
-                                WHERE timestamp BETWEEN ? AND ?
-                                ORDER BY timestamp
-                            """, (session_start.isoformat(), session_end.isoformat()))
-                            rows = cursor.fetchall()
-
-                        for row in rows:
-                            if _within_session(row[0]):
-                                activities.append({
-                                    "id": f"browser_{row[0]}",
-                                    "type": "browser",
-                                    "timestamp": row[0],
-                                    "event_type": row[1],
-                                    "url": row[2],
-                                    "element_type": row[3],
-                                    "element_text": row[4]
-                                })
-                                _remember_time(row[0])
-
-                    else:
-                        # Normalized schema helpers
-                        def fetch_rows(query_by_session: str, query_by_time: str, columns: int):
-                            rows_local = []
-                            if session_id:
-                                cursor.execute(query_by_session, (session_id,))
-                                rows_local = cursor.fetchall()
-                            if not rows_local and session_start and session_end:
-                                cursor.execute(
-                                    query_by_time,
-                                    (session_start.isoformat(), session_end.isoformat())
-                                )
-                                rows_local = cursor.fetchall()
-                            return rows_local
-
-                        if "page_navigations" in tables:
-                            rows = fetch_rows(
-                                """
-                                SELECT timestamp, navigation_type, url, page_title
-                                FROM page_navigations
-                                WHERE session_id = ?
-                                ORDER BY timestamp
-                                """,
-                                """
-                                SELECT timestamp, navigation_type, url, page_title
-                                FROM page_navigations
-                                WHERE timestamp BETWEEN ? AND ?
-                                ORDER BY timestamp
-                                """,
-                                4
-                            )
-                            for row in rows:
-                                if _within_session(row[0]):
-                                    activities.append({
-                                        "id": f"browser_nav_{row[0]}",
-                                        "type": "browser-navigation",
-                                        "timestamp": row[0],
-                                        "event_type": row[1],
-                                        "url": row[2],
-                                        "page_title": row[3]
-                                    })
-                                    _remember_time(row[0])
-
-                        if "element_interactions" in tables:
-                            rows = fetch_rows(
-                                """
-                                SELECT timestamp, action_type, element_tag, element_id, element_name, page_url
-                                FROM element_interactions
-                                WHERE session_id = ?
-                                ORDER BY timestamp
-                                """,
-                                """
-                                SELECT timestamp, action_type, element_tag, element_id, element_name, page_url
-                                FROM element_interactions
-                                WHERE timestamp BETWEEN ? AND ?
-                                ORDER BY timestamp
-                                """,
-                                6
-                            )
-                            for row in rows:
-                                if _within_session(row[0]):
-                                    activities.append({
-                                        "id": f"browser_el_{row[0]}",
-                                        "type": "browser-element",
-                                        "timestamp": row[0],
-                                        "event_type": row[1],
-                                        "element_tag": row[2],
-                                        "element_id": row[3],
-                                        "element_name": row[4],
-                                        "url": row[5]
-                                    })
-                                    _remember_time(row[0])
-
-                        if "form_field_interactions" in tables:
-                            rows = fetch_rows(
-                                """
-                                SELECT timestamp, field_name, field_type, has_value, page_url
-                                FROM form_field_interactions
-                                WHERE session_id = ?
-                                ORDER BY timestamp
-                                """,
-                                """
-                                SELECT timestamp, field_name, field_type, has_value, page_url
-                                FROM form_field_interactions
-                                WHERE timestamp BETWEEN ? AND ?
-                                ORDER BY timestamp
-                                """,
-                                5
-                            )
-                            for row in rows:
-                                if _within_session(row[0]):
-                                    activities.append({
-                                        "id": f"browser_form_{row[0]}",
-                                        "type": "browser-form",
-                                        "timestamp": row[0],
-                                        "field_name": row[1],
-                                        "field_type": row[2],
-                                        "has_value": row[3],
-                                        "url": row[4]
-                                    })
-                                    _remember_time(row[0])
-
-                if len(activities) > before_browser:
-                    break
+                if session_start <= ts <= session_end:
+                    activities.append(activity)
 
             activities.sort(key=lambda x: x.get("timestamp", ""))
             return activities
@@ -676,90 +525,15 @@ class ContextUnderstandingEngine:
 
     def _get_bot_log_entries(self, session_start: Optional[datetime], session_end: Optional[datetime]) -> List[Dict]:
         """Load bot GUI log entries and map them onto the activity timeline."""
-        entries: List[Dict] = []
         if not session_start or not session_end:
-            return entries
-
-        candidates: List[Path] = []
-
-        secure_log_dir = self.installation_dir / "_secure_data" / "bot_logs"
-        if secure_log_dir.exists():
-            candidates.extend(secure_log_dir.glob("*.log"))
-
-        bots_dir = self.installation_dir / "_bots"
-        if bots_dir.exists():
-            candidates.extend(bots_dir.rglob("*.log"))
-
-        seen: set = set()
-        for log_path in sorted(candidates):
-            try:
-                resolved = log_path.resolve()
-            except Exception:
-                resolved = log_path
-            if resolved in seen or not log_path.exists():
-                continue
-            seen.add(resolved)
-
-            bot_name = log_path.parent.name
-            if bot_name.lower().endswith("bot"):
-                bot_name = bot_name
-            elif "_bots" in str(log_path):
-                bot_name = log_path.stem
-
-            try:
-                with log_path.open("r", encoding="utf-8") as fh:
-                    for idx, line in enumerate(fh):
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        timestamp_str: Optional[str] = None
-                        level = "INFO"
-                        message = line
-
-                        if " | " in line:
-                            parts = line.split(" | ", 2)
-                            if len(parts) >= 3:
-                                timestamp_str, level, message = parts[0], parts[1], parts[2]
-                                try:
-                                    datetime.fromisoformat(timestamp_str)
-                                except ValueError:
-                                    timestamp_str = None
-                        else:
-                            # Attempt to parse standard logging format: "YYYY-MM-DD HH:MM:SS,ms - logger - LEVEL - message"
-                            try:
-                                ts_part, remainder = line.split(" - ", 1)
-                                parsed_ts = datetime.strptime(ts_part, "%Y-%m-%d %H:%M:%S,%f")
-                                timestamp_str = parsed_ts.isoformat()
-                                remainder_parts = remainder.split(" - ")
-                                if len(remainder_parts) >= 2:
-                                    level = remainder_parts[1].strip()
-                                    message = " - ".join(remainder_parts[2:]) if len(remainder_parts) > 2 else ""
-                                else:
-                                    message = remainder
-                            except Exception:
-                                timestamp_str = None
-
-                        if not timestamp_str:
-                            continue
-                        try:
-                            timestamp = datetime.fromisoformat(timestamp_str)
-                        except ValueError:
-                            continue
-
-                        if session_start <= timestamp <= session_end:
-                            entries.append({
-                                "id": f"botlog_{log_path.stem}_{idx}",
-                                "type": "bot-log",
-                                "timestamp": timestamp_str,
-                                "level": level,
-                                "message": message,
-                                "bot_name": bot_name,
-                                "log_file": str(log_path)
-                            })
-            except Exception as exc:
-                self.logger.error(f"Error reading bot log {log_path}: {exc}")
-        return entries
+            return []
+        try:
+            # Only lines appended since the last call are parsed
+            self.bot_log_index.refresh()
+            return self.bot_log_index.entries_between(session_start, session_end)
+        except Exception as exc:
+            self.logger.error(f"Error reading bot logs: {exc}")
+            return []
     
     def _understand_intent(self, session_id: str, session_data: List[Dict]) -> List[Dict]:
         """Understand intent behind actions"""
@@ -1319,7 +1093,8 @@ class ContextUnderstandingEngine:
             results = []
             for session_id in recent_sessions:
                 try:
-                    understanding = self.understand_session(session_id)
+                    # Timeline was refreshed by _get_recent_sessions
+                    understanding = self.understand_session(session_id, refresh_timeline=False)
                     results.append(understanding)
                     self.logger.info(f"Processed session: {session_id}")
                 except Exception as e:
@@ -1337,35 +1112,10 @@ class ContextUnderstandingEngine:
     def _get_recent_sessions(self, hours: int = 24) -> List[str]:
         """Get recent session IDs"""
         try:
-            db_paths = [
-                self.data_dir / "full_monitoring" / "full_monitoring.db",
-                self.installation_dir / "_secure_data" / "full_monitoring" / "full_monitoring.db",
-            ]
-            
-            sessions = set()
-            
-            for db_path in db_paths:
-                if db_path.exists():
-                    conn = sqlite3.connect(db_path)
-                    cursor = conn.cursor()
-                    
-                    cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
-                    
-                    cursor.execute("""
-                        SELECT DISTINCT session_id
-                        FROM screen_recordings
-                        WHERE timestamp > ?
-                        ORDER BY timestamp DESC
-                    """, (cutoff_time,))
-                    
-                    for row in cursor.fetchall():
-                        sessions.add(row[0])
-                    
-                    conn.close()
-            
-            return list(sessions)
+            self._refresh_timeline()
+            cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
+            return self.timeline.recent_sessions(cutoff_time, kind=KIND_DESKTOP)
             
         except Exception as e:
             self.logger.error(f"Error getting recent sessions: {e}")
             return []
-
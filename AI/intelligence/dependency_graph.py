@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Dependency Graph - linear-time path and cluster analysis for DependencyMapper
+Part of the Context Understanding Engine
+
+Critical paths come from a longest-path dynamic program over a topological
+order (O(V + E)); clusters come from union-find with path compression.
+Run this file directly to benchmark both on synthetic action graphs.
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class UnionFind:
+    """Disjoint-set forest with path compression and union by size"""
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def add(self, item: str):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item: str) -> str:
+        self.add(item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: str, b: str) -> str:
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+class DependencyGraph:
+    """
+    Directed dependency graph over action ids
+
+    Node ids keep their first-seen order, which is used to break ties and to
+    order nodes that sit on a cycle (edges pointing backwards in the final
+    order are ignored for path finding).
+    """
+
+    def __init__(self, node_ids: Optional[Iterable[str]] = None,
+                 edges: Optional[Iterable[Tuple[str, str]]] = None):
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._edges: List[Tuple[int, int]] = []
+        for node_id in node_ids or []:
+            self.add_node(node_id)
+        for source, target in edges or []:
+            self.add_edge(source, target)
+
+    @classmethod
+    def from_graph(cls, nodes: List[Dict], edges: List[Dict]) -> "DependencyGraph":
+        """Build from DependencyMapper node/edge dictionaries"""
+        return cls(
+            (node["id"] for node in nodes),
+            ((edge["source"], edge["target"]) for edge in edges)
+        )
+
+    def add_node(self, node_id: str) -> int:
+        index = self._index.get(node_id)
+        if index is None:
+            index = len(self._ids)
+            self._index[node_id] = index
+            self._ids.append(node_id)
+        return index
+
+    def add_edge(self, source: str, target: str):
+        self._edges.append((self.add_node(source), self.add_node(target)))
+
+    def topological_order(self) -> List[int]:
+        """Kahn's algorithm; nodes left on cycles follow in first-seen order"""
+        count = len(self._ids)
+        indegree = [0] * count
+        adjacency: List[List[int]] = [[] for _ in range(count)]
+        for source, target in self._edges:
+            if source != target:
+                adjacency[source].append(target)
+                indegree[target] += 1
+
+        ready = deque(i for i in range(count) if indegree[i] == 0)
+        order: List[int] = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for target in adjacency[node]:
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    ready.append(target)
+
+        if len(order) < count:
+            placed = set(order)
+            order.extend(i for i in range(count) if i not in placed)
+        return order
+
+    def longest_paths(self, k: int = 5, min_length: int = 3) -> List[List[str]]:
+        """
+        Return up to ``k`` longest dependency chains, one per end node
+
+        Each chain ends at a node with no outgoing edge and has at least
+        ``min_length`` nodes.  Runs in O(V + E + V log V).
+        """
+        count = len(self._ids)
+        if count == 0 or k <= 0:
+            return []
+
+        order = self.topological_order()
+        position = [0] * count
+        for pos, node in enumerate(order):
+            position[node] = pos
+
+        forward: List[List[int]] = [[] for _ in range(count)]
+        for source, target in self._edges:
+            if position[source] < position[target]:
+                forward[source].append(target)
+
+        # length[v] = nodes on the longest chain ending at v
+        length = [1] * count
+        previous = [-1] * count
+        for node in order:
+            next_length = length[node] + 1
+            for target in forward[node]:
+                if next_length > length[target]:
+                    length[target] = next_length
+                    previous[target] = node
+
+        ends = [
+            node for node in range(count)
+            if not forward[node] and length[node] >= min_length
+        ]
+        ends.sort(key=lambda node: (-length[node], position[node]))
+
+        paths: List[List[str]] = []
+        for end in ends[:k]:
+            path: List[str] = []
+            node = end
+            while node != -1:
+                path.append(self._ids[node])
+                node = previous[node]
+            path.reverse()
+            paths.append(path)
+        return paths
+
+    def clusters(self, min_size: int = 2) -> List[List[str]]:
+        """Weakly connected groups of nodes joined by at least one edge"""
+        union_find = UnionFind()
+        for source, target in self._edges:
+            union_find.union(self._ids[source], self._ids[target])
+
+        groups: Dict[str, List[str]] = {}
+        for node_id in self._ids:
+            if node_id in union_find.parent:
+                groups.setdefault(union_find.find(node_id), []).append(node_id)
+        return [members for members in groups.values() if len(members) >= min_size]
+
+
+def _synthetic_graph(action_count: int, seed: int = 7) -> DependencyGraph:
+    """Mimic a day of monitoring: mostly consecutive edges plus short look-aheads"""
+    rng = random.Random(seed)
+    graph = DependencyGraph(f"action_{i}" for i in range(action_count))
+    for i in range(action_count - 1):
+        # Session breaks leave roughly 1 in 50 consecutive pairs unlinked
+        if rng.random() > 0.02:
+            graph.add_edge(f"action_{i}", f"action_{i + 1}")
+        for _ in range(rng.randint(0, 2)):
+            j = i + rng.randint(2, 9)
+            if j < action_count:
+                graph.add_edge(f"action_{i}", f"action_{j}")
+    return graph
+
+
+def _synthetic_actions(action_count: int, seed: int = 7) -> List[Dict]:
+    """Timestamped actions with a repeating intent cycle, one per second"""
+    rng = random.Random(seed)
+    intents = ["login", "navigate", "search", "view", "edit", "submit"]
+    start = datetime(2025, 1, 6, 8, 0, 0)
+    actions = []
+    for i in range(action_count):
+        actions.append({
+            "id": f"action_{i}",
+            "type": "browser",
+            "intent_category": intents[i % len(intents)] if rng.random() > 0.1 else "",
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+        })
+    return actions
+
+
+def benchmark(sizes: Iterable[int] = (10_000, 50_000, 100_000), k: int = 5,
+              include_mapper: bool = True) -> List[Dict]:
+    """Time critical-path and cluster analysis on synthetic graphs"""
+    results = []
+    for size in sizes:
+        graph = _synthetic_graph(size)
+        started = time.perf_counter()
+        paths = graph.longest_paths(k=k)
+        paths_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        clusters = graph.clusters()
+        cluster_seconds = time.perf_counter() - started
+        row = {
+            "actions": size,
+            "edges": len(graph._edges),
+            "critical_paths_seconds": round(paths_seconds, 4),
+            "clusters_seconds": round(cluster_seconds, 4),
+            "longest_path": len(paths[0]) if paths else 0,
+            "clusters": len(clusters),
+        }
+        if include_mapper:
+            try:
+                from .dependency_mapper import DependencyMapper
+            except ImportError:
+                from dependency_mapper import DependencyMapper
+            actions = _synthetic_actions(size)
+            started = time.perf_counter()
+            DependencyMapper().build_dependency_graph(actions)
+            row["build_dependency_graph_seconds"] = round(time.perf_counter() - started, 4)
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dependency graph analysis")
+    parser.add_argument("sizes", nargs="*", type=int, default=[10_000, 50_000, 100_000],
+                        help="Number of synthetic actions per run")
+    parser.add_argument("-k", type=int, default=5, help="Critical paths to return")
+    parser.add_argument("--graph-only", action="store_true",
+                        help="Skip the end-to-end DependencyMapper.build_dependency_graph timing")
+    args = parser.parse_args()
+    for row in benchmark(args.sizes, k=args.k, include_mapper=not args.graph_only):
+        line = (
+            f"{row['actions']:>7} actions / {row['edges']:>7} edges: "
+            f"critical paths {row['critical_paths_seconds']:.3f}s, "
+            f"clusters {row['clusters_seconds']:.3f}s "
+            f"(longest path {row['longest_path']}, {row['clusters']} clusters)"
+        )
+        if "build_dependency_graph_seconds" in row:
+            line += f", build_dependency_graph {row['build_dependency_graph_seconds']:.3f}s"
+        print(line)
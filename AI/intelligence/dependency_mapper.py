@@ -10,6 +10,11 @@ from collections import defaultdict
 from datetime import datetime
 import logging
 
+try:
+    from .dependency_graph import DependencyGraph
+except ImportError:
+    from dependency_graph import DependencyGraph
+
 
 class DependencyMapper:
     """
@@ -345,80 +350,15 @@ class DependencyMapper:
             "total_edges": len(edges)
         }
     
-    def _find_critical_paths(self, nodes: List[Dict], edges: List[Dict]) -> List[List[str]]:
+    def _find_critical_paths(self, nodes: List[Dict], edges: List[Dict],
+                             top_k: int = 5) -> List[List[str]]:
         """Find critical paths (long chains of dependencies)"""
-        # Build adjacency list
-        adjacency = defaultdict(list)
-        for edge in edges:
-            adjacency[edge["source"]].append(edge["target"])
-        
-        # Find longest paths
-        paths = []
-        visited = set()
-        
-        def dfs(node, path):
-            if node in visited:
-                return
-            
-            visited.add(node)
-            path.append(node)
-            
-            if node in adjacency:
-                for neighbor in adjacency[node]:
-                    dfs(neighbor, path.copy())
-            else:
-                # End of path
-                if len(path) > 2:  # Only paths with 3+ nodes
-                    paths.append(path)
-            
-            visited.remove(node)
-        
-        for node in nodes:
-            if node["id"] not in visited:
-                dfs(node["id"], [])
-        
-        # Return longest paths
-        if paths:
-            paths.sort(key=len, reverse=True)
-            return paths[:5]  # Top 5 longest paths
-        
-        return []
+        # Longest-path DP over a topological order: linear in nodes + edges
+        graph = DependencyGraph.from_graph(nodes, edges)
+        return graph.longest_paths(k=top_k, min_length=3)
     
     def _find_dependency_clusters(self, nodes: List[Dict], edges: List[Dict]) -> List[List[str]]:
         """Find dependency clusters (groups of related actions)"""
-        # Simple clustering by shared dependencies
-        clusters = []
-        node_clusters = {}
-        
-        for edge in edges:
-            source = edge["source"]
-            target = edge["target"]
-            
-            # If both nodes are in same cluster, continue
-            if source in node_clusters and target in node_clusters:
-                if node_clusters[source] == node_clusters[target]:
-                    continue
-            
-            # Merge clusters
-            if source in node_clusters:
-                cluster_id = node_clusters[source]
-                node_clusters[target] = cluster_id
-            elif target in node_clusters:
-                cluster_id = node_clusters[target]
-                node_clusters[source] = cluster_id
-            else:
-                # New cluster
-                cluster_id = len(clusters)
-                clusters.append([])
-                node_clusters[source] = cluster_id
-                node_clusters[target] = cluster_id
-            
-            # Add nodes to cluster
-            cluster = clusters[cluster_id]
-            if source not in cluster:
-                cluster.append(source)
-            if target not in cluster:
-                cluster.append(target)
-        
-        return clusters
-
+        # Union-find over edge endpoints
+        graph = DependencyGraph.from_graph(nodes, edges)
+        return graph.clusters()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""Incrementally maintained session timeline for the context engine.
+
+Rows from the full-monitoring and browser-activity databases are copied
+into one ``session_timeline`` table keyed by ``(session_id, timestamp)``.
+Each source table has a rowid watermark, so a refresh only reads rows that
+were appended since the previous one and reading a session is a single
+ordered range scan instead of one query per source table.
+
+The copy follows the monitoring retention policy: rows older than
+``retention_days`` are pruned on every refresh, and sessions purged from
+the monitoring store are purged here as well.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+KIND_DESKTOP = "desktop"
+KIND_BROWSER = "browser"
+
+
+@dataclass(frozen=True)
+class TimelineSource:
+    """How one source table maps onto timeline activity dictionaries."""
+
+    table: str
+    kind: str
+    activity_type: str
+    id_prefix: str
+    # (activity key, candidate source columns in order of preference)
+    fields: Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+DESKTOP_SOURCES: Tuple[TimelineSource, ...] = (
+    TimelineSource("screen_recordings", KIND_DESKTOP, "screen", "screen", (
+        ("window_title", ("window_title",)),
+        ("active_app", ("active_app",)),
+    )),
+    TimelineSource("keyboard_input", KIND_DESKTOP, "keyboard", "keyboard", (
+        ("key", ("key_pressed",)),
+        ("active_app", ("active_app",)),
+        ("window_title", ("window_title",)),
+    )),
+    TimelineSource("mouse_activity", KIND_DESKTOP, "mouse", "mouse", (
+        ("event_type", ("event_type",)),
+        ("x", ("x_position",)),
+        ("y", ("y_position",)),
+        ("active_app", ("active_app",)),
+        ("window_title", ("window_title",)),
+    )),
+)
+
+# Legacy single-table browser schema; when present the normalized tables are ignored.
+LEGACY_BROWSER_SOURCE = TimelineSource("browser_activity", KIND_BROWSER, "browser", "browser", (
+    ("event_type", ("event_type", "action_type")),
+    ("url", ("url",)),
+    ("element_type", ("element_type",)),
+    ("element_text", ("element_text", "element_value")),
+))
+
+BROWSER_SOURCES: Tuple[TimelineSource, ...] = (
+    TimelineSource("page_navigations", KIND_BROWSER, "browser-navigation", "browser_nav", (
+        ("event_type", ("navigation_type",)),
+        ("url", ("url", "anonymized_url")),
+        ("page_title", ("page_title",)),
+    )),
+    TimelineSource("element_interactions", KIND_BROWSER, "browser-element", "browser_el", (
+        ("event_type", ("action_type",)),
+        ("element_tag", ("element_tag",)),
+        ("element_id", ("element_id",)),
+        ("element_name", ("element_name",)),
+        ("url", ("page_url", "anonymized_page_url")),
+    )),
+    TimelineSource("form_field_interactions", KIND_BROWSER, "browser-form", "browser_form", (
+        ("field_name", ("field_name",)),
+        ("field_type", ("field_type",)),
+        ("has_value", ("has_value",)),
+        ("url", ("page_url", "anonymized_page_url")),
+    )),
+)
+
+
+class SessionTimelineStore:
+    """Materialized timeline of desktop and browser activity, pruned to the retention window."""
+
+    BATCH_SIZE = 5000
+
+    def __init__(self, db_path: Path, retention_days: Optional[int] = None) -> None:
+        self.db_path = Path(db_path)
+        self.retention_days = max(1, retention_days) if retention_days else None
+        self._init_schema()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def refresh(self, desktop_dbs: Iterable[Path], browser_dbs: Iterable[Path]) -> int:
+        """Append rows added to the source databases since the last refresh.
+
+        Rows that have aged out of the retention window are pruned afterwards,
+        including old rows re-read from a recreated source.
+        """
+        appended = 0
+        with self._connect() as conn:
+            for db_path in desktop_dbs:
+                appended += self._refresh_database(conn, Path(db_path), DESKTOP_SOURCES)
+            for db_path in browser_dbs:
+                appended += self._refresh_database(conn, Path(db_path), None)
+        if appended:
+            LOGGER.info("Session timeline: appended %s rows", appended)
+        if self.retention_days:
+            self.prune_before(datetime.now() - timedelta(days=self.retention_days))
+        return appended
+
+    def prune_before(self, cutoff: datetime) -> int:
+        """Delete activities recorded before ``cutoff``; returns rows deleted."""
+        deleted = 0
+        with self._connect() as conn:
+            # One index range per kind
+            for kind in (KIND_DESKTOP, KIND_BROWSER):
+                deleted += conn.execute(
+                    "DELETE FROM session_timeline WHERE kind = ? AND timestamp < ?",
+                    (kind, cutoff.isoformat()),
+                ).rowcount
+        if deleted:
+            LOGGER.info("Session timeline: pruned %s rows older than %s", deleted, cutoff)
+        return deleted
+
+    def purge_sessions(self, session_ids: Iterable[str]) -> int:
+        """Delete every activity of the given sessions; returns rows deleted."""
+        deleted = 0
+        with self._connect() as conn:
+            for session_id in dict.fromkeys(session_ids):
+                if session_id:
+                    deleted += conn.execute(
+                        "DELETE FROM session_timeline WHERE session_id = ?", (session_id,)
+                    ).rowcount
+        return deleted
+
+    def session_activities(self, session_id: str) -> Dict[str, List[Dict]]:
+        """Return one session's activities grouped by kind, in timestamp order."""
+        grouped: Dict[str, List[Dict]] = {KIND_DESKTOP: [], KIND_BROWSER: []}
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                SELECT kind, activity FROM session_timeline
+                WHERE session_id = ?
+                ORDER BY timestamp
+                """,
+                (session_id,),
+            )
+            for kind, activity in cursor:
+                grouped.setdefault(kind, []).append(json.loads(activity))
+        return grouped
+
+    def window_activities(self, kind: str, start: str, end: str) -> List[Dict]:
+        """Return activities of ``kind`` with ``start <= timestamp <= end``."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                SELECT activity FROM session_timeline
+                WHERE kind = ? AND timestamp BETWEEN ? AND ?
+                ORDER BY timestamp
+                """,
+                (kind, start, end),
+            )
+            return [json.loads(row[0]) for row in cursor]
+
+    def recent_sessions(self, since: str, kind: str = KIND_DESKTOP) -> List[str]:
+        """Return session ids with ``kind`` activity after ``since``."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                SELECT DISTINCT session_id FROM session_timeline
+                WHERE kind = ? AND timestamp > ? AND session_id != ''
+                """,
+                (kind, since),
+            )
+            return [row[0] for row in cursor]
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_timeline (
+                    session_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    source_id INTEGER NOT NULL,
+                    source_rowid INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    activity TEXT NOT NULL,
+                    PRIMARY KEY (session_id, timestamp, source_id, source_rowid)
+                ) WITHOUT ROWID
+                """
+            )
+            # Serves the time-window fallback and recent-session lookups.
+            # Earlier versions also indexed the activity text, which doubled
+            # the table's size on disk; drop that one.
+            conn.execute("DROP INDEX IF EXISTS idx_session_timeline_window")
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_session_timeline_kind_time
+                ON session_timeline(kind, timestamp)
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_timeline_sources (
+                    source_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    db_path TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    last_rowid INTEGER NOT NULL DEFAULT 0,
+                    UNIQUE(db_path, table_name)
+                )
+                """
+            )
+
+    def _refresh_database(
+        self,
+        conn: sqlite3.Connection,
+        db_path: Path,
+        sources: Optional[Tuple[TimelineSource, ...]],
+    ) -> int:
+        if not db_path.exists():
+            return 0
+        appended = 0
+        try:
+            with sqlite3.connect(db_path, timeout=30) as source_conn:
+                tables = {
+                    row[0]
+                    for row in source_conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                }
+                if sources is None:
+                    sources = (LEGACY_BROWSER_SOURCE,) if LEGACY_BROWSER_SOURCE.table in tables else BROWSER_SOURCES
+                for source in sources:
+                    if source.table in tables:
+                        appended += self._refresh_table(conn, source_conn, db_path, source)
+        except sqlite3.Error as exc:
+            LOGGER.error("Session timeline: could not read %s: %s", db_path, exc)
+        return appended
+
+    def _refresh_table(
+        self,
+        conn: sqlite3.Connection,
+        source_conn: sqlite3.Connection,
+        db_path: Path,
+        source: TimelineSource,
+    ) -> int:
+        source_id, last_rowid = self._watermark(conn, db_path, source.table)
+
+        max_rowid = source_conn.execute(f"SELECT MAX(rowid) FROM {source.table}").fetchone()[0] or 0
+        if max_rowid < last_rowid:
+            # Source was recreated or truncated; rebuild this source from scratch.
+            conn.execute("DELETE FROM session_timeline WHERE source_id = ?", (source_id,))
+            last_rowid = 0
+        if max_rowid == last_rowid:
+            return 0
+
+        columns = {row[1] for row in source_conn.execute(f"PRAGMA table_info({source.table})")}
+        if "timestamp" not in columns:
+            return 0
+        select_fields = []
+        for _, candidates in source.fields:
+            column = next((name for name in candidates if name in columns), None)
+            select_fields.append(column or "NULL")
+        session_column = "session_id" if "session_id" in columns else "NULL"
+        query = (
+            f"SELECT rowid, {session_column}, timestamp, {', '.join(select_fields)} "
+            f"FROM {source.table} WHERE rowid > ? ORDER BY rowid LIMIT ?"
+        )
+
+        appended = 0
+        while True:
+            rows = source_conn.execute(query, (last_rowid, self.BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+            batch = []
+            for row in rows:
+                rowid, session_id, timestamp = row[0], row[1], row[2]
+                last_rowid = rowid
+                if not timestamp:
+                    continue
+                activity = {
+                    "id": f"{source.id_prefix}_{timestamp}",
+                    "type": source.activity_type,
+                    "timestamp": timestamp,
+                }
+                for (key, _), value in zip(source.fields, row[3:]):
+                    activity[key] = value
+                batch.append((
+                    session_id or "",
+                    timestamp,
+                    source_id,
+                    rowid,
+                    source.kind,
+                    json.dumps(activity, default=str),
+                ))
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO session_timeline
+                    (session_id, timestamp, source_id, source_rowid, kind, activity)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    batch,
+                )
+                conn.execute(
+                    "UPDATE session_timeline_sources SET last_rowid = ? WHERE source_id = ?",
+                    (last_rowid, source_id),
+                )
+            appended += len(batch)
+        return appended
+
+    @staticmethod
+    def _watermark(conn: sqlite3.Connection, db_path: Path, table: str) -> Tuple[int, int]:
+        key = str(db_path.resolve())
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO session_timeline_sources (db_path, table_name) VALUES (?, ?)",
+                (key, table),
+            )
+        row = conn.execute(
+            "SELECT source_id, last_rowid FROM session_timeline_sources WHERE db_path = ? AND table_name = ?",
+            (key, table),
+        ).fetchone()
+        return int(row[0]), int(row[1])
+
+
+__all__ = [
+    "KIND_BROWSER",
+    "KIND_DESKTOP",
+    "SessionTimelineStore",
+    "TimelineSource",
+]
@@ -34,6 +34,9 @@ except ImportError:  # pragma: no cover - optional dependency
 ai_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(ai_dir / "training"))
 sys.path.insert(0, str(ai_dir / "intelligence"))
+sys.path.insert(0, str(ai_dir / "monitoring"))
+
+from partitioned_store import monitoring_database_files, open_monitoring_reader
 
 try:
     from ai_training_integration import get_ai_training_integration
@@ -115,7 +118,7 @@ class AIIntelligenceDashboard:
             return status
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = open_monitoring_reader(self.db_path)
             cursor = conn.cursor()
             
             # Check for recent activity (last 5 minutes - more accurate for "currently active")
@@ -187,7 +190,7 @@ class AIIntelligenceDashboard:
             return metrics
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = open_monitoring_reader(self.db_path)
             cursor = conn.cursor()
             
             # Count records
@@ -232,7 +235,8 @@ class AIIntelligenceDashboard:
                     metrics["collection_rate_per_hour"] = metrics["total_data_points"] / hours
             
             # Estimate data size
-            db_size = self.db_path.stat().st_size / (1024 * 1024)  # MB
+            db_size = sum(path.stat().st_size for path in monitoring_database_files(self.db_path)
+                          if path.exists()) / (1024 * 1024)  # MB
             metrics["data_size_mb"] = round(db_size, 2)
             
             conn.close()
@@ -413,7 +417,7 @@ class AIIntelligenceDashboard:
             return insights
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = open_monitoring_reader(self.db_path)
             cursor = conn.cursor()
             
             # Most used apps
@@ -38,6 +38,7 @@ except ImportError:
         ScreenRecorder = None  # type: ignore
 
 from automation_prototype_generator import AutomationPrototypeGenerator
+from monitoring.partitioned_store import open_monitoring_reader
 try:
     from monitoring.session_pipeline import MonitoringSessionPipeline
 except ImportError:
@@ -242,8 +243,7 @@ class WorkflowTrainingManager:
         print(f"[DEBUG] Verifying events in database for session: {metadata.session_id}")
         full_monitoring_db = self.installation_dir / "_secure_data" / "full_monitoring" / "full_monitoring.db"
         if full_monitoring_db.exists():
-            import sqlite3
-            with sqlite3.connect(full_monitoring_db) as conn:
+            with open_monitoring_reader(full_monitoring_db) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM browser_activity WHERE session_id = ?", (metadata.session_id,))
                 browser_count = cursor.fetchone()[0]
@@ -8,11 +8,17 @@ from __future__ import annotations
 
 import json
 import logging
-import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+try:
+    from partitioned_store import open_monitoring_reader
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+    from partitioned_store import open_monitoring_reader
+
 _LOGGER = logging.getLogger("ai_learning")
 
 
@@ -75,7 +81,7 @@ class AIDataProcessor:
                     continue
                 
                 try:
-                    conn = sqlite3.connect(db_path)
+                    conn = open_monitoring_reader(db_path)
                     cursor = conn.cursor()
                     
                     # Extract page navigations
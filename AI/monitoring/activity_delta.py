@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Activity Delta - ships browser activity databases as consistent snapshots or row deltas.
+
+Employee side:
+    ``snapshot_database`` copies a live database through the SQLite online
+    backup API, so the copy is consistent even while monitor threads write.
+    ``export_delta`` writes only the rows above each table's rowid watermark
+    into a small SQLite batch file; all tables are read in one transaction.
+
+Central side:
+    ``merge_delta_batch`` inserts a batch into one indexed central store
+    (``AI/browser_activity/browser_activity_central.db``), tagging each row
+    with its computer, source database, source generation and source rowid.
+    Merging the same batch twice inserts nothing.
+
+A database that is deleted and recreated starts its rowids again, so every
+batch carries the source's *generation*; the employee side bumps it when the
+database is recreated and rows of a new generation never collide with those
+already merged.  Recreation is noticed by a changed file identity
+(``database_identity``), a non-empty table shrinking below its watermark,
+or the row at a watermark no longer matching the digest recorded when it
+was shipped.  Cleanup deletes, even ones that empty a table, do not bump it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_LOGGER = logging.getLogger("activity_delta")
+
+BATCH_SUFFIX = ".delta.sqlite"
+CENTRAL_DB_NAME = "browser_activity_central.db"
+META_TABLE = "_batch_meta"
+# Central indexes created when a merged table has these columns
+INDEXED_COLUMNS = ("session_id", "timestamp")
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _user_tables(conn: sqlite3.Connection, schema: str = "main") -> List[Tuple[str, str]]:
+    """(name, CREATE sql) of the ordinary tables in a database."""
+    return conn.execute(
+        f"SELECT name, sql FROM {schema}.sqlite_master WHERE type = 'table' "
+        "AND name NOT LIKE 'sqlite_%' AND name != ? ORDER BY name",
+        (META_TABLE,),
+    ).fetchall()
+
+
+def _columns(conn: sqlite3.Connection, table: str, schema: str = "main") -> List[Tuple[str, bool]]:
+    """(column, is INTEGER PRIMARY KEY alias of rowid) for a table."""
+    rows = conn.execute(f"PRAGMA {schema}.table_info({_quote(table)})").fetchall()
+    single_pk = sum(1 for row in rows if row[5]) == 1
+    return [(row[1], bool(single_pk and row[5] and (row[2] or "").upper() == "INTEGER")) for row in rows]
+
+
+# ----------------------------------------------------------------------
+# Employee side
+# ----------------------------------------------------------------------
+def database_identity(path: Path) -> str:
+    """Identity of a database *file*, which changes when it is deleted and recreated.
+
+    File index (inode) plus creation time where the platform reports it
+    (``st_birthtime``, or ``st_ctime`` on Windows).  In-place writes and
+    ``VACUUM`` keep it.
+    """
+    stat = os.stat(path)
+    birth = getattr(stat, "st_birthtime", None)
+    if birth is None and os.name == "nt":
+        birth = stat.st_ctime
+    return f"{stat.st_ino}:{birth or ''}"
+
+
+def _row_digest(conn: sqlite3.Connection, table: str, rowid: int) -> Optional[str]:
+    """Digest of one row, or None if it no longer exists (e.g. removed by cleanup)."""
+    row = conn.execute(f"SELECT * FROM {_quote(table)} WHERE rowid = ?", (rowid,)).fetchone()
+    if row is None:
+        return None
+    return hashlib.blake2b(repr(row).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def snapshot_database(source: Path, dest: Path) -> int:
+    """Consistent copy of a live database via the online backup API; returns its size."""
+    dest = Path(dest)
+    if dest.exists():
+        dest.unlink()
+    src_conn = sqlite3.connect(f"file:{Path(source).as_posix()}?mode=ro", uri=True, timeout=30)
+    dest_conn = sqlite3.connect(str(dest))
+    try:
+        # One step: a stepped copy restarts whenever a writer changes the source
+        # between steps, so a busy monitor could keep it from ever finishing
+        src_conn.backup(dest_conn, pages=-1)
+    finally:
+        dest_conn.close()
+        src_conn.close()
+    return dest.stat().st_size
+
+
+def export_delta(
+    source: Path,
+    batch_path: Path,
+    watermarks: Dict[str, int],
+    generation: int = 0,
+    anchors: Optional[Dict[str, str]] = None,
+    source_name: Optional[str] = None,
+) -> Tuple[Dict[str, int], Dict[str, int], int, Dict[str, str]]:
+    """Write rows above ``watermarks`` (table -> last shipped rowid) to a batch file.
+
+    ``anchors`` are the digests of the rows at the watermarks, as returned by
+    the previous export.  Returns ``(new watermarks, rows exported per table,
+    generation, new anchors)``.  No batch file is left behind when there are
+    no new rows.  If a non-empty table's highest rowid is below its watermark,
+    or the row at a watermark differs from its anchor, the database was
+    recreated: every watermark is ignored and the batch is written under
+    ``generation + 1``.  A table emptied by cleanup keeps its watermark.
+    """
+    batch_path = Path(batch_path)
+    if batch_path.exists():
+        batch_path.unlink()
+    source_name = source_name or Path(source).name
+    anchors = anchors or {}
+    new_marks = dict(watermarks)
+    new_anchors: Dict[str, str] = {}
+    counts: Dict[str, int] = {}
+
+    src = sqlite3.connect(f"file:{Path(source).as_posix()}?mode=ro", uri=True, timeout=30)
+    batch = None
+    try:
+        # One read transaction: every table is read at the same point in time
+        src.execute("BEGIN")
+        highs: Dict[str, Tuple[int, str]] = {}
+        for table, create_sql in _user_tables(src):
+            try:
+                highs[table] = (src.execute(f"SELECT MAX(rowid) FROM {_quote(table)}").fetchone()[0] or 0, create_sql)
+            except sqlite3.OperationalError:
+                continue  # WITHOUT ROWID table
+        # An empty table was cleaned up, not recreated (the monitor's tables are
+        # AUTOINCREMENT, so their rowids keep counting); a recreated file is
+        # caught by its identity and the anchor rows
+        restarted = any(0 < high < watermarks.get(table, 0) for table, (high, _) in highs.items())
+        for table, anchor in anchors.items():
+            if restarted:
+                break
+            if table in highs and watermarks.get(table):
+                digest = _row_digest(src, table, watermarks[table])
+                restarted = digest is not None and digest != anchor
+        if restarted:
+            _LOGGER.info(f"{source_name} was recreated; exporting it from the start as a new generation")
+            watermarks = {}
+            new_marks = {}
+            generation += 1
+        for table, (high, create_sql) in highs.items():
+            low = watermarks.get(table, 0)
+            if high:
+                digest = _row_digest(src, table, high)
+                if digest is not None:
+                    new_anchors[table] = digest
+            if high <= low:
+                new_marks[table] = high or low
+                continue
+
+            if batch is None:
+                batch = sqlite3.connect(str(batch_path))
+                batch.execute(
+                    f"CREATE TABLE {META_TABLE} (table_name TEXT PRIMARY KEY, source_db TEXT, "
+                    "from_rowid INTEGER, to_rowid INTEGER, row_count INTEGER, exported_at TEXT, generation INTEGER)"
+                )
+            batch.execute(create_sql)
+            columns = [name for name, _ in _columns(src, table)]
+            column_list = ", ".join(_quote(name) for name in columns)
+            placeholders = ", ".join("?" * (len(columns) + 1))
+            cursor = src.execute(
+                f"SELECT rowid, {column_list} FROM {_quote(table)} WHERE rowid > ? AND rowid <= ? ORDER BY rowid",
+                (low, high),
+            )
+            count = 0
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                batch.executemany(
+                    f"INSERT INTO {_quote(table)} (rowid, {column_list}) VALUES ({placeholders})", rows
+                )
+                count += len(rows)
+            batch.execute(
+                f"INSERT INTO {META_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (table, source_name, low, high, count, datetime.now().isoformat(), generation),
+            )
+            new_marks[table] = high
+            counts[table] = count
+        src.rollback()
+        if batch is not None:
+            batch.commit()
+    except Exception:
+        if batch is not None:
+            batch.close()
+            batch = None
+            batch_path.unlink(missing_ok=True)
+        raise
+    finally:
+        if batch is not None:
+            batch.close()
+        src.close()
+    return new_marks, counts, generation, new_anchors
+
+
+# ----------------------------------------------------------------------
+# Central side
+# ----------------------------------------------------------------------
+def open_central_store(path: Path) -> sqlite3.Connection:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=60)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.Error:
+        pass
+    return conn
+
+
+def _ensure_central_table(conn: sqlite3.Connection, table: str, columns: List[str]) -> None:
+    existing = [name for name, _ in _columns(conn, table)]
+    quoted = _quote(table)
+    if not existing:
+        column_defs = ", ".join(_quote(name) for name in columns)
+        conn.execute(
+            f"CREATE TABLE {quoted} (central_id INTEGER PRIMARY KEY, computer_id TEXT NOT NULL, "
+            f"source_db TEXT NOT NULL, source_generation INTEGER NOT NULL DEFAULT 0, "
+            f"source_rowid INTEGER NOT NULL, {column_defs})"
+        )
+        conn.execute(
+            f"CREATE UNIQUE INDEX {_quote('ux_' + table + '_origin_gen')} ON {quoted} "
+            "(computer_id, source_db, source_generation, source_rowid)"
+        )
+        for column in INDEXED_COLUMNS:
+            if column in columns:
+                conn.execute(f"CREATE INDEX {_quote('idx_' + table + '_' + column)} ON {quoted} ({_quote(column)})")
+        return
+    if "source_generation" not in existing:
+        # Stores merged before generations existed: their rows are generation 0
+        conn.execute(f"ALTER TABLE {quoted} ADD COLUMN source_generation INTEGER NOT NULL DEFAULT 0")
+        conn.execute(f"DROP INDEX IF EXISTS {_quote('ux_' + table + '_origin')}")
+        conn.execute(
+            f"CREATE UNIQUE INDEX {_quote('ux_' + table + '_origin_gen')} ON {quoted} "
+            "(computer_id, source_db, source_generation, source_rowid)"
+        )
+    # Source schemas gain columns over time (e.g. element_value)
+    for name in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {quoted} ADD COLUMN {_quote(name)}")
+
+
+def merge_delta_batch(conn: sqlite3.Connection, batch_path: Path, computer_id: str) -> int:
+    """Insert one batch file into the central store in a single transaction; returns rows added."""
+    conn.execute("ATTACH DATABASE ? AS batch", (str(batch_path),))
+    try:
+        meta_columns = [name for name, _ in _columns(conn, META_TABLE, "batch")]
+        generation_column = "generation" if "generation" in meta_columns else "0"
+        meta = {
+            row[0]: (row[1], row[2] or 0)
+            for row in conn.execute(
+                f"SELECT table_name, source_db, {generation_column} FROM batch.{META_TABLE}"
+            )
+        }
+        added = 0
+        with conn:
+            for table, _ in _user_tables(conn, "batch"):
+                columns = _columns(conn, table, "batch")
+                data_columns = [name for name, is_rowid in columns if not is_rowid]
+                _ensure_central_table(conn, table, data_columns)
+                column_list = ", ".join(_quote(name) for name in data_columns)
+                before = conn.total_changes
+                source_db, generation = meta.get(table, (Path(batch_path).name, 0))
+                conn.execute(
+                    f"INSERT OR IGNORE INTO main.{_quote(table)} "
+                    f"(computer_id, source_db, source_generation, source_rowid, {column_list}) "
+                    f"SELECT ?, ?, ?, rowid, {column_list} FROM batch.{_quote(table)}",
+                    (computer_id, source_db, generation),
+                )
+                added += conn.total_changes - before
+        return added
+    finally:
+        conn.execute("DETACH DATABASE batch")
+
+
+__all__ = [
+    "BATCH_SUFFIX",
+    "CENTRAL_DB_NAME",
+    "database_identity",
+    "export_delta",
+    "merge_delta_batch",
+    "open_central_store",
+    "snapshot_database",
+]
@@ -4,7 +4,6 @@ Automatic Diagnostic Monitor
 Runs diagnostics automatically while bots are running to ensure browser activity is being recorded.
 """
 
-import sqlite3
 import threading
 import time
 from pathlib import Path
@@ -12,6 +11,11 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import logging
 
+try:
+    from .partitioned_store import open_monitoring_reader
+except ImportError:
+    from partitioned_store import open_monitoring_reader
+
 
 class AutoDiagnosticMonitor:
     """
@@ -157,7 +161,7 @@ class AutoDiagnosticMonitor:
         """Check for recent session activity"""
         try:
             db_path = self.secure_data_dir / "browser_activity.db"
-            conn = sqlite3.connect(db_path)
+            conn = open_monitoring_reader(db_path)
             cursor = conn.cursor()
             
             # Check sessions in last hour
@@ -187,7 +191,7 @@ class AutoDiagnosticMonitor:
         """Check if events are being recorded"""
         try:
             db_path = self.secure_data_dir / "browser_activity.db"
-            conn = sqlite3.connect(db_path)
+            conn = open_monitoring_reader(db_path)
             cursor = conn.cursor()
             
             # Check events in last 5 minutes
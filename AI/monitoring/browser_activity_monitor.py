@@ -1,8 +1,23 @@
 #!/usr/bin/env python3
-"""Browser activity monitoring utilities."""
+"""Browser activity monitoring utilities.
+
+Selenium listener hooks only capture an event (one ``execute_script`` round
+trip) and push it onto a bounded in-memory ring buffer; a background writer
+thread drains the buffer and inserts batches into ``page_navigations`` and
+``element_interactions`` with one transaction per batch, so a monitored click
+never waits on SQLite.  ``BROWSER_MONITOR_QUEUE_SIZE`` and
+``BROWSER_MONITOR_OVERFLOW`` (``drop_oldest``, ``drop_newest`` or ``block``)
+configure the buffer.
+
+With ``BROWSER_MONITOR_PARTITION`` set to ``day`` or ``week`` events go to
+time-partitioned files under ``_secure_data/browser_activity/`` instead of
+``browser_activity.db``; use :meth:`BrowserActivityMonitor.open_reader` to
+query either layout.
+"""
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import hmac
 import logging
@@ -10,10 +25,11 @@ import os
 import sqlite3
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Deque, List, Tuple
 
 try:
     from selenium.webdriver.support.events import (
@@ -28,6 +44,11 @@ except ImportError:  # pragma: no cover
     WebDriverException = Exception
     SELENIUM_AVAILABLE = False
 
+try:
+    from .partitioned_store import GRANULARITIES, PartitionedStore
+except ImportError:
+    from partitioned_store import GRANULARITIES, PartitionedStore
+
 __all__ = [
     "get_browser_monitor",
     "wrap_webdriver_for_monitoring",
@@ -37,6 +58,19 @@ __all__ = [
 
 _LOGGER = logging.getLogger("browser_monitor")
 
+DEFAULT_QUEUE_SIZE = 10000
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# Element details and page URL in a single WebDriver round trip.
+# arguments: element, whether to include the element's current value.
+_ELEMENT_SNAPSHOT_SCRIPT = (
+    "var e = arguments[0];"
+    "return [e.tagName ? e.tagName.toLowerCase() : null, e.getAttribute('id'), e.getAttribute('name'),"
+    " e.getAttribute('type'), arguments[1] ? (e.value === undefined ? e.getAttribute('value') : e.value) : null,"
+    " window.location.href];"
+)
+_PAGE_SNAPSHOT_SCRIPT = "return [window.location.href, document.title];"
+
 
 @dataclass
 class BrowserEvent:
@@ -53,10 +87,137 @@ class BrowserEvent:
     element_value: Optional[str] = None
 
 
+class _AsyncEventSink:
+    """Bounded ring buffer drained in batches by a background writer thread.
+
+    ``submit`` never touches the disk.  When the buffer is full the overflow
+    policy decides what happens: ``drop_oldest`` evicts the oldest queued
+    event, ``drop_newest`` discards the new one, and ``block`` waits up to
+    ``block_timeout`` seconds for room before discarding it.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Tuple[str, BrowserEvent]]], None],
+        capacity: int = DEFAULT_QUEUE_SIZE,
+        overflow_policy: str = "drop_oldest",
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        block_timeout: float = 1.0,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy!r}; expected one of {OVERFLOW_POLICIES}")
+        self.capacity = max(1, int(capacity))
+        self.overflow_policy = overflow_policy
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self._write_batch = write_batch
+        self.buffer: Deque[Tuple[str, BrowserEvent]] = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self.counters = {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "write_errors": 0, "max_depth": 0}
+        self.thread = threading.Thread(target=self._run, name="browser-monitor-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, kind: str, event: BrowserEvent) -> bool:
+        """Queue one event; returns False if it was dropped."""
+        with self._cond:
+            if self._closed:
+                self.counters["dropped"] += 1
+                return False
+            if len(self.buffer) >= self.capacity:
+                if self.overflow_policy == "drop_newest":
+                    self.counters["dropped"] += 1
+                    return False
+                if self.overflow_policy == "block":
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self.buffer) >= self.capacity and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if len(self.buffer) >= self.capacity or self._closed:
+                        self.counters["dropped"] += 1
+                        return False
+                else:
+                    self.buffer.popleft()
+                    self.counters["dropped"] += 1
+            self.buffer.append((kind, event))
+            self.counters["queued"] += 1
+            self.counters["max_depth"] = max(self.counters["max_depth"], len(self.buffer))
+            if len(self.buffer) >= self.batch_size:
+                self._cond.notify_all()
+            return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been written; False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self.buffer or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.thread.is_alive():
+                    return False
+                self._cond.wait(min(remaining, 0.05))
+            return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(
+                self.counters,
+                depth=len(self.buffer),
+                capacity=self.capacity,
+                overflow_policy=self.overflow_policy,
+            )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self.buffer and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                if not self.buffer:
+                    if self._closed:
+                        return
+                    continue
+                count = min(len(self.buffer), self.batch_size)
+                batch = [self.buffer.popleft() for _ in range(count)]
+                self._in_flight = count
+                # Wake producers blocked on a full buffer
+                self._cond.notify_all()
+            try:
+                self._write_batch(batch)
+                written, errors = len(batch), 0
+            except Exception as e:
+                _LOGGER.warning(f"Failed to write {len(batch)} browser events: {e}")
+                written, errors = 0, 1
+            with self._cond:
+                self.counters["written"] += written
+                self.counters["write_errors"] += errors
+                self.counters["batches"] += 1
+                self._in_flight = 0
+                self._cond.notify_all()
+
+
 class BrowserActivityMonitor:
     """Lightweight browser telemetry sink that stores activity in SQLite."""
 
-    def __init__(self, installation_dir: Path):
+    def __init__(
+        self,
+        installation_dir: Path,
+        queue_size: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        async_writes: bool = True,
+        partition_granularity: Optional[str] = None,
+    ):
         self.installation_dir = Path(installation_dir)
         self.secure_dir = self.installation_dir / "_secure_data"
         self.secure_dir.mkdir(parents=True, exist_ok=True)
@@ -70,11 +231,55 @@ class BrowserActivityMonitor:
         self._init_database()
         self._salt = self._load_salt()
 
+        # Optional day/week partitioning (browser_activity.db stays readable as the legacy partition)
+        if partition_granularity is None:
+            partition_granularity = os.environ.get("BROWSER_MONITOR_PARTITION") or None
+        if partition_granularity and partition_granularity not in GRANULARITIES:
+            _LOGGER.warning(f"Unknown BROWSER_MONITOR_PARTITION {partition_granularity!r}; partitioning disabled")
+            partition_granularity = None
+        self.store: Optional[PartitionedStore] = None
+        if partition_granularity:
+            self.store = PartitionedStore(
+                self.secure_dir / "browser_activity",
+                "browser_activity",
+                self._create_schema,
+                granularity=partition_granularity,
+                legacy_path=self.db_path,
+            )
+
+        # Writer-thread connection (created lazily by _write_batch)
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._has_element_value = True
+        self._sink: Optional[_AsyncEventSink] = None
+        if async_writes:
+            if queue_size is None:
+                try:
+                    queue_size = int(os.environ.get("BROWSER_MONITOR_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+                except ValueError:
+                    queue_size = DEFAULT_QUEUE_SIZE
+            policy = overflow_policy or os.environ.get("BROWSER_MONITOR_OVERFLOW", "drop_oldest")
+            if policy not in OVERFLOW_POLICIES:
+                _LOGGER.warning(f"Unknown BROWSER_MONITOR_OVERFLOW {policy!r}; using drop_oldest")
+                policy = "drop_oldest"
+            self._sink = _AsyncEventSink(self._write_batch, capacity=queue_size, overflow_policy=policy)
+            atexit.register(self.close)
+
     # ------------------------------------------------------------------
     # Database initialisation
     # ------------------------------------------------------------------
     def _init_database(self) -> None:
         conn = sqlite3.connect(self.db_path)
+        self._create_schema(conn)
+        conn.commit()
+        try:
+            # WAL lets readers (dashboards, exporters) run while the writer thread inserts
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error:
+            pass
+        conn.close()
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -124,8 +329,6 @@ class BrowserActivityMonitor:
             CREATE INDEX IF NOT EXISTS idx_element_session ON element_interactions(session_id)
             """
         )
-        conn.commit()
-        conn.close()
 
     def _load_salt(self) -> bytes:
         if self.salt_path.exists():
@@ -168,35 +371,84 @@ class BrowserActivityMonitor:
         return digest
 
     def _record_navigation(self, event: BrowserEvent) -> None:
-        with self._lock:
-            if not self.collection_active:
-                return
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO page_navigations (session_id, timestamp, page_title, url, anonymized_url)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    event.session_id,
-                    event.timestamp,
-                    event.page_title,
-                    event.url,
-                    event.anonymized_url,
-                ),
-            )
-            conn.commit()
-            conn.close()
+        self._record("navigation", event)
 
     def _record_interaction(self, event: BrowserEvent) -> None:
-        with self._lock:
-            if not self.collection_active:
-                return
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        self._record("interaction", event)
+
+    def _record(self, kind: str, event: BrowserEvent) -> None:
+        if not self.collection_active:
+            return
+        if self._sink is not None:
+            self._sink.submit(kind, event)
+        else:
+            with self._lock:
+                self._write_batch([(kind, event)])
+
+    def _write_batch(self, batch: List[Tuple[str, BrowserEvent]]) -> None:
+        """Insert a batch of queued events, one transaction per target file (writer thread)."""
+        if self.store is None:
+            if self._write_conn is None:
+                self._write_conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            try:
+                self._write_events(self._write_conn, batch)
+            except sqlite3.Error:
+                # Reconnect on the next batch (e.g. the database file was replaced)
+                conn, self._write_conn = self._write_conn, None
+                conn.close()
+                raise
+            return
+
+        by_partition: Dict[str, List[Tuple[str, BrowserEvent]]] = {}
+        for item in batch:
+            by_partition.setdefault(self.store.key_for(item[1].timestamp), []).append(item)
+        for key, events in by_partition.items():
+            try:
+                self._write_events(self.store.connection(key), events)
+            except sqlite3.Error:
+                self.store.close_connection(key)
+                raise
+
+    def _write_events(self, conn: sqlite3.Connection, batch: List[Tuple[str, BrowserEvent]]) -> None:
+        navigations = [
+            (e.session_id, e.timestamp, e.page_title, e.url, self._anonymized_url(e))
+            for kind, e in batch if kind == "navigation"
+        ]
+        interactions = [
+            (
+                e.session_id,
+                e.timestamp,
+                e.action_type,
+                e.element_tag,
+                e.element_id,
+                e.element_name,
+                e.element_type,
+                e.element_value,
+                self._anonymized_url(e),
+            )
+            for kind, e in batch if kind == "interaction"
+        ]
+        with conn:
+            if navigations:
+                conn.executemany(
+                    """
+                    INSERT INTO page_navigations (session_id, timestamp, page_title, url, anonymized_url)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    navigations,
+                )
+            if interactions:
+                self._insert_interactions(conn, interactions)
+
+    def _anonymized_url(self, event: BrowserEvent) -> str:
+        if event.anonymized_url is not None:
+            return event.anonymized_url
+        return self._hash_value(event.url or "")
+
+    def _insert_interactions(self, conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+        if self._has_element_value:
             try:
-                cursor.execute(
+                conn.executemany(
                     """
                     INSERT INTO element_interactions (
                         session_id,
@@ -210,54 +462,30 @@ class BrowserActivityMonitor:
                         anonymized_page_url
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
-                    (
-                        event.session_id,
-                        event.timestamp,
-                        event.action_type,
-                        event.element_tag,
-                        event.element_id,
-                        event.element_name,
-                        event.element_type,
-                        event.element_value,
-                        event.anonymized_url,
-                    ),
+                    rows,
                 )
-                conn.commit()
+                return
             except sqlite3.OperationalError as e:
-                if "element_value" in str(e):
-                    # Fallback: try without element_value column
-                    try:
-                        cursor.execute(
-                            """
-                            INSERT INTO element_interactions (
-                                session_id,
-                                timestamp,
-                                action_type,
-                                element_tag,
-                                element_id,
-                                element_name,
-                                element_type,
-                                anonymized_page_url
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                event.session_id,
-                                event.timestamp,
-                                event.action_type,
-                                event.element_tag,
-                                event.element_id,
-                                event.element_name,
-                                event.element_type,
-                                event.anonymized_url,
-                            ),
-                        )
-                        conn.commit()
-                    except Exception as fallback_error:
-                        logging.warning(f"Failed to record interaction (fallback): {fallback_error}")
-                else:
-                    logging.warning(f"Failed to record interaction: {e}")
-            finally:
-                conn.close()
+                if "element_value" not in str(e):
+                    raise
+                logging.warning(f"element_interactions has no element_value column; recording without it: {e}")
+                self._has_element_value = False
+        # Fallback: older database without the element_value column
+        conn.executemany(
+            """
+            INSERT INTO element_interactions (
+                session_id,
+                timestamp,
+                action_type,
+                element_tag,
+                element_id,
+                element_name,
+                element_type,
+                anonymized_page_url
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [row[:7] + row[8:] for row in rows],
+        )
 
     # ------------------------------------------------------------------
     # Public API
@@ -274,7 +502,6 @@ class BrowserActivityMonitor:
                 session_id=session,
                 page_title=title,
                 url=url,
-                anonymized_url=self._hash_value(url),
             )
             self._record_navigation(event)
         except Exception as e:
@@ -295,23 +522,12 @@ class BrowserActivityMonitor:
             if not session:
                 session = self.start_collection()
 
-            page_url = ""
-            try:
-                page_url = driver.current_url if driver else ""
-            except Exception:
-                page_url = ""
-
-            tag = element.tag_name if element is not None else None
-            elem_id = element.get_attribute("id") if element is not None else None
-            elem_name = element.get_attribute("name") if element is not None else None
-            elem_type = element.get_attribute("type") if element is not None else None
-            elem_value = None
-            if action_type in {"change", "value_change"} and element is not None:
-                try:
-                    elem_value = element.get_attribute("value")
-                except Exception:
-                    elem_value = None
+            include_value = action_type in {"change", "value_change"}
+            tag, elem_id, elem_name, elem_type, elem_value, page_url = self._snapshot_element(
+                driver, element, include_value
+            )
 
+            # The URL is hashed into anonymized_page_url by the writer thread
             event = BrowserEvent(
                 timestamp=datetime.now().isoformat(),
                 session_id=session,
@@ -321,13 +537,97 @@ class BrowserActivityMonitor:
                 element_name=elem_name,
                 element_type=elem_type,
                 element_value=elem_value,
-                anonymized_url=self._hash_value(page_url or ""),
+                url=page_url or "",
             )
             self._record_interaction(event)
         except Exception as e:
             # Never crash the bot - monitoring failures should be silent
             logging.debug(f"Monitoring: Failed to record interaction event: {e}")
     
+    @staticmethod
+    def _snapshot_element(driver, element, include_value: bool) -> Tuple:
+        """Return (tag, id, name, type, value, page_url) using one round trip when possible."""
+        if element is not None and driver is not None:
+            try:
+                snapshot = driver.execute_script(_ELEMENT_SNAPSHOT_SCRIPT, element, include_value)
+                if isinstance(snapshot, list) and len(snapshot) == 6:
+                    return tuple(snapshot)
+            except Exception:
+                pass
+
+        page_url = ""
+        try:
+            page_url = driver.current_url if driver else ""
+        except Exception:
+            page_url = ""
+        if element is None:
+            return None, None, None, None, None, page_url
+        elem_value = None
+        if include_value:
+            try:
+                elem_value = element.get_attribute("value")
+            except Exception:
+                elem_value = None
+        return (
+            element.tag_name,
+            element.get_attribute("id"),
+            element.get_attribute("name"),
+            element.get_attribute("type"),
+            elem_value,
+            page_url,
+        )
+
+    # ------------------------------------------------------------------
+    # Async sink control
+    # ------------------------------------------------------------------
+    @property
+    def activity_buffer(self) -> Deque:
+        """Events queued but not yet written."""
+        return self._sink.buffer if self._sink is not None else deque()
+
+    @property
+    def processing_thread(self) -> Optional[threading.Thread]:
+        """Background writer thread (None when writes are synchronous)."""
+        return self._sink.thread if self._sink is not None else None
+
+    def open_reader(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> sqlite3.Connection:
+        """Read connection exposing page_navigations / element_interactions for ``[start, end]``.
+
+        With partitioning on, only partitions overlapping the range are
+        attached; the caller still filters rows by timestamp.
+        """
+        if self.store is None:
+            return sqlite3.connect(self.db_path, timeout=30)
+        return self.store.connect_range(start, end)
+
+    def get_sink_stats(self) -> Dict[str, Any]:
+        """Counters of queued, written and dropped events plus current queue depth."""
+        if self._sink is None:
+            return {"async_writes": False}
+        return dict(self._sink.stats(), async_writes=True)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until queued events are on disk; False if the timeout expired."""
+        if self._sink is None:
+            return True
+        return self._sink.flush(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending events and stop the writer thread."""
+        if self._sink is not None:
+            self._sink.close(timeout)
+            stats = self._sink.stats()
+            if stats["dropped"]:
+                _LOGGER.warning(f"Browser monitor dropped {stats['dropped']} event(s) (queue full)")
+        if self._write_conn is not None:
+            try:
+                self._write_conn.close()
+            except sqlite3.Error:
+                pass
+            self._write_conn = None
+        if self.store is not None:
+            self.store.close()
+
     # ------------------------------------------------------------------
     # Data cleanup / recycling
     # ------------------------------------------------------------------
@@ -340,13 +640,16 @@ class BrowserActivityMonitor:
         Returns:
             Number of records deleted
         """
-        if not self.db_path.exists():
-            return 0
-        
         cutoff_date = datetime.now() - timedelta(days=retention_days)
         cutoff_str = cutoff_date.isoformat()
+        self.flush()
         
         total_deleted = 0
+        if self.store is not None:
+            # Whole partitions past the cutoff are deleted as files; rows are not counted
+            self.store.drop_before(cutoff_date)
+        if not self.db_path.exists():
+            return 0
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -381,6 +684,21 @@ class BrowserActivityMonitor:
         return total_deleted
 
 
+def _page_snapshot(driver, fallback_url: str) -> Tuple[str, Optional[str]]:
+    """Current URL and title of the page in one round trip"""
+    if not driver:
+        return fallback_url or "", None
+    try:
+        url, title = driver.execute_script(_PAGE_SNAPSHOT_SCRIPT)
+        return url, title
+    except Exception:
+        pass
+    try:
+        return driver.current_url, driver.title
+    except Exception:
+        return fallback_url or "", None
+
+
 class _MonitoringEventListener(AbstractEventListener):
     def __init__(self, monitor: BrowserActivityMonitor, session_id: str):
         self.monitor = monitor
@@ -389,12 +707,7 @@ class _MonitoringEventListener(AbstractEventListener):
     # Navigation events -------------------------------------------------
     def after_navigate_to(self, url, driver):  # type: ignore[override]
         try:
-            try:
-                current_url = driver.current_url if driver else url
-                title = driver.title if driver else None
-            except Exception:
-                current_url = url if url else ""
-                title = None
+            current_url, title = _page_snapshot(driver, url)
             self.monitor.record_navigation(current_url, title, session_id=self.session_id)
         except Exception as e:
             # Never crash the bot - monitoring failures should be silent
@@ -402,12 +715,7 @@ class _MonitoringEventListener(AbstractEventListener):
 
     def after_navigate_back(self, driver):  # type: ignore[override]
         try:
-            try:
-                url = driver.current_url
-                title = driver.title
-            except Exception:
-                url = ""
-                title = None
+            url, title = _page_snapshot(driver, "")
             self.monitor.record_navigation(url, title, session_id=self.session_id)
         except Exception as e:
             # Never crash the bot - monitoring failures should be silent
@@ -415,12 +723,7 @@ class _MonitoringEventListener(AbstractEventListener):
 
     def after_navigate_forward(self, driver):  # type: ignore[override]
         try:
-            try:
-                url = driver.current_url
-                title = driver.title
-            except Exception:
-                url = ""
-                title = None
+            url, title = _page_snapshot(driver, "")
             self.monitor.record_navigation(url, title, session_id=self.session_id)
         except Exception as e:
             # Never crash the bot - monitoring failures should be silent
@@ -499,3 +802,45 @@ def wrap_webdriver_for_monitoring(
         # Never crash the bot - if monitoring fails, return original driver
         logging.debug(f"Monitoring: Failed to wrap webdriver: {e}")
         return driver
+
+
+def benchmark(events: int = 2000) -> Dict[str, Any]:
+    """Time record_interaction with synchronous writes vs the async sink"""
+    import tempfile
+
+    class _FakeDriver:
+        current_url = "https://example.test/app/patients/"
+
+        def execute_script(self, script, *args):
+            return ["a", "link", None, None, None, self.current_url]
+
+    driver = _FakeDriver()
+    results: Dict[str, Any] = {"events": events}
+    for label, async_writes in (("sync", False), ("async", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            monitor = BrowserActivityMonitor(Path(tmp), async_writes=async_writes)
+            monitor.start_collection("benchmark")
+            started = time.perf_counter()
+            for _ in range(events):
+                monitor.record_interaction("click", driver, element=object())
+            hook_seconds = time.perf_counter() - started
+            monitor.flush(timeout=60)
+            with sqlite3.connect(monitor.db_path) as conn:
+                rows = conn.execute("SELECT COUNT(*) FROM element_interactions").fetchone()[0]
+            results[label] = {
+                "per_event_ms": round(hook_seconds / events * 1000, 4),
+                "rows_written": rows,
+                "sink": monitor.get_sink_stats(),
+            }
+            monitor.close()
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark browser monitor hook latency")
+    parser.add_argument("events", nargs="?", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.events), indent=2))
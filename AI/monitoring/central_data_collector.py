@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """
 Central Data Collector - Processes incoming data from employee computers.
+
+Browser activity row batches (``*.delta.sqlite``) are merged into one indexed
+store, ``AI/browser_activity/browser_activity_central.db``; whole database
+snapshots and legacy copies are still filed per computer.
 """
 
 import json
@@ -10,8 +14,16 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+try:
+    from .activity_delta import BATCH_SUFFIX, CENTRAL_DB_NAME, merge_delta_batch, open_central_store
+except ImportError:
+    from activity_delta import BATCH_SUFFIX, CENTRAL_DB_NAME, merge_delta_batch, open_central_store
+
 _LOGGER = logging.getLogger("central_collector")
 
+# Content store written by DataTransferManager (shared by all computers, not a computer folder)
+OBJECTS_DIR_NAME = "_objects"
+
 class CentralDataCollector:
     """Collects and processes data from employee computers."""
     
@@ -20,6 +32,7 @@ class CentralDataCollector:
         self.central_data_path = Path(central_data_path)
         self.ai_dir = self.installation_dir / "AI"
         self.training_data_dir = self.ai_dir / "training_data"
+        self.central_activity_db = self.ai_dir / "browser_activity" / CENTRAL_DB_NAME
         
     def collect_employee_data(self) -> Dict[str, Any]:
         """Collect all data from employee computer folders and move to central training data."""
@@ -27,6 +40,7 @@ class CentralDataCollector:
             "computers_processed": 0,
             "files_collected": 0,
             "bytes_collected": 0,
+            "rows_merged": 0,
             "errors": 0
         }
         
@@ -37,9 +51,11 @@ class CentralDataCollector:
         # Ensure training data directory exists
         self.training_data_dir.mkdir(parents=True, exist_ok=True)
         
+        activity_store = None
+        
         # Process each computer folder
         for computer_folder in self.central_data_path.iterdir():
-            if not computer_folder.is_dir():
+            if not computer_folder.is_dir() or computer_folder.name == OBJECTS_DIR_NAME:
                 continue
             
             computer_id = computer_folder.name
@@ -78,10 +94,25 @@ class CentralDataCollector:
                 # Collect browser activity databases
                 browser_activity_dir = computer_folder / "browser_activity"
                 if browser_activity_dir.exists():
+                    # Row batches go into the central store, oldest first
+                    for batch_file in sorted(browser_activity_dir.glob(f"*{BATCH_SUFFIX}")):
+                        try:
+                            if activity_store is None:
+                                activity_store = open_central_store(self.central_activity_db)
+                            size = batch_file.stat().st_size
+                            stats["rows_merged"] += merge_delta_batch(activity_store, batch_file, computer_id)
+                            batch_file.unlink()
+                            
+                            stats["files_collected"] += 1
+                            stats["bytes_collected"] += size
+                        except Exception as e:
+                            stats["errors"] += 1
+                            _LOGGER.warning(f"Error merging activity batch {batch_file.name}: {e}")
+                    
                     central_browser_dir = self.ai_dir / "browser_activity" / computer_id
-                    central_browser_dir.mkdir(parents=True, exist_ok=True)
                     
                     for db_file in browser_activity_dir.glob("*.db"):
+                        central_browser_dir.mkdir(parents=True, exist_ok=True)
                         try:
                             dest_file = central_browser_dir / db_file.name
                             shutil.move(str(db_file), str(dest_file))
@@ -92,9 +123,15 @@ class CentralDataCollector:
                             stats["errors"] += 1
                             _LOGGER.warning(f"Error collecting database {db_file.name}: {e}")
                 
+                # Collect training data shipped into the content store (listed in the manifests)
+                processed_manifests = []
+                for manifest_file in computer_folder.glob("transfer_manifest_*.json"):
+                    if self._collect_manifest_objects(manifest_file, computer_id, stats):
+                        processed_manifests.append(manifest_file)
+                
                 # Clean up empty folders and manifest files
                 try:
-                    for manifest_file in computer_folder.glob("transfer_manifest_*.json"):
+                    for manifest_file in processed_manifests:
                         manifest_file.unlink()  # Delete manifest after processing
                     
                     # Remove empty computer folder
@@ -109,9 +146,49 @@ class CentralDataCollector:
                 stats["errors"] += 1
                 _LOGGER.warning(f"Error processing computer {computer_id}: {e}")
         
+        if activity_store is not None:
+            activity_store.close()
+        
         _LOGGER.info(f"Collection complete: {stats['computers_processed']} computers, "
                     f"{stats['files_collected']} files, "
                     f"{stats['bytes_collected'] / (1024*1024):.2f} MB")
         
         return stats
+    
+    def _collect_manifest_objects(self, manifest_file: Path, computer_id: str, stats: Dict[str, Any]) -> bool:
+        """Copy the JSON training files a transfer manifest lists out of the content store.
+        
+        Returns False (keep the manifest for the next run) if any listed object is missing.
+        """
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            stats["errors"] += 1
+            _LOGGER.warning(f"Error reading {manifest_file.name}: {e}")
+            return False
+        
+        objects_dir = self.central_data_path / manifest.get("objects_dir", OBJECTS_DIR_NAME)
+        try:
+            timestamp = datetime.fromisoformat(manifest["transfer_timestamp"]).strftime("%Y%m%d_%H%M%S")
+        except (KeyError, ValueError):
+            timestamp = manifest_file.stem.replace("transfer_manifest_", "")
+        
+        complete = True
+        for entry in manifest.get("files", []):
+            name = entry.get("name", "")
+            if not (name.endswith(".json") or name.endswith(".json.gz")):
+                continue  # Screenshots stay in the content store
+            source = objects_dir / entry["sha256"][:2] / entry["sha256"]
+            try:
+                # Many bots ship a file with the same name; the hash prefix keeps them apart
+                dest_file = self.training_data_dir / f"{computer_id}_{timestamp}_{entry['sha256'][:8]}_{name}"
+                shutil.copy2(str(source), str(dest_file))
+                stats["files_collected"] += 1
+                stats["bytes_collected"] += dest_file.stat().st_size
+            except Exception as e:
+                complete = False
+                stats["errors"] += 1
+                _LOGGER.warning(f"Error collecting {name} from content store: {e}")
+        return complete
 
@@ -17,6 +17,8 @@ pattern_db_path = ai_dir / "intelligence" / "workflow_patterns.db"
 # Ensure shared modules are importable
 sys.path.insert(0, str(installation_dir / "_system"))
 
+from partitioned_store import open_monitoring_reader
+
 # Optional imports for deeper diagnostics
 SecureDataCollector = None
 LocalAITrainer = None
@@ -54,11 +56,12 @@ else:
     print()
     
     try:
-        conn = sqlite3.connect(active_db_path)
+        conn = open_monitoring_reader(active_db_path)
         cursor = conn.cursor()
         
-        # Get table names
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        # Get table names (partitioned data is exposed as TEMP views)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                       "UNION SELECT name FROM sqlite_temp_master WHERE type='view'")
         tables = [row[0] for row in cursor.fetchall()]
         print(f"[INFO] Tables in database: {', '.join(tables)}")
         print()
@@ -35,6 +35,14 @@ except ImportError:
         def get_computer_id(installation_dir): return "unknown"
         DataTransferManager = None
 
+try:
+    from .partitioned_store import PartitionedStore
+except ImportError:
+    from partitioned_store import PartitionedStore
+
+# Only VACUUM when at least this share of the database is free pages
+VACUUM_FREE_RATIO = 0.25
+
 
 class DataCleanupManager:
     """Manages passive cleanup of collected data to prevent storage bloat across all bots."""
@@ -165,11 +173,10 @@ class DataCleanupManager:
             
             # Check if it's time to transfer
             if DataTransferManager:
-                transfer_manager = DataTransferManager(self.installation_dir)
-                
-                # Load config to get transfer interval
+                # Load config to get transfer interval and browser database transfer mode
                 from .system_config import load_config
                 config = load_config(self.installation_dir)
+                transfer_manager = DataTransferManager(self.installation_dir, config.get("browser_db_transfer"))
                 interval_hours = config.get("transfer_interval_hours", 24)
                 
                 # Check last transfer time
@@ -395,15 +402,27 @@ class DataCleanupManager:
             # Find all _secure_data directories
             secure_dirs = list(self.installation_dir.rglob("_secure_data"))
             
+            cutoff_date = datetime.now() - timedelta(days=retention)
+            cutoff_str = cutoff_date.isoformat()
+            
             for secure_dir in secure_dirs:
+                # Partitioned layout: expired days/weeks are deleted as whole files
+                partition_dir = secure_dir / "browser_activity"
+                if partition_dir.is_dir():
+                    try:
+                        files, freed = PartitionedStore(partition_dir, "browser_activity").drop_before(cutoff_date)
+                        if files:
+                            self.cleanup_stats['total_space_freed_mb'] += freed / (1024 * 1024)
+                            _LOGGER.info(f"Dropped {files} expired browser activity partition(s) from {partition_dir}")
+                    except Exception as e:
+                        _LOGGER.warning(f"Error dropping partitions in {partition_dir}: {e}")
+                
                 db_path = secure_dir / "browser_activity.db"
                 if not db_path.exists():
                     continue
                 
-                cutoff_date = datetime.now() - timedelta(days=retention)
-                cutoff_str = cutoff_date.isoformat()
-                
                 try:
+                    file_size_before = db_path.stat().st_size
                     conn = sqlite3.connect(db_path)
                     cursor = conn.cursor()
                     
@@ -423,21 +442,20 @@ class DataCleanupManager:
                     
                     conn.commit()
                     
-                    # Vacuum database to reclaim space
-                    cursor.execute("VACUUM")
-                    conn.commit()
+                    # Vacuum only when enough pages are free to be worth rewriting the file
+                    page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+                    freelist_count = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+                    if page_count and freelist_count / page_count >= VACUUM_FREE_RATIO:
+                        cursor.execute("VACUUM")
                     conn.close()
                     
                     total_deleted = nav_deleted + elem_deleted
                     if total_deleted > 0:
                         self.cleanup_stats['database_records_deleted'] += total_deleted
                         _LOGGER.info(f"Cleaned {total_deleted} old records from {db_path}")
-                        
-                        # Calculate space freed (approximate)
-                        file_size_before = db_path.stat().st_size
-                        # Re-check after vacuum
-                        file_size_after = db_path.stat().st_size
-                        space_freed = (file_size_before - file_size_after) / (1024 * 1024)
+                    
+                    space_freed = (file_size_before - db_path.stat().st_size) / (1024 * 1024)
+                    if space_freed > 0:
                         self.cleanup_stats['total_space_freed_mb'] += space_freed
                         
                 except Exception as e:
@@ -1,24 +1,192 @@
 #!/usr/bin/env python3
 """
 Data Transfer Module - Transfers collected data from employee computers to central location.
+
+Transfers are incremental.  A local ledger (``AI/monitoring/transfer_ledger.db``)
+remembers the size, modification time and SHA-256 of every file already
+shipped to a central folder; files whose size and mtime still match are
+skipped without being read.  File contents are stored once, by hash, under
+``<central>/_objects/ab/<sha256>`` (shared by all computers), and each
+transfer's manifest maps the shipped files to their objects.
+
+Browser activity databases are shipped according to ``db_transfer_mode``:
+``"delta"`` (default) exports only rows added since the last transfer, using
+per-table rowid watermarks kept in the same ledger; ``"snapshot"`` ships a
+consistent copy made with the SQLite online backup API; ``"copy"`` is the
+old byte-for-byte copy of the live file.
 """
 
+import hashlib
 import json
+import os
 import shutil
 import logging
+import sqlite3
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    from .activity_delta import BATCH_SUFFIX, database_identity, export_delta, snapshot_database
+except ImportError:
+    from activity_delta import BATCH_SUFFIX, database_identity, export_delta, snapshot_database
 
 _LOGGER = logging.getLogger("data_transfer")
 
+# Content-addressed store in the central folder, shared by every computer
+OBJECTS_DIR_NAME = "_objects"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Folders never searched (matched anywhere in the folder name, as before)
+_SKIP_DIRS = ('__pycache__', '.git', 'Cursor versions', 'Past Logs')
+# Images inside these are library assets, not training screenshots
+_IMAGE_SKIP_DIRS = ('vendor', 'node_modules')
+_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# How browser activity databases are shipped (see module docstring)
+DB_TRANSFER_MODES = ("delta", "snapshot", "copy")
+DEFAULT_DB_TRANSFER_MODE = "delta"
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def object_path(central_path: Path, sha256: str) -> Path:
+    """Where a file's contents live in the central content store."""
+    return Path(central_path) / OBJECTS_DIR_NAME / sha256[:2] / sha256
+
+
+class TransferLedger:
+    """Files already shipped to each central folder: (path, size, mtime, SHA-256)."""
+    
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS shipped_files (
+                    central TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    shipped_at TEXT NOT NULL,
+                    PRIMARY KEY (central, path)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS row_watermarks (
+                    central TEXT NOT NULL,
+                    db TEXT NOT NULL,
+                    tbl TEXT NOT NULL,
+                    last_rowid INTEGER NOT NULL,
+                    PRIMARY KEY (central, db, tbl)
+                ) WITHOUT ROWID
+            """)
+            # File identity, watermark-row digests (JSON) and generation of each database;
+            # the generation is bumped whenever the database is recreated
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS db_generations (
+                    central TEXT NOT NULL,
+                    db TEXT NOT NULL,
+                    identity TEXT NOT NULL,
+                    anchors TEXT NOT NULL,
+                    generation INTEGER NOT NULL,
+                    PRIMARY KEY (central, db)
+                ) WITHOUT ROWID
+            """)
+    
+    def load(self, central: str) -> Dict[str, Tuple[int, int, str]]:
+        """path -> (size, mtime_ns, sha256) for everything shipped to ``central``."""
+        rows = self._conn.execute(
+            "SELECT path, size, mtime_ns, sha256 FROM shipped_files WHERE central = ?", (central,)
+        )
+        return {path: (size, mtime_ns, sha256) for path, size, mtime_ns, sha256 in rows}
+    
+    def record(self, central: str, rows: List[Tuple[str, int, int, str]]) -> None:
+        """Record shipped ``(path, size, mtime_ns, sha256)`` rows in one transaction."""
+        now = datetime.now().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO shipped_files (central, path, size, mtime_ns, sha256, shipped_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(central, path, size, mtime_ns, sha256, now) for path, size, mtime_ns, sha256 in rows],
+            )
+    
+    def load_watermarks(self, central: str, db: str) -> Dict[str, int]:
+        """table -> last rowid of database ``db`` already shipped to ``central``."""
+        rows = self._conn.execute(
+            "SELECT tbl, last_rowid FROM row_watermarks WHERE central = ? AND db = ?", (central, db)
+        )
+        return {tbl: last_rowid for tbl, last_rowid in rows}
+    
+    def load_generation(self, central: str, db: str) -> Tuple[Optional[str], Dict[str, str], int]:
+        """(file identity, anchors, generation) last shipped for ``db``; identity is None if never recorded."""
+        row = self._conn.execute(
+            "SELECT identity, anchors, generation FROM db_generations WHERE central = ? AND db = ?", (central, db)
+        ).fetchone()
+        return (row[0], json.loads(row[1]), row[2]) if row else (None, {}, 0)
+    
+    def record_watermarks(self, central: str, db: str, marks: Dict[str, int], identity: Optional[str] = None,
+                          anchors: Optional[Dict[str, str]] = None, generation: int = 0) -> None:
+        """Replace the watermarks of ``db`` (and its identity/anchors/generation) in one transaction."""
+        with self._conn:
+            self._conn.execute("DELETE FROM row_watermarks WHERE central = ? AND db = ?", (central, db))
+            self._conn.executemany(
+                "INSERT INTO row_watermarks (central, db, tbl, last_rowid) VALUES (?, ?, ?, ?)",
+                [(central, db, tbl, last_rowid) for tbl, last_rowid in marks.items()],
+            )
+            if identity is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO db_generations (central, db, identity, anchors, generation) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (central, db, identity, json.dumps(anchors or {}), generation),
+                )
+    
+    def forget_databases(self, central: str, keep: List[str]) -> None:
+        """Drop watermarks of databases that no longer exist locally (deleted by cleanup).
+        
+        Their generation is kept with a blank identity, so a database recreated
+        under the same name is shipped as the next generation.
+        """
+        known = {row[0] for row in self._conn.execute(
+            "SELECT db FROM row_watermarks WHERE central = ? UNION SELECT db FROM db_generations WHERE central = ?",
+            (central, central),
+        )}
+        gone = known - set(keep)
+        if gone:
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM row_watermarks WHERE central = ? AND db = ?", [(central, db) for db in gone]
+                )
+                self._conn.executemany(
+                    "UPDATE db_generations SET identity = '', anchors = '{}' WHERE central = ? AND db = ?",
+                    [(central, db) for db in gone],
+                )
+    
+    def close(self) -> None:
+        self._conn.close()
+
 class DataTransferManager:
     """Manages transfer of training data from employee computers to central location."""
     
-    def __init__(self, installation_dir: Path):
+    def __init__(self, installation_dir: Path, db_transfer_mode: Optional[str] = None):
         self.installation_dir = Path(installation_dir)
         self.ai_dir = self.installation_dir / "AI"
         self.training_data_dir = self.ai_dir / "training_data"
+        self.ledger_path = self.ai_dir / "monitoring" / "transfer_ledger.db"
+        mode = (db_transfer_mode or DEFAULT_DB_TRANSFER_MODE).lower()
+        if mode not in DB_TRANSFER_MODES:
+            _LOGGER.warning(f"Unknown browser database transfer mode '{db_transfer_mode}', using '{DEFAULT_DB_TRANSFER_MODE}'")
+            mode = DEFAULT_DB_TRANSFER_MODE
+        self.db_transfer_mode = mode
         
     def transfer_data_to_central(self, central_path: Path, computer_id: str) -> Dict[str, Any]:
         """Transfer all training data to central location.
@@ -33,6 +201,9 @@ class DataTransferManager:
         stats = {
             "files_transferred": 0,
             "bytes_transferred": 0,
+            "files_unchanged": 0,
+            "files_deduplicated": 0,
+            "rows_transferred": 0,
             "errors": 0,
             "transferred_files": []
         }
@@ -45,87 +216,210 @@ class DataTransferManager:
         computer_folder = central_path / computer_id
         computer_folder.mkdir(parents=True, exist_ok=True)
         
-        # Transfer all training data files (processed data)
-        training_files = list(self.training_data_dir.glob("*.json"))
-        training_files.extend(list(self.training_data_dir.glob("*.json.gz")))
-        
-        # Also transfer raw coordinate files (workflow trainer data)
-        coord_files = list(self.installation_dir.rglob("*_coordinates.json"))
-        coord_files.extend(list(self.installation_dir.rglob("*coordinates*.json")))
-        # Filter out files in protected directories
-        coord_files = [f for f in coord_files if not any(skip in str(f) for skip in ['__pycache__', '.git', 'Cursor versions', 'Past Logs'])]
-        training_files.extend(coord_files)
-        
-        # Also transfer screenshot/image files (workflow trainer data)
-        image_extensions = ['.png', '.jpg', '.jpeg']
-        for ext in image_extensions:
-            image_files = list(self.installation_dir.rglob(f"*{ext}"))
-            # Filter out files in protected directories and only include training screenshots
-            image_files = [f for f in image_files if not any(skip in str(f) for skip in ['__pycache__', '.git', 'Cursor versions', 'Past Logs', 'vendor', 'node_modules'])]
-            # Only include images in bot directories (likely training screenshots)
-            image_files = [f for f in image_files if '_bots' in str(f) or 'Billing' in str(f) or 'Medisoft' in str(f)]
-            training_files.extend(image_files)
-        
-        for source_file in training_files:
-            try:
-                # Create destination path with timestamp to avoid conflicts
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                dest_file = computer_folder / f"{timestamp}_{source_file.name}"
-                
-                # Copy file
-                shutil.copy2(source_file, dest_file)
+        # Ship only files that are new or changed since the last transfer
+        central_key = str(Path(central_path).resolve())
+        ledger = TransferLedger(self.ledger_path)
+        try:
+            shipped = ledger.load(central_key)
+            manifest_files = []
+            ledger_rows = []
+            
+            for source_file, stat in self._find_training_files():
+                relative = source_file.relative_to(self.installation_dir).as_posix()
+                previous = shipped.get(relative)
+                if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+                    stats["files_unchanged"] += 1
+                    continue
                 
-                # Verify copy
-                if dest_file.exists() and dest_file.stat().st_size == source_file.stat().st_size:
+                try:
+                    sha256 = _sha256(source_file)
+                    if previous and previous[2] == sha256:
+                        # Touched but not changed: only the ledger needs the new mtime
+                        ledger_rows.append((relative, stat.st_size, stat.st_mtime_ns, sha256))
+                        stats["files_unchanged"] += 1
+                        continue
+                    
+                    dest_file = object_path(central_path, sha256)
+                    if dest_file.exists():
+                        stats["files_deduplicated"] += 1
+                    else:
+                        dest_file.parent.mkdir(parents=True, exist_ok=True)
+                        temp_file = dest_file.with_name(f"{sha256}.{computer_id}.part")
+                        shutil.copy2(source_file, temp_file)
+                        
+                        # Verify copy
+                        if temp_file.stat().st_size != stat.st_size:
+                            temp_file.unlink()
+                            stats["errors"] += 1
+                            _LOGGER.warning(f"Transfer verification failed: {source_file.name}")
+                            continue
+                        os.replace(temp_file, dest_file)
+                        stats["bytes_transferred"] += stat.st_size
+                    
                     stats["files_transferred"] += 1
-                    stats["bytes_transferred"] += source_file.stat().st_size
                     stats["transferred_files"].append(str(dest_file))
+                    manifest_files.append({
+                        "source": relative,
+                        "name": source_file.name,
+                        "size": stat.st_size,
+                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                        "sha256": sha256
+                    })
+                    ledger_rows.append((relative, stat.st_size, stat.st_mtime_ns, sha256))
                     _LOGGER.debug(f"Transferred: {source_file.name} -> {dest_file}")
-                else:
-                    stats["errors"] += 1
-                    _LOGGER.warning(f"Transfer verification failed: {source_file.name}")
                     
-            except Exception as e:
-                stats["errors"] += 1
-                _LOGGER.warning(f"Error transferring {source_file.name}: {e}")
+                except Exception as e:
+                    stats["errors"] += 1
+                    _LOGGER.warning(f"Error transferring {source_file.name}: {e}")
+            
+            # Also transfer browser activity databases if they exist
+            self._transfer_browser_databases(central_path, computer_folder, central_key, ledger, stats)
+            
+            if not stats["transferred_files"] and not ledger_rows:
+                _LOGGER.debug("Nothing new to transfer")
+                return stats
+            
+            # Create transfer manifest ("files" maps each shipped file to its object by SHA-256)
+            manifest = {
+                "computer_id": computer_id,
+                "transfer_timestamp": datetime.now().isoformat(),
+                "files_transferred": stats["files_transferred"],
+                "bytes_transferred": stats["bytes_transferred"],
+                "transferred_files": stats["transferred_files"],
+                "objects_dir": OBJECTS_DIR_NAME,
+                "files": manifest_files
+            }
+            
+            if stats["transferred_files"]:
+                manifest_file = computer_folder / f"transfer_manifest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                try:
+                    with open(manifest_file, 'w', encoding='utf-8') as f:
+                        json.dump(manifest, f, indent=2)
+                except Exception as e:
+                    _LOGGER.warning(f"Error creating transfer manifest: {e}")
+                    # Not recorded as shipped: the next transfer retries (the objects are already stored)
+                    return stats
+            
+            ledger.record(central_key, ledger_rows)
+        finally:
+            ledger.close()
         
-        # Also transfer browser activity databases if they exist
+        return stats
+    
+    def _transfer_browser_databases(self, central_path: Path, computer_folder: Path, central_key: str,
+                                    ledger: TransferLedger, stats: Dict[str, Any]) -> None:
+        """Ship ``AI/browser_activity/*.db`` to ``<computer>/browser_activity/`` in the configured mode."""
         browser_db_dir = self.ai_dir / "browser_activity"
-        if browser_db_dir.exists():
-            db_files = list(browser_db_dir.glob("*.db"))
+        if not browser_db_dir.exists():
+            return
+        db_files = sorted(browser_db_dir.glob("*.db"))
+        dest_dir = computer_folder / "browser_activity"
+        if self.db_transfer_mode == "delta":
+            ledger.forget_databases(central_key, [db_file.name for db_file in db_files])
+        
+        # Batches and snapshots are built locally, then moved onto the share in one rename
+        staging_dir = Path(tempfile.mkdtemp(prefix="browser_activity_transfer_"))
+        try:
             for db_file in db_files:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 try:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    dest_file = computer_folder / "browser_activity" / f"{timestamp}_{db_file.name}"
-                    dest_file.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    shutil.copy2(db_file, dest_file)
-                    
-                    if dest_file.exists() and dest_file.stat().st_size == db_file.stat().st_size:
-                        stats["files_transferred"] += 1
-                        stats["bytes_transferred"] += db_file.stat().st_size
-                        stats["transferred_files"].append(str(dest_file))
+                    if self.db_transfer_mode == "delta":
+                        marks = ledger.load_watermarks(central_key, db_file.name)
+                        identity = database_identity(db_file)
+                        known_identity, anchors, generation = ledger.load_generation(central_key, db_file.name)
+                        if known_identity is not None and known_identity != identity:
+                            # Deleted and recreated (possibly already past the old watermarks)
+                            _LOGGER.info(f"{db_file.name} was recreated; shipping it as a new generation")
+                            marks, anchors = {}, {}
+                            generation += 1
+                        batch_file = staging_dir / f"{timestamp}_{db_file.stem}{BATCH_SUFFIX}"
+                        new_marks, counts, generation, anchors = export_delta(
+                            db_file, batch_file, marks, generation, anchors
+                        )
+                        if counts:
+                            dest_file = self._ship_file(batch_file, dest_dir / batch_file.name, stats)
+                            if dest_file is None:
+                                continue  # Watermarks stay put; the rows are exported again next time
+                            stats["rows_transferred"] += sum(counts.values())
+                            _LOGGER.debug(f"Transferred {sum(counts.values())} new rows from {db_file.name}")
+                        # Recorded only once the batch is on the share
+                        ledger.record_watermarks(central_key, db_file.name, new_marks, identity, anchors, generation)
+                    elif self.db_transfer_mode == "snapshot":
+                        snapshot_file = staging_dir / f"{timestamp}_{db_file.name}"
+                        snapshot_database(db_file, snapshot_file)
+                        self._ship_file(snapshot_file, dest_dir / snapshot_file.name, stats)
+                    else:
+                        self._ship_file(db_file, dest_dir / f"{timestamp}_{db_file.name}", stats)
                 except Exception as e:
                     stats["errors"] += 1
                     _LOGGER.warning(f"Error transferring database {db_file.name}: {e}")
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    def _ship_file(self, source_file: Path, dest_file: Path, stats: Dict[str, Any]) -> Optional[Path]:
+        """Copy to ``<dest>.part``, verify the size and rename into place; returns the destination."""
+        dest_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = dest_file.with_name(dest_file.name + ".part")
+        shutil.copy2(source_file, temp_file)
+        size = source_file.stat().st_size
+        if temp_file.stat().st_size != size:
+            temp_file.unlink()
+            stats["errors"] += 1
+            _LOGGER.warning(f"Transfer verification failed: {source_file.name}")
+            return None
+        os.replace(temp_file, dest_file)
+        stats["files_transferred"] += 1
+        stats["bytes_transferred"] += size
+        stats["transferred_files"].append(str(dest_file))
+        return dest_file
+    
+    def _find_training_files(self) -> List[Tuple[Path, os.stat_result]]:
+        """Training files with their stat results, from one walk of the installation.
         
-        # Create transfer manifest
-        manifest = {
-            "computer_id": computer_id,
-            "transfer_timestamp": datetime.now().isoformat(),
-            "files_transferred": stats["files_transferred"],
-            "bytes_transferred": stats["bytes_transferred"],
-            "transferred_files": stats["transferred_files"]
-        }
+        Processed training data (``AI/training_data/*.json``, ``*.json.gz``),
+        workflow trainer coordinate files (``*coordinates*.json``) and
+        screenshots (PNG/JPG under bot folders).
+        """
+        found: Dict[str, Tuple[Path, os.stat_result]] = {}
         
-        manifest_file = computer_folder / f"transfer_manifest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        try:
-            with open(manifest_file, 'w', encoding='utf-8') as f:
-                json.dump(manifest, f, indent=2)
-        except Exception as e:
-            _LOGGER.warning(f"Error creating transfer manifest: {e}")
+        for pattern in ("*.json", "*.json.gz"):
+            for path in self.training_data_dir.glob(pattern):
+                try:
+                    found[str(path)] = (path, path.stat())
+                except OSError:
+                    pass
         
-        return stats
+        # One scandir walk instead of an rglob per pattern; DirEntry.stat() is free on Windows
+        pending = [(str(self.installation_dir), False)]
+        while pending:
+            folder, in_library = pending.pop()
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not any(skip in name for skip in _SKIP_DIRS):
+                            pending.append((entry.path, in_library or any(skip in name for skip in _IMAGE_SKIP_DIRS)))
+                        continue
+                    if not entry.is_file():
+                        continue
+                    lower = name.lower()
+                    if lower.endswith('.json'):
+                        wanted = 'coordinates' in name
+                    elif lower.endswith(_IMAGE_EXTENSIONS):
+                        # Only include images in bot directories (likely training screenshots)
+                        wanted = not in_library and ('_bots' in entry.path or 'Billing' in entry.path or 'Medisoft' in entry.path)
+                    else:
+                        wanted = False
+                    if wanted and entry.path not in found:
+                        found[entry.path] = (Path(entry.path), entry.stat())
+                except OSError:
+                    continue
+        
+        return list(found.values())
     
     def should_transfer(self, last_transfer_file: Path, interval_hours: int) -> bool:
         """Check if it's time to transfer data based on interval."""
@@ -5,7 +5,6 @@ Comprehensive diagnostic tool to identify why browser events aren't being captur
 """
 
 import sys
-import sqlite3
 import time
 from pathlib import Path
 from datetime import datetime
@@ -27,6 +26,8 @@ secure_data_dir = installation_dir / "_secure_data"
 if str(system_dir) not in sys.path:
     sys.path.insert(0, str(system_dir))
 
+from partitioned_store import open_monitoring_reader
+
 print("=" * 70)
 print("Browser Monitoring Diagnostics")
 print("=" * 70)
@@ -72,7 +73,7 @@ try:
     else:
         print(f"  [OK] Database exists: {db_path}")
         
-        conn = sqlite3.connect(db_path)
+        conn = open_monitoring_reader(db_path)
         cursor = conn.cursor()
         
         # Check session summaries
@@ -206,7 +207,7 @@ try:
         
         # Check if events were recorded
         time.sleep(2)  # Wait for events to be processed
-        conn = sqlite3.connect(secure_data_dir / "browser_activity.db")
+        conn = open_monitoring_reader(secure_data_dir / "browser_activity.db")
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM page_navigations WHERE url LIKE '%google.com%' ORDER BY timestamp DESC LIMIT 1")
         recent_nav = cursor.fetchone()[0]
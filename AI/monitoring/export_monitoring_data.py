@@ -11,6 +11,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Sequence
 
+try:
+    from .partitioned_store import open_monitoring_reader
+except ImportError:
+    from partitioned_store import open_monitoring_reader
+
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
 DEFAULT_EVENT_LIMIT = 5000
 DEFAULT_EXPORT_SUBDIR = Path("AI") / "training" / "exports"
@@ -97,7 +102,7 @@ class MonitoringDataExporter:
         export_root = (export_root or (self.installation_dir / DEFAULT_EXPORT_SUBDIR)).resolve()
         export_root.mkdir(parents=True, exist_ok=True)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with open_monitoring_reader(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             available = self._session_exists(conn, session_id)
             if not available:
@@ -231,7 +236,7 @@ def export_latest_sessions(
         return []
 
     results: List[ExportResult] = []
-    with sqlite3.connect(exporter.db_path) as conn:
+    with open_monitoring_reader(exporter.db_path) as conn:
         conn.row_factory = sqlite3.Row
         cursor = conn.execute(
             """
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Single-file frame container for screen recordings.
+
+A recording is one ``.frames`` file instead of a folder of loose images::
+
+    header  b"SCRF" + version (u8) + 3 reserved bytes
+    chunk   b"FRAM" | format (4s) | frame number (u32) | timestamp (f64)
+            | width (u32) | height (u32) | payload length (u32) | payload
+
+Each payload is one encoded image (PNG by default).  When the writer is
+closed it saves an index next to the container (``<name>.frames.index.json``)
+with the offset and length of every frame, so a reader can seek straight to
+any frame.  Every chunk header is self-describing, so the index is rebuilt
+by scanning the container if the recording was interrupted.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from bisect import bisect_right
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None  # type: ignore
+    PIL_AVAILABLE = False
+
+CONTAINER_SUFFIX = ".frames"
+INDEX_SUFFIX = ".index.json"
+CONTAINER_VERSION = 1
+
+_MAGIC = b"SCRF"
+_CHUNK_TAG = b"FRAM"
+_HEADER = struct.Struct("<4sB3x")
+_CHUNK = struct.Struct("<4s4sIdIII")
+
+# Format name -> 4-byte tag stored in each chunk header
+IMAGE_FORMATS = {"png": b"PNG\0", "jpeg": b"JPEG", "webp": b"WEBP"}
+
+
+def index_path_for(container_path: Path) -> Path:
+    container_path = Path(container_path)
+    return container_path.with_name(container_path.name + INDEX_SUFFIX)
+
+
+class FrameContainerWriter:
+    """Append encoded frames to a container file (one writer thread at a time)."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        image_format: str = "png",
+        png_compress_level: int = 1,
+        quality: int = 80,
+    ) -> None:
+        if not PIL_AVAILABLE:
+            raise RuntimeError("Pillow is required to encode frames")
+        image_format = image_format.lower()
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format {image_format!r}; expected one of {tuple(IMAGE_FORMATS)}")
+        self.path = Path(path)
+        self.image_format = image_format
+        self.png_compress_level = max(0, min(9, int(png_compress_level)))
+        self.quality = max(10, min(95, int(quality)))
+        self.entries: List[Dict[str, Any]] = []
+        self._file = open(self.path, "wb")
+        self._file.write(_HEADER.pack(_MAGIC, CONTAINER_VERSION))
+        self.bytes_written = _HEADER.size
+
+    def encode(self, img) -> bytes:
+        """Encode a PIL image in the container's format."""
+        buffer = BytesIO()
+        if self.image_format == "png":
+            # Level 1 is several times faster than Pillow's default and still lossless
+            img.save(buffer, format="PNG", compress_level=self.png_compress_level)
+        elif self.image_format == "jpeg":
+            img.save(buffer, format="JPEG", quality=self.quality)
+        else:
+            img.save(buffer, format="WEBP", quality=self.quality, method=0)
+        return buffer.getvalue()
+
+    def write(self, payload: bytes, *, number: int, timestamp: float, size: Tuple[int, int]) -> Dict[str, Any]:
+        """Append one encoded frame; returns its index entry."""
+        header = _CHUNK.pack(
+            _CHUNK_TAG, IMAGE_FORMATS[self.image_format], number, timestamp, size[0], size[1], len(payload)
+        )
+        offset = self.bytes_written + len(header)
+        self._file.write(header)
+        self._file.write(payload)
+        self.bytes_written += len(header) + len(payload)
+        entry = {
+            "number": number,
+            "timestamp": timestamp,
+            "width": size[0],
+            "height": size[1],
+            "offset": offset,
+            "length": len(payload),
+        }
+        self.entries.append(entry)
+        return entry
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> Path:
+        """Close the container and write its index; returns the index path."""
+        if not self._file.closed:
+            self._file.close()
+        index_path = index_path_for(self.path)
+        index = {
+            "version": CONTAINER_VERSION,
+            "image_format": self.image_format,
+            "frames": self.entries,
+        }
+        index_path.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        return index_path
+
+
+def read_index(path: Path) -> List[Dict[str, Any]]:
+    """Index entries of a container, from its index file or by scanning the chunks."""
+    path = Path(path)
+    index_path = index_path_for(path)
+    if index_path.exists():
+        try:
+            return json.loads(index_path.read_text(encoding="utf-8"))["frames"]
+        except (ValueError, KeyError):
+            pass
+    return _scan(path)
+
+
+def _scan(path: Path) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    with open(path, "rb") as handle:
+        magic, _version = _HEADER.unpack(handle.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a frame container")
+        position = _HEADER.size
+        while True:
+            header = handle.read(_CHUNK.size)
+            if len(header) < _CHUNK.size:
+                break
+            tag, _fmt, number, timestamp, width, height, length = _CHUNK.unpack(header)
+            if tag != _CHUNK_TAG:
+                break
+            offset = position + _CHUNK.size
+            handle.seek(length, 1)
+            position = offset + length
+            entries.append({
+                "number": number,
+                "timestamp": timestamp,
+                "width": width,
+                "height": height,
+                "offset": offset,
+                "length": length,
+            })
+    # A chunk cut short by a crash is dropped
+    size = path.stat().st_size
+    return [entry for entry in entries if entry["offset"] + entry["length"] <= size]
+
+
+class FrameContainerReader:
+    """Random access to the frames of a container."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.entries = read_index(self.path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def read_bytes(self, position: int) -> bytes:
+        entry = self.entries[position]
+        with open(self.path, "rb") as handle:
+            handle.seek(entry["offset"])
+            return handle.read(entry["length"])
+
+    def image(self, position: int):
+        if not PIL_AVAILABLE:
+            raise RuntimeError("Pillow is required to decode frames")
+        frame = Image.open(BytesIO(self.read_bytes(position)))
+        frame.load()
+        return frame
+
+    def frame_at(self, timestamp: float) -> Optional[int]:
+        """Position of the frame on screen at ``timestamp`` (the last one stored before it)."""
+        position = bisect_right([entry["timestamp"] for entry in self.entries], timestamp)
+        return position - 1 if position else None
+
+    def iter_images(self) -> Iterator[Tuple[Dict[str, Any], Any]]:
+        for position, entry in enumerate(self.entries):
+            yield entry, self.image(position)
+
+
+__all__ = [
+    "CONTAINER_SUFFIX",
+    "FrameContainerReader",
+    "FrameContainerWriter",
+    "IMAGE_FORMATS",
+    "index_path_for",
+    "read_index",
+]
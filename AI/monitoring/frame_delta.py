@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Delta-frame encoding and reconstruction for full-monitoring screen capture.
+
+Frames are compared on a downscaled grayscale thumbnail.  Unchanged frames
+are stored as ``still`` markers with no image payload, changed frames store
+only the dirty regions as JPEG tiles, and a full ``key`` frame is written
+periodically (or when most of the screen changed) so a reader never has to
+replay an unbounded chain of deltas.  A key frame is also forced whenever
+the storage partition changes, so every day/week partition file decodes on
+its own and dropping an old partition never orphans a later delta.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .partitioned_store import open_monitoring_reader
+except ImportError:
+    from partitioned_store import open_monitoring_reader
+
+try:
+    from PIL import Image, ImageChops
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None  # type: ignore
+    ImageChops = None  # type: ignore
+    PIL_AVAILABLE = False
+
+FRAME_KEY = "key"
+FRAME_DELTA = "delta"
+FRAME_STILL = "still"
+
+
+@dataclass
+class EncodedFrame:
+    """Result of encoding one captured frame."""
+
+    frame_type: str
+    payload: Optional[bytes] = None
+    regions: List[Dict[str, int]] = field(default_factory=list)
+    dirty_ratio: float = 0.0
+
+    @property
+    def regions_json(self) -> Optional[str]:
+        if self.frame_type != FRAME_DELTA:
+            return None
+        return json.dumps(self.regions, separators=(",", ":"))
+
+
+class FrameDeltaEncoder:
+    """Turn a stream of full-screen PIL images into key/delta/still frames."""
+
+    def __init__(
+        self,
+        *,
+        tile_size: int = 64,
+        thumbnail_scale: int = 8,
+        change_threshold: int = 12,
+        keyframe_interval: int = 60,
+        full_frame_ratio: float = 0.5,
+        jpeg_quality: int = 70,
+    ) -> None:
+        if not PIL_AVAILABLE:
+            raise RuntimeError("Pillow is required for frame differencing")
+        self.tile_size = max(8, int(tile_size))
+        self.thumbnail_scale = max(1, min(int(thumbnail_scale), self.tile_size))
+        self.change_threshold = max(0, min(254, int(change_threshold)))
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.full_frame_ratio = min(1.0, max(0.0, float(full_frame_ratio)))
+        self.jpeg_quality = max(10, min(95, int(jpeg_quality)))
+
+        self._reference = None
+        self._reference_size: Optional[Tuple[int, int]] = None
+        self._frames_since_key = 0
+        self._partition: Optional[str] = None
+
+    def reset(self) -> None:
+        """Forget the reference frame so the next frame becomes a key frame."""
+        self._reference = None
+        self._reference_size = None
+        self._frames_since_key = 0
+        self._partition = None
+
+    def encode(self, img, partition: Optional[str] = None) -> EncodedFrame:
+        """Encode ``img`` relative to the last stored frame.
+
+        ``partition`` is the storage partition key the frame will be written
+        to; when it differs from the previous frame's, a key frame is forced.
+        """
+        thumbnail, grid = self._thumbnail(img)
+
+        partition_changed = partition != self._partition
+        self._partition = partition
+        if (
+            self._reference is None
+            or self._reference_size != img.size
+            or self._frames_since_key >= self.keyframe_interval
+            or partition_changed
+        ):
+            return self._key_frame(img, thumbnail)
+
+        dirty = self._dirty_tiles(thumbnail, grid)
+        if not dirty:
+            # Reference is left untouched so slow drift still accumulates
+            # until it crosses the threshold.
+            return EncodedFrame(FRAME_STILL)
+
+        dirty_ratio = len(dirty) / float(grid[0] * grid[1])
+        if dirty_ratio >= self.full_frame_ratio:
+            return self._key_frame(img, thumbnail, dirty_ratio)
+
+        regions: List[Dict[str, int]] = []
+        payload = BytesIO()
+        cells = self.tile_size // self.thumbnail_scale
+        for x0, y0, x1, y1 in self._merge_tiles(dirty, grid):
+            box = (
+                x0 * self.tile_size,
+                y0 * self.tile_size,
+                min(img.size[0], x1 * self.tile_size),
+                min(img.size[1], y1 * self.tile_size),
+            )
+            # Only the emitted tiles change in the reference, so it keeps
+            # matching what a decoder rebuilds and sub-threshold drift in
+            # the other tiles still accumulates.
+            thumb_box = (x0 * cells, y0 * cells, x1 * cells, y1 * cells)
+            self._reference.paste(thumbnail.crop(thumb_box), thumb_box[:2])
+            tile_bytes = self._jpeg(img.crop(box))
+            regions.append({
+                "x": box[0],
+                "y": box[1],
+                "w": box[2] - box[0],
+                "h": box[3] - box[1],
+                "offset": payload.tell(),
+                "length": len(tile_bytes),
+            })
+            payload.write(tile_bytes)
+
+        self._frames_since_key += 1
+        return EncodedFrame(FRAME_DELTA, payload.getvalue(), regions, dirty_ratio)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _key_frame(self, img, thumbnail, dirty_ratio: float = 1.0) -> EncodedFrame:
+        self._reference = thumbnail
+        self._reference_size = img.size
+        self._frames_since_key = 0
+        return EncodedFrame(FRAME_KEY, self._jpeg(img), [], dirty_ratio)
+
+    def _thumbnail(self, img):
+        cols = -(-img.size[0] // self.tile_size)
+        rows = -(-img.size[1] // self.tile_size)
+        cells = self.tile_size // self.thumbnail_scale
+        thumbnail = img.convert("L").resize((cols * cells, rows * cells), Image.BILINEAR)
+        return thumbnail, (cols, rows)
+
+    def _dirty_tiles(self, thumbnail, grid: Tuple[int, int]) -> List[Tuple[int, int]]:
+        threshold = self.change_threshold
+        diff = ImageChops.difference(thumbnail, self._reference)
+        mask = diff.point(lambda value: 255 if value > threshold else 0)
+        if mask.getbbox() is None:
+            return []
+        # BOX-downsampling the binary mask leaves a non-zero cell for every
+        # tile that contains at least one changed thumbnail pixel.
+        per_tile = mask.resize(grid, Image.BOX)
+        cols = grid[0]
+        return [
+            (index % cols, index // cols)
+            for index, value in enumerate(per_tile.getdata())
+            if value
+        ]
+
+    @staticmethod
+    def _merge_tiles(dirty: List[Tuple[int, int]], grid: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+        """Group 4-connected dirty tiles into bounding boxes (tile units, exclusive max)."""
+        remaining = set(dirty)
+        boxes: List[Tuple[int, int, int, int]] = []
+        while remaining:
+            start = remaining.pop()
+            x0 = x1 = start[0]
+            y0 = y1 = start[1]
+            pending = deque([start])
+            while pending:
+                cx, cy = pending.popleft()
+                for neighbour in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    if neighbour in remaining:
+                        remaining.discard(neighbour)
+                        pending.append(neighbour)
+                        x0 = min(x0, neighbour[0])
+                        x1 = max(x1, neighbour[0])
+                        y0 = min(y0, neighbour[1])
+                        y1 = max(y1, neighbour[1])
+            boxes.append((x0, y0, x1 + 1, y1 + 1))
+        return boxes
+
+    def _jpeg(self, img) -> bytes:
+        buffer = BytesIO()
+        img.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True)
+        return buffer.getvalue()
+
+
+def apply_delta(base, payload: bytes, regions: List[Dict[str, int]]):
+    """Paste the JPEG tiles of a delta frame onto a copy of ``base``."""
+    frame = base.copy()
+    for region in regions:
+        start = region["offset"]
+        tile = Image.open(BytesIO(payload[start:start + region["length"]]))
+        frame.paste(tile.convert(frame.mode), (region["x"], region["y"]))
+    return frame
+
+
+class FrameReconstructor:
+    """Rebuild full frames from ``screen_recordings`` rows on demand.
+
+    ``db_path`` is the monitor's ``full_monitoring.db``; day/week partitions
+    next to it are read as well.  Row ids restart in every partition, so
+    frames are ordered and addressed by ``timestamp``.  ``decrypt`` may be
+    supplied to read ``encrypted_data`` instead of the plain
+    ``compressed_data`` column.
+    """
+
+    def __init__(self, db_path: Path, *, decrypt: Optional[Callable[[bytes], bytes]] = None) -> None:
+        if not PIL_AVAILABLE:
+            raise RuntimeError("Pillow is required to rebuild frames")
+        self.db_path = Path(db_path)
+        self.decrypt = decrypt
+
+    def iter_session_frames(
+        self,
+        session_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """Yield ``(timestamp, image)`` for every stored tick of a session.
+
+        ``start``/``end`` narrow the partitions that are read; without them
+        every partition is.  The encoder starts a new key frame in each
+        partition, so the chain never depends on row ids across files.
+        """
+        conn = open_monitoring_reader(self.db_path, start=start, end=end)
+        try:
+            try:
+                cursor = conn.execute(
+                    """
+                    SELECT timestamp, frame_type, frame_regions, compressed_data, encrypted_data
+                    FROM screen_recordings
+                    WHERE session_id = ?
+                    ORDER BY timestamp
+                    """,
+                    (session_id,),
+                )
+            except sqlite3.OperationalError:
+                return
+            current = None
+            for row in cursor:
+                current = self._apply_row(current, row)
+                if current is not None:
+                    yield row[0], current
+        finally:
+            conn.close()
+
+    def rebuild_frame(self, session_id: str, timestamp: str):
+        """Return the full image a session showed at ``timestamp`` (or ``None``)."""
+        # Key frames are forced at partition boundaries, so the chain lives in
+        # the partition holding ``timestamp`` (plus the legacy database).
+        moment = datetime.fromisoformat(timestamp)
+        conn = open_monitoring_reader(self.db_path, start=moment, end=moment)
+        try:
+            key = conn.execute(
+                """
+                SELECT MAX(timestamp) FROM screen_recordings
+                WHERE session_id = ? AND timestamp <= ?
+                  AND (frame_type IS NULL OR frame_type = ?)
+                """,
+                (session_id, timestamp, FRAME_KEY),
+            ).fetchone()
+            if key is None or key[0] is None:
+                return None
+            cursor = conn.execute(
+                """
+                SELECT timestamp, frame_type, frame_regions, compressed_data, encrypted_data
+                FROM screen_recordings
+                WHERE session_id = ? AND timestamp BETWEEN ? AND ?
+                ORDER BY timestamp
+                """,
+                (session_id, key[0], timestamp),
+            )
+            current = None
+            for row in cursor:
+                current = self._apply_row(current, row)
+            return current
+        finally:
+            conn.close()
+
+    def _apply_row(self, current, row):
+        _, frame_type, regions_json, compressed, encrypted = row
+        if frame_type == FRAME_STILL:
+            return current
+        payload = compressed
+        if self.decrypt is not None and encrypted:
+            payload = self.decrypt(encrypted)
+        if not payload:
+            return current
+        if frame_type == FRAME_DELTA:
+            if current is None:
+                return None
+            return apply_delta(current, payload, json.loads(regions_json or "[]"))
+        frame = Image.open(BytesIO(payload))
+        frame.load()
+        return frame.convert("RGB")
+
+
+__all__ = [
+    "EncodedFrame",
+    "FRAME_DELTA",
+    "FRAME_KEY",
+    "FRAME_STILL",
+    "FrameDeltaEncoder",
+    "FrameReconstructor",
+    "apply_delta",
+]
@@ -93,6 +93,24 @@ except ImportError:
     ENCRYPTION_AVAILABLE = False
     Fernet = None
 
+# Batched storage writer
+try:
+    from .monitoring_storage import BatchedStorageWriter, INSERT_SQL, build_row, ensure_session_index, update_session_index
+except ImportError:
+    from monitoring_storage import BatchedStorageWriter, INSERT_SQL, build_row, ensure_session_index, update_session_index
+
+# Day/week partitioned databases
+try:
+    from .partitioned_store import GRANULARITIES, PartitionedStore
+except ImportError:
+    from partitioned_store import GRANULARITIES, PartitionedStore
+
+# Delta-frame screen encoding
+try:
+    from .frame_delta import FRAME_STILL, FrameDeltaEncoder
+except ImportError:
+    from frame_delta import FRAME_STILL, FrameDeltaEncoder
+
 
 class FullSystemMonitor:
     """
@@ -189,9 +207,16 @@ class FullSystemMonitor:
         self.screen_fps = 1  # 1 frame per second (adjustable)
         self.screen_quality = 0.7  # JPEG quality (0-1)
         self.screen_resolution = None  # Will detect automatically
+        self.screen_frame_diff = True  # Store only changed regions / still markers
+        self.screen_keyframe_interval = 60  # Full frame at least every N stored frames
+        self.screen_tile_size = 64  # Dirty-region tile size in pixels
+        self.screen_change_threshold = 12  # Grayscale delta that counts as a change
         
         # Storage queue
         self.storage_queue = Queue(maxsize=1000)
+        self.storage_writer: Optional[BatchedStorageWriter] = None
+        self.storage_batch_size = 500
+        self.storage_flush_interval = 0.5
         
         # Performance metrics
 
@@ -204,6 +229,9 @@ class FullSystemMonitor:
             "excel_events_recorded": 0,
             "browser_events_recorded": 0,
             "pdf_events_recorded": 0,
+            "screen_key_frames": 0,
+            "screen_delta_frames": 0,
+            "screen_still_frames": 0,
             "start_time": None,
             "total_data_size": 0
         }
@@ -220,6 +248,13 @@ class FullSystemMonitor:
             self.screen_fps = 0.2
         self.screen_quality = float(self.monitoring_config.get("screen_quality", self.screen_quality))
         self.screen_quality = max(0.1, min(1.0, self.screen_quality))
+        self.screen_frame_diff = bool(self.monitoring_config.get("screen_frame_diff", self.screen_frame_diff))
+        try:
+            self.screen_keyframe_interval = max(1, int(self.monitoring_config.get("screen_keyframe_interval", self.screen_keyframe_interval)))
+            self.screen_tile_size = max(16, int(self.monitoring_config.get("screen_tile_size", self.screen_tile_size)))
+            self.screen_change_threshold = max(0, int(self.monitoring_config.get("screen_change_threshold", self.screen_change_threshold)))
+        except Exception:
+            pass
         mouse_throttle = self.monitoring_config.get("mouse_move_throttle")
         if mouse_throttle is not None:
             try:
@@ -234,6 +269,25 @@ class FullSystemMonitor:
                     self.storage_queue = Queue(maxsize=queue_limit)
             except Exception:
                 pass
+        try:
+            self.storage_batch_size = max(1, int(self.monitoring_config.get("storage_batch_size", self.storage_batch_size)))
+            self.storage_flush_interval = max(0.05, float(self.monitoring_config.get("storage_flush_interval", self.storage_flush_interval)))
+        except Exception:
+            pass
+
+        # Optional day/week partitions; full_monitoring.db stays readable as the oldest partition
+        self.store: Optional[PartitionedStore] = None
+        if self.monitoring_config.get("partitioned_storage", False):
+            granularity = str(self.monitoring_config.get("partition_granularity", "week"))
+            if granularity not in GRANULARITIES:
+                granularity = "week"
+            self.store = PartitionedStore(
+                self.data_dir / "partitions",
+                "full_monitoring",
+                self._create_schema,
+                granularity=granularity,
+                legacy_path=self.db_path,
+            )
     
 
     def _load_settings(self) -> Dict[str, Any]:
@@ -251,6 +305,18 @@ class FullSystemMonitor:
     def _init_database(self):
         """Initialize monitoring database"""
         conn = sqlite3.connect(self.db_path)
+        self._create_schema(conn)
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        """Create all monitoring tables and indexes (also used for new partitions)"""
+        # Lets retention reclaim space with incremental_vacuum; applied to new (empty) files only,
+        # where the VACUUM that switches the mode is instant
+        if not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
         cursor = conn.cursor()
         
         # Screen recordings table
@@ -263,10 +329,18 @@ class FullSystemMonitor:
                 compressed_data BLOB,
                 window_title TEXT,
                 active_app TEXT,
-                encrypted_data BLOB
+                encrypted_data BLOB,
+                frame_type TEXT,
+                frame_regions TEXT
             )
         """)
         
+        # Databases created before delta frames lack the frame columns
+        existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(screen_recordings)")}
+        for column in ("frame_type", "frame_regions"):
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE screen_recordings ADD COLUMN {column} TEXT")
+        
         # Keyboard input table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS keyboard_input (
@@ -419,8 +493,13 @@ class FullSystemMonitor:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_timestamp ON file_activity(timestamp)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_pattern_hash ON activity_patterns(pattern_hash)")
         
-        conn.commit()
-        conn.close()
+        # Per-session first/last timestamp and size, kept current by the storage writer.
+        # Built here, before the writer starts; if the file is busy (e.g. a retention
+        # VACUUM) retention builds it on its next run and the writer skips upkeep until then.
+        try:
+            ensure_session_index(conn)
+        except sqlite3.OperationalError:
+            pass
     
     def _get_or_create_encryption_key(self) -> bytes:
         """Get or create encryption key"""
@@ -611,6 +690,15 @@ class FullSystemMonitor:
                     frame_interval = 1.0 / self.screen_fps
                     last_frame_time = time.time()
                     
+                    encoder = None
+                    if self.screen_frame_diff:
+                        encoder = FrameDeltaEncoder(
+                            tile_size=self.screen_tile_size,
+                            change_threshold=self.screen_change_threshold,
+                            keyframe_interval=self.screen_keyframe_interval,
+                            jpeg_quality=int(self.screen_quality * 100),
+                        )
+                    
                     while self.monitoring_active:
                         try:
                             current_time = time.time()
@@ -624,31 +712,46 @@ class FullSystemMonitor:
                                 # Get active window info
                                 active_app, window_title = self._get_active_window_info()
                                 
-                                # Compress image
-                                img_bytes = self._compress_image(img)
+                                captured_at = datetime.now()
+                                
+                                # Encode as key/delta/still frame (or a plain JPEG when diffing is off);
+                                # each partition starts with a key frame so it decodes on its own
+                                if encoder is not None:
+                                    partition = self.store.key_for(captured_at) if self.store is not None else None
+                                    encoded = encoder.encode(img, partition)
+                                    frame_type = encoded.frame_type
+                                    img_bytes = encoded.payload
+                                    frame_regions = encoded.regions_json
+                                else:
+                                    frame_type = "key"
+                                    img_bytes = self._compress_image(img)
+                                    frame_regions = None
                                 
                                 # Record screen
                                 record = {
-                                    "timestamp": datetime.now().isoformat(),
+                                    "timestamp": captured_at.isoformat(),
                                     "session_id": self.session_id,
                                     "compressed_data": img_bytes,
                                     "window_title": window_title,
                                     "active_app": active_app,
+                                    "frame_type": frame_type,
+                                    "frame_regions": frame_regions,
                                     "table": "screen_recordings"
                                 }
-                                if self.retain_raw_frames:
+                                if self.retain_raw_frames and frame_type != FRAME_STILL:
                                     record["screenshot_data"] = img.tobytes()
                                 else:
                                     record["screenshot_data"] = None
                                 
-                                # Encrypt if available
-                                if self.cipher_suite:
+                                # Encrypt if available (still markers carry no image)
+                                if self.cipher_suite and img_bytes:
                                     encrypted = self.cipher_suite.encrypt(img_bytes)
                                     record["encrypted_data"] = encrypted
                                 
                                 self.screen_buffer.append(record)
                                 self.storage_queue.put(record)
                                 
+                                self.metrics[f"screen_{frame_type}_frames"] += 1
                                 self.metrics["screens_recorded"] += 1
                                 last_frame_time = current_time
                             
@@ -1669,232 +1772,44 @@ class FullSystemMonitor:
                 self.logger.debug(f"Error recording file event: {e}")
     
     def _start_storage_thread(self):
-        """Start background storage thread"""
-        def store_data():
-            records_stored = 0
-            last_log_time = time.time()
-            while self.monitoring_active or not self.storage_queue.empty():
-                try:
-                    # Get record from queue
-                    try:
-                        record = self.storage_queue.get(timeout=1)
-                    except:
-                        continue
-                    
-                    # Store in database
-                    if self._store_record(record):
-                        records_stored += 1
-                        self.storage_queue.task_done()
-                        
-                        # Log progress every 10 seconds
-                        current_time = time.time()
-                        if current_time - last_log_time >= 10:
-                            self.logger.info(f"Storage thread: {records_stored} records stored (queue size: {self.storage_queue.qsize()})")
-                            last_log_time = current_time
-                    else:
-                        # Store failed, put back in queue
-                        self.storage_queue.put(record)
-                        self.storage_queue.task_done()
-                        time.sleep(0.5)  # Wait before retry
-                    
-                except Exception as e:
-                    self.logger.error(f"Error in storage thread: {e}")
-                    import traceback
-                    self.logger.error(traceback.format_exc())
-                    time.sleep(1)
-            
-            if records_stored > 0:
-                self.logger.info(f"Storage thread finished: {records_stored} total records stored")
-        
-        self.storage_thread = threading.Thread(target=store_data, daemon=True)
-        self.storage_thread.start()
-        self.logger.info("Storage thread started")
+        """Start background storage writer (one connection, batched inserts)"""
+        self.storage_writer = BatchedStorageWriter(
+            self.db_path,
+            self.storage_queue,
+            max_batch_size=self.storage_batch_size,
+            max_batch_latency=self.storage_flush_interval,
+            retain_raw_frames=self.retain_raw_frames,
+            logger=self.logger,
+            store=self.store,
+        )
+        self.storage_thread = self.storage_writer.start()
+        self.logger.info(
+            f"Storage thread started (batch size {self.storage_batch_size}, "
+            f"flush interval {self.storage_flush_interval}s)"
+        )
     
     def _store_record(self, record: Dict):
-        """Store record in database"""
+        """Store a single record in database (used when the batched writer is not running)"""
         try:
-            # Make a copy to avoid modifying original
-            record_copy = record.copy()
-            table = record_copy.pop("table", None)
-            
-            if not table:
+            row = build_row(record, retain_raw_frames=self.retain_raw_frames)
+            if row is None:
                 self.logger.warning("Record missing 'table' field, skipping")
                 return False
             
+            table, values = row
+            if self.store is not None:
+                conn = self.store.connection(self.store.key_for(record.get("timestamp") or datetime.now()))
+                with conn:
+                    conn.execute(INSERT_SQL[table], values)
+                    update_session_index(conn, {table: [values]})
+                return True
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if table == "screen_recordings":
-                compressed_blob = record_copy.get("compressed_data") or record_copy.get("screenshot_data")
-                raw_blob = record_copy.get("screenshot_data") if self.retain_raw_frames else None
-                cursor.execute("""
-                    INSERT INTO screen_recordings
-                    (timestamp, session_id, screenshot_data, compressed_data, window_title, active_app, encrypted_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record_copy.get("timestamp"),
-                    record_copy.get("session_id"),
-                    raw_blob,
-                    compressed_blob,
-                    record_copy.get("window_title"),
-                    record_copy.get("active_app"),
-                    record_copy.get("encrypted_data")
-                ))
-            
-            elif table == "keyboard_input":
-                cursor.execute("""
-                    INSERT INTO keyboard_input
-                    (timestamp, session_id, key_pressed, key_name, is_special_key, active_app, window_title, encrypted_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record_copy.get("timestamp"),
-                    record_copy.get("session_id"),
-                    record_copy.get("key_pressed"),
-                    record_copy.get("key_name"),
-                    record_copy.get("is_special_key"),
-                    record_copy.get("active_app"),
-                    record_copy.get("window_title"),
-                    record_copy.get("encrypted_data")
-                ))
-            
-            elif table == "mouse_activity":
-                # Handle batched movements
-                if record_copy.get("event_type") == "move_batch":
-                    movements_data = json.dumps(record_copy.get("movements", []))
-                    cursor.execute("""
-                        INSERT INTO mouse_activity
-                        (timestamp, session_id, event_type, x_position, y_position, button, scroll_delta, active_app, window_title, movements_data, movement_count, encrypted_data)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        record_copy.get("timestamp"),
-                        record_copy.get("session_id"),
-                        record_copy.get("event_type"),
-                        None,  # x_position for batch
-                        None,  # y_position for batch
-                        None,  # button for batch
-                        None,  # scroll_delta for batch
-                        record_copy.get("active_app"),
-                        record_copy.get("window_title"),
-                        movements_data,
-                        record_copy.get("count", 0),
-                        record_copy.get("encrypted_data")
-                    ))
-                else:
-                    # Handle individual events (clicks, scrolls)
-                    cursor.execute("""
-                        INSERT INTO mouse_activity
-                        (timestamp, session_id, event_type, x_position, y_position, button, scroll_delta, active_app, window_title, movements_data, movement_count, encrypted_data)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        record_copy.get("timestamp"),
-                        record_copy.get("session_id"),
-                        record_copy.get("event_type"),
-                        record_copy.get("x_position"),
-                        record_copy.get("y_position"),
-                        record_copy.get("button"),
-                        record_copy.get("scroll_delta"),
-                        record_copy.get("active_app"),
-                        record_copy.get("window_title"),
-                        None,  # movements_data for individual events
-                        None,  # movement_count for individual events
-                        record_copy.get("encrypted_data")
-                    ))
-            
-            elif table == "application_usage":
-                cursor.execute("""
-                    INSERT INTO application_usage
-                    (timestamp, session_id, app_name, app_path, window_title, is_active, duration_seconds, encrypted_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record_copy.get("timestamp"),
-                    record_copy.get("session_id"),
-                    record_copy.get("app_name"),
-                    record_copy.get("app_path"),
-                    record_copy.get("window_title"),
-                    record_copy.get("is_active"),
-                    record_copy.get("duration_seconds"),
-                    record_copy.get("encrypted_data")
-                ))
-            
-            elif table == "file_activity":
-                cursor.execute("""
-                    INSERT INTO file_activity
-                    (timestamp, session_id, event_type, file_path, file_size, file_type, app_name, encrypted_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record_copy.get("timestamp"),
-                    record_copy.get("session_id"),
-                    record_copy.get("event_type"),
-                    record_copy.get("file_path"),
-                    record_copy.get("file_size"),
-                    record_copy.get("file_type"),
-                    record_copy.get("app_name"),
-                    record_copy.get("encrypted_data")
-                ))
-            
-            elif table == "excel_activity":
-                cursor.execute("""
-                    INSERT INTO excel_activity
-                    (timestamp, session_id, workbook_name, worksheet_name, cell_reference, cell_value, formula, action_type, window_title, encrypted_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record_copy.get("timestamp"),
-                    record_copy.get("session_id"),
-                    record_copy.get("workbook_name"),
-                    record_copy.get("worksheet_name"),
-                    record_copy.get("cell_reference"),
-                    record_copy.get("cell_value"),
-                    record_copy.get("formula"),
-                    record_copy.get("action_type"),
-                    record_copy.get("window_title"),
-                    record_copy.get("encrypted_data")
-                ))
-            
-            elif table == "browser_activity":
-                cursor.execute("""
-                    INSERT INTO browser_activity
-                    (timestamp, session_id, browser_name, window_title, url, page_title, action_type, element_type, element_id, element_name, element_value, click_x, click_y, screenshot_path, screenshot_data, encrypted_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record_copy.get("timestamp"),
-                    record_copy.get("session_id"),
-                    record_copy.get("browser_name"),
-                    record_copy.get("window_title"),
-                    record_copy.get("url"),
-                    record_copy.get("page_title"),
-                    record_copy.get("action_type"),
-                    record_copy.get("element_type"),
-                    record_copy.get("element_id"),
-                    record_copy.get("element_name"),
-                    record_copy.get("element_value"),
-                    record_copy.get("click_x"),
-                    record_copy.get("click_y"),
-                    record_copy.get("screenshot_path"),
-                    record_copy.get("screenshot_data"),
-                    record_copy.get("encrypted_data")
-                ))
-            
-            elif table == "pdf_activity":
-                cursor.execute("""
-                    INSERT INTO pdf_activity
-                    (timestamp, session_id, pdf_file_path, pdf_file_name, action_type, page_number, form_field_name, form_field_value, window_title, pdf_viewer_app, encrypted_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    record_copy.get("timestamp"),
-                    record_copy.get("session_id"),
-                    record_copy.get("pdf_file_path"),
-                    record_copy.get("pdf_file_name"),
-                    record_copy.get("action_type"),
-                    record_copy.get("page_number"),
-                    record_copy.get("form_field_name"),
-                    record_copy.get("form_field_value"),
-                    record_copy.get("window_title"),
-                    record_copy.get("pdf_viewer_app"),
-                    record_copy.get("encrypted_data")
-                ))
-            
-            conn.commit()
-            conn.close()
+            try:
+                conn.execute(INSERT_SQL[table], values)
+                update_session_index(conn, {table: [values]})
+                conn.commit()
+            finally:
+                conn.close()
             return True
             
         except Exception as e:
@@ -1977,7 +1892,13 @@ class FullSystemMonitor:
     def _flush_all_buffers(self):
         """Flush all buffers to database"""
         try:
-            # Process all remaining records in queue
+            # The batched writer drains whatever is still queued before it exits
+            if self.storage_writer is not None and not self.storage_writer.stop():
+                # Still running: it does the final flush, writing from here would race it
+                self.logger.info("Storage writer is still flushing the remaining records")
+                return
+            
+            # Process anything left (writer never started)
             while not self.storage_queue.empty():
                 try:
                     record = self.storage_queue.get(timeout=0.1)
@@ -2005,7 +1926,12 @@ class FullSystemMonitor:
                 "excel": len(self.excel_buffer),
                 "browser": len(self.browser_buffer),
                 "pdf": len(self.pdf_buffer)
-            }
+            },
+            "storage": self.storage_writer.get_metrics() if self.storage_writer else {
+                "queue_depth": self.storage_queue.qsize(),
+                "queue_capacity": self.storage_queue.maxsize,
+                "writer_running": False,
+            },
         }
     
     def get_session_data(self, session_id: Optional[str] = None) -> Dict:
@@ -2014,30 +1940,11 @@ class FullSystemMonitor:
             session_id = self.session_id
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get screen recordings
-            cursor.execute("SELECT COUNT(*) FROM screen_recordings WHERE session_id = ?", (session_id,))
-            screen_count = cursor.fetchone()[0]
-            
-            # Get keyboard input
-            cursor.execute("SELECT COUNT(*) FROM keyboard_input WHERE session_id = ?", (session_id,))
-            keyboard_count = cursor.fetchone()[0]
-            
-            # Get mouse activity
-            cursor.execute("SELECT COUNT(*) FROM mouse_activity WHERE session_id = ?", (session_id,))
-            mouse_count = cursor.fetchone()[0]
-            
-            # Get application usage
-            cursor.execute("SELECT COUNT(*) FROM application_usage WHERE session_id = ?", (session_id,))
-            app_count = cursor.fetchone()[0]
-            
-            # Get file activity
-            cursor.execute("SELECT COUNT(*) FROM file_activity WHERE session_id = ?", (session_id,))
-            file_count = cursor.fetchone()[0]
-            
-            conn.close()
+            screen_count = self._count_session_rows("screen_recordings", session_id)
+            keyboard_count = self._count_session_rows("keyboard_input", session_id)
+            mouse_count = self._count_session_rows("mouse_activity", session_id)
+            app_count = self._count_session_rows("application_usage", session_id)
+            file_count = self._count_session_rows("file_activity", session_id)
             
             return {
                 "session_id": session_id,
@@ -2052,6 +1959,28 @@ class FullSystemMonitor:
             self.logger.error(f"Error getting session data: {e}")
             return {}
 
+    def open_reader(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> sqlite3.Connection:
+        """Read connection over every monitoring table for ``[start, end]``.
+
+        With partitioned storage the tables are TEMP views unioning the
+        partitions in range; otherwise this is a plain connection to
+        ``full_monitoring.db``.
+        """
+        if self.store is None:
+            return sqlite3.connect(self.db_path)
+        return self.store.connect_range(start, end)
+
+    def _count_session_rows(self, table: str, session_id: str) -> int:
+        """Row count for a session across the database and any partitions"""
+        sql = f"SELECT COUNT(*) FROM {table} WHERE session_id = ?"
+        if self.store is not None:
+            return sum(row[0] for row in self.store.iter_rows(sql, (session_id,)))
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, (session_id,)).fetchone()[0]
+        finally:
+            conn.close()
+
 
 # Global monitor instance
 _global_monitor = None
@@ -1,5 +1,16 @@
 ﻿#!/usr/bin/env python3
-"""Retention helpers for full monitoring datasets."""
+"""Retention helpers for full monitoring datasets.
+
+Partition files written with ``partitioned_storage`` enabled are expired by
+deleting whole files.  Sessions in the pre-partitioning ``full_monitoring.db``
+(and single sessions purged after export) are found through the
+``session_index`` table the storage writer maintains, deleted with one
+set-based ``DELETE`` per table in a single transaction, and the freed pages
+are returned to the file system once per file with ``incremental_vacuum``.
+
+The context engine's ``session_timeline`` copy of the same rows is purged
+alongside, so expired keystrokes do not survive in ``context_understanding.db``.
+"""
 
 from __future__ import annotations
 
@@ -8,21 +19,32 @@ import shutil
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Sequence
+
+try:
+    from .monitoring_storage import SESSION_INDEX_TABLES, ensure_session_index
+    from .partitioned_store import PartitionedStore
+except ImportError:
+    from monitoring_storage import SESSION_INDEX_TABLES, ensure_session_index
+    from partitioned_store import PartitionedStore
+
+try:
+    from intelligence.session_timeline import SessionTimelineStore
+except ImportError:
+    from session_timeline import SessionTimelineStore
 
 LOGGER = logging.getLogger(__name__)
 
+# SQLite's auto_vacuum value for INCREMENTAL
+_AUTO_VACUUM_INCREMENTAL = 2
+# Size-limit rounds; each purges enough sessions (by the index's byte estimate) to get under the limit
+_MAX_SIZE_PASSES = 5
+
 
 class MonitoringRetentionManager:
     """Apply retention policies to the full monitoring store."""
 
-    TABLES = (
-        "screen_recordings",
-        "keyboard_input",
-        "mouse_activity",
-        "application_usage",
-        "file_activity",
-    )
+    TABLES = SESSION_INDEX_TABLES
 
     def __init__(
         self,
@@ -35,99 +57,171 @@ class MonitoringRetentionManager:
         self.data_dir = self.installation_dir / "_secure_data" / "full_monitoring"
         self.session_media_dir = self.installation_dir / "_secure_data" / "session_media"
         self.db_path = self.data_dir / "full_monitoring.db"
+        self.timeline_db = self.installation_dir / "AI" / "intelligence" / "context_understanding.db"
         self.retention_days = max(1, retention_days)
         self.max_database_bytes = max_database_gb * (1024 ** 3)
+        # Partition file names carry their own period, so no schema/granularity is needed here
+        self.store = PartitionedStore(self.data_dir / "partitions", "full_monitoring", legacy_path=self.db_path)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
     def purge_session(self, session_id: str) -> None:
-        if not self.db_path.exists():
-            return
-        LOGGER.info("Purging telemetry for session %s", session_id)
-        with sqlite3.connect(self.db_path) as conn:
-            for table in self.TABLES:
-                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
-            conn.commit()
-            conn.execute("VACUUM")
+        self.purge_sessions([session_id])
 
-        session_media = self.session_media_dir / session_id
-        if session_media.exists():
-            shutil.rmtree(session_media, ignore_errors=True)
+    def purge_sessions(self, session_ids: Iterable[str]) -> int:
+        """Delete the sessions' telemetry from every file; returns rows deleted."""
+        session_ids = [session_id for session_id in dict.fromkeys(session_ids) if session_id]
+        if not session_ids:
+            return 0
+        deleted = 0
+        for path in self.store.paths_between():
+            deleted += self._purge_file(path, session_ids)
+        self._remove_session_media(session_ids)
+        self._purge_timeline(session_ids)
+        return deleted
 
     def enforce(self) -> None:
-        if not self.db_path.exists():
-            return
         cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
-        stale_sessions = self._sessions_older_than(cutoff)
-        for session_id in stale_sessions:
-            self.purge_session(session_id)
+        self.store.drop_before(cutoff)
+        if self.db_path.exists():
+            stale_sessions = self._sessions_older_than(cutoff)
+            if stale_sessions:
+                LOGGER.info("Purging %s session(s) older than %s", len(stale_sessions), cutoff)
+                self._purge_file(self.db_path, stale_sessions)
+                self._remove_session_media(stale_sessions)
+                self._purge_timeline(stale_sessions)
+        timeline = self._timeline()
+        if timeline is not None:
+            # Timeline timestamps are local time, like the monitor's
+            timeline.prune_before(datetime.now() - timedelta(days=self.retention_days))
         self._enforce_size_limit()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _sessions_older_than(self, cutoff: datetime) -> Iterable[str]:
-        with sqlite3.connect(self.db_path) as conn:
+    def _connect(self, path: Path) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=30)
+        ensure_session_index(conn)
+        return conn
+
+    def _sessions_older_than(self, cutoff: datetime) -> List[str]:
+        conn = self._connect(self.db_path)
+        try:
             cursor = conn.execute(
-                """
-                SELECT session_id, MAX(timestamp) AS last_seen
-                FROM (
-                    SELECT session_id, timestamp FROM screen_recordings
-                    UNION ALL
-                    SELECT session_id, timestamp FROM keyboard_input
-                    UNION ALL
-                    SELECT session_id, timestamp FROM mouse_activity
-                    UNION ALL
-                    SELECT session_id, timestamp FROM application_usage
-                    UNION ALL
-                    SELECT session_id, timestamp FROM file_activity
-                )
-                WHERE session_id IS NOT NULL
-                GROUP BY session_id
-                HAVING datetime(last_seen) < datetime(?)
-                """,
+                "SELECT session_id FROM session_index WHERE datetime(last_seen) < datetime(?)",
                 (cutoff.isoformat(),),
             )
             return [row[0] for row in cursor.fetchall() if row[0]]
+        finally:
+            conn.close()
+
+    def _purge_file(self, path: Path, session_ids: Sequence[str]) -> int:
+        """One transaction of set-based deletes, then a single space reclaim."""
+        try:
+            conn = self._connect(path)
+        except sqlite3.Error as exc:
+            LOGGER.debug("Skipping %s: %s", path, exc)
+            return 0
+        try:
+            present = {
+                row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            deleted = 0
+            with conn:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS purge_sessions (session_id TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM temp.purge_sessions")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO temp.purge_sessions (session_id) VALUES (?)",
+                    [(session_id,) for session_id in session_ids],
+                )
+                for table in self.TABLES:
+                    if table in present:
+                        deleted += conn.execute(
+                            f"DELETE FROM {table} WHERE session_id IN (SELECT session_id FROM temp.purge_sessions)"
+                        ).rowcount
+                conn.execute(
+                    "DELETE FROM session_index WHERE session_id IN (SELECT session_id FROM temp.purge_sessions)"
+                )
+            if deleted:
+                LOGGER.info("Deleted %s row(s) for %s session(s) from %s", deleted, len(session_ids), path.name)
+                self._reclaim_space(conn, path)
+            return deleted
+        finally:
+            conn.close()
+
+    def _reclaim_space(self, conn: sqlite3.Connection, path: Path) -> None:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL:
+            # One-time conversion: the mode only takes effect through a full VACUUM
+            LOGGER.info("Enabling incremental vacuum on %s", path.name)
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            # Frees one page per step and returns no rows; executescript steps it to completion
+            conn.executescript("PRAGMA incremental_vacuum;")
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass
+
+    def _timeline(self) -> Optional[SessionTimelineStore]:
+        """The context engine's timeline copy, if the engine has created one."""
+        if not self.timeline_db.exists():
+            return None
+        try:
+            return SessionTimelineStore(self.timeline_db)
+        except sqlite3.Error as exc:
+            LOGGER.debug("Skipping session timeline: %s", exc)
+            return None
+
+    def _purge_timeline(self, session_ids: Sequence[str]) -> None:
+        timeline = self._timeline()
+        if timeline is not None:
+            deleted = timeline.purge_sessions(session_ids)
+            if deleted:
+                LOGGER.info("Deleted %s session timeline row(s) for %s session(s)", deleted, len(session_ids))
+
+    def _remove_session_media(self, session_ids: Iterable[str]) -> None:
+        for session_id in session_ids:
+            session_media = self.session_media_dir / session_id
+            if session_media.exists():
+                shutil.rmtree(session_media, ignore_errors=True)
 
     def _enforce_size_limit(self) -> None:
-        if not self.db_path.exists():
-            return
-        if self.db_path.stat().st_size <= self.max_database_bytes:
+        if self.store.total_bytes() <= self.max_database_bytes:
             return
         LOGGER.warning(
-            "Monitoring database exceeds size limit (%.2f GB). Purging oldest sessions until under limit.",
-            self.db_path.stat().st_size / (1024 ** 3),
+            "Monitoring database exceeds size limit (%.2f GB). Purging oldest data until under limit.",
+            self.store.total_bytes() / (1024 ** 3),
         )
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                """
-                SELECT session_id, MAX(timestamp) AS last_seen
-                FROM (
-                    SELECT session_id, timestamp FROM screen_recordings
-                    UNION ALL
-                    SELECT session_id, timestamp FROM keyboard_input
-                    UNION ALL
-                    SELECT session_id, timestamp FROM mouse_activity
-                    UNION ALL
-                    SELECT session_id, timestamp FROM application_usage
-                    UNION ALL
-                    SELECT session_id, timestamp FROM file_activity
-                )
-                WHERE session_id IS NOT NULL
-                GROUP BY session_id
-                ORDER BY last_seen ASC
-                """,
-            )
-            sessions = [row["session_id"] for row in cursor.fetchall() if row["session_id"]]
+        # Oldest partitions go first as whole files; the current one is always kept
+        while len(self.store.partitions()) > 1 and self.store.total_bytes() > self.max_database_bytes:
+            self.store.drop_oldest()
 
-        for session_id in sessions:
-            if self.db_path.stat().st_size <= self.max_database_bytes:
-                break
-            LOGGER.info("Purging session %s to enforce database size limit", session_id)
-            self.purge_session(session_id)
+        for _ in range(_MAX_SIZE_PASSES):
+            excess = self.store.total_bytes() - self.max_database_bytes
+            if not self.db_path.exists() or excess <= 0:
+                return
+            conn = self._connect(self.db_path)
+            try:
+                # One row per session, so reading it all is cheap (and releases the read lock)
+                index = conn.execute("SELECT session_id, bytes FROM session_index ORDER BY last_seen ASC").fetchall()
+            finally:
+                conn.close()
+            sessions: List[str] = []
+            planned = 0
+            for session_id, size in index:
+                if planned >= excess:
+                    break
+                sessions.append(session_id)
+                planned += size or 0
+            if not sessions:
+                return
+            LOGGER.info("Purging %s oldest session(s) to enforce database size limit", len(sessions))
+            if not self._purge_file(self.db_path, sessions):
+                return
+            self._remove_session_media(sessions)
+            self._purge_timeline(sessions)
 
 
 __all__ = ["MonitoringRetentionManager"]
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""Batched, single-connection storage writer for the full monitoring store."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from queue import Empty, Queue
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .partitioned_store import PartitionedStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Column order for every table the monitor writes to.  Values are pulled from
+# the queued record dicts by name, so the same spec drives single-row and
+# batched inserts.
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "screen_recordings": (
+        "timestamp", "session_id", "screenshot_data", "compressed_data",
+        "window_title", "active_app", "encrypted_data", "frame_type",
+        "frame_regions",
+    ),
+    "keyboard_input": (
+        "timestamp", "session_id", "key_pressed", "key_name", "is_special_key",
+        "active_app", "window_title", "encrypted_data",
+    ),
+    "mouse_activity": (
+        "timestamp", "session_id", "event_type", "x_position", "y_position",
+        "button", "scroll_delta", "active_app", "window_title",
+        "movements_data", "movement_count", "encrypted_data",
+    ),
+    "application_usage": (
+        "timestamp", "session_id", "app_name", "app_path", "window_title",
+        "is_active", "duration_seconds", "encrypted_data",
+    ),
+    "file_activity": (
+        "timestamp", "session_id", "event_type", "file_path", "file_size",
+        "file_type", "app_name", "encrypted_data",
+    ),
+    "excel_activity": (
+        "timestamp", "session_id", "workbook_name", "worksheet_name",
+        "cell_reference", "cell_value", "formula", "action_type",
+        "window_title", "encrypted_data",
+    ),
+    "browser_activity": (
+        "timestamp", "session_id", "browser_name", "window_title", "url",
+        "page_title", "action_type", "element_type", "element_id",
+        "element_name", "element_value", "click_x", "click_y",
+        "screenshot_path", "screenshot_data", "encrypted_data",
+    ),
+    "pdf_activity": (
+        "timestamp", "session_id", "pdf_file_path", "pdf_file_name",
+        "action_type", "page_number", "form_field_name", "form_field_value",
+        "window_title", "pdf_viewer_app", "encrypted_data",
+    ),
+}
+
+INSERT_SQL: Dict[str, str] = {
+    table: "INSERT INTO {table} ({columns}) VALUES ({placeholders})".format(
+        table=table,
+        columns=", ".join(columns),
+        placeholders=", ".join("?" for _ in columns),
+    )
+    for table, columns in TABLE_COLUMNS.items()
+}
+
+
+# Tables whose rows belong to a session and are purged by retention; the
+# per-session summary in ``session_index`` covers exactly these.
+SESSION_INDEX_TABLES: Tuple[str, ...] = (
+    "screen_recordings",
+    "keyboard_input",
+    "mouse_activity",
+    "application_usage",
+    "file_activity",
+)
+
+SESSION_INDEX_UPSERT_SQL = """
+    INSERT INTO session_index (session_id, first_seen, last_seen, bytes) VALUES (?, ?, ?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        first_seen = MIN(COALESCE(first_seen, excluded.first_seen), COALESCE(excluded.first_seen, first_seen)),
+        last_seen = MAX(COALESCE(last_seen, excluded.last_seen), COALESCE(excluded.last_seen, last_seen)),
+        bytes = bytes + excluded.bytes
+"""
+
+
+def ensure_session_index(conn: sqlite3.Connection) -> bool:
+    """Create ``session_index`` if missing, backfilled from the existing rows.
+
+    The backfill is one grouped scan, paid once per database; it runs when
+    the schema is created (before the storage writer starts) or from
+    retention, never in the writer thread.  Returns ``True`` when the table
+    was created.
+    """
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_index'").fetchone():
+        return False
+    selects = []
+    for table in SESSION_INDEX_TABLES:
+        present = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if "session_id" not in present or "timestamp" not in present:
+            continue
+        size = " + ".join(f"COALESCE(LENGTH(CAST({column} AS BLOB)), 0)" for column in present)
+        selects.append(f"SELECT session_id, timestamp, {size} AS bytes FROM {table}")
+    with conn:
+        conn.execute(
+            """
+            CREATE TABLE session_index (
+                session_id TEXT PRIMARY KEY,
+                first_seen TEXT,
+                last_seen TEXT,
+                bytes INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """
+        )
+        if selects:
+            conn.execute(
+                "INSERT INTO session_index (session_id, first_seen, last_seen, bytes) "
+                "SELECT session_id, MIN(timestamp), MAX(timestamp), SUM(bytes) FROM ("
+                + " UNION ALL ".join(selects)
+                + ") WHERE session_id IS NOT NULL GROUP BY session_id"
+            )
+    return True
+
+
+def update_session_index(conn: sqlite3.Connection, grouped: Dict[str, List[Tuple[Any, ...]]]) -> None:
+    """Fold newly inserted ``table -> rows`` into ``session_index`` (caller owns the transaction).
+
+    Skipped while the table does not exist yet: the backfill in
+    ``ensure_session_index`` picks these rows up, and the caller's inserts
+    are never lost to index upkeep.
+    """
+    sessions: Dict[str, List[Any]] = {}
+    for table, rows in grouped.items():
+        if table not in SESSION_INDEX_TABLES:
+            continue
+        columns = TABLE_COLUMNS[table]
+        session_pos = columns.index("session_id")
+        timestamp_pos = columns.index("timestamp")
+        for row in rows:
+            session_id = row[session_pos]
+            if not session_id:
+                continue
+            timestamp = row[timestamp_pos]
+            size = sum(len(value) if isinstance(value, (bytes, str)) else (8 if value is not None else 0) for value in row)
+            entry = sessions.get(session_id)
+            if entry is None:
+                sessions[session_id] = [timestamp, timestamp, size]
+                continue
+            if timestamp is not None:
+                entry[0] = timestamp if entry[0] is None else min(entry[0], timestamp)
+                entry[1] = timestamp if entry[1] is None else max(entry[1], timestamp)
+            entry[2] += size
+    if not sessions:
+        return
+    try:
+        conn.executemany(
+            SESSION_INDEX_UPSERT_SQL,
+            [(session_id, first, last, size) for session_id, (first, last, size) in sessions.items()],
+        )
+    except sqlite3.OperationalError as exc:
+        # Only this statement is rolled back; the rows inserted before it stay in the transaction
+        if "no such table" not in str(exc):
+            raise
+        LOGGER.debug("session_index missing; left to the backfill")
+
+
+def build_row(record: Dict[str, Any], *, retain_raw_frames: bool = False) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+    """Translate a queued monitor record into ``(table, values)`` for INSERT.
+
+    Returns ``None`` when the record has no known ``table``.
+    """
+    table = record.get("table")
+    columns = TABLE_COLUMNS.get(table or "")
+    if not columns:
+        return None
+
+    values = dict(record)
+    if table == "screen_recordings":
+        values["compressed_data"] = record.get("compressed_data") or record.get("screenshot_data")
+        values["screenshot_data"] = record.get("screenshot_data") if retain_raw_frames else None
+    elif table == "mouse_activity":
+        if record.get("event_type") == "move_batch":
+            values["x_position"] = None
+            values["y_position"] = None
+            values["button"] = None
+            values["scroll_delta"] = None
+            values["movements_data"] = json.dumps(record.get("movements", []))
+            values["movement_count"] = record.get("count", 0)
+        else:
+            values["movements_data"] = None
+            values["movement_count"] = None
+
+    return table, tuple(values.get(column) for column in columns)
+
+
+class BatchedStorageWriter:
+    """Drain a record queue into SQLite through one long-lived WAL connection.
+
+    Records are pulled off ``source_queue`` until either ``max_batch_size``
+    records are collected or ``max_batch_latency`` seconds have passed since
+    the first one arrived.  Each batch is grouped by table and written with
+    ``executemany`` inside a single transaction.
+
+    With a ``store`` (:class:`PartitionedStore`) records are routed to the
+    partition for their ``timestamp`` instead of ``db_path``, one
+    transaction per partition touched by the batch.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        source_queue: Queue,
+        *,
+        max_batch_size: int = 500,
+        max_batch_latency: float = 0.5,
+        retain_raw_frames: bool = False,
+        logger: Optional[logging.Logger] = None,
+        store: Optional["PartitionedStore"] = None,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.store = store
+        self.source_queue = source_queue
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_latency = max(0.01, float(max_batch_latency))
+        self.retain_raw_frames = retain_raw_frames
+        self.logger = logger or LOGGER
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {
+            "records_written": 0,
+            "records_failed": 0,
+            "batches_written": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def thread(self) -> Optional[threading.Thread]:
+        return self._thread
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> threading.Thread:
+        """Start the background writer thread (idempotent)."""
+        # A thread still draining after stop() simply keeps running
+        self._stop_event.clear()
+        if self.is_running():
+            return self._thread  # type: ignore[return-value]
+        self._thread = threading.Thread(target=self._run, name="monitoring-storage", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        """Signal the writer to drain the queue, flush and close its connection.
+
+        Returns False if the thread is still draining after ``timeout``.  It
+        keeps going until the queue is empty, so the caller must leave the
+        remaining records to it rather than write them from another thread.
+        """
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                self.logger.warning(
+                    f"Storage writer still draining {self.source_queue.qsize()} queued records after {timeout}s"
+                )
+                return False
+        self._thread = None
+        return True
+
+    def write_batch(self, conn: Optional[sqlite3.Connection], records: List[Dict[str, Any]]) -> int:
+        """Write ``records`` in one transaction and return the number stored.
+
+        ``conn`` is ignored when the writer has a partitioned ``store``.
+        """
+        if not records:
+            return 0
+
+        # partition key (None without a store) -> table -> rows
+        grouped: Dict[Optional[str], Dict[str, List[Tuple[Any, ...]]]] = {}
+        for record in records:
+            row = build_row(record, retain_raw_frames=self.retain_raw_frames)
+            if row is None:
+                self.logger.warning("Record missing 'table' field, skipping")
+                self._bump("records_failed", 1)
+                continue
+            key = self.store.key_for(record.get("timestamp") or datetime.now()) if self.store else None
+            grouped.setdefault(key, {}).setdefault(row[0], []).append(row[1])
+
+        started = time.perf_counter()
+        stored = 0
+        for key, tables in grouped.items():
+            target = conn if key is None else self.store.connection(key)
+            stored += self._write_tables(target, tables)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._metrics_lock:
+            self._metrics["records_written"] += stored
+            self._metrics["batches_written"] += 1
+            self._metrics["last_batch_size"] = len(records)
+            self._metrics["max_batch_size"] = max(self._metrics["max_batch_size"], len(records))
+            self._metrics["last_flush_ms"] = round(elapsed_ms, 3)
+            self._metrics["max_flush_ms"] = round(max(self._metrics["max_flush_ms"], elapsed_ms), 3)
+            self._metrics["total_flush_ms"] += elapsed_ms
+        return stored
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return queue depth, batch size and flush latency counters."""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        batches = metrics["batches_written"]
+        total_flush_ms = metrics.pop("total_flush_ms")
+        metrics["avg_batch_size"] = round(metrics["records_written"] / batches, 2) if batches else 0.0
+        metrics["avg_flush_ms"] = round(total_flush_ms / batches, 3) if batches else 0.0
+        metrics["queue_depth"] = self.source_queue.qsize()
+        metrics["queue_capacity"] = self.source_queue.maxsize
+        metrics["writer_running"] = self.is_running()
+        return metrics
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _write_tables(self, conn: sqlite3.Connection, grouped: Dict[str, List[Tuple[Any, ...]]]) -> int:
+        stored = 0
+        try:
+            with conn:
+                for table, rows in grouped.items():
+                    conn.executemany(INSERT_SQL[table], rows)
+                    stored += len(rows)
+                update_session_index(conn, grouped)
+        except sqlite3.Error as exc:
+            # One bad row should not cost the whole batch: retry row by row.
+            self.logger.error(f"Batch insert into {self.db_path} failed ({exc}); retrying row by row")
+            stored = self._write_rows_individually(conn, grouped)
+        return stored
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as exc:
+            self.logger.warning(f"Could not enable WAL mode on {self.db_path}: {exc}")
+        return conn
+
+    def _run(self) -> None:
+        # Partition connections are opened on demand by the store
+        conn = self._connect() if self.store is None else None
+        last_log_time = time.time()
+        try:
+            while not self._stop_event.is_set() or not self.source_queue.empty():
+                try:
+                    batch = self._collect_batch()
+                    if not batch:
+                        continue
+                    self.write_batch(conn, batch)
+                    for _ in batch:
+                        self.source_queue.task_done()
+
+                    if time.time() - last_log_time >= 10:
+                        metrics = self.get_metrics()
+                        self.logger.info(
+                            f"Storage writer: {metrics['records_written']} records stored in "
+                            f"{metrics['batches_written']} batches (queue size: {metrics['queue_depth']}, "
+                            f"avg flush: {metrics['avg_flush_ms']} ms)"
+                        )
+                        last_log_time = time.time()
+                except Exception as exc:
+                    self.logger.error(f"Error in storage writer: {exc}")
+                    time.sleep(1)
+        finally:
+            try:
+                if conn is not None:
+                    conn.close()
+                if self.store is not None:
+                    self.store.close()
+            except sqlite3.Error:
+                pass
+            written = self._metrics["records_written"]
+            if written:
+                self.logger.info(f"Storage writer finished: {written} total records stored")
+
+    def _collect_batch(self) -> List[Dict[str, Any]]:
+        try:
+            first = self.source_queue.get(timeout=self.max_batch_latency)
+        except Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_batch_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.source_queue.get(timeout=min(remaining, 0.05)))
+            except Empty:
+                if self._stop_event.is_set():
+                    break
+        return batch
+
+    def _write_rows_individually(
+        self, conn: sqlite3.Connection, grouped: Dict[str, List[Tuple[Any, ...]]]
+    ) -> int:
+        stored = 0
+        for table, rows in grouped.items():
+            for row in rows:
+                try:
+                    with conn:
+                        conn.execute(INSERT_SQL[table], row)
+                        update_session_index(conn, {table: [row]})
+                    stored += 1
+                except sqlite3.Error as exc:
+                    self.logger.error(f"Dropping unwritable {table} record: {exc}")
+                    self._bump("records_failed", 1)
+        return stored
+
+    def _bump(self, key: str, amount: int) -> None:
+        with self._metrics_lock:
+            self._metrics[key] += amount
+
+
+__all__ = [
+    "BatchedStorageWriter",
+    "INSERT_SQL",
+    "SESSION_INDEX_TABLES",
+    "TABLE_COLUMNS",
+    "build_row",
+    "ensure_session_index",
+    "update_session_index",
+]
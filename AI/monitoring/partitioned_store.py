@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""Time-partitioned SQLite storage for the monitoring databases.
+
+Rows are written to one database file per day (``<name>_2025-01-06.db``) or
+per ISO week (``<name>_2025-W02.db``) chosen from each row's ISO
+``timestamp``.  Retention therefore becomes deleting whole files instead of
+``DELETE`` + ``VACUUM`` on one ever-growing database, and readers only open
+the partitions that overlap the time range they ask for.
+
+``connect_range`` returns a connection with one TEMP view per table that
+unions the selected partitions (plus the pre-partitioning database, if one
+exists), so existing SQL keeps working unchanged.  ``iter_rows`` runs a query
+against each partition in turn and has no limit on the number of partitions;
+``copy_range`` serves ranges wider than SQLite's ATTACH limit by copying the
+rows into a private temporary database a few files at a time.
+
+Scripts that only read monitoring data use ``open_monitoring_reader`` (or
+``monitoring_database_files`` for per-file reads) with the monitor's
+original database path.  Partitions are found on disk next to it, so a
+reader sees new data whether or not it knows the monitor's partition
+setting.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+GRANULARITIES = ("day", "week")
+
+# Where each monitor keeps its partitions: original database name ->
+# (folder next to it, partition file prefix)
+PARTITION_LAYOUTS: Dict[str, Tuple[str, str]] = {
+    "full_monitoring.db": ("partitions", "full_monitoring"),
+    "browser_activity.db": ("browser_activity", "browser_activity"),
+}
+
+_PARTITION_RE = re.compile(r"_(\d{4}-\d{2}-\d{2}|\d{4}-W\d{2})\.db$")
+
+
+def partition_key(timestamp: Any, granularity: str = "week") -> str:
+    """Partition key for a ``datetime``/``date`` or an ISO timestamp string."""
+    if isinstance(timestamp, datetime):
+        day = timestamp.date()
+    elif isinstance(timestamp, date):
+        day = timestamp
+    else:
+        day = date.fromisoformat(str(timestamp)[:10])
+    if granularity == "day":
+        return day.isoformat()
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def partition_period(key: str) -> Tuple[datetime, datetime]:
+    """``[start, end)`` covered by a partition key."""
+    if "-W" in key:
+        year, week = key.split("-W")
+        start = datetime.fromisocalendar(int(year), int(week), 1)
+        return start, start + timedelta(days=7)
+    start = datetime.combine(date.fromisoformat(key), datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+class PartitionedStore:
+    """One SQLite file per day or week under ``directory``.
+
+    ``init_schema(conn)`` creates the tables in a new partition.
+    ``legacy_path`` is the single pre-partitioning database; it is included
+    in every read and is never deleted by ``drop_before``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        name: str,
+        init_schema: Optional[Callable[[sqlite3.Connection], None]] = None,
+        *,
+        granularity: str = "week",
+        legacy_path: Optional[Path] = None,
+    ) -> None:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown partition granularity {granularity!r}; expected one of {GRANULARITIES}")
+        self.directory = Path(directory)
+        self.name = name
+        self.init_schema = init_schema
+        self.granularity = granularity
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def key_for(self, timestamp: Any) -> str:
+        return partition_key(timestamp, self.granularity)
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{self.name}_{key}.db"
+
+    def connection(self, key: str) -> sqlite3.Connection:
+        """Cached writer connection for one partition, created on first use."""
+        with self._lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path_for(key), timeout=30, check_same_thread=False)
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                except sqlite3.Error as exc:
+                    LOGGER.warning("Could not enable WAL mode on %s: %s", self.path_for(key), exc)
+                if self.init_schema is not None:
+                    self.init_schema(conn)
+                    conn.commit()
+                self._connections[key] = conn
+            return conn
+
+    def close_connection(self, key: str) -> None:
+        with self._lock:
+            conn = self._connections.pop(key, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close(self) -> None:
+        for key in list(self._connections):
+            self.close_connection(key)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def partitions(self) -> List[Tuple[str, Path]]:
+        """Existing ``(key, path)`` pairs in chronological order."""
+        found = []
+        if self.directory.exists():
+            for path in self.directory.glob(f"{self.name}_*.db"):
+                match = _PARTITION_RE.search(path.name)
+                if match and path.name == f"{self.name}_{match.group(1)}.db":
+                    found.append((partition_period(match.group(1))[0], match.group(1), path))
+        return [(key, path) for _, key, path in sorted(found)]
+
+    def paths_between(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        include_legacy: bool = True,
+    ) -> List[Path]:
+        """Database files that can hold rows in ``[start, end]``, oldest first."""
+        paths: List[Path] = []
+        if include_legacy and self.legacy_path is not None and self.legacy_path.exists():
+            paths.append(self.legacy_path)
+        for key, path in self.partitions():
+            period_start, period_end = partition_period(key)
+            if start is not None and period_end <= start:
+                continue
+            if end is not None and period_start > end:
+                continue
+            paths.append(path)
+        return paths
+
+    def iter_rows(
+        self,
+        sql: str,
+        params: Sequence[Any] = (),
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        include_legacy: bool = True,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Run ``sql`` on each partition in the range and yield all rows.
+
+        Partitions are visited oldest first, so a per-partition
+        ``ORDER BY timestamp`` yields rows in global timestamp order.
+        Partitions lacking a referenced table or column are skipped.
+        """
+        for path in self.paths_between(start, end, include_legacy):
+            conn = _connect_readonly(path)
+            try:
+                yield from conn.execute(sql, params)
+            except sqlite3.OperationalError as exc:
+                LOGGER.debug("Skipping partition %s: %s", path, exc)
+            finally:
+                conn.close()
+
+    def connect_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        include_legacy: bool = True,
+    ) -> sqlite3.Connection:
+        """Connection whose TEMP views union every partition in the range.
+
+        Each table found in the partitions becomes a view of the same name
+        (columns missing from older files read as NULL).  Raises
+        ``ValueError`` if the range spans more files than SQLite can attach;
+        use :meth:`iter_rows` or :meth:`copy_range` for such ranges.
+        """
+        paths = self.paths_between(start, end, include_legacy)
+        conn = sqlite3.connect(":memory:", uri=True)
+        limit = _attach_limit(conn)
+        if len(paths) > limit:
+            conn.close()
+            raise ValueError(
+                f"{len(paths)} partitions in range but SQLite can attach at most {limit}; "
+                f"narrow the range or use iter_rows()"
+            )
+
+        columns: Dict[str, List[str]] = {}
+        sources: Dict[str, List[Tuple[str, set]]] = {}
+        for index, path in enumerate(paths):
+            alias = f"p{index}"
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (f"{path.resolve().as_uri()}?mode=ro",))
+            tables = [
+                row[0] for row in conn.execute(
+                    f"SELECT name FROM {alias}.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                )
+            ]
+            for table in tables:
+                table_columns = [row[1] for row in conn.execute(f'PRAGMA {alias}.table_info("{table}")')]
+                merged = columns.setdefault(table, [])
+                merged.extend(column for column in table_columns if column not in merged)
+                sources.setdefault(table, []).append((alias, set(table_columns)))
+
+        for table, table_columns in columns.items():
+            selects = []
+            for alias, present in sources[table]:
+                select_list = ", ".join(
+                    f'"{column}"' if column in present else f'NULL AS "{column}"'
+                    for column in table_columns
+                )
+                selects.append(f'SELECT {select_list} FROM {alias}."{table}"')
+            conn.execute(f'CREATE TEMP VIEW "{table}" AS ' + " UNION ALL ".join(selects))
+        return conn
+
+    def copy_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        include_legacy: bool = True,
+    ) -> sqlite3.Connection:
+        """Connection to a private temporary database holding every row in the range.
+
+        Works for any number of partitions: files are attached in batches
+        that fit SQLite's ATTACH limit and their rows are copied into one
+        table per name (columns missing from older files read as NULL).
+        The copy lives on disk and is deleted when the connection closes.
+        """
+        paths = self.paths_between(start, end, include_legacy)
+        columns: Dict[str, List[str]] = {}
+        for path in paths:
+            source = _connect_readonly(path)
+            try:
+                for (table,) in source.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                ).fetchall():
+                    merged = columns.setdefault(table, [])
+                    merged.extend(
+                        row[1] for row in source.execute(f'PRAGMA table_info("{table}")') if row[1] not in merged
+                    )
+            finally:
+                source.close()
+
+        conn = sqlite3.connect("", uri=True)
+        for table, table_columns in columns.items():
+            conn.execute(f'CREATE TABLE "{table}" (' + ", ".join(f'"{column}"' for column in table_columns) + ")")
+        batch = max(1, _attach_limit(conn))
+        for offset in range(0, len(paths), batch):
+            aliases = []
+            for index, path in enumerate(paths[offset:offset + batch]):
+                alias = f"p{index}"
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (f"{path.resolve().as_uri()}?mode=ro",))
+                aliases.append(alias)
+            with conn:
+                for alias in aliases:
+                    for (table,) in conn.execute(
+                        f"SELECT name FROM {alias}.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                    ).fetchall():
+                        present = ", ".join(
+                            f'"{row[1]}"' for row in conn.execute(f'PRAGMA {alias}.table_info("{table}")')
+                        )
+                        conn.execute(f'INSERT INTO main."{table}" ({present}) SELECT {present} FROM {alias}."{table}"')
+            for alias in aliases:
+                conn.execute(f"DETACH DATABASE {alias}")
+        return conn
+
+    def execute_all(self, sql: str, params: Sequence[Any] = (), include_legacy: bool = True) -> Dict[Path, int]:
+        """Run a write statement on every file; returns affected rows per file."""
+        affected: Dict[Path, int] = {}
+        for path in self.paths_between(include_legacy=include_legacy):
+            try:
+                with sqlite3.connect(path, timeout=30) as conn:
+                    affected[path] = conn.execute(sql, params).rowcount
+            except sqlite3.OperationalError as exc:
+                LOGGER.debug("Skipping %s: %s", path, exc)
+        return affected
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+    def drop_before(self, cutoff: datetime) -> Tuple[int, int]:
+        """Delete partitions whose whole period ends on or before ``cutoff``.
+
+        Returns ``(files_deleted, bytes_freed)``.
+        """
+        files = 0
+        freed = 0
+        for key, path in self.partitions():
+            if partition_period(key)[1] > cutoff:
+                break
+            freed += self._delete_partition(key, path)
+            files += 1
+        if files:
+            LOGGER.info("Dropped %s %s partition(s) before %s (%.1f MB)", files, self.name, cutoff, freed / (1024 * 1024))
+        return files, freed
+
+    def drop_oldest(self) -> int:
+        """Delete the oldest partition; returns bytes freed (0 if none left)."""
+        partitions = self.partitions()
+        if not partitions:
+            return 0
+        key, path = partitions[0]
+        return self._delete_partition(key, path)
+
+    def total_bytes(self, include_legacy: bool = True) -> int:
+        total = 0
+        for path in self.paths_between(include_legacy=include_legacy):
+            total += sum(_file_size(candidate) for candidate in _database_files(path))
+        return total
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _delete_partition(self, key: str, path: Path) -> int:
+        self.close_connection(key)
+        freed = 0
+        for candidate in _database_files(path):
+            size = _file_size(candidate)
+            try:
+                candidate.unlink()
+                freed += size
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                LOGGER.warning("Could not delete partition file %s: %s", candidate, exc)
+        return freed
+
+
+def partitions_for(db_path: Path) -> Optional[PartitionedStore]:
+    """Read-side store for a monitor database, or None if it has no partitions on disk."""
+    db_path = Path(db_path)
+    layout = PARTITION_LAYOUTS.get(db_path.name)
+    if layout is None:
+        return None
+    store = PartitionedStore(db_path.parent / layout[0], layout[1], legacy_path=db_path)
+    return store if store.partitions() else None
+
+
+def monitoring_database_files(db_path: Path) -> List[Path]:
+    """``db_path`` followed by its partition files, oldest first."""
+    store = partitions_for(db_path)
+    if store is None:
+        return [Path(db_path)]
+    files = store.paths_between()
+    return files if Path(db_path) in files else [Path(db_path)] + files
+
+
+def open_monitoring_reader(
+    db_path: Path,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> sqlite3.Connection:
+    """Read connection for a monitor database and the partitions overlapping ``[start, end]``.
+
+    Without partitions this is a plain connection to ``db_path``.  When the
+    range spans more partitions than SQLite can attach, the rows are copied
+    into a temporary database (see :meth:`PartitionedStore.copy_range`), so
+    every partition in range is always read.
+    """
+    store = partitions_for(db_path)
+    if store is None:
+        return sqlite3.connect(db_path, timeout=30)
+    try:
+        return store.connect_range(start, end)
+    except ValueError:
+        LOGGER.info("%s: range exceeds the ATTACH limit; copying partitions to a temporary database", Path(db_path).name)
+        return store.copy_range(start, end)
+
+
+def _database_files(path: Path) -> List[Path]:
+    return [path, path.with_name(path.name + "-wal"), path.with_name(path.name + "-shm")]
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _connect_readonly(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+
+
+def _attach_limit(conn: sqlite3.Connection) -> int:
+    getlimit = getattr(conn, "getlimit", None)
+    if getlimit is not None:
+        try:
+            return getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        except (AttributeError, sqlite3.Error):
+            pass
+    return 10
+
+
+__all__ = [
+    "GRANULARITIES",
+    "PARTITION_LAYOUTS",
+    "PartitionedStore",
+    "monitoring_database_files",
+    "open_monitoring_reader",
+    "partition_key",
+    "partition_period",
+    "partitions_for",
+]
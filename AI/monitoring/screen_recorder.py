@@ -1,8 +1,19 @@
 #!/usr/bin/env python3
-"""Lightweight screen recorder for workflow training sessions."""
+"""Lightweight screen recorder for workflow training sessions.
+
+The capture thread grabs the desktop every ``interval_seconds`` and hashes a
+small grayscale thumbnail of it; frames whose thumbnail matches the last
+stored frame are skipped.  Changed frames go through a bounded queue to an
+encoder thread, which writes them into one frame container
+(``screen.frames`` plus its seek index, see ``frame_container``) in the
+session's capture folder.  When the encoder falls behind, new frames are
+dropped rather than queued without limit.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import queue
 import threading
 import time
 from datetime import datetime
@@ -18,21 +29,50 @@ except Exception:
     Image = None  # type: ignore
     MSS_AVAILABLE = False
 
+try:
+    from .frame_container import CONTAINER_SUFFIX, FrameContainerWriter
+except ImportError:
+    from frame_container import CONTAINER_SUFFIX, FrameContainerWriter
+
+CONTAINER_NAME = f"screen{CONTAINER_SUFFIX}"
+
 
 class ScreenRecorder:
     """Capture periodic screenshots for a training session."""
 
-    def __init__(self, installation_dir: Path, *, interval_seconds: float = 1.0) -> None:
+    def __init__(
+        self,
+        installation_dir: Path,
+        *,
+        interval_seconds: float = 1.0,
+        thumbnail_scale: int = 16,
+        change_tolerance: int = 2,
+        queue_size: int = 4,
+        image_format: str = "png",
+    ) -> None:
         self.installation_dir = Path(installation_dir)
         self.interval_seconds = interval_seconds
         self.output_root = self.installation_dir / "_secure_data" / "session_media"
         self.output_root.mkdir(parents=True, exist_ok=True)
+        # Thumbnail is 1/thumbnail_scale of the screen; the low change_tolerance bits
+        # of each thumbnail pixel are ignored so noise does not count as a change
+        self.thumbnail_scale = max(1, int(thumbnail_scale))
+        self.change_tolerance = max(0, min(7, int(change_tolerance)))
+        mask = (0xFF << self.change_tolerance) & 0xFF
+        self._quantize = bytes(value & mask for value in range(256))
+        self.queue_size = max(1, int(queue_size))
+        self.image_format = image_format
 
         self._session_id: Optional[str] = None
         self._capture_dir: Optional[Path] = None
-        self._frames: list[str] = []
+        self._writer: Optional[FrameContainerWriter] = None
+        self._queue: Optional[queue.Queue] = None
         self._thread: Optional[threading.Thread] = None
+        self._encoder_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        # Set once the capture thread has finished; the encoder then exits when the queue is empty
+        self._capture_done = threading.Event()
+        self._stats: Dict[str, Any] = {}
 
     # ------------------------------------------------------------------
     # Public API
@@ -50,35 +90,78 @@ class ScreenRecorder:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self._capture_dir = self.output_root / f"{session_id}_{timestamp}"
         self._capture_dir.mkdir(exist_ok=True)
-        self._frames = []
+        self._writer = FrameContainerWriter(self._capture_dir / CONTAINER_NAME, image_format=self.image_format)
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._stats = {
+            "frames_captured": 0,
+            "frames_skipped": 0,
+            "frames_dropped": 0,
+            "frames_stored": 0,
+            "frames_failed": 0,
+            "encode_seconds": 0.0,
+        }
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run_capture_loop, daemon=True)
+        # One per recording, so an encoder outliving stop() still sees its own
+        self._capture_done = threading.Event()
+        self._encoder_thread = threading.Thread(target=self._run_encoder, name="screen-recorder-encoder", daemon=True)
+        self._encoder_thread.start()
+        self._thread = threading.Thread(target=self._run_capture_loop, name="screen-recorder-capture", daemon=True)
         self._thread.start()
         return self._capture_dir
 
     def stop(self) -> Optional[Dict[str, Any]]:
-        """Stop capturing and return a manifest describing captured files."""
+        """Stop capturing and return a manifest describing the recording."""
         if self._session_id is None:
             return None
 
         self._stop_event.set()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=5)
-
+        # Let the encoder drain what is queued, then close the container.  The
+        # sentinel only wakes it early; with a full queue it stops on the event.
+        self._capture_done.set()
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+        if self._encoder_thread and self._encoder_thread.is_alive():
+            self._encoder_thread.join(timeout=30)
+
+        writer = self._writer
+        if writer is not None and self._encoder_thread and self._encoder_thread.is_alive():
+            # Encoder is stuck; close the container here so the file and index are not left open
+            try:
+                self._stats["index_path"] = str(writer.close())
+            except Exception:
+                pass
+        stats = dict(self._stats)
         manifest = {
             "session_id": self._session_id,
             "capture_dir": str(self._capture_dir) if self._capture_dir else None,
-            "frames": list(self._frames),
+            "container": str(writer.path) if writer else None,
+            "image_format": self.image_format,
+            "frame_count": stats.get("frames_stored", 0),
+            "frames_captured": stats.get("frames_captured", 0),
+            "frames_skipped": stats.get("frames_skipped", 0),
+            "frames_dropped": stats.get("frames_dropped", 0),
+            "frames_failed": stats.get("frames_failed", 0),
+            "encode_seconds": round(stats.get("encode_seconds", 0.0), 3),
+            "bytes_written": writer.bytes_written if writer else 0,
             "interval_seconds": self.interval_seconds,
             "recorded_at": datetime.now().isoformat(),
             "mss_available": MSS_AVAILABLE,
         }
+        if stats.get("index_path"):
+            manifest["index"] = stats["index_path"]
 
         # Reset state
         self._session_id = None
         self._capture_dir = None
-        self._frames = []
+        self._writer = None
+        self._queue = None
         self._thread = None
+        self._encoder_thread = None
         self._stop_event.clear()
 
         return manifest
@@ -87,28 +170,76 @@ class ScreenRecorder:
     # Internal helpers
     # ------------------------------------------------------------------
     def _run_capture_loop(self) -> None:
-        if not MSS_AVAILABLE or self._capture_dir is None or mss is None:
+        if not MSS_AVAILABLE or self._capture_dir is None or mss is None or self._queue is None:
             return
 
+        frame_queue = self._queue
+        last_digest: Optional[bytes] = None
         with mss.mss() as sct:  # type: ignore[attr-defined]
             monitor = sct.monitors[0]
             frame_index = 0
             while not self._stop_event.is_set():
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                image = sct.grab(monitor)
-                frame_path = self._capture_dir / f"frame_{frame_index:06d}_{timestamp}.png"
+                started = time.monotonic()
                 try:
+                    image = sct.grab(monitor)
                     img = Image.frombytes("RGB", image.size, image.bgra, "raw", "BGRX")  # type: ignore[arg-type]
-                    img.save(frame_path, format="PNG")
-                    self._frames.append(str(frame_path))
+                    self._stats["frames_captured"] += 1
+                    digest = self._thumbnail_digest(img)
+                    if digest == last_digest:
+                        self._stats["frames_skipped"] += 1
+                    else:
+                        try:
+                            frame_queue.put_nowait((frame_index, time.time(), img))
+                            last_digest = digest
+                        except queue.Full:
+                            # Encoder is behind; the next changed grab is tried instead
+                            self._stats["frames_dropped"] += 1
                 except Exception:
                     # Ignore individual frame failures
                     pass
 
                 frame_index += 1
-                time.sleep(self.interval_seconds)
+                self._stop_event.wait(max(0.0, self.interval_seconds - (time.monotonic() - started)))
+
+    def _thumbnail_digest(self, img) -> bytes:
+        """Hash of a downsampled grayscale copy, insensitive to tiny pixel noise."""
+        thumbnail = img.reduce(self.thumbnail_scale) if self.thumbnail_scale > 1 else img
+        data = thumbnail.convert("L").tobytes().translate(self._quantize)
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def _run_encoder(self) -> None:
+        frame_queue = self._queue
+        writer = self._writer
+        capture_done = self._capture_done
+        stats = self._stats
+        if frame_queue is None or writer is None:
+            return
+        try:
+            while True:
+                try:
+                    item = frame_queue.get(timeout=0.5)
+                except queue.Empty:
+                    if capture_done.is_set():
+                        break
+                    continue
+                if item is None:
+                    break
+                frame_index, captured_at, img = item
+                try:
+                    started = time.perf_counter()
+                    payload = writer.encode(img)
+                    stats["encode_seconds"] += time.perf_counter() - started
+                    writer.write(payload, number=frame_index, timestamp=captured_at, size=img.size)
+                    stats["frames_stored"] += 1
+                except Exception:
+                    stats["frames_failed"] += 1
+        finally:
+            try:
+                stats["index_path"] = str(writer.close())
+            except Exception:
+                pass
 
 
-def create_screen_recorder(installation_dir: Path, *, interval_seconds: float = 1.0) -> ScreenRecorder:
+def create_screen_recorder(installation_dir: Path, *, interval_seconds: float = 1.0, **options: Any) -> ScreenRecorder:
     """Factory helper that returns a ScreenRecorder instance."""
-    return ScreenRecorder(installation_dir, interval_seconds=interval_seconds)
+    return ScreenRecorder(installation_dir, interval_seconds=interval_seconds, **options)
@@ -14,6 +14,7 @@ _CONFIG_KEYS = {
     "CENTRAL_DATA_PATH": "central_data_path",  # Path to central data folder
     "TRANSFER_INTERVAL_HOURS": "transfer_interval_hours",  # How often to transfer data
     "COMPUTER_ID": "computer_id",  # Unique identifier for this computer
+    "BROWSER_DB_TRANSFER": "browser_db_transfer",  # "delta", "snapshot" or "copy"
 }
 
 def get_config_path(installation_dir: Path) -> Path:
@@ -31,6 +32,7 @@ def load_config(installation_dir: Path) -> Dict[str, Any]:
             "central_data_path": None,
             "transfer_interval_hours": 24,
             "computer_id": None,
+            "browser_db_transfer": "delta",
         }
     
     try:
@@ -44,6 +46,7 @@ def load_config(installation_dir: Path) -> Dict[str, Any]:
             "central_data_path": None,
             "transfer_interval_hours": 24,
             "computer_id": None,
+            "browser_db_transfer": "delta",
         }
 
 def save_config(installation_dir: Path, config: Dict[str, Any]) -> bool:
@@ -114,6 +117,7 @@ def configure_employee_mode(
         "central_data_path": central_path_str,
         "transfer_interval_hours": transfer_interval_hours,
         "computer_id": get_computer_id(installation_dir),  # Preserve existing ID
+        "browser_db_transfer": load_config(installation_dir).get("browser_db_transfer", "delta"),
     }
     return save_config(installation_dir, config)
 
@@ -13,6 +13,8 @@ from datetime import datetime, timedelta
 system_dir = Path(__file__).parent
 sys.path.insert(0, str(system_dir))
 
+from partitioned_store import open_monitoring_reader
+
 installation_dir = system_dir.parent
 
 print("=" * 70)
@@ -33,7 +35,7 @@ print(f"[OK] Database found: {db_path}")
 print()
 
 try:
-    conn = sqlite3.connect(db_path)
+    conn = open_monitoring_reader(db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -6,13 +6,15 @@ This script verifies that monitoring is actually recording data.
 
 import os
 import sys
-import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 
 # Add parent directories to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "_system"))
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from partitioned_store import monitoring_database_files, open_monitoring_reader
 
 def get_installation_dir():
     """Get installation directory"""
@@ -52,15 +54,19 @@ def check_monitoring_database():
     print("MONITORING DATABASE FOUND")
     print("=" * 70)
     print(f"\nDatabase Location: {db_path}")
-    print(f"Database Size: {db_path.stat().st_size / 1024 / 1024:.2f} MB")
+    db_files = monitoring_database_files(db_path)
+    print(f"Database Size: {sum(path.stat().st_size for path in db_files if path.exists()) / 1024 / 1024:.2f} MB")
+    if len(db_files) > 1:
+        print(f"Partitions: {len(db_files) - 1} (in {db_files[-1].parent})")
     
     # Check database contents
     try:
-        conn = sqlite3.connect(db_path)
+        conn = open_monitoring_reader(db_path)
         cursor = conn.cursor()
         
-        # Get table names
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        # Get table names (partitioned data is exposed as TEMP views)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                       "UNION SELECT name FROM sqlite_temp_master WHERE type='view'")
         tables = [row[0] for row in cursor.fetchall()]
         print(f"\nTables Found: {', '.join(tables)}")
         
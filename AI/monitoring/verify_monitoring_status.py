@@ -7,12 +7,13 @@ Checks if monitoring is actually working and collecting data
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-import sqlite3
 
 # Add parent directories to path
 sys.path.insert(0, str(Path(__file__).parent))
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from partitioned_store import open_monitoring_reader
+
 def verify_monitoring_status():
     """Verify monitoring status and data collection"""
     print("=" * 70)
@@ -70,7 +71,7 @@ def verify_monitoring_status():
         print("CHECK 3: Data in Database")
         print("-" * 70)
         try:
-            conn = sqlite3.connect(db_path)
+            conn = open_monitoring_reader(db_path)
             cursor = conn.cursor()
             
             # Total counts
@@ -4,7 +4,6 @@ AI Activity Analyzer
 Analyzes recorded activity data to extract patterns and train AI models.
 """
 
-import sqlite3
 import json
 import hashlib
 from pathlib import Path
@@ -13,6 +12,13 @@ from typing import Dict, List, Optional, Any, Tuple
 from collections import Counter, defaultdict
 import logging
 
+try:
+    from partitioned_store import open_monitoring_reader
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+    from partitioned_store import open_monitoring_reader
+
 
 class AIActivityAnalyzer:
     """
@@ -58,7 +64,7 @@ class AIActivityAnalyzer:
     def analyze_session(self, session_id: str) -> Dict:
         """Analyze a specific session"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = open_monitoring_reader(self.db_path)
             cursor = conn.cursor()
             
             # Get all activity for session
@@ -271,7 +277,7 @@ class AIActivityAnalyzer:
     def generate_training_data(self, session_ids: Optional[List[str]] = None) -> List[Dict]:
         """Generate training data from recorded sessions"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = open_monitoring_reader(self.db_path)
             cursor = conn.cursor()
             
             # Get all sessions if not specified
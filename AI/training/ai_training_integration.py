@@ -13,6 +13,13 @@ from typing import Dict, List, Optional, Any
 import logging
 import json
 
+try:
+    from partitioned_store import open_monitoring_reader
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+    from partitioned_store import open_monitoring_reader
+
 # Import full system monitor
 try:
     from full_system_monitor import FullSystemMonitor, get_full_monitor
@@ -240,17 +247,15 @@ class AITrainingIntegration:
     def _get_recent_sessions(self, hours: int = 24) -> List[str]:
         """Get recent session IDs"""
         try:
-            import sqlite3
-            
             db_path = self.data_dir / "full_monitoring.db"
             if not db_path.exists():
                 return []
             
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
             # Get sessions from last N hours
-            cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
+            cutoff = datetime.now() - timedelta(hours=hours)
+            cutoff_time = cutoff.isoformat()
+            conn = open_monitoring_reader(db_path, start=cutoff)
+            cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT DISTINCT session_id 
@@ -284,13 +289,11 @@ class AITrainingIntegration:
     def _has_enough_data(self) -> bool:
         """Check if there's enough data for training"""
         try:
-            import sqlite3
-            
             db_path = self.data_dir / "full_monitoring.db"
             if not db_path.exists():
                 return False
             
-            conn = sqlite3.connect(db_path)
+            conn = open_monitoring_reader(db_path)
             cursor = conn.cursor()
             
             # Count total data points
@@ -22,6 +22,7 @@ if str(AI_ROOT / "monitoring") not in sys.path:
     sys.path.insert(0, str(AI_ROOT / "monitoring"))
 
 from workflow_training_manager import WorkflowTrainingManager, TrainingSessionMetadata
+from partitioned_store import open_monitoring_reader
 from automation_prototype_generator import AutomationPrototypeGenerator
 
 # Import LLMService to sync API key
@@ -727,7 +728,7 @@ class WorkflowTrainerApp(tk.Tk):
                 self.log("   ⚠️ WARNING: Folder does not exist at expected location!")
             
             if session.screen_manifest and session.screen_manifest.get("capture_dir"):
-                self.log(f"   📸 Screen captures: {len(session.screen_manifest.get('frames', []))} frames")
+                self.log(f"   📸 Screen captures: {session.screen_manifest.get('frame_count', 0)} frames")
             
             # Check if GPT report was generated
             gpt_report_path = bundle / "gpt_report.md"
@@ -944,22 +945,22 @@ class WorkflowTrainerApp(tk.Tk):
             return
 
         try:
-            conn = sqlite3.connect(str(browser_db))
+            conn = open_monitoring_reader(browser_db)
             conn.row_factory = sqlite3.Row
             cur = conn.cursor()
 
             threshold = datetime.now(UTC) - timedelta(minutes=5)
             rows_nav = cur.execute(
-                "SELECT session_id, timestamp FROM page_navigations ORDER BY id DESC LIMIT 200"
+                "SELECT session_id, timestamp FROM page_navigations ORDER BY timestamp DESC LIMIT 200"
             ).fetchall()
             rows_int = cur.execute(
-                "SELECT session_id, action_type, timestamp FROM element_interactions ORDER BY id DESC LIMIT 200"
+                "SELECT session_id, action_type, timestamp FROM element_interactions ORDER BY timestamp DESC LIMIT 200"
             ).fetchall()
             recent_nav_details = cur.execute(
-                "SELECT session_id, timestamp FROM page_navigations ORDER BY id DESC LIMIT 5"
+                "SELECT session_id, timestamp FROM page_navigations ORDER BY timestamp DESC LIMIT 5"
             ).fetchall()
             recent_int_details = cur.execute(
-                "SELECT session_id, action_type, timestamp FROM element_interactions ORDER BY id DESC LIMIT 5"
+                "SELECT session_id, action_type, timestamp FROM element_interactions ORDER BY timestamp DESC LIMIT 5"
             ).fetchall()
         except Exception as exc:
             messagebox.showerror("Monitoring Check Failed", f"Unable to read monitoring DB:\n{exc}")
@@ -1108,7 +1109,7 @@ class WorkflowTrainerApp(tk.Tk):
             full_monitoring_db = INSTALLATION_DIR / "_secure_data" / "full_monitoring" / "full_monitoring.db"
             if full_monitoring_db.exists():
                 try:
-                    with sqlite3.connect(full_monitoring_db) as conn:
+                    with open_monitoring_reader(full_monitoring_db) as conn:
                         cursor = conn.cursor()
                         
                         # Browser activity
@@ -1192,7 +1193,7 @@ class WorkflowTrainerApp(tk.Tk):
             browser_db = INSTALLATION_DIR / "_secure_data" / "browser_activity.db"
             if browser_db.exists():
                 try:
-                    with sqlite3.connect(browser_db) as conn:
+                    with open_monitoring_reader(browser_db) as conn:
                         cursor = conn.cursor()
                         cursor.execute("SELECT COUNT(*) FROM page_navigations WHERE session_id = ?", (session_id,))
                         nav_count = cursor.fetchone()[0]
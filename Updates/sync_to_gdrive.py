@@ -10,6 +10,8 @@ from pathlib import Path
 from datetime import datetime
 import os
 
+from update_manager import BLOB_STORE_DIR, MANIFEST_FORMAT, blob_path, manifest_entry
+
 def find_gdrive_path():
     """Try to find the G-Drive path automatically"""
     # Try mapped G: drive first
@@ -54,10 +56,25 @@ def load_config():
     
     return config
 
-def sync_entire_folder(master_folder, version_folder, user_data_patterns):
-    """Sync entire master folder to version folder, excluding user data"""
+def sync_entire_folder(master_folder, version_folder, user_data_patterns, blob_dir=None, version=None,
+                       publish_file_tree=True):
+    """Publish the master folder as a release, excluding user data.
+    
+    File contents go into the content-addressed blob store (only blobs the
+    store does not have yet are uploaded); the version folder gets
+    release_manifest.json plus version.json and a hashed update_manifest.json
+    for every bot, which clients use to fetch just the files that changed.
+    
+    With publish_file_tree the version folder also gets the plain file tree.
+    UpdateManagers from before delta updates copy files from there and skip
+    any they cannot find, so without it they would record an empty install
+    as a successful update and never receive the new update manager.
+    """
     from fnmatch import fnmatch
     
+    if blob_dir is None:
+        blob_dir = version_folder.parent / BLOB_STORE_DIR
+    
     # Exclude patterns (system/temp files)
     exclude_patterns = [
         "__pycache__",
@@ -66,7 +83,8 @@ def sync_entire_folder(master_folder, version_folder, user_data_patterns):
         "_updates",
     ]
     
-    files_copied = 0
+    entries = []
+    bot_folders = []
     
     # Walk through entire master folder
     for file_path in master_folder.rglob("*"):
@@ -84,23 +102,116 @@ def sync_entire_folder(master_folder, version_folder, user_data_patterns):
                 if fnmatch(relative_str, pattern) or fnmatch(file_path.name, pattern) or pattern in relative_str:
                     excluded = True
                     break
+            if excluded:
+                continue
+            
+            # Bot folders are the ones with a version.json
+            if file_path.name == "version.json":
+                bot_folders.append(relative_path.parent)
             
             # Check user data files (preserve employee's saved data)
-            if not excluded:
-                for user_pattern in user_data_patterns:
-                    if fnmatch(relative_str, user_pattern) or fnmatch(file_path.name, user_pattern):
-                        excluded = True
-                        break
+            for user_pattern in user_data_patterns:
+                if fnmatch(relative_str, user_pattern) or fnmatch(file_path.name, user_pattern):
+                    excluded = True
+                    break
             
-            # Copy file if not excluded
             if not excluded:
-                dest_file = version_folder / relative_path
-                dest_file.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(file_path, dest_file)
-                files_copied += 1
+                entries.append((file_path, manifest_entry(file_path, relative_str)))
+    
+    # Upload the contents the blob store does not have yet
+    blob_dir.mkdir(parents=True, exist_ok=True)
+    existing_blobs = {blob.name for prefix in blob_dir.iterdir() if prefix.is_dir() for blob in prefix.iterdir()}
+    uploaded = 0
+    uploaded_bytes = 0
+    for file_path, entry in entries:
+        if entry['sha256'] in existing_blobs:
+            continue
+        dest_blob = blob_path(blob_dir, entry['sha256'])
+        dest_blob.parent.mkdir(parents=True, exist_ok=True)
+        temp_blob = dest_blob.with_name(dest_blob.name + ".part")
+        shutil.copy2(file_path, temp_blob)
+        os.replace(temp_blob, dest_blob)
+        existing_blobs.add(entry['sha256'])
+        uploaded += 1
+        uploaded_bytes += entry['size']
+    
+    if publish_file_tree:
+        for file_path, entry in entries:
+            dest_file = version_folder / entry['path']
+            dest_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(file_path, dest_file)
+        print(f"   ✅ Copied the plain file tree for older update clients ({len(entries)} files)")
     
-    print(f"   ✅ Copied {files_copied} files")
-    return files_copied
+    files = [entry for _, entry in entries]
+    created = datetime.now().isoformat()
+    write_json(version_folder / "release_manifest.json", {
+        'format': MANIFEST_FORMAT,
+        'version': version,
+        'created': created,
+        'blob_store': os.path.relpath(blob_dir, version_folder).replace("\\", "/"),
+        'files': files,
+        'total_files': len(files)
+    })
+    
+    # Per-bot version.json and update_manifest.json (paths relative to the bot folder)
+    for bot_folder in bot_folders:
+        bot_prefix = "" if str(bot_folder) == "." else str(bot_folder).replace("\\", "/") + "/"
+        bot_files = []
+        for entry in files:
+            if entry['path'].startswith(bot_prefix):
+                bot_path = entry['path'][len(bot_prefix):]
+                if bot_path not in ("version.json", "update_manifest.json"):
+                    bot_files.append(dict(entry, path=bot_path))
+        
+        dest_folder = version_folder / bot_folder
+        dest_folder.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(master_folder / bot_folder / "version.json", dest_folder / "version.json")
+        write_json(dest_folder / "update_manifest.json", {
+            'format': MANIFEST_FORMAT,
+            'created': created,
+            'blob_store': os.path.relpath(blob_dir, dest_folder).replace("\\", "/"),
+            'files': bot_files,
+            'total_files': len(bot_files)
+        })
+    
+    print(f"   ✅ Published {len(files)} files for {len(bot_folders)} bots")
+    print(f"   ✅ Uploaded {uploaded} new or changed files ({uploaded_bytes / (1024 * 1024):.1f} MB); "
+          f"{len(files) - uploaded} already on G-Drive")
+    return len(files)
+
+def write_json(path, data):
+    """Write a JSON file in one step (readers never see a half-written manifest)"""
+    temp_path = path.with_name(path.name + ".part")
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+def prune_blobs(gdrive_updates_dir, blob_dir):
+    """Delete blobs that no version folder's release_manifest.json refers to"""
+    if not blob_dir.exists():
+        return 0
+    referenced = set()
+    for release_manifest in gdrive_updates_dir.glob("*/release_manifest.json"):
+        try:
+            with open(release_manifest, 'r') as f:
+                referenced.update(entry['sha256'] for entry in json.load(f).get('files', []))
+        except Exception as e:
+            # An unreadable manifest could hide references; keep everything
+            print(f"   ⚠️  Could not read {release_manifest}, skipping cleanup: {e}")
+            return 0
+    
+    removed = 0
+    for prefix in blob_dir.iterdir():
+        if not prefix.is_dir():
+            continue
+        for blob in prefix.iterdir():
+            if blob.name not in referenced:
+                try:
+                    blob.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+    return removed
 
 def main(version_override=None):
     """Main sync function"""
@@ -150,7 +261,7 @@ def main(version_override=None):
             # Check if it's a bot folder (not a version folder, not __pycache__)
             import re
             is_version_folder = re.match(r'^\d+\.\d+(\.\d+)?$', item.name)
-            if not is_version_folder and item.name not in ["__pycache__"]:
+            if not is_version_folder and item.name not in ["__pycache__", BLOB_STORE_DIR]:
                 # Check if it looks like a bot folder (has version.json inside)
                 if (item / "version.json").exists():
                     old_bot_folders.append(item)
@@ -219,8 +330,18 @@ def main(version_override=None):
     except Exception as e:
         print(f"   ⚠️  Could not add version/date to bot headers: {e}")
     
-    # Sync entire folder structure
-    files_copied = sync_entire_folder(master_folder, version_folder, all_user_data_patterns)
+    # Sync entire folder structure (only changed file contents are uploaded)
+    blob_dir = gdrive_updates_dir / BLOB_STORE_DIR
+    # Keep the plain tree until every PC runs an UpdateManager that reads blobs
+    publish_file_tree = config.get('publish_file_tree', True)
+    files_copied = sync_entire_folder(master_folder, version_folder, all_user_data_patterns,
+                                      blob_dir=blob_dir, version=version,
+                                      publish_file_tree=publish_file_tree)
+    
+    # Drop file contents no remaining version folder needs
+    removed_blobs = prune_blobs(gdrive_updates_dir, blob_dir)
+    if removed_blobs:
+        print(f"   🧹 Removed {removed_blobs} unused files from {BLOB_STORE_DIR}/")
     
     success_count = len(config.get('bots', [])) if files_copied > 0 else 0
     
@@ -260,7 +381,7 @@ def main(version_override=None):
     print(f"✅ UPDATE SUCCESSFULLY PUSHED TO G-DRIVE!")
     print(f"{'='*60}")
     print(f"\n✅ Successfully synced entire In-Office Installation folder")
-    print(f"   Files copied: {files_copied}")
+    print(f"   Files published: {files_copied}")
     print(f"   Version: {version}")
     print(f"\n📤 Updates are now available on G-Drive!")
     print(f"   Root folder: {gdrive_updates_dir}")
@@ -273,12 +394,12 @@ def main(version_override=None):
     print(f"   │   ├── update_manager.py")
     print(f"   │   ├── add_timestamp_helper.py")
     print(f"   │   └── config.json")
+    print(f"   ├── {BLOB_STORE_DIR}/                  (file contents, stored once by SHA-256)")
     print(f"   └── {version}/              ← ALL UPDATES ARE HERE")
-    print(f"       ├── _bots/")
-    print(f"       ├── _admin/")
-    print(f"       ├── _docs/")
-    print(f"       ├── AI/")
-    print(f"       └── ... (entire folder structure)")
+    print(f"       ├── release_manifest.json")
+    print(f"       └── _bots/.../version.json + update_manifest.json (per bot)")
+    if publish_file_tree:
+        print(f"           + the plain file tree, for PCs still on the old update manager")
     print(f"\n💡 Employees should run 'update_bot.bat' from G-Drive to update their software")
     print(f"\n📍 Update location: {version_folder}")
 
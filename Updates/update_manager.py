@@ -2,8 +2,14 @@
 Auto-Update Manager for Bots
 Handles checking for updates, downloading, and installing them automatically.
 Preserves user data (credentials, settings, saved selectors).
+
+Manifests list every file with its size and SHA-256.  Releases publish file
+contents once into a content-addressed blob store (``blobs/ab/abcdef...``),
+and an update only fetches the files whose hash differs from the installed
+copy, then swaps them in together.
 """
 
+import hashlib
 import json
 import os
 import shutil
@@ -18,6 +24,26 @@ import urllib.error
 
 logger = logging.getLogger(__name__)
 
+# Manifest format 2 adds per-file SHA-256 hashes and a content-addressed blob store
+MANIFEST_FORMAT = 2
+BLOB_STORE_DIR = "blobs"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: Path) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_path(blob_root: Path, sha256: str) -> Path:
+    """Location of a file's contents in the blob store."""
+    return Path(blob_root) / sha256[:2] / sha256
+
+
 class UpdateManager:
     """Manages automatic updates for bots."""
     
@@ -47,6 +73,12 @@ class UpdateManager:
         self.version_file = self.bot_directory / "version.json"
         self.manifest_file = self.update_dir / "update_manifest.json"
         
+        # Changed files are fetched here before being swapped into the bot directory
+        self.staging_dir = self.update_dir / "staging"
+        # Hashes of installed files, keyed by path, reused while size and mtime match
+        self.hash_cache_file = self.update_dir / "file_hashes.json"
+        self._hash_cache = None
+        
     def get_current_version(self) -> str:
         """Get the current installed version."""
         if self.version_file.exists():
@@ -134,6 +166,61 @@ class UpdateManager:
             else:
                 return 0
     
+    def is_user_data(self, file_path: str) -> bool:
+        """Whether a manifest path matches one of the user data patterns (supports wildcards)."""
+        from fnmatch import fnmatch
+        for pattern in self.user_data_files:
+            if fnmatch(file_path, pattern) or fnmatch(Path(file_path).name, pattern):
+                return True
+        return False
+    
+    def local_sha256(self, file_path: str) -> Optional[str]:
+        """SHA-256 of the installed copy of a manifest path, or None if it is missing."""
+        local_file = self.bot_directory / file_path
+        try:
+            stat = local_file.stat()
+        except OSError:
+            return None
+        
+        if self._hash_cache is None:
+            try:
+                with open(self.hash_cache_file, 'r') as f:
+                    self._hash_cache = json.load(f)
+            except (OSError, ValueError):
+                self._hash_cache = {}
+        
+        cached = self._hash_cache.get(file_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        
+        sha256 = file_sha256(local_file)
+        self._hash_cache[file_path] = [stat.st_size, stat.st_mtime_ns, sha256]
+        return sha256
+    
+    def save_hash_cache(self):
+        """Persist the installed-file hash cache."""
+        if self._hash_cache is None:
+            return
+        try:
+            temp_file = self.hash_cache_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(self._hash_cache, f)
+            os.replace(temp_file, self.hash_cache_file)
+        except OSError as e:
+            logger.warning(f"Could not save file hash cache: {e}")
+    
+    def changed_files(self, manifest: Dict) -> List[Dict]:
+        """Manifest entries whose installed copy is missing or has a different hash (user data excluded)."""
+        changed = []
+        for file_info in manifest.get('files', []):
+            file_path = file_info.get('path', '')
+            if not file_path or self.is_user_data(file_path):
+                continue
+            if self.local_sha256(file_path) != file_info.get('sha256'):
+                changed.append(file_info)
+        self.save_hash_cache()
+        return changed
+    
     def backup_user_data(self) -> Path:
         """Backup user data files before update."""
         backup_dir = self.update_dir / f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -206,6 +293,9 @@ class UpdateManager:
             with open(manifest_path, 'r') as f:
                 manifest = json.load(f)
             
+            if manifest.get('format', 1) >= MANIFEST_FORMAT:
+                return self._download_changed_files(update_source_path, manifest)
+            
             files_to_update = manifest.get('files', [])
             
             # Download/copy each file
@@ -234,6 +324,87 @@ class UpdateManager:
             logger.error(f"Error downloading update: {e}")
             return False
     
+    def _download_changed_files(self, update_source_path: Path, manifest: Dict) -> bool:
+        """Stage only the files whose hash differs from the installed copy (format 2 manifests)."""
+        blob_root = update_source_path / manifest.get('blob_store', BLOB_STORE_DIR)
+        changed = self.changed_files(manifest)
+        logger.info(f"{len(changed)} of {len(manifest.get('files', []))} files changed")
+        
+        for file_info in changed:
+            file_path = file_info['path']
+            sha256 = file_info['sha256']
+            staged_file = self.staging_dir / file_path
+            
+            # Already staged by an earlier, interrupted download
+            if staged_file.exists() and file_sha256(staged_file) == sha256:
+                continue
+            
+            source_file = blob_path(blob_root, sha256)
+            if not source_file.exists():
+                # Release published as a plain folder tree
+                source_file = update_source_path / file_path
+            if not source_file.exists():
+                logger.error(f"Update file not found for {file_path}: {source_file}")
+                return False
+            
+            staged_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = staged_file.with_name(staged_file.name + '.part')
+            shutil.copy2(source_file, temp_file)
+            if file_sha256(temp_file) != sha256:
+                temp_file.unlink()
+                logger.error(f"Downloaded file does not match its hash: {file_path}")
+                return False
+            os.replace(temp_file, staged_file)
+            logger.info(f"Downloaded: {file_path}")
+        
+        # The saved manifest records which files install_update swaps in
+        manifest = dict(manifest, changed_files=[file_info['path'] for file_info in changed])
+        with open(self.manifest_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return True
+    
+    def _swap_in_staged_files(self, manifest: Dict, backup_dir: Path):
+        """Move the staged files into place; if any move fails, put back the files already replaced."""
+        hashes = {file_info['path']: file_info.get('sha256') for file_info in manifest.get('files', [])}
+        changed = manifest.get('changed_files', [])
+        
+        # Check everything before touching the installation
+        for file_path in changed:
+            staged_file = self.staging_dir / file_path
+            if not staged_file.exists() or file_sha256(staged_file) != hashes.get(file_path):
+                raise RuntimeError(f"Staged file missing or damaged: {file_path}")
+        
+        replaced = []
+        try:
+            for file_path in changed:
+                dest_file = self.bot_directory / file_path
+                dest_file.parent.mkdir(parents=True, exist_ok=True)
+                had_original = dest_file.exists()
+                if had_original:
+                    backup_file = backup_dir / file_path
+                    backup_file.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(dest_file, backup_file)
+                # Same volume as the bot directory, so each file is replaced in one step
+                os.replace(self.staging_dir / file_path, dest_file)
+                replaced.append((file_path, had_original))
+                logger.info(f"Installed: {file_path}")
+        except Exception:
+            for file_path, had_original in reversed(replaced):
+                dest_file = self.bot_directory / file_path
+                try:
+                    if had_original:
+                        shutil.copy2(backup_dir / file_path, dest_file)
+                    else:
+                        dest_file.unlink()
+                except OSError as rollback_error:
+                    logger.error(f"Could not roll back {file_path}: {rollback_error}")
+            raise
+        
+        for file_path in changed:
+            self.local_sha256(file_path)
+        self.save_hash_cache()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+    
     def install_update(self, update_info: Dict, ask_permission: bool = True) -> bool:
         """
         Install the downloaded update.
@@ -259,6 +430,10 @@ class UpdateManager:
                 manifest = json.load(f)
             
             files_to_update = manifest.get('files', [])
+            if manifest.get('format', 1) >= MANIFEST_FORMAT:
+                # Only the changed files were downloaded; swap them in together
+                self._swap_in_staged_files(manifest, backup_dir)
+                files_to_update = []
             
             # Install each file
             for file_info in files_to_update:
@@ -271,15 +446,7 @@ class UpdateManager:
                     continue
                 
                 # Skip user data files (they'll be restored)
-                # Check if file matches any user data pattern (supports wildcards)
-                is_user_data = False
-                from fnmatch import fnmatch
-                for pattern in self.user_data_files:
-                    if fnmatch(file_path, pattern) or fnmatch(Path(file_path).name, pattern):
-                        is_user_data = True
-                        break
-                
-                if is_user_data:
+                if self.is_user_data(file_path):
                     logger.info(f"Skipping user data file: {file_path}")
                     continue
                 
@@ -386,10 +553,22 @@ def create_version_file(bot_directory: Path, version: str, bot_name: str,
     print(f"Version: {version}")
 
 
+def manifest_entry(file_path: Path, relative_path: str, sha256: str = None) -> Dict:
+    """Manifest record for one file: path, size, modified time and SHA-256."""
+    stat = Path(file_path).stat()
+    return {
+        'path': relative_path,
+        'size': stat.st_size,
+        'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        'sha256': sha256 or file_sha256(file_path)
+    }
+
+
 def create_update_manifest(bot_directory: Path, files_to_include: List[str] = None,
                           exclude_patterns: List[str] = None):
     """
-    Create an update_manifest.json file listing all files to include in updates.
+    Create an update_manifest.json file listing all files to include in updates,
+    with the size and SHA-256 of each.
     
     Args:
         bot_directory: Root directory of the bot
@@ -437,13 +616,10 @@ def create_update_manifest(bot_directory: Path, files_to_include: List[str] = No
                     break
             
             if not excluded:
-                files_list.append({
-                    'path': relative_str,
-                    'size': file_path.stat().st_size,
-                    'modified': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-                })
+                files_list.append(manifest_entry(file_path, relative_str))
     
     manifest = {
+        'format': MANIFEST_FORMAT,
         'created': datetime.now().isoformat(),
         'files': files_list,
         'total_files': len(files_list)
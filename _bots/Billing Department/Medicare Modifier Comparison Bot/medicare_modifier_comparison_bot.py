@@ -20,9 +20,11 @@ import re
 
 # Optional dependencies
 try:
+    import numpy as np
     import pandas as pd
     EXCEL_AVAILABLE = True
 except ImportError:
+    np = None
     pd = None
     EXCEL_AVAILABLE = False
 
@@ -94,9 +96,9 @@ class MedicareModifierComparisonBot:
         self.file2_columns: List[str] = []
         
         # Data storage
-        self.log_data: List[Dict[str, Any]] = []
-        self.scrape_data: List[Dict[str, Any]] = []
-        self.comparison_results: List[Dict[str, Any]] = []
+        self.log_data: "pd.DataFrame | None" = None
+        self.scrape_data: "pd.DataFrame | None" = None
+        self.comparison_results: "pd.DataFrame | None" = None
         
         # PDF/Excel Synthesis tab variables
         self.pdf_file_path: Path | None = None  # PDF file for synthesis
@@ -399,12 +401,12 @@ class MedicareModifierComparisonBot:
             
             # Load File 1: Refile Medicare Log
             self.gui_log(f"\n📄 Loading File 1: {self.log_file_path.name}")
-            self.log_data = self._load_excel_file(self.log_file_path)
+            self.log_data = self._load_excel_dataframe(self.log_file_path)
             self.gui_log(f"   ✅ Loaded {len(self.log_data)} record(s) from File 1")
             
             # Load File 2: Scrape Excel
             self.gui_log(f"\n📄 Loading File 2: {self.scrape_file_path.name}")
-            self.scrape_data = self._load_excel_file(self.scrape_file_path)
+            self.scrape_data = self._load_excel_dataframe(self.scrape_file_path)
             self.gui_log(f"   ✅ Loaded {len(self.scrape_data)} record(s) from File 2")
             
             # Match records and compare
@@ -430,19 +432,6 @@ class MedicareModifierComparisonBot:
             self.processing = False
             self.root.after(0, lambda: self.process_button.config(state="normal", text="Compare and Generate Output"))
     
-    def _load_excel_file(self, file_path: Path) -> List[Dict[str, Any]]:
-        """Load Excel file and return list of dictionaries"""
-        if not EXCEL_AVAILABLE:
-            raise Exception("pandas is required. Install with: pip install pandas openpyxl")
-        
-        try:
-            df = pd.read_excel(file_path, engine='openpyxl')
-            # Convert DataFrame to list of dictionaries
-            records = df.to_dict('records')
-            return records
-        except Exception as e:
-            raise Exception(f"Failed to load Excel file {file_path.name}: {str(e)}")
-    
     def _normalize_name(self, name: str) -> str:
         """Normalize name for matching (remove extra spaces, convert to uppercase)"""
         if not name or pd.isna(name):
@@ -640,23 +629,6 @@ class MedicareModifierComparisonBot:
         except Exception:
             return False
     
-    def _extract_column_value(self, record: Dict, column_letter: str, default_col_name: str = None) -> str:
-        """Extract value from record by column letter or column name"""
-        # Try column letter first (convert to index)
-        col_index = self._column_letter_to_index(column_letter)
-        if col_index is not None:
-            columns = list(record.keys())
-            if 0 <= col_index < len(columns):
-                value = record.get(columns[col_index], "")
-                return str(value).strip() if value and not pd.isna(value) else ""
-        
-        # Try default column name
-        if default_col_name:
-            value = record.get(default_col_name, "")
-            return str(value).strip() if value and not pd.isna(value) else ""
-        
-        return ""
-    
     def _column_letter_to_index(self, column_letter: str) -> int | None:
         """Convert Excel column letter to 0-based index"""
         if not column_letter:
@@ -671,417 +643,346 @@ class MedicareModifierComparisonBot:
             result = result * 26 + (ord(char) - ord('A') + 1)
         return result - 1
     
-    def _find_column_by_name(self, record: Dict, search_terms: List[str]) -> str:
-        """Find column value by searching for column names containing search terms"""
-        for key in record.keys():
-            key_lower = str(key).lower()
-            for term in search_terms:
-                if term.lower() in key_lower:
-                    value = record.get(key, "")
-                    if value and not pd.isna(value):
-                        return str(value).strip()
-        return ""
+    # ------------------------------------------------------------------
+    # Vectorized matching engine (File 1 vs File 2)
+    # ------------------------------------------------------------------
+    NAME_TERMS = ["name", "client name", "patient name", "full name"]
+    FIRST_NAME_TERMS = ["first name", "fname", "firstname"]
+    LAST_NAME_TERMS = ["last name", "lname", "lastname"]
+    DOB_TERMS = ["dob", "date of birth", "birthdate"]
+    DOS_TERMS = ["date of service", "dos", "service date"]
+    SESSION_MEDIUM_TERMS = ["session medium", "medium", "session type"]
+    KEY_COLUMNS = ["k_name", "k_dob", "k_dos"]
     
-    def _resolve_column_reference(self, user_input: str, record: Dict) -> str:
-        """Resolve user input (column name or letter) to actual column value"""
-        if not user_input:
-            return ""
+    # Expected modifier mapping based on session medium
+    # Session Medium -> Expected Modifier (first contained key wins)
+    SESSION_MEDIUM_TO_MODIFIER = {
+        "video": "95",
+        "telehealth": "95",
+        "telemedicine": "95",
+        "phone": "93",
+        "telephone": "93",
+        "in-person": "",
+        "in person": "",
+        "office": ""
+    }
+    
+    def _load_excel_dataframe(self, file_path: Path):
+        """Load Excel file as a DataFrame (columns keep their sheet order)"""
+        if not EXCEL_AVAILABLE:
+            raise Exception("pandas is required. Install with: pip install pandas openpyxl")
         
+        try:
+            return pd.read_excel(file_path, engine='openpyxl')
+        except Exception as e:
+            raise Exception(f"Failed to load Excel file {file_path.name}: {str(e)}")
+    
+    @staticmethod
+    def _cell_text(value) -> str:
+        """Text of a cell the way record lookups read it ('' for empty/NaN/0)"""
+        try:
+            if not value or pd.isna(value):
+                return ""
+        except (TypeError, ValueError):
+            pass
+        return str(value).strip()
+    
+    @staticmethod
+    def _map_unique(series, func):
+        """Apply func once per distinct string and broadcast back to the column"""
+        uniques = series.unique()
+        return series.map(dict(zip(uniques, (func(value) for value in uniques))))
+    
+    def _resolve_mapped_column(self, df, user_input: str):
+        """Resolve a user mapping (column letter or name) to a DataFrame column label"""
+        if not user_input:
+            return None
         user_input = user_input.strip()
         
-        # Try as column letter first
         col_index = self._column_letter_to_index(user_input)
-        if col_index is not None:
-            columns = list(record.keys())
-            if 0 <= col_index < len(columns):
-                value = record.get(columns[col_index], "")
-                return str(value).strip() if value and not pd.isna(value) else ""
-        
-        # Try exact column name match
-        if user_input in record:
-            value = record.get(user_input, "")
-            return str(value).strip() if value and not pd.isna(value) else ""
-        
-        # Try case-insensitive match
-        for key in record.keys():
-            if str(key).strip().lower() == user_input.lower():
-                value = record.get(key, "")
-                return str(value).strip() if value and not pd.isna(value) else ""
+        if col_index is not None and 0 <= col_index < len(df.columns):
+            return df.columns[col_index]
         
-        return ""
+        if user_input in df.columns:
+            return user_input
+        
+        for column in df.columns:
+            if str(column).strip().lower() == user_input.lower():
+                return column
+        return None
+    
+    def _build_column_reader(self, df, entries: Dict[str, Any]):
+        """Return helpers that read mapped / auto-detected fields as whole text columns"""
+        text_cache: Dict[Any, Any] = {}
+        empty = pd.Series([""] * len(df), index=df.index, dtype=object)
+        # Read the Tk entries once per run instead of once per record
+        mappings = {field: entry.get().strip() for field, entry in (entries or {}).items()}
+        
+        def text(column):
+            if column not in text_cache:
+                values = df[column]
+                # Typed (numeric/datetime) columns repeat heavily; mixed object
+                # columns are converted per cell so 95 and "95" stay distinct
+                if values.dtype == object:
+                    text_cache[column] = values.map(self._cell_text).astype(object)
+                else:
+                    text_cache[column] = self._map_unique(values, self._cell_text).astype(object)
+            return text_cache[column]
+        
+        def mapped(field: str):
+            column = self._resolve_mapped_column(df, mappings.get(field, ""))
+            return text(column) if column is not None else empty
+        
+        def auto(search_terms: List[str]):
+            terms = [term.lower() for term in search_terms]
+            candidates = [col for col in df.columns if any(term in str(col).lower() for term in terms)]
+            result = empty
+            # First candidate column (sheet order) with a value wins
+            for column in reversed(candidates):
+                values = text(column)
+                result = values.where(values != "", result)
+            return result
+        
+        def positional(column_letter: str, default_col_name: str):
+            col_index = self._column_letter_to_index(column_letter)
+            if col_index is not None and 0 <= col_index < len(df.columns):
+                return text(df.columns[col_index])
+            if default_col_name in df.columns:
+                return text(default_col_name)
+            return empty
+        
+        return mapped, auto, positional
+    
+    @staticmethod
+    def _first_non_empty(*columns):
+        """Row-wise first non-empty string across columns"""
+        result = columns[-1]
+        for values in reversed(columns[:-1]):
+            result = values.where(values != "", result)
+        return result
     
-    def _extract_name_from_record(self, record: Dict, is_file1: bool = True) -> str:
-        """Extract full name from record using mappings or auto-detect"""
-        mappings = self.file1_mappings if is_file1 else self.file2_mappings
+    def _build_match_frame(self, df, is_file1: bool):
+        """Normalize name, DOB and DOS as whole columns and derive the key variants"""
         entries = self.file1_mapping_entries if is_file1 else self.file2_mapping_entries
+        mapped, auto, positional = self._build_column_reader(df, entries)
         
-        # Try mapped columns first
-        if entries and "Name" in entries:
-            name_mapping = entries["Name"].get().strip()
-            if name_mapping:
-                name = self._resolve_column_reference(name_mapping, record)
-                if name:
-                    return name
-        
-        # Try separate first/last name if mapped
-        first_name = ""
-        last_name = ""
-        if entries and "First Name" in entries:
-            first_mapping = entries["First Name"].get().strip()
-            if first_mapping:
-                first_name = self._resolve_column_reference(first_mapping, record)
-        
-        if entries and "Last Name" in entries:
-            last_mapping = entries["Last Name"].get().strip()
-            if last_mapping:
-                last_name = self._resolve_column_reference(last_mapping, record)
-        
-        if first_name or last_name:
-            return f"{first_name} {last_name}".strip()
-        
-        # Fallback to auto-detect
-        full_name = self._find_column_by_name(record, ["name", "client name", "patient name", "full name"])
-        if full_name:
-            return full_name
-        
-        # Try separate first and last name
-        first_name = self._find_column_by_name(record, ["first name", "fname", "firstname"])
-        last_name = self._find_column_by_name(record, ["last name", "lname", "lastname"])
-        
-        if first_name or last_name:
-            return f"{first_name} {last_name}".strip()
+        name_raw = self._first_non_empty(
+            mapped("Name"),
+            (mapped("First Name") + " " + mapped("Last Name")).str.strip(),
+            auto(self.NAME_TERMS),
+            (auto(self.FIRST_NAME_TERMS) + " " + auto(self.LAST_NAME_TERMS)).str.strip(),
+        )
+        dob_mapped = mapped("DOB")
+        dob_auto = auto(self.DOB_TERMS)
+        dos_mapped = mapped("Date of Service")
+        dos_auto = auto(self.DOS_TERMS)
+        
+        frame = pd.DataFrame({
+            "name_raw": name_raw,
+            "dob_raw": self._first_non_empty(dob_mapped, dob_auto),
+            "dos_raw": self._first_non_empty(dos_mapped, dos_auto),
+        }, index=df.index)
+        frame["name"] = self._map_unique(name_raw, self._normalize_name)
+        frame["dob"] = self._first_non_empty(
+            self._map_unique(dob_mapped, self._normalize_dob),
+            self._map_unique(dob_auto, self._normalize_dob),
+        )
+        frame["dos"] = self._first_non_empty(
+            self._map_unique(dos_mapped, self._normalize_date),
+            self._map_unique(dos_auto, self._normalize_date),
+        )
         
-        return ""
+        # Key variants: cleaned dates, first+last and first-name-only names
+        frame["dob_clean"] = frame["dob"].str.replace(r'[^\d/]', '', regex=True)
+        frame["dos_clean"] = frame["dos"].str.replace(r'[^\d/]', '', regex=True)
+        parts = frame["name"].str.split()
+        frame["multi_part"] = parts.str.len().fillna(0) >= 2
+        first = parts.str[0].fillna("")
+        frame["first_name"] = first.where(frame["multi_part"], "")
+        frame["first_last"] = (first + " " + parts.str[-1].fillna("")).where(frame["multi_part"], "")
+        frame["valid"] = (frame["name"] != "") & (frame["dob"] != "") & (frame["dos"] != "")
+        
+        if is_file1:
+            frame["session_medium"] = self._first_non_empty(
+                mapped("Session Medium"),
+                positional("F", "Session Medium"),
+                auto(self.SESSION_MEDIUM_TERMS),
+            )
+        else:
+            frame["modifier"] = self._first_non_empty(mapped("Modifier"), positional("G", "Modifier"))
+        return frame
+    
+    def _key_frame(self, names, dobs, doses, mask, row_positions):
+        """Key rows (k_name, k_dob, k_dos, row) for the rows selected by mask"""
+        return pd.DataFrame({
+            "k_name": names[mask].to_numpy(dtype=object),
+            "k_dob": dobs[mask].to_numpy(dtype=object),
+            "k_dos": doses[mask].to_numpy(dtype=object),
+            "row": row_positions[mask.to_numpy()],
+        })
+    
+    def _build_scrape_lookup(self, frame2):
+        """Unique key -> first File 2 row, across all key variants"""
+        positions = np.arange(len(frame2))
+        valid = frame2["valid"]
+        multi = valid & frame2["multi_part"]
+        variants = [
+            self._key_frame(frame2["name"], frame2["dob"], frame2["dos"], valid, positions),
+            self._key_frame(frame2["name"], frame2["dob_clean"], frame2["dos_clean"], valid, positions),
+            self._key_frame(frame2["first_last"], frame2["dob"], frame2["dos"], multi, positions),
+            self._key_frame(frame2["first_last"], frame2["dob_clean"], frame2["dos_clean"], multi, positions),
+        ]
+        lookup = pd.concat(variants, ignore_index=True)
+        # Earliest File 2 row wins when several rows share a key
+        lookup = lookup.sort_values("row", kind="stable").drop_duplicates(self.KEY_COLUMNS, keep="first")
+        return lookup.rename(columns={"row": "file2_row"})
+    
+    def _match_tiers(self, frame1):
+        """Ordered (tier, name, dob, dos, mask) join attempts for File 1"""
+        valid = frame1["valid"]
+        multi = valid & frame1["multi_part"]
+        cleaned = (
+            valid
+            & (frame1["dob_clean"] != "") & (frame1["dos_clean"] != "")
+            & ((frame1["dob_clean"] != frame1["dob"]) | (frame1["dos_clean"] != frame1["dos"]))
+        )
+        return [
+            ("exact", frame1["name"], frame1["dob"], frame1["dos"], valid),
+            ("first_last", frame1["first_last"], frame1["dob"], frame1["dos"], multi),
+            ("cleaned_dates", frame1["name"], frame1["dob_clean"], frame1["dos_clean"], cleaned),
+            ("cleaned_dates_first_last", frame1["first_last"], frame1["dob_clean"], frame1["dos_clean"],
+             cleaned & frame1["multi_part"]),
+            ("first_name", frame1["first_name"], frame1["dob"], frame1["dos"], multi),
+        ]
     
     def _match_and_compare(self):
         """Match records between the two files and compare modifiers"""
-        self.comparison_results = []
-        match_count = 0
-        no_match_count = 0
+        log_df = self.log_data.reset_index(drop=True)
+        scrape_df = self.scrape_data.reset_index(drop=True)
         
-        # Expected modifier mapping based on session medium
-        # Session Medium -> Expected Modifier
-        session_medium_to_modifier = {
-            "video": "95",
-            "telehealth": "95",
-            "telemedicine": "95",
-            "phone": "93",
-            "telephone": "93",
-            "in-person": "",
-            "in person": "",
-            "office": ""
-        }
+        self.gui_log("   Normalizing File 1 and File 2 columns...")
+        frame1 = self._build_match_frame(log_df, is_file1=True)
+        frame2 = self._build_match_frame(scrape_df, is_file1=False)
         
-        # Build lookup dictionary for File 2 to speed up matching
-        # Key: (normalized_name, normalized_dob, normalized_dos)
+        # Build lookup table for File 2
         self.gui_log("   Building lookup index for File 2...")
-        scrape_lookup: Dict[tuple, List[Dict]] = {}
-        file2_samples = []  # Store samples for debugging
-        
-        for scrape_record in self.scrape_data:
-            # Extract matching fields from File 2
-            name2 = self._normalize_name(self._extract_name_from_record(scrape_record, is_file1=False))
-            dob2 = ""
-            if "DOB" in self.file2_mapping_entries:
-                dob_mapping = self.file2_mapping_entries["DOB"].get().strip()
-                if dob_mapping:
-                    dob2 = self._normalize_dob(self._resolve_column_reference(dob_mapping, scrape_record))
-            if not dob2:
-                dob2 = self._normalize_dob(self._find_column_by_name(scrape_record, ["dob", "date of birth", "birthdate"]))
-            
-            dos2 = ""
-            if "Date of Service" in self.file2_mapping_entries:
-                dos_mapping = self.file2_mapping_entries["Date of Service"].get().strip()
-                if dos_mapping:
-                    dos2 = self._normalize_date(self._resolve_column_reference(dos_mapping, scrape_record))
-            if not dos2:
-                dos2 = self._normalize_date(self._find_column_by_name(scrape_record, ["date of service", "dos", "service date"]))
-            
-            # Store first few samples for debugging (before normalization)
-            if len(file2_samples) < 5 and name2 and dob2 and dos2:
-                # Get raw values before normalization for debugging
-                name2_raw = self._extract_name_from_record(scrape_record, is_file1=False)
-                dob2_raw = ""
-                if "DOB" in self.file2_mapping_entries:
-                    dob_mapping = self.file2_mapping_entries["DOB"].get().strip()
-                    if dob_mapping:
-                        dob2_raw = self._resolve_column_reference(dob_mapping, scrape_record)
-                if not dob2_raw:
-                    dob2_raw = self._find_column_by_name(scrape_record, ["dob", "date of birth", "birthdate"])
-                
-                dos2_raw = ""
-                if "Date of Service" in self.file2_mapping_entries:
-                    dos_mapping = self.file2_mapping_entries["Date of Service"].get().strip()
-                    if dos_mapping:
-                        dos2_raw = self._resolve_column_reference(dos_mapping, scrape_record)
-                if not dos2_raw:
-                    dos2_raw = self._find_column_by_name(scrape_record, ["date of service", "dos", "service date"])
-                
-                file2_samples.append({
-                    "raw_name": name2_raw,
-                    "raw_dob": dob2_raw,
-                    "raw_dos": dos2_raw,
-                    "normalized_name": name2,
-                    "normalized_dob": dob2,
-                    "normalized_dos": dos2
-                })
-            
-            # Create lookup keys with multiple variations
-            if name2 and dob2 and dos2:
-                name_parts = name2.split()
-                
-                # Clean dates for flexible matching
-                dob2_clean = re.sub(r'[^\d/]', '', dob2)
-                dos2_clean = re.sub(r'[^\d/]', '', dos2)
-                
-                # Add multiple key variations for flexible matching
-                keys_to_add = [
-                    (name2, dob2, dos2),  # Exact match
-                    (name2, dob2_clean, dos2_clean),  # Exact name, cleaned dates
-                ]
-                
-                # Add first + last name variations
-                if len(name_parts) >= 2:
-                    first_last_name = f"{name_parts[0]} {name_parts[-1]}"
-                    keys_to_add.extend([
-                        (first_last_name, dob2, dos2),  # First+Last, original dates
-                        (first_last_name, dob2_clean, dos2_clean),  # First+Last, cleaned dates
-                    ])
-                
-                # Add all key variations to lookup
-                for key in keys_to_add:
-                    if key not in scrape_lookup:
-                        scrape_lookup[key] = []
-                    if scrape_record not in scrape_lookup[key]:
-                        scrape_lookup[key].append(scrape_record)
-        
+        scrape_lookup = self._build_scrape_lookup(frame2)
         self.gui_log(f"   Built lookup index with {len(scrape_lookup)} unique key(s)")
         
         # Debug: Show sample File 2 values
-        if file2_samples:
+        file2_samples = frame2[frame2["valid"]].head(5)
+        if len(file2_samples):
             self.gui_log(f"\n   📋 Sample File 2 values (raw → normalized):")
-            for i, sample in enumerate(file2_samples[:5], 1):
-                self.gui_log(f"      {i}. Name: '{sample['raw_name']}' → '{sample['normalized_name']}'")
-                self.gui_log(f"         DOB:  '{sample['raw_dob']}' → '{sample['normalized_dob']}'")
-                self.gui_log(f"         DOS:  '{sample['raw_dos']}' → '{sample['normalized_dos']}'")
+            for i, sample in enumerate(file2_samples.itertuples(index=False), 1):
+                self.gui_log(f"      {i}. Name: '{sample.name_raw}' → '{sample.name}'")
+                self.gui_log(f"         DOB:  '{sample.dob_raw}' → '{sample.dob}'")
+                self.gui_log(f"         DOS:  '{sample.dos_raw}' → '{sample.dos}'")
         
         # Debug: Show sample lookup keys
-        sample_keys = list(scrape_lookup.keys())[:5]
         self.gui_log(f"\n   🔑 Sample File 2 lookup keys (first 5):")
-        for key in sample_keys:
-            self.gui_log(f"      {key}")
-        
-        total_records = len(self.log_data)
-        no_match_samples = []  # Store first few no-match samples for debugging
-        
-        for idx, log_record in enumerate(self.log_data):
-            # Progress logging every 50 records
-            if (idx + 1) % 50 == 0 or idx == 0:
-                self.gui_log(f"   Processing record {idx + 1}/{total_records}...")
-            # Extract matching fields from File 1 using mappings or auto-detect
-            name1 = self._normalize_name(self._extract_name_from_record(log_record, is_file1=True))
-            
-            # Extract DOB using mapping or auto-detect
-            dob1 = ""
-            if "DOB" in self.file1_mapping_entries:
-                dob_mapping = self.file1_mapping_entries["DOB"].get().strip()
-                if dob_mapping:
-                    dob1_raw = self._resolve_column_reference(dob_mapping, log_record)
-                    dob1 = self._normalize_dob(dob1_raw)
-            if not dob1:
-                dob1_raw = self._find_column_by_name(log_record, ["dob", "date of birth", "birthdate"])
-                dob1 = self._normalize_dob(dob1_raw)
-            
-            # Extract Date of Service using mapping or auto-detect
-            dos1 = ""
-            if "Date of Service" in self.file1_mapping_entries:
-                dos_mapping = self.file1_mapping_entries["Date of Service"].get().strip()
-                if dos_mapping:
-                    dos1_raw = self._resolve_column_reference(dos_mapping, log_record)
-                    dos1 = self._normalize_date(dos1_raw)
-            if not dos1:
-                dos1_raw = self._find_column_by_name(log_record, ["date of service", "dos", "service date"])
-                dos1 = self._normalize_date(dos1_raw)
-            
-            # Debug: Show first few File 1 values (raw and normalized)
-            if idx < 5:
-                name1_raw = self._extract_name_from_record(log_record, is_file1=True)
-                dob1_raw = ""
-                if "DOB" in self.file1_mapping_entries:
-                    dob_mapping = self.file1_mapping_entries["DOB"].get().strip()
-                    if dob_mapping:
-                        dob1_raw = self._resolve_column_reference(dob_mapping, log_record)
-                if not dob1_raw:
-                    dob1_raw = self._find_column_by_name(log_record, ["dob", "date of birth", "birthdate"])
-                
-                dos1_raw = ""
-                if "Date of Service" in self.file1_mapping_entries:
-                    dos_mapping = self.file1_mapping_entries["Date of Service"].get().strip()
-                    if dos_mapping:
-                        dos1_raw = self._resolve_column_reference(dos_mapping, log_record)
-                if not dos1_raw:
-                    dos1_raw = self._find_column_by_name(log_record, ["date of service", "dos", "service date"])
-                
-                if idx == 0:
-                    self.gui_log(f"\n   📋 Sample File 1 values (raw → normalized):")
-                self.gui_log(f"      {idx + 1}. Name: '{name1_raw}' → '{name1}'")
-                self.gui_log(f"         DOB:  '{dob1_raw}' → '{dob1}'")
-                self.gui_log(f"         DOS:  '{dos1_raw}' → '{dos1}'")
-            
-            # Extract Session Medium using mapping or Column F
-            session_medium = ""
-            if "Session Medium" in self.file1_mapping_entries:
-                session_mapping = self.file1_mapping_entries["Session Medium"].get().strip()
-                if session_mapping:
-                    session_medium = self._resolve_column_reference(session_mapping, log_record)
-            if not session_medium:
-                session_medium = self._extract_column_value(log_record, "F", "Session Medium")
-            if not session_medium:
-                session_medium = self._find_column_by_name(log_record, ["session medium", "medium", "session type"])
-            session_medium_lower = session_medium.lower().strip() if session_medium else ""
-            
-            # Determine expected modifier based on session medium
-            expected_modifier = ""
-            for key, mod in session_medium_to_modifier.items():
-                if key in session_medium_lower:
-                    expected_modifier = mod
-                    break
-            
-            # Try to find matching record in File 2 using lookup dictionary
-            matched_scrape_record = None
-            
-            if name1 and dob1 and dos1:
-                name1_parts = name1.split() if name1 else []
-                
-                # Build list of all keys to try (in order of preference)
-                keys_to_try = []
-                
-                # 1. Exact match
-                keys_to_try.append((name1, dob1, dos1))
-                
-                # 2. First + last name only (ignore middle names)
-                if len(name1_parts) >= 2:
-                    first_last_name = f"{name1_parts[0]} {name1_parts[-1]}"
-                    keys_to_try.append((first_last_name, dob1, dos1))
-                
-                # 3. Try with cleaned dates (normalize should already do this, but try anyway)
-                dob1_clean = re.sub(r'[^\d/]', '', dob1)
-                dos1_clean = re.sub(r'[^\d/]', '', dos1)
-                if dob1_clean and dos1_clean and (dob1_clean != dob1 or dos1_clean != dos1):
-                    keys_to_try.append((name1, dob1_clean, dos1_clean))
-                    if len(name1_parts) >= 2:
-                        first_last_name = f"{name1_parts[0]} {name1_parts[-1]}"
-                        keys_to_try.append((first_last_name, dob1_clean, dos1_clean))
-                
-                # 4. Try just DOB + DOS match (name might be slightly different)
-                # This is a fallback - only if exact matches fail
-                if len(name1_parts) >= 2:
-                    # Try matching just first name + DOB + DOS
-                    keys_to_try.append((name1_parts[0], dob1, dos1))
-                
-                # Try all keys
-                for lookup_key in keys_to_try:
-                    if lookup_key in scrape_lookup:
-                        matched_scrape_record = scrape_lookup[lookup_key][0]  # Take first match
-                        break
-                
-                # Debug: Log first few no-match attempts
-                if not matched_scrape_record and len(no_match_samples) < 5:
-                    dob1_clean = re.sub(r'[^\d/]', '', dob1) if dob1 else ""
-                    dos1_clean = re.sub(r'[^\d/]', '', dos1) if dos1 else ""
-                    name1_parts = name1.split() if name1 else []
-                    first_last_name = f"{name1_parts[0]} {name1_parts[-1]}" if len(name1_parts) >= 2 else ""
-                    
-                    attempted_keys = keys_to_try.copy()  # Use the same keys we tried
-                    
-                    no_match_samples.append({
-                        "name": name1,
-                        "dob": dob1,
-                        "dos": dos1,
-                        "keys_attempted": attempted_keys
-                    })
-            elif len(no_match_samples) < 5:
-                # Missing required fields
-                no_match_samples.append({
-                    "name": name1 or "(empty)",
-                    "dob": dob1 or "(empty)",
-                    "dos": dos1 or "(empty)",
-                    "keys_attempted": []
-                })
-            
-            # Extract modifier from File 2 using mapping or Column G
-            actual_modifier = ""
-            if matched_scrape_record:
-                if "Modifier" in self.file2_mapping_entries:
-                    mod_mapping = self.file2_mapping_entries["Modifier"].get().strip()
-                    if mod_mapping:
-                        actual_modifier = self._resolve_column_reference(mod_mapping, matched_scrape_record)
-                if not actual_modifier:
-                    actual_modifier = self._extract_column_value(matched_scrape_record, "G", "Modifier")
-                match_count += 1
-            else:
-                no_match_count += 1
-            
-            # Determine if refiling is needed
-            needs_refile = False
-            refile_reason = ""
-            
-            if matched_scrape_record:
-                if expected_modifier and actual_modifier:
-                    if expected_modifier != actual_modifier:
-                        needs_refile = True
-                        refile_reason = f"Modifier mismatch: Expected {expected_modifier} (for {session_medium}), but found {actual_modifier}"
-                elif expected_modifier and not actual_modifier:
-                    needs_refile = True
-                    refile_reason = f"Missing modifier: Expected {expected_modifier} for {session_medium} session"
-                elif not expected_modifier and actual_modifier:
-                    needs_refile = True
-                    refile_reason = f"Unexpected modifier: Found {actual_modifier} but session medium is {session_medium} (in-person should have no modifier)"
-            else:
-                refile_reason = "No matching record found in File 2"
-            
-            # Create comparison result
-            # Get original values for display (before normalization)
-            orig_name1 = self._extract_name_from_record(log_record, is_file1=True)
-            orig_dob1 = ""
-            if "DOB" in self.file1_mapping_entries:
-                dob_mapping = self.file1_mapping_entries["DOB"].get().strip()
-                if dob_mapping:
-                    orig_dob1 = self._resolve_column_reference(dob_mapping, log_record)
-            if not orig_dob1:
-                orig_dob1 = self._find_column_by_name(log_record, ["dob", "date of birth"])
-            
-            orig_dos1 = ""
-            if "Date of Service" in self.file1_mapping_entries:
-                dos_mapping = self.file1_mapping_entries["Date of Service"].get().strip()
-                if dos_mapping:
-                    orig_dos1 = self._resolve_column_reference(dos_mapping, log_record)
-            if not orig_dos1:
-                orig_dos1 = self._find_column_by_name(log_record, ["date of service", "dos"])
-            
-            result = {
-                "Name": name1 or orig_name1,
-                "DOB": dob1 or orig_dob1,
-                "Date_of_Service": dos1 or orig_dos1,
-                "Session_Medium": session_medium,
-                "Expected_Modifier": expected_modifier,
-                "Actual_Modifier": actual_modifier,
-                "Needs_Refile": "Yes" if needs_refile else "No",
-                "Refile_Reason": refile_reason,
-                "Match_Status": "Matched" if matched_scrape_record else "No Match"
-            }
-            
-            # Add all other fields from both files
-            for key, value in log_record.items():
-                if key not in result:
-                    result[f"File1_{key}"] = value
-            
-            if matched_scrape_record:
-                for key, value in matched_scrape_record.items():
-                    if key not in result:
-                        result[f"File2_{key}"] = value
-            
-            self.comparison_results.append(result)
+        for key in scrape_lookup.sort_index().head(5)[self.KEY_COLUMNS].itertuples(index=False):
+            self.gui_log(f"      {tuple(key)}")
+        
+        # Debug: Show first few File 1 values (raw and normalized)
+        for idx, sample in enumerate(frame1.head(5).itertuples(index=False)):
+            if idx == 0:
+                self.gui_log(f"\n   📋 Sample File 1 values (raw → normalized):")
+            self.gui_log(f"      {idx + 1}. Name: '{sample.name_raw}' → '{sample.name}'")
+            self.gui_log(f"         DOB:  '{sample.dob_raw}' → '{sample.dob}'")
+            self.gui_log(f"         DOS:  '{sample.dos_raw}' → '{sample.dos}'")
+        
+        # Join File 1 against the lookup one tier at a time; earlier tiers win
+        positions = np.arange(len(frame1))
+        matched_row = np.full(len(frame1), -1, dtype=np.int64)
+        match_tier = np.full(len(frame1), "", dtype=object)
+        for tier, names, dobs, doses, mask in self._match_tiers(frame1):
+            pending = mask & pd.Series(matched_row < 0, index=frame1.index)
+            if not pending.any():
+                continue
+            probe = self._key_frame(names, dobs, doses, pending, positions)
+            hits = probe.merge(scrape_lookup, on=self.KEY_COLUMNS, how="inner")
+            if len(hits):
+                rows = hits["row"].to_numpy()
+                matched_row[rows] = hits["file2_row"].to_numpy()
+                match_tier[rows] = tier
+                self.gui_log(f"   Tier '{tier}': {len(hits)} match(es)")
+        
+        matched = matched_row >= 0
+        match_count = int(matched.sum())
+        no_match_count = len(frame1) - match_count
+        
+        # Expected modifier from session medium (computed once per distinct value)
+        session_medium = frame1["session_medium"]
+        
+        def expected_for(medium: str) -> str:
+            medium_lower = medium.lower().strip() if medium else ""
+            for key, mod in self.SESSION_MEDIUM_TO_MODIFIER.items():
+                if key in medium_lower:
+                    return mod
+            return ""
+        
+        expected = self._map_unique(session_medium, expected_for)
+        modifiers2 = frame2["modifier"].to_numpy(dtype=object)
+        actual = pd.Series(
+            np.where(matched, modifiers2[np.where(matched, matched_row, 0)] if len(modifiers2) else "", ""),
+            index=frame1.index, dtype=object
+        )
+        
+        # Determine if refiling is needed
+        has_expected = expected != ""
+        has_actual = actual != ""
+        is_matched = pd.Series(matched, index=frame1.index)
+        mismatch = is_matched & has_expected & has_actual & (expected != actual)
+        missing = is_matched & has_expected & ~has_actual
+        unexpected = is_matched & ~has_expected & has_actual
+        needs_refile = mismatch | missing | unexpected
+        
+        refile_reason = pd.Series("", index=frame1.index, dtype=object)
+        refile_reason = refile_reason.mask(
+            mismatch,
+            "Modifier mismatch: Expected " + expected + " (for " + session_medium + "), but found " + actual,
+        )
+        refile_reason = refile_reason.mask(
+            missing, "Missing modifier: Expected " + expected + " for " + session_medium + " session"
+        )
+        refile_reason = refile_reason.mask(
+            unexpected,
+            "Unexpected modifier: Found " + actual + " but session medium is " + session_medium
+            + " (in-person should have no modifier)",
+        )
+        refile_reason = refile_reason.mask(~is_matched, "No matching record found in File 2")
+        
+        results = pd.DataFrame({
+            "Name": frame1["name"].where(frame1["name"] != "", frame1["name_raw"]),
+            "DOB": frame1["dob"].where(frame1["dob"] != "", frame1["dob_raw"]),
+            "Date_of_Service": frame1["dos"].where(frame1["dos"] != "", frame1["dos_raw"]),
+            "Session_Medium": session_medium,
+            "Expected_Modifier": expected,
+            "Actual_Modifier": actual,
+            "Needs_Refile": np.where(needs_refile, "Yes", "No"),
+            "Refile_Reason": refile_reason,
+            "Match_Status": np.where(matched, "Matched", "No Match"),
+            "Match_Tier": match_tier,
+        }, index=frame1.index)
+        
+        # Add all other fields from both files
+        reserved = set(results.columns)
+        file1_columns = {}
+        for column in log_df.columns:
+            if column not in reserved:
+                file1_columns[f"File1_{column}"] = log_df[column]
+        reserved.update(file1_columns)
+        
+        matched_scrape = scrape_df.reindex(pd.Index(matched_row)).set_index(frame1.index)
+        file2_columns = {}
+        for column in scrape_df.columns:
+            if column not in reserved:
+                file2_columns[f"File2_{column}"] = matched_scrape[column]
+        
+        self.comparison_results = pd.concat(
+            [results, pd.DataFrame(file1_columns, index=frame1.index), pd.DataFrame(file2_columns, index=frame1.index)],
+            axis=1,
+        )
         
         self.gui_log(f"\n📊 Matching Summary:")
         self.gui_log(f"   ✅ Matched: {match_count} record(s)")
@@ -1089,74 +990,64 @@ class MedicareModifierComparisonBot:
         self.gui_log(f"   📋 Total: {len(self.comparison_results)} record(s)")
         
         # Debug: Show why matches failed
-        if match_count == 0 and no_match_samples:
-            self.gui_log(f"\n🔍 Debug: Why matches failed (first {len(no_match_samples)} samples):")
-            for i, sample in enumerate(no_match_samples[:5], 1):
-                self.gui_log(f"\n   Sample {i} from File 1:")
-                self.gui_log(f"      Name='{sample['name']}'")
-                self.gui_log(f"      DOB='{sample['dob']}'")
-                self.gui_log(f"      DOS='{sample['dos']}'")
-                if sample['keys_attempted']:
-                    self.gui_log(f"      Attempted lookup keys ({len(sample['keys_attempted'])}):")
-                    for key_idx, key in enumerate(sample['keys_attempted'], 1):
-                        found = "✅ FOUND" if key in scrape_lookup else "❌ NOT FOUND"
-                        self.gui_log(f"         {key_idx}. {key} - {found}")
-                    
-                    # Check if any similar keys exist
-                    if sample['keys_attempted']:
-                        first_attempted_key = sample['keys_attempted'][0]
-                        if first_attempted_key and len(first_attempted_key) == 3:
-                            attempted_name, attempted_dob, attempted_dos = first_attempted_key
-                            
-                            # Find keys with same name but different dates
-                            similar_name_keys = [k for k in scrape_lookup.keys() 
-                                              if len(k) == 3 and k[0] == attempted_name][:5]
-                            if similar_name_keys:
-                                self.gui_log(f"      Found keys with same name (different dates): {similar_name_keys}")
-                            
-                            # Find keys with same DOB but different name
-                            similar_dob_keys = [k for k in scrape_lookup.keys() 
-                                              if len(k) == 3 and k[1] == attempted_dob][:5]
-                            if similar_dob_keys:
-                                self.gui_log(f"      Found keys with same DOB (different name): {similar_dob_keys}")
-                            
-                            # Find keys with same DOS but different name/DOB
-                            similar_dos_keys = [k for k in scrape_lookup.keys() 
-                                              if len(k) == 3 and k[2] == attempted_dos][:5]
-                            if similar_dos_keys:
-                                self.gui_log(f"      Found keys with same DOS (different name/DOB): {similar_dos_keys}")
-                        
-                        # Try fuzzy name matching
-                        if attempted_name:
-                            name_parts = attempted_name.split()
-                            if len(name_parts) >= 2:
-                                first_name = name_parts[0]
-                                last_name = name_parts[-1]
-                                # Find keys that start with same first name or end with same last name
-                                fuzzy_keys = [k for k in scrape_lookup.keys() 
-                                            if len(k) == 3 and (
-                                                (isinstance(k[0], str) and k[0].startswith(first_name)) or
-                                                (isinstance(k[0], str) and k[0].endswith(last_name))
-                                            )][:5]
-                                if fuzzy_keys:
-                                    self.gui_log(f"      Found keys with similar name (first/last match): {fuzzy_keys}")
+        if match_count == 0 and len(frame1):
+            self._log_match_failures(frame1, scrape_lookup)
+    
+    def _log_match_failures(self, frame1, scrape_lookup):
+        """Log attempted keys and near-miss File 2 keys for the first unmatched rows"""
+        lookup_keys = set(scrape_lookup[self.KEY_COLUMNS].itertuples(index=False, name=None))
+        tiers = self._match_tiers(frame1)
+        samples = frame1.head(5)
+        self.gui_log(f"\n🔍 Debug: Why matches failed (first {len(samples)} samples):")
+        for i, (row_index, sample) in enumerate(samples.iterrows(), 1):
+            self.gui_log(f"\n   Sample {i} from File 1:")
+            self.gui_log(f"      Name='{sample['name'] or '(empty)'}'")
+            self.gui_log(f"      DOB='{sample['dob'] or '(empty)'}'")
+            self.gui_log(f"      DOS='{sample['dos'] or '(empty)'}'")
+            attempted = [
+                (names[row_index], dobs[row_index], doses[row_index])
+                for _, names, dobs, doses, mask in tiers if mask[row_index]
+            ]
+            if not attempted:
+                continue
+            self.gui_log(f"      Attempted lookup keys ({len(attempted)}):")
+            for key_idx, key in enumerate(attempted, 1):
+                found = "✅ FOUND" if key in lookup_keys else "❌ NOT FOUND"
+                self.gui_log(f"         {key_idx}. {key} - {found}")
+            
+            attempted_name, attempted_dob, attempted_dos = attempted[0]
+            similar = [
+                ("same name (different dates)", scrape_lookup["k_name"] == attempted_name),
+                ("same DOB (different name)", scrape_lookup["k_dob"] == attempted_dob),
+                ("same DOS (different name/DOB)", scrape_lookup["k_dos"] == attempted_dos),
+            ]
+            name_parts = attempted_name.split()
+            if len(name_parts) >= 2:
+                similar.append((
+                    "similar name (first/last match)",
+                    scrape_lookup["k_name"].str.startswith(name_parts[0])
+                    | scrape_lookup["k_name"].str.endswith(name_parts[-1]),
+                ))
+            for label, mask in similar:
+                keys = [tuple(k) for k in scrape_lookup[mask].head(5)[self.KEY_COLUMNS].itertuples(index=False)]
+                if keys:
+                    self.gui_log(f"      Found keys with {label}: {keys}")
     
     def _generate_output(self):
         """Generate output Excel file with comparison results"""
-        if not self.comparison_results:
+        if self.comparison_results is None or len(self.comparison_results) == 0:
             raise Exception("No comparison results to output")
         
         if not EXCEL_AVAILABLE:
             raise Exception("pandas is required. Install with: pip install pandas openpyxl")
         
-        # Create DataFrame
-        df = pd.DataFrame(self.comparison_results)
+        df = self.comparison_results
         
         # Reorder columns to put important ones first
         priority_columns = [
             "Name", "DOB", "Date_of_Service", "Session_Medium",
             "Expected_Modifier", "Actual_Modifier", "Needs_Refile",
-            "Refile_Reason", "Match_Status"
+            "Refile_Reason", "Match_Status", "Match_Tier"
         ]
         
         # Get remaining columns
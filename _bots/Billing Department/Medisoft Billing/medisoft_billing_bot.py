@@ -76,6 +76,20 @@ except ImportError:
     OCR_AVAILABLE = False
     pytesseract = None
 
+# Shared helpers live in the installation's _system folder
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # _bots
+from system_path import add_system_path
+add_system_path()
+
+# Try to import the shared OCR/PDF-text cache (optional)
+try:
+    from ocr_cache import ocr_pdf_pages, pdf_page_texts
+    OCR_CACHE_AVAILABLE = True
+except ImportError:
+    OCR_CACHE_AVAILABLE = False
+    ocr_pdf_pages = None
+    pdf_page_texts = None
+
 # Try to import Excel/CSV reading libraries
 try:
     import pandas as pd
@@ -4638,8 +4652,11 @@ Please analyze the following workflow data and provide a comprehensive interpret
                 full_text = ""
                 pages_text = []
                 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_text = page.extract_text() or ""
+                if OCR_CACHE_AVAILABLE:
+                    page_texts = pdf_page_texts(pdf_path, pdf)
+                else:
+                    page_texts = [page.extract_text() or "" for page in pdf.pages]
+                for page_num, page_text in enumerate(page_texts, 1):
                     full_text += page_text
                     full_text += "\n"
                     pages_text.append((page_num, page_text))
@@ -4649,7 +4666,6 @@ Please analyze the following workflow data and provide a comprehensive interpret
                     self.gui_log("PDF appears to be scanned (no text found) - attempting OCR...")
                     try:
                         # Try OCR on all pages (date range and client name could be on any page)
-                        from pdf2image import convert_from_path
                         # Use Poppler path - must be passed directly, not just env var
                         poppler_path = os.environ.get('POPPLER_PATH')
                         if not poppler_path:
@@ -4669,16 +4685,21 @@ Please analyze the following workflow data and provide a comprehensive interpret
                         # OCR all pages (up to 5 pages to avoid long processing)
                         max_ocr_pages = min(len(pages_text), 5)
                         self.gui_log(f"Running OCR on pages 1-{max_ocr_pages}...")
-                        images = convert_from_path(str(pdf_path), first_page=1, last_page=max_ocr_pages, poppler_path=poppler_path, dpi=300)
+                        if OCR_CACHE_AVAILABLE:
+                            # Page text is OCR'd once per file content and reused
+                            ocr_pages = ocr_pdf_pages(pdf_path, poppler_path, last_page=max_ocr_pages, dpi=300)
+                        else:
+                            from pdf2image import convert_from_path
+                            images = convert_from_path(str(pdf_path), first_page=1, last_page=max_ocr_pages, poppler_path=poppler_path, dpi=300)
+                            ocr_pages = [pytesseract.image_to_string(img) for img in images]
                         
-                        if images:
+                        if ocr_pages:
                             # Combine OCR text from all pages
                             all_ocr_text = ""
-                            for page_num, img in enumerate(images, 1):
-                                page_ocr = pytesseract.image_to_string(img)
+                            for page_num, page_ocr in enumerate(ocr_pages, 1):
                                 all_ocr_text += f"\n[PAGE {page_num} OCR]\n{page_ocr}\n"
                             full_text += all_ocr_text
-                            self.gui_log(f"OCR extraction completed from {len(images)} page(s)")
+                            self.gui_log(f"OCR extraction completed from {len(ocr_pages)} page(s)")
                     except Exception as ocr_error:
                         self.gui_log(f"OCR not available or failed: {ocr_error}")
                         self.gui_log("Tip: Install Tesseract OCR for scanned PDFs (https://github.com/tesseract-ocr/tesseract)")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Drive the parallel browser pool against a local mock of Therapy Notes
+
+Starts a small HTTP server that serves the pages the bot touches before a
+client is opened (login form, Patients page, patient search dropdown), points
+the bot at it through ``therapy_notes_url`` and ``worker_driver_factory``, and
+runs ``_process_clients_parallel`` over a batch of made-up clients.
+
+Every patient in the mock's dropdown has a DOB that does not match, so each
+client ends quickly as "Error - Client Not Found".  That is enough to check the
+pool itself: each browser logs in on its own, every client is handed out
+exactly once, and the results are merged back in input order.
+
+Usage:
+    python test_worker_pool_mock.py --browsers 3 --clients 9 [--headless]
+"""
+
+import argparse
+import json
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+
+from tn_refiling_bot import TNRefilingBot
+
+MOCK_USERNAME = "mock-user"
+MOCK_PASSWORD = "mock-password"
+# DOB shown for every search result; the test clients use a different one
+MOCK_RESULT_DOB = "1/1/1900"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Mock TherapyNotes - Log In</title></head>
+<body>
+<form method="post" action="/app/login/submit">
+  <input id="Login__UsernameField" name="username" type="text">
+  <input id="Login__Password" name="Password" type="password">
+  <button id="Login__LogInButton" type="submit" aria-disabled="false">Log In</button>
+</form>
+</body></html>
+"""
+
+PATIENTS_PAGE = """<!DOCTYPE html>
+<html><head><title>Mock TherapyNotes - Patients</title></head>
+<body>
+<div class="nav"><a id="PatientsLink" href="/app/patients/">Patients</a></div>
+<input id="ctl00_BodyContent_TextBoxSearchPatientName" name="ctl00$BodyContent$TextBoxSearchPatientName" type="text">
+<script>
+  // The bot looks for the icon with //svg[@viewBox='0 0 16 16']//path[@id='Primary'].
+  // Unprefixed XPath names only match HTML or null-namespace elements, so the
+  // icon is built without the SVG namespace.
+  (function () {
+    var svg = document.createElementNS(null, "svg");
+    svg.setAttribute("viewBox", "0 0 16 16");
+    var path = document.createElementNS(null, "path");
+    path.setAttribute("id", "Primary");
+    svg.appendChild(path);
+    document.getElementById("PatientsLink").prepend(svg);
+  })();
+
+  var field = document.getElementById("ctl00_BodyContent_TextBoxSearchPatientName");
+  var pending = null;
+  field.addEventListener("input", function () {
+    var old = document.getElementById("ContentBubbleResultsContainer");
+    if (old) { old.remove(); }
+    clearTimeout(pending);
+    var query = field.value.trim();
+    if (!query) { return; }
+    pending = setTimeout(function () {
+      fetch("/app/patients/search?q=" + encodeURIComponent(query))
+        .then(function (response) { return response.json(); })
+        .then(function (results) {
+          var container = document.createElement("div");
+          container.id = "ContentBubbleResultsContainer";
+          results.forEach(function (text) {
+            var item = document.createElement("div");
+            item.className = "ui-menu-item";
+            var link = document.createElement("a");
+            link.href = "#";
+            link.textContent = text;
+            item.appendChild(link);
+            container.appendChild(item);
+          });
+          document.body.appendChild(container);
+        });
+    }, 300);
+  });
+</script>
+</body></html>
+"""
+
+
+class MockTherapyNotes:
+    """Local HTTP server standing in for the Therapy Notes pages used before a client is opened"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.lock = threading.Lock()
+        self.logins = 0
+        self.rejected_logins = 0
+        self.searches = Counter()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def login_url(self):
+        return f"{self.base_url}/app/login/Mock/?r=%2fapp%2fpatients%2f"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-therapynotes", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.startswith("/app/login"):
+                    self._send(200, LOGIN_PAGE)
+                elif url.path == "/app/patients/search":
+                    query = parse_qs(url.query).get("q", [""])[0]
+                    with mock.lock:
+                        mock.searches[query] += 1
+                    results = [f"{query} - {MOCK_RESULT_DOB}"]
+                    self._send(200, json.dumps(results), "application/json")
+                elif url.path.startswith("/app/patients"):
+                    self._send(200, PATIENTS_PAGE)
+                else:
+                    self._send(404, "Not found")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                username = form.get("username", [""])[0]
+                password = form.get("Password", [""])[0]
+                with mock.lock:
+                    if (username, password) == (MOCK_USERNAME, MOCK_PASSWORD):
+                        mock.logins += 1
+                        location = "/app/patients/"
+                    else:
+                        mock.rejected_logins += 1
+                        location = "/app/login/Mock/?error=1"
+                self.send_response(303)
+                self.send_header("Location", location)
+                self.end_headers()
+
+            def _send(self, status, body, content_type="text/html; charset=utf-8"):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def make_driver(headless):
+    """Plain Chrome for one pool browser"""
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1280,900")
+    return webdriver.Chrome(options=options)
+
+
+def make_clients(count):
+    return [
+        {
+            'client_name': f"Mock Client{index:02d}",
+            'dob': "02/03/1980",
+            'date_of_service': "04/05/2025",
+            'excel_row': index + 2,
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the TN Refiling browser pool against a local mock server")
+    parser.add_argument("--browsers", type=int, default=3, help="Number of parallel browsers")
+    parser.add_argument("--clients", type=int, default=9, help="Number of mock clients to process")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome headless")
+    args = parser.parse_args()
+
+    mock = MockTherapyNotes().start()
+    print(f"Mock Therapy Notes running at {mock.base_url}")
+
+    bot = TNRefilingBot()
+    bot.therapy_notes_url = mock.login_url
+    bot.worker_driver_factory = lambda: make_driver(args.headless)
+    clients = make_clients(args.clients)
+    bot.excel_client_data = clients
+
+    failures = []
+    try:
+        # Browser 1 is the main bot's own session, as in the GUI flow
+        bot.driver = bot.worker_driver_factory()
+        bot.wait = WebDriverWait(bot.driver, 10)
+        if not bot.login(MOCK_USERNAME, MOCK_PASSWORD) or not bot.is_logged_in:
+            print("FAIL: main browser could not log in to the mock server")
+            return 1
+
+        browsers = max(1, min(args.browsers, bot.MAX_PARALLEL_BROWSERS))
+        bot.parallel_browsers = browsers
+        bot._processing_credentials = (MOCK_USERNAME, MOCK_PASSWORD)
+        bot._process_clients_parallel(clients)
+    finally:
+        bot._close_driver()
+        mock.stop()
+
+    print(f"\n{'='*80}")
+    print("WORKER POOL RESULTS")
+    print(f"{'='*80}")
+    for worker_id, stats in sorted(bot.worker_stats.items()):
+        print(f"  Browser {worker_id}: {stats['processed']} processed in {stats['elapsed_seconds']:.1f}s"
+              + ("" if stats['logged_in'] else " - login failed"))
+    print(f"  Server logins: {mock.logins} (rejected: {mock.rejected_logins})")
+
+    expected_workers = min(browsers, len(clients))
+    if mock.logins != expected_workers:
+        failures.append(f"expected {expected_workers} logins, server saw {mock.logins}")
+    if not all(stats['logged_in'] for stats in bot.worker_stats.values()):
+        failures.append("at least one browser failed to log in")
+    processed = sum(stats['processed'] for stats in bot.worker_stats.values())
+    if processed != len(clients):
+        failures.append(f"expected {len(clients)} clients processed, workers reported {processed}")
+    tracked_names = [entry['client_name'] for entry in bot.tracked_clients]
+    expected_names = [client['client_name'] for client in clients]
+    if tracked_names != expected_names:
+        failures.append(f"tracked clients out of order or missing: {tracked_names}")
+    missing = [name for name in expected_names if name not in mock.searches]
+    if missing:
+        failures.append(f"never searched on the server: {missing}")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        return 1
+    print("PASS: every client was handed out once and merged back in order")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
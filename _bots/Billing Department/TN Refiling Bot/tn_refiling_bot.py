@@ -21,6 +21,7 @@ import os
 import re
 import queue
 import importlib
+import copy
 from logging.handlers import RotatingFileHandler
 
 # Try to import keyboard module (optional - needed for hotkeys)
@@ -56,6 +57,29 @@ except ImportError:
     OCR_AVAILABLE = False
     pytesseract = None
 
+# Shared helpers live in the installation's _system folder
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # _bots
+from system_path import add_system_path
+add_system_path()
+
+# Try to import the shared OCR/PDF-text cache (optional)
+try:
+    from ocr_cache import ocr_pdf_pages, pdf_page_texts
+    OCR_CACHE_AVAILABLE = True
+except ImportError:
+    OCR_CACHE_AVAILABLE = False
+    ocr_pdf_pages = None
+    pdf_page_texts = None
+
+# Try to import the shared adaptive wait layer (optional - falls back to fixed sleeps)
+try:
+    from adaptive_wait import AdaptiveWaiter, get_wait_telemetry
+    ADAPTIVE_WAIT_AVAILABLE = True
+except ImportError:
+    ADAPTIVE_WAIT_AVAILABLE = False
+    AdaptiveWaiter = None
+    get_wait_telemetry = None
+
 # Try to import Excel/CSV reading libraries
 try:
     import pandas as pd
@@ -209,9 +233,144 @@ pyautogui.PAUSE = 1  # Add 1 second pause between actions
 pyautogui.FAILSAFE = True  # Move mouse to corner to abort
 
 
+class RefilingJournal:
+    """Append-only JSONL log of finished clients for one input file
+    
+    Each line is either a run header ({"type": "run", ...}) or one finished
+    client ({"type": "client", ...}) with the tracked/skipped/correct-modifier
+    rows that client produced. Lines are flushed and fsynced as they are
+    written, so a crash or lost browser session costs at most the client in
+    progress. A run started without resume appends a fresh header; only
+    entries after the last such header belong to the current run.
+    """
+    
+    # Statuses that mean the client should be driven again on resume
+    RETRY_STATUS_PREFIX = "Error"
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def client_key(client_name, dob, dos):
+        return (str(client_name or ''), str(dob or ''), str(dos or ''))
+    
+    def start_run(self, resume, total, input_file=None):
+        self._append({
+            "type": "run",
+            "resume": bool(resume),
+            "started": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "clients": total,
+            "input_file": str(input_file) if input_file else None,
+        })
+    
+    def record_client(self, key, position, excel_row, outcome, tracked, skipped, correct):
+        """Append one finished client; returns True if it counts as completed"""
+        completed = outcome == 'successful' or any(
+            not str(record.get('status', '')).startswith(self.RETRY_STATUS_PREFIX) for record in tracked
+        )
+        self._append({
+            "type": "client",
+            "key": list(key),
+            "position": position,
+            "excel_row": excel_row,
+            "outcome": outcome,
+            "completed": completed,
+            "tracked": tracked,
+            "skipped": skipped,
+            "correct": correct,
+        })
+        return completed
+    
+    def iter_clients(self):
+        """Yield (byte offset, entry) for the current run's client entries, streaming from disk"""
+        start = self._current_run_offset()
+        if start is None:
+            return
+        with open(self.path, 'rb') as handle:
+            handle.seek(start)
+            offset = start
+            for raw in handle:
+                entry = self._parse(raw)
+                if entry is not None and entry.get("type") == "client":
+                    yield offset, entry
+                offset += len(raw)
+    
+    def completed_keys(self):
+        return {tuple(entry["key"]) for _, entry in self.iter_clients() if entry.get("completed")}
+    
+    def latest_offsets(self):
+        """Offset of each client's most recent entry, in Excel row order
+        
+        A client retried on resume has several entries; only the last one
+        is reported. Only offsets are kept in memory, not the entries.
+        """
+        latest = {}
+        for order, (offset, entry) in enumerate(self.iter_clients()):
+            try:
+                row = int(entry.get("excel_row"))
+            except (TypeError, ValueError):
+                row = float('inf')
+            latest[tuple(entry["key"])] = (row, order, offset)
+        return [offset for _, _, offset in sorted(latest.values())]
+    
+    def read_entries(self, offsets):
+        """Yield the entries at ``offsets`` (from latest_offsets)"""
+        with open(self.path, 'rb') as handle:
+            for offset in offsets:
+                handle.seek(offset)
+                entry = self._parse(handle.readline())
+                if entry is not None:
+                    yield entry
+    
+    def _current_run_offset(self):
+        """Byte offset of the last non-resume run header (None if the journal is empty)"""
+        if not self.path.exists():
+            return None
+        offset = None
+        position = 0
+        with open(self.path, 'rb') as handle:
+            for raw in handle:
+                if raw.startswith(b'{"type": "run"'):
+                    entry = self._parse(raw)
+                    if entry is not None and not entry.get("resume"):
+                        offset = position
+                position += len(raw)
+        return offset if offset is not None else 0
+    
+    @staticmethod
+    def _parse(line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            # Torn last line from a crash mid-write
+            return None
+    
+    def _append(self, entry):
+        line = json.dumps(entry, default=str, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists() and self.path.stat().st_size:
+                # Start on a fresh line if the previous write was torn by a crash
+                with open(self.path, 'rb') as handle:
+                    handle.seek(-1, os.SEEK_END)
+                    if handle.read(1) != b"\n":
+                        line = "\n" + line
+            with open(self.path, 'a', encoding='utf-8') as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+
 class TNRefilingBot:
     """Main bot class for Therapy Notes refiling automation"""
     
+    # Upper bound for the "Browsers" setting of parallel processing
+    MAX_PARALLEL_BROWSERS = 6
+    
     def __init__(self):
         # Therapy Notes URL
         self.therapy_notes_url = "https://www.therapynotes.com/app/login/IntegritySWS/?r=%2fapp%2fpatients%2f"
@@ -259,6 +418,7 @@ class TNRefilingBot:
         # Selenium WebDriver for browser automation
         self.driver = None
         self.wait = None
+        self._adaptive_waiter = None  # AdaptiveWaiter bound to self.driver (see _get_adaptive_waiter)
         
         # Processing statistics
         self.processing_stats = {
@@ -300,20 +460,48 @@ class TNRefilingBot:
         # Current processing subset (populated when running real processing)
         self.current_processing_clients = []
         
+        # Crash-safe progress journal for the current processing run (see RefilingJournal)
+        self._journal = None
+        
+        # (excel_client_data list, its length, {(name, dob, dos): client}) - see _find_excel_client
+        self._excel_client_index = None
+        
         # Current popup capture data
         self.current_primary_policy_name = None
         self.current_primary_policy_member_id = None
         self.current_primary_payment_description = None
         
-        # Stop control
+        # Stop control (an Event so parallel browser workers share one flag)
+        self._stop_event = threading.Event()
         self.stop_requested = False
         
+        # Parallel processing (one logged-in browser per worker)
+        self.parallel_browsers = 1
+        self.worker_id = None  # Set on worker copies of the bot; None for the main bot
+        self.worker_driver_factory = None  # Optional callable returning a WebDriver for extra workers
+        self.worker_stats = {}  # {worker_id: per-worker processing statistics}
+        self._processing_credentials = None
+        self._results_lock = threading.Lock()
+        self._parallel_results = {}  # {client position: (tracked, skipped, correct_modifier) lists}
+        
         # Test mode flag (to stop before saving changes during testing)
         self.is_testing_mode = False
         # Complex testing mode flag (to run full flow but stop before final Submit Claims)
         self.is_complex_testing_mode = False
         self.test_row_number = None  # Store current test row number for status updates
     
+    @property
+    def stop_requested(self):
+        """True once a stop was requested (shared by all parallel workers)"""
+        return self._stop_event.is_set()
+    
+    @stop_requested.setter
+    def stop_requested(self, value):
+        if value:
+            self._stop_event.set()
+        else:
+            self._stop_event.clear()
+    
     def _ensure_keyring_available(self):
         """Warn once if keyring is unavailable for secure storage."""
         if KEYRING_AVAILABLE:
@@ -649,6 +837,8 @@ class TNRefilingBot:
     def gui_log(self, message, level="INFO", include_context=True):
         """Log a message to the GUI log window with comprehensive debugging."""
         timestamp = time.strftime("%H:%M:%S")
+        if self.worker_id is not None:
+            message = f"[Browser {self.worker_id}] {message}"
 
         if include_context and level in ["DEBUG", "ERROR", "WARNING"]:
             import inspect
@@ -723,6 +913,67 @@ class TNRefilingBot:
             return True
         return False
     
+    def _get_adaptive_waiter(self):
+        """Return the adaptive waiter for this bot's browser, or None if adaptive waits are unavailable"""
+        if not ADAPTIVE_WAIT_AVAILABLE or self.driver is None:
+            return None
+        if self._adaptive_waiter is None or self._adaptive_waiter.driver is not self.driver:
+            self._adaptive_waiter = AdaptiveWaiter(
+                self.driver,
+                telemetry=get_wait_telemetry("tn_refiling_bot"),
+                should_stop=lambda: self.stop_requested
+            )
+        return self._adaptive_waiter
+    
+    def _wait_for_page(self, site, seconds, condition="network_idle"):
+        """Wait for the page to settle instead of sleeping a fixed number of seconds
+        
+        Returns as soon as the condition holds ("network_idle": document loaded and no
+        requests in flight, "dom_ready": document loaded) and never waits longer than
+        `seconds`. Falls back to time.sleep(seconds) without the adaptive wait layer.
+        """
+        waiter = self._get_adaptive_waiter()
+        if waiter is None:
+            time.sleep(seconds)
+        elif condition == "dom_ready":
+            waiter.dom_ready(site=site, baseline=seconds)
+        else:
+            waiter.network_idle(site=site, baseline=seconds)
+    
+    def _wait_for_scroll(self, element, site, seconds=0.5):
+        """Wait (at most `seconds`) for an element to stop moving after scrollIntoView"""
+        waiter = self._get_adaptive_waiter()
+        if waiter is None:
+            time.sleep(seconds)
+        else:
+            waiter.element_stable(element, site=site, baseline=seconds)
+    
+    def _wait_for_condition(self, predicate, site, seconds):
+        """Poll predicate(driver) for at most `seconds` (fixed sleep without the adaptive wait layer)"""
+        waiter = self._get_adaptive_waiter()
+        if waiter is None:
+            time.sleep(seconds)
+        else:
+            waiter.until(predicate, site=site, baseline=seconds)
+    
+    def _log_wait_telemetry(self):
+        """Save adaptive wait telemetry and log the timing of each converted wait"""
+        if not ADAPTIVE_WAIT_AVAILABLE:
+            return
+        telemetry = get_wait_telemetry("tn_refiling_bot")
+        telemetry.save()
+        summary = telemetry.summary()
+        if not summary:
+            return
+        self.gui_log(f"Adaptive wait timings (saved to {telemetry.path}):", level="DEBUG")
+        for site, stats in sorted(summary.items()):
+            self.gui_log(
+                f"  {site}: {stats['count']} wait(s), p50 {stats['p50_seconds']:.2f}s, "
+                f"p95 {stats['p95_seconds']:.2f}s, {stats['timeouts']} timeout(s) "
+                f"of {stats['baseline_seconds']:.1f}s budget, {stats['saved_seconds']:.1f}s saved",
+                level="DEBUG"
+            )
+    
     def update_status(self, message, color="#0066cc"):
         """Update the status label in the GUI"""
         if hasattr(self, 'status_label'):
@@ -741,8 +992,11 @@ class TNRefilingBot:
                 full_text = ""
                 pages_text = []
                 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_text = page.extract_text() or ""
+                if OCR_CACHE_AVAILABLE:
+                    page_texts = pdf_page_texts(pdf_path, pdf)
+                else:
+                    page_texts = [page.extract_text() or "" for page in pdf.pages]
+                for page_num, page_text in enumerate(page_texts, 1):
                     full_text += page_text
                     full_text += "\n"
                     pages_text.append((page_num, page_text))
@@ -751,7 +1005,6 @@ class TNRefilingBot:
                 if not full_text.strip() and OCR_AVAILABLE:
                     self.gui_log("PDF appears to be scanned (no text found) - attempting OCR...")
                     try:
-                        from pdf2image import convert_from_path
                         poppler_path = os.environ.get('POPPLER_PATH')
                         if not poppler_path:
                             # Fallback to default location
@@ -760,16 +1013,21 @@ class TNRefilingBot:
                         # OCR all pages (up to 5 pages to avoid long processing)
                         max_ocr_pages = min(len(pages_text), 5)
                         self.gui_log(f"Running OCR on pages 1-{max_ocr_pages}...")
-                        images = convert_from_path(str(pdf_path), first_page=1, last_page=max_ocr_pages, poppler_path=poppler_path, dpi=300)
+                        if OCR_CACHE_AVAILABLE:
+                            # Page text is OCR'd once per file content and reused
+                            ocr_pages = ocr_pdf_pages(pdf_path, poppler_path, last_page=max_ocr_pages, dpi=300)
+                        else:
+                            from pdf2image import convert_from_path
+                            images = convert_from_path(str(pdf_path), first_page=1, last_page=max_ocr_pages, poppler_path=poppler_path, dpi=300)
+                            ocr_pages = [pytesseract.image_to_string(img) for img in images]
                         
-                        if images:
+                        if ocr_pages:
                             # Combine OCR text from all pages
                             all_ocr_text = ""
-                            for page_num, img in enumerate(images, 1):
-                                page_ocr = pytesseract.image_to_string(img)
+                            for page_num, page_ocr in enumerate(ocr_pages, 1):
                                 all_ocr_text += f"\n[PAGE {page_num} OCR]\n{page_ocr}\n"
                             full_text += all_ocr_text
-                            self.gui_log(f"OCR extraction completed from {len(images)} page(s)")
+                            self.gui_log(f"OCR extraction completed from {len(ocr_pages)} page(s)")
                     except Exception as ocr_error:
                         self.gui_log(f"OCR not available or failed: {ocr_error}")
                         self.gui_log("Tip: Install Tesseract OCR for scanned PDFs (https://github.com/tesseract-ocr/tesseract)")
@@ -840,22 +1098,28 @@ class TNRefilingBot:
             with pdfplumber.open(pdf_path) as pdf:
                 # Extract text from all pages
                 full_text = ""
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_text = page.extract_text() or ""
+                if OCR_CACHE_AVAILABLE:
+                    page_texts = pdf_page_texts(pdf_path, pdf)
+                else:
+                    page_texts = [page.extract_text() or "" for page in pdf.pages]
+                for page_text in page_texts:
                     full_text += page_text + "\n"
                 
                 # If no text, try OCR if available
                 if not full_text.strip() and OCR_AVAILABLE:
                     self.gui_log("PDF appears to be scanned - attempting OCR...")
                     try:
-                        from pdf2image import convert_from_path
                         poppler_path = os.environ.get('POPPLER_PATH')
                         if not poppler_path:
                             poppler_path = r"C:\Users\mthompson\Downloads\Release-25.07.0-0\poppler-25.07.0\Library\bin"
                         
-                        images = convert_from_path(str(pdf_path), poppler_path=poppler_path, dpi=300)
-                        for img in images:
-                            page_ocr = pytesseract.image_to_string(img)
+                        if OCR_CACHE_AVAILABLE:
+                            ocr_pages = ocr_pdf_pages(pdf_path, poppler_path, dpi=300)
+                        else:
+                            from pdf2image import convert_from_path
+                            images = convert_from_path(str(pdf_path), poppler_path=poppler_path, dpi=300)
+                            ocr_pages = [pytesseract.image_to_string(img) for img in images]
+                        for page_ocr in ocr_pages:
                             full_text += f"\n{page_ocr}\n"
                         self.gui_log("OCR extraction completed")
                     except Exception as ocr_error:
@@ -2165,6 +2429,27 @@ class TNRefilingBot:
         tk.Label(self.processing_range_frame, text="Leave blank to process a single row.", font=("Arial", 8), bg="#f0f0f0", fg="#666666").pack(side="left")
         self._toggle_processing_range()
         
+        # Parallel browsers control
+        parallel_frame = tk.Frame(processing_content, bg="#f0f0f0")
+        parallel_frame.pack(fill="x", pady=(0, 10))
+        
+        tk.Label(parallel_frame, text="Browsers:", font=("Arial", 9), bg="#f0f0f0").pack(side="left", padx=(0, 8))
+        self.parallel_browsers_var = tk.IntVar(value=1)
+        tk.Spinbox(parallel_frame, from_=1, to=self.MAX_PARALLEL_BROWSERS, width=4,
+                   textvariable=self.parallel_browsers_var, font=("Arial", 9)).pack(side="left", padx=(0, 8))
+        tk.Label(parallel_frame, text="More than 1 opens extra logged-in Chrome windows and splits the clients between them.",
+                 font=("Arial", 8), bg="#f0f0f0", fg="#666666").pack(side="left")
+        
+        # Resume from the progress journal of an interrupted run
+        self.resume_run_var = tk.IntVar(value=0)
+        tk.Checkbutton(processing_content,
+                       text="Resume previous run (skip clients already finished in this file's journal)",
+                       variable=self.resume_run_var,
+                       bg="#f0f0f0",
+                       font=("Arial", 9),
+                       onvalue=1,
+                       offvalue=0).pack(anchor="w", pady=(0, 10))
+        
         # Processing controls row
         processing_row = tk.Frame(processing_content, bg="#f0f0f0")
         processing_row.pack(fill="x")
@@ -2943,9 +3228,56 @@ class TNRefilingBot:
             
             scope_description = f"rows {start_row}-{end_row} ({len(selected_clients)} client(s))"
         
+        # Open the progress journal; on resume, drop clients the interrupted run already finished
+        resume = bool(self.resume_run_var.get()) if hasattr(self, 'resume_run_var') else False
+        self._journal = RefilingJournal(self._journal_path())
+        if resume:
+            try:
+                done = self._journal.completed_keys()
+            except OSError as e:
+                self.gui_log(f"Could not read progress journal {self._journal.path}: {e}", level="WARNING")
+                done = set()
+            remaining = [
+                client for client in selected_clients
+                if RefilingJournal.client_key(client.get('client_name'), client.get('dob'), client.get('date_of_service')) not in done
+            ]
+            self.gui_log(
+                f"Resuming from {self._journal.path.name}: {len(selected_clients) - len(remaining)} client(s) already finished, "
+                f"{len(remaining)} left",
+                level="INFO"
+            )
+            if not remaining:
+                messagebox.showinfo("Nothing to Resume", "Every selected client is already finished in the progress journal.")
+                self._journal = None
+                return
+            selected_clients = remaining
+            scope_description += f", resuming with {len(remaining)} left"
+        try:
+            self._journal.start_run(resume, len(selected_clients), self.selected_excel_path)
+        except OSError as e:
+            self.gui_log(f"Progress journal disabled - could not write {self._journal.path}: {e}", level="WARNING")
+            self._journal = None
+        
         # Store selected clients for processing
         self.current_processing_clients = selected_clients
         
+        # Parallel browsers need the credentials to log each extra browser in
+        try:
+            requested_browsers = int(self.parallel_browsers_var.get())
+        except (tk.TclError, ValueError, AttributeError):
+            requested_browsers = 1
+        self.parallel_browsers = max(1, min(requested_browsers, self.MAX_PARALLEL_BROWSERS))
+        self._processing_credentials = None
+        if self.parallel_browsers > 1:
+            username = self.username_entry.get().strip()
+            password = self.password_entry.get().strip()
+            if username and password:
+                self._processing_credentials = (username, password)
+                scope_description += f" across {self.parallel_browsers} browser(s)"
+            else:
+                self.gui_log("Parallel processing needs the username and password fields filled - using 1 browser", level="WARNING")
+                self.parallel_browsers = 1
+        
         # Reset testing mode flag - we're doing actual processing, not testing
         self.is_testing_mode = False
         
@@ -3030,189 +3362,351 @@ class TNRefilingBot:
             
             self.gui_log(f"Processing {total} client(s)...", level="INFO")
             
-            for idx, client in enumerate(data_to_process, 1):
-                # Check for stop request
-                if self.check_stop_requested():
-                    self.gui_log("Processing stopped by user", level="WARNING")
-                    break
-                
-                self.processing_stats['current'] = idx
-                
-                # Update progress in GUI
-                if self.root:
-                    self.root.after(0, lambda i=idx, t=total: self._update_processing_progress(i, t))
-                
-                client_name = client.get('client_name', 'Unknown')
-                dob = client.get('dob', '')
-                dos = client.get('date_of_service', '')
-                
-                # Store current client info for potential skipping
-                self.current_client_name = client_name
-                self.current_client_dob = dob
-                self.current_date_of_service = dos
-                self.current_original_modifier = None
-                self.current_session_medium = None
-                self.current_new_modifier = None
-                self.current_modifier_action = None
-                self.current_primary_policy_name = None
-                self.current_primary_policy_member_id = None
-                self.current_primary_payment_description = None
-                
-                self.gui_log(f"\n{'='*80}", level="INFO")
-                self.gui_log(f"Processing client {idx}/{total}: {client_name}", level="INFO")
-                self.gui_log(f"{'='*80}", level="INFO")
-                self.gui_log(f"  DOB: {dob}, Date of Service: {dos}", level="INFO")
-                
-                # Step 1: Ensure we're on Patients page (for first client or after reset)
-                if idx == 1:
-                    current_url = self.driver.current_url
-                    if "patients" not in current_url.lower():
-                        self.gui_log("Not on Patients page - Navigating to Patients...", level="INFO")
-                        if not self._navigate_to_patients():
-                            self.gui_log(f"❌ Failed to navigate to Patients page for client {idx}", level="ERROR")
-                            self.processing_stats['failed'] += 1
-                            continue
-                else:
-                    # For subsequent clients, only navigate/reset if needed
-                    current_url = self.driver.current_url
-                    on_patients = "patients" in current_url.lower()
-                    search_ready = False
-                    if on_patients:
-                        try:
-                            search_field = self.driver.find_element(By.ID, "ctl00_BodyContent_TextBoxSearchPatientName")
-                            if search_field.is_displayed() and search_field.is_enabled():
-                                search_field.clear()
-                                self.gui_log("✅ Search field ready - staying on Patients page", level="DEBUG")
-                                search_ready = True
-                        except Exception:
-                            search_ready = False
-                    if not search_ready:
-                        if not self._reset_search_field():
-                            self.gui_log(f"⚠️ Could not reset search field for client {idx}, continuing anyway...", level="WARNING")
-                
-                # Step 2: Search for the client with retry logic
-                search_successful = self._search_for_client(client_name, dob, dos)
-                
-                if not search_successful:
-                    self.gui_log(f"❌ Could not find client {idx}: {client_name} after all retry attempts", level="WARNING")
-                    self.gui_log(f"Moving to next client...", level="INFO")
-                    self.processing_stats['failed'] += 1
-                    
-                    # Track failed client
-                    self._add_tracked_client(
-                        status='Error - Client Not Found',
-                        original_modifier='N/A',
-                        new_modifier='N/A',
-                        modifier_action='N/A',
-                        reason=f'Could not find client in Therapy Notes after all retry attempts',
-                        error_message=f'Client search failed: {client_name} (DOB: {dob}, DOS: {dos})'
-                    )
-                    
-                    # Reset search field for next client
-                    if idx < total:
-                        self._reset_search_field()
-                    continue
-                
-                # Navigation continues in _search_for_client -> _navigate_to_billing_tab -> _click_all_items_button
-                # Date clicking will happen after "All Items" is clicked
-                # After clicking payment amount, check for View ERA button
-                # This happens in _click_payment_amount_link -> _check_and_click_view_era_button
-                
-                # Check if client was skipped during navigation (no View ERA button or no payments made)
-                # The skip logic is handled in _check_and_click_view_era_button or _click_payment_amount_link
-                # which navigates back to Patients if button doesn't exist or if no payments were made
-                # The _navigate_back_to_billing_tab -> _click_all_items_button chain may return "skip_client" or "no_payments"
-                
-                # If client was skipped, it's already in skipped_clients list and tracked
-                # and navigation back to Patients has already occurred - continue to next client
-                if search_successful == "skip_client":
-                    self.gui_log(f"⏭️ Client {idx} skipped - Continuing to next client...", level="INFO")
-                    self.processing_stats['failed'] += 1
-                    
-                    # Note: Skip tracking is already done in _check_and_click_view_era_button
-                    # when View ERA button is not found
-                    
-                    # Reset search field for next client
-                    if idx < total:
-                        self._reset_search_field()
-                    continue
-                
-                # Check if "no payments made" scenario was encountered
-                if search_successful == "no_payments":
-                    self.gui_log(f"⏭️ Client {idx} skipped (no payments made) - Continuing to next client...", level="INFO")
-                    self.processing_stats['failed'] += 1
-                    
-                    # Note: Tracking is already done in _click_payment_amount_link
-                    # when "No payments have been made" message is found
-                    
-                    # Reset search field for next client
-                    if idx < total:
-                        self._reset_search_field()
-                    continue
-                
-                # Check if "payment mismatch" scenario was encountered
-                if search_successful == "payment_mismatch":
-                    self.gui_log(f"⏭️ Client {idx} skipped (payment did not match primary policy) - Continuing to next client...", level="INFO")
-                    self.processing_stats['failed'] += 1
-                    
-                    # Reset search field for next client
-                    if idx < total:
-                        self._reset_search_field()
-                    continue
-                
-                # Check if "modifier already correct" scenario was encountered
-                if search_successful == "modifier_correct":
-                    self.gui_log(f"⏭️ Client {idx} skipped (modifier already correct) - Continuing to next client...", level="INFO")
-                    self.processing_stats['failed'] += 1
+            if self.parallel_browsers > 1 and total > 1 and self._processing_credentials:
+                self._process_clients_parallel(data_to_process)
+            else:
+                for idx, client in enumerate(data_to_process, 1):
+                    # Check for stop request
+                    if self.check_stop_requested():
+                        self.gui_log("Processing stopped by user", level="WARNING")
+                        break
                     
-                    # Note: Tracking is already done in _click_progress_note_button
-                    # when modifier matches expected value
+                    self.processing_stats['current'] = idx
                     
-                    # Reset search field for next client
-                    if idx < total:
-                        self._reset_search_field()
-                    continue
-                
-                if search_successful == "session_medium_missing":
-                    self.gui_log(f"⏭️ Client {idx} skipped (session medium not found) - Continuing to next client...", level="INFO")
-                    self.processing_stats['failed'] += 1
+                    # Update progress in GUI
+                    if self.root:
+                        self.root.after(0, lambda i=idx, t=total: self._update_processing_progress(i, t))
                     
-                    # Reset search field for next client
-                    if idx < total:
-                        self._reset_search_field()
-                    continue
-                
-                # Note: The navigation chain after clicking date again may return "next_client"
-                # if modifier was correct (popup closed, navigated back to Patients)
-                # This is handled in _click_date_of_service_again -> _check_and_update_modifier flow
-                # If modifier was correct, the flow will have already:
-                # - Closed the popup
-                # - Added client to correct_modifier_clients list
-                # - Navigated back to Patients page
-                # So we can just continue to next client
-                
-                # Check if we need to handle "next_client" signal from the navigation chain
-                # The check happens inside _click_date_of_service_again -> _check_and_update_modifier
-                # which handles the "correct" modifier case and returns "next_client"
-                
-                # Continue processing - normal completion
-                self.gui_log(f"✅ Client {idx} processing completed", level="INFO")
-                self.processing_stats['successful'] += 1
-                time.sleep(1)  # Small delay between clients
+                    outcome = self._process_single_client(client, idx, total, is_first=(idx == 1), has_more=(idx < total))
+                    self.processing_stats[outcome] += 1
+            
+            self._log_wait_telemetry()
             
             # Final update and save output Excel
             if self.root:
                 self.root.after(0, self._finish_processing)
             
-            # Save output Excel with skipped clients and correct modifier clients
-            if self.skipped_clients or self.correct_modifier_clients:
+            # Save output Excel (written from the journal, so resumed runs include earlier clients)
+            if self._journal is not None or self.tracked_clients or self.skipped_clients or self.correct_modifier_clients:
                 self._save_output_excel()
                 
         except Exception as e:
             self.log_error("Error during processing", exception=e, include_traceback=True)
+            if self._journal is not None:
+                self.gui_log(f"Progress so far is in {self._journal.path} - tick 'Resume previous run' to continue", level="INFO")
             if self.root:
                 self.root.after(0, lambda: self.processing_status_label.config(text="Status: Error occurred", fg="#dc3545"))
                 self.root.after(0, lambda: self.start_processing_button.config(state="normal"))
+        finally:
+            self._journal = None
+    
+    def _process_single_client(self, client, idx, total, is_first=False, has_more=False):
+        """Run the full refiling flow for one client in this bot's browser
+        
+        Args:
+            client: Client dict from excel_client_data
+            idx: 1-based position of the client in the run (for logging)
+            total: Number of clients in the run
+            is_first: True for the first client handled by this browser
+            has_more: True if this browser has more clients after this one
+        
+        Returns:
+            str: 'successful' or 'failed' (key into processing_stats)
+        """
+        waiter = self._get_adaptive_waiter()
+        saved_before = waiter.saved_seconds if waiter else 0.0
+        marks = (len(self.tracked_clients), len(self.skipped_clients), len(self.correct_modifier_clients))
+        outcome = 'failed'
+        try:
+            outcome = self._refile_single_client(client, idx, total, is_first, has_more)
+            return outcome
+        finally:
+            if waiter is not None:
+                saved = waiter.saved_seconds - saved_before
+                self.gui_log(f"⏱️ Adaptive waits saved {saved:.1f}s for client {idx}", level="DEBUG")
+            self._journal_client(client, idx, outcome, marks)
+    
+    def _journal_client(self, client, idx, outcome, marks):
+        """Append one finished client and the rows it produced to the progress journal"""
+        if self._journal is None:
+            return
+        key = RefilingJournal.client_key(client.get('client_name'), client.get('dob'), client.get('date_of_service'))
+        try:
+            self._journal.record_client(
+                key, idx, client.get('excel_row'), outcome,
+                self.tracked_clients[marks[0]:],
+                self.skipped_clients[marks[1]:],
+                self.correct_modifier_clients[marks[2]:],
+            )
+        except OSError as e:
+            self.gui_log(f"⚠️ Could not write progress journal: {e}", level="WARNING")
+    
+    def _journal_path(self):
+        """Progress journal next to the input file (one journal per input file)"""
+        if self.selected_excel_path:
+            input_file = Path(self.selected_excel_path)
+            return input_file.parent / f"{input_file.stem}_refiling_journal.jsonl"
+        return Path(__file__).parent / "tn_refiling_journal.jsonl"
+    
+    def _find_excel_client(self, client_name, dob, dos):
+        """Loaded Excel/CSV row for (name, DOB, DOS) - first match, via a dict built once per load"""
+        data = self.excel_client_data
+        if not data:
+            return None
+        index = self._excel_client_index
+        if index is None or index[0] is not data or index[1] != len(data):
+            lookup = {}
+            for client in data:
+                try:
+                    lookup.setdefault((client.get('client_name'), client.get('dob'), client.get('date_of_service')), client)
+                except TypeError:
+                    continue
+            index = self._excel_client_index = (data, len(data), lookup)
+        try:
+            return index[2].get((client_name, dob, dos))
+        except TypeError:
+            # Unhashable cell value
+            return None
+    
+    def _refile_single_client(self, client, idx, total, is_first, has_more):
+        """Refiling steps for one client (see _process_single_client)"""
+        client_name = client.get('client_name', 'Unknown')
+        dob = client.get('dob', '')
+        dos = client.get('date_of_service', '')
+        
+        # Store current client info for potential skipping
+        self.current_client_name = client_name
+        self.current_client_dob = dob
+        self.current_date_of_service = dos
+        self.current_original_modifier = None
+        self.current_session_medium = None
+        self.current_new_modifier = None
+        self.current_modifier_action = None
+        self.current_primary_policy_name = None
+        self.current_primary_policy_member_id = None
+        self.current_primary_payment_description = None
+        
+        self.gui_log(f"\n{'='*80}", level="INFO")
+        self.gui_log(f"Processing client {idx}/{total}: {client_name}", level="INFO")
+        self.gui_log(f"{'='*80}", level="INFO")
+        self.gui_log(f"  DOB: {dob}, Date of Service: {dos}", level="INFO")
+        
+        # Step 1: Ensure we're on Patients page (for first client or after reset)
+        if is_first:
+            current_url = self.driver.current_url
+            if "patients" not in current_url.lower():
+                self.gui_log("Not on Patients page - Navigating to Patients...", level="INFO")
+                if not self._navigate_to_patients():
+                    self.gui_log(f"❌ Failed to navigate to Patients page for client {idx}", level="ERROR")
+                    return 'failed'
+        else:
+            # For subsequent clients, only navigate/reset if needed
+            current_url = self.driver.current_url
+            on_patients = "patients" in current_url.lower()
+            search_ready = False
+            if on_patients:
+                try:
+                    search_field = self.driver.find_element(By.ID, "ctl00_BodyContent_TextBoxSearchPatientName")
+                    if search_field.is_displayed() and search_field.is_enabled():
+                        search_field.clear()
+                        self.gui_log("✅ Search field ready - staying on Patients page", level="DEBUG")
+                        search_ready = True
+                except Exception:
+                    search_ready = False
+            if not search_ready:
+                if not self._reset_search_field():
+                    self.gui_log(f"⚠️ Could not reset search field for client {idx}, continuing anyway...", level="WARNING")
+        
+        # Step 2: Search for the client with retry logic
+        search_successful = self._search_for_client(client_name, dob, dos)
+        
+        if not search_successful:
+            self.gui_log(f"❌ Could not find client {idx}: {client_name} after all retry attempts", level="WARNING")
+            self.gui_log(f"Moving to next client...", level="INFO")
+            
+            # Track failed client
+            self._add_tracked_client(
+                status='Error - Client Not Found',
+                original_modifier='N/A',
+                new_modifier='N/A',
+                modifier_action='N/A',
+                reason=f'Could not find client in Therapy Notes after all retry attempts',
+                error_message=f'Client search failed: {client_name} (DOB: {dob}, DOS: {dos})'
+            )
+            
+            # Reset search field for next client
+            if has_more:
+                self._reset_search_field()
+            return 'failed'
+        
+        # Navigation continues in _search_for_client -> _navigate_to_billing_tab -> _click_all_items_button
+        # Date clicking will happen after "All Items" is clicked
+        # After clicking payment amount, check for View ERA button
+        # This happens in _click_payment_amount_link -> _check_and_click_view_era_button
+        
+        # Skip outcomes are already tracked (skipped_clients / tracked_clients) by the step
+        # that detected them, and navigation back to Patients has already occurred:
+        # - "skip_client": no View ERA button (_check_and_click_view_era_button)
+        # - "no_payments": "No payments have been made" (_click_payment_amount_link)
+        # - "payment_mismatch": payment did not match primary policy
+        # - "modifier_correct": modifier matched expected value (_click_progress_note_button)
+        # - "session_medium_missing": session medium not found in the progress note
+        skip_messages = {
+            "skip_client": "skipped",
+            "no_payments": "skipped (no payments made)",
+            "payment_mismatch": "skipped (payment did not match primary policy)",
+            "modifier_correct": "skipped (modifier already correct)",
+            "session_medium_missing": "skipped (session medium not found)",
+        }
+        if search_successful in skip_messages:
+            self.gui_log(f"⏭️ Client {idx} {skip_messages[search_successful]} - Continuing to next client...", level="INFO")
+            
+            # Reset search field for next client
+            if has_more:
+                self._reset_search_field()
+            return 'failed'
+        
+        # Note: The navigation chain after clicking date again may return "next_client"
+        # if modifier was correct (popup closed, navigated back to Patients)
+        # This is handled in _click_date_of_service_again -> _check_and_update_modifier flow
+        
+        # Continue processing - normal completion
+        self.gui_log(f"✅ Client {idx} processing completed", level="INFO")
+        time.sleep(1)  # Small delay between clients
+        return 'successful'
+    
+    def _create_processing_worker(self, worker_id, reuse_driver=False):
+        """Return a copy of this bot that drives its own browser for parallel processing
+        
+        The copy shares the GUI, loaded Excel data and stop flag with this bot but has
+        its own WebDriver, per-client state and result lists.
+        """
+        worker = copy.copy(self)
+        worker.worker_id = worker_id
+        if not reuse_driver:
+            worker.driver = None
+            worker.wait = None
+            worker.is_logged_in = False
+        worker._adaptive_waiter = None
+        worker.tracked_clients = []
+        worker.skipped_clients = []
+        worker.correct_modifier_clients = []
+        worker.current_processing_clients = []
+        worker.processing_stats = {'total': 0, 'successful': 0, 'failed': 0, 'current': 0}
+        return worker
+    
+    def _process_clients_parallel(self, data_to_process):
+        """Process clients across several independently logged-in browsers
+        
+        Browser 1 reuses the already logged-in session; the others open and log in
+        their own Chrome window. Clients are handed out from a shared queue, so a
+        browser that fails to log in simply leaves its share to the others.
+        """
+        total = len(data_to_process)
+        worker_count = min(self.parallel_browsers, total)
+        
+        work_queue = queue.Queue()
+        for position, client in enumerate(data_to_process):
+            work_queue.put((position, client))
+        
+        self._parallel_results = {}
+        self.worker_stats = {}
+        self.gui_log(f"Starting {worker_count} browser worker(s) for {total} client(s)...", level="INFO")
+        started = time.time()
+        
+        threads = []
+        for worker_id in range(1, worker_count + 1):
+            worker = self._create_processing_worker(worker_id, reuse_driver=(worker_id == 1))
+            thread = self._start_worker_thread(
+                f"process-browser-{worker_id}", self._run_processing_worker,
+                args=(worker, work_queue, total)
+            )
+            if thread is not None:
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+        
+        # Merge per-client results in the original Excel order
+        for position in sorted(self._parallel_results):
+            tracked, skipped, correct = self._parallel_results[position]
+            self.tracked_clients.extend(tracked)
+            self.skipped_clients.extend(skipped)
+            self.correct_modifier_clients.extend(correct)
+        self._parallel_results = {}
+        
+        unprocessed = work_queue.qsize()
+        elapsed = time.time() - started
+        self.gui_log(f"Parallel processing finished in {elapsed:.1f}s", level="INFO")
+        for worker_id, stats in sorted(self.worker_stats.items()):
+            self.gui_log(
+                f"  Browser {worker_id}: {stats['processed']} processed "
+                f"({stats['successful']} successful, {stats['failed']} failed) in {stats['elapsed_seconds']:.1f}s"
+                + ("" if stats['logged_in'] else " - login failed"),
+                level="INFO"
+            )
+        if unprocessed:
+            self.gui_log(f"⚠️ {unprocessed} client(s) were not processed", level="WARNING")
+    
+    def _run_processing_worker(self, worker, work_queue, total):
+        """Worker thread: log in (if needed) and process clients until the queue is empty"""
+        started = time.time()
+        stats = {'processed': 0, 'successful': 0, 'failed': 0, 'logged_in': False, 'elapsed_seconds': 0.0}
+        with self._results_lock:
+            self.worker_stats[worker.worker_id] = stats
+        owns_driver = worker.driver is None
+        
+        try:
+            if owns_driver:
+                if self.worker_driver_factory is not None:
+                    worker.driver = self.worker_driver_factory()
+                    worker.wait = WebDriverWait(worker.driver, 10)
+                username, password = self._processing_credentials
+                if not worker.login(username, password) or not worker.is_logged_in:
+                    worker.gui_log("❌ Login failed - leaving remaining clients to the other browsers", level="ERROR")
+                    return
+            stats['logged_in'] = True
+            
+            is_first = True
+            while not worker.check_stop_requested():
+                try:
+                    position, client = work_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                try:
+                    outcome = worker._process_single_client(
+                        client, position + 1, total, is_first=is_first, has_more=not work_queue.empty()
+                    )
+                except Exception as e:
+                    worker.log_error(f"Error processing client {position + 1}", exception=e, include_traceback=True)
+                    outcome = 'failed'
+                is_first = False
+                self._merge_worker_results(worker, position, outcome, stats, total)
+        except Exception as e:
+            worker.log_error("Browser worker stopped after an error", exception=e, include_traceback=True)
+        finally:
+            stats['elapsed_seconds'] = round(time.time() - started, 3)
+            if owns_driver:
+                worker._close_driver()
+    
+    def _merge_worker_results(self, worker, position, outcome, stats, total):
+        """Move one client's results from a worker into the main bot (thread-safe)"""
+        with self._results_lock:
+            self._parallel_results[position] = (
+                worker.tracked_clients, worker.skipped_clients, worker.correct_modifier_clients
+            )
+            worker.tracked_clients = []
+            worker.skipped_clients = []
+            worker.correct_modifier_clients = []
+            
+            stats['processed'] += 1
+            stats[outcome] += 1
+            self.processing_stats[outcome] += 1
+            self.processing_stats['current'] += 1
+            current = self.processing_stats['current']
+        
+        if self.root:
+            self.root.after(0, lambda c=current, t=total: self._update_processing_progress(c, t))
     
     def _update_processing_progress(self, current, total):
         """Update processing progress in GUI (called from main thread)"""
@@ -4210,7 +4704,7 @@ class TNRefilingBot:
                 return False
             
             # Wait for page to fully load after clicking client
-            time.sleep(2)
+            self._wait_for_page("billing_tab.client_page_loaded", 2, condition="dom_ready")
             
             # Find and click Billing tab using multiple strategies
             billing_tab = None
@@ -4269,7 +4763,7 @@ class TNRefilingBot:
             if billing_tab:
                 # Scroll into view if needed
                 self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", billing_tab)
-                time.sleep(0.5)
+                self._wait_for_scroll(billing_tab, "billing_tab.scroll")
                 
                 # Click the Billing tab
                 try:
@@ -4278,7 +4772,7 @@ class TNRefilingBot:
                     self.update_status("Billing tab clicked - Waiting for page to load...", "#ff9500")
                     
                     # Wait for tab to load
-                    time.sleep(2)
+                    self._wait_for_page("billing_tab.tab_loaded", 2)
                     
                     # Verify navigation by checking URL or page elements
                     current_url = self.driver.current_url
@@ -4333,7 +4827,7 @@ class TNRefilingBot:
                     try:
                         self.driver.execute_script("arguments[0].click();", billing_tab)
                         self.gui_log("✅ Billing tab clicked (JavaScript)", level="INFO")
-                        time.sleep(2)
+                        self._wait_for_page("billing_tab.tab_loaded_js", 2)
                         return True
                     except Exception as js_error:
                         self.log_error(f"Failed to click Billing tab: {click_error}", exception=js_error, include_traceback=True)
@@ -4365,7 +4859,7 @@ class TNRefilingBot:
                 return False
             
             # Wait for Billing tab content to load
-            time.sleep(2)
+            self._wait_for_page("all_items.billing_content_loaded", 2)
             
             # Find and click All Items button using multiple strategies
             all_items_button = None
@@ -4425,7 +4919,7 @@ class TNRefilingBot:
             if all_items_button:
                 # Scroll into view if needed
                 self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", all_items_button)
-                time.sleep(0.5)
+                self._wait_for_scroll(all_items_button, "all_items.scroll")
                 
                 # Click the All Items button
                 try:
@@ -4433,8 +4927,8 @@ class TNRefilingBot:
                     self.gui_log("✅ All Items button clicked", level="INFO")
                     self.update_status("All Items clicked - Waiting for page to load...", "#ff9500")
                     
-                    # Wait for content to load
-                    time.sleep(2)
+                    # Wait for the transaction list to reload
+                    self._wait_for_page("all_items.list_loaded", 2)
                     
                     # Verify click by checking if button appears active or content loaded
                     current_url = self.driver.current_url
@@ -4449,7 +4943,7 @@ class TNRefilingBot:
                     try:
                         self.driver.execute_script("arguments[0].click();", all_items_button)
                         self.gui_log("✅ All Items button clicked (JavaScript)", level="INFO")
-                        time.sleep(2)
+                        self._wait_for_page("all_items.list_loaded_js", 2)
                         self.update_status("All Items selected", "#28a745")
                         return True
                     except Exception as js_error:
@@ -4569,6 +5063,14 @@ class TNRefilingBot:
             self.log_error(f"Error normalizing date of service: {dos_str}", exception=e, include_traceback=False)
             return None, None
     
+    @staticmethod
+    def _payment_popup_visible(driver):
+        """True once the billing popup opened by a date of service link shows its modifier field"""
+        return any(
+            element.is_displayed()
+            for element in driver.find_elements(By.XPATH, "//input[@data-testid='modifierseditor-code-input-1']")
+        )
+    
     def _click_date_of_service(self, date_of_service):
         """Click the date of service link from the list of dates on the Billing tab
         
@@ -4599,7 +5101,7 @@ class TNRefilingBot:
             self.gui_log(f"Normalized date of service to Therapy Notes format: {normalized_dos_str}", level="DEBUG")
             
             # Wait for date links to load
-            time.sleep(2)
+            self._wait_for_page("date_of_service.links_loaded", 2)
             
             # Find all date links using multiple strategies
             date_links = []
@@ -4682,7 +5184,7 @@ class TNRefilingBot:
             if matched_link:
                 # Scroll into view
                 self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", matched_link)
-                time.sleep(0.5)
+                self._wait_for_scroll(matched_link, "date_of_service.scroll")
                 
                 # Click the date link
                 try:
@@ -4691,7 +5193,7 @@ class TNRefilingBot:
                     self.update_status(f"Date clicked: {matched_link.text.strip()}", "#28a745")
                     
                     # Wait for popup to appear
-                    time.sleep(2)
+                    self._wait_for_condition(self._payment_popup_visible, "date_of_service.popup_visible", 2)
                     
                     # Extract original modifier immediately after popup appears (before navigating to Notes)
                     # This allows us to check if modifier is already correct later and skip the entire flow if so
@@ -4742,7 +5244,7 @@ class TNRefilingBot:
                         self.driver.execute_script("arguments[0].click();", matched_link)
                         self.gui_log(f"✅ Date of service clicked (JavaScript): {matched_link.text.strip()}", level="INFO")
                         self.update_status(f"Date clicked: {matched_link.text.strip()}", "#28a745")
-                        time.sleep(2)
+                        self._wait_for_condition(self._payment_popup_visible, "date_of_service.popup_visible_js", 2)
                         
                         if not hasattr(self, 'current_session_medium') or not self.current_session_medium:
                             self._extract_original_modifier()
@@ -8322,15 +8824,11 @@ class TNRefilingBot:
             claim_status = None
             
             # Find Excel row number, insurance, and claim status if available
-            if self.excel_client_data:
-                for client in self.excel_client_data:
-                    if (client.get('client_name') == client_name and 
-                        client.get('dob') == dob and 
-                        client.get('date_of_service') == dos):
-                        excel_row = client.get('excel_row')
-                        insurance = client.get('insurance')  # Extract insurance from Excel data
-                        claim_status = client.get('claim_status')  # Extract claim status from Excel data
-                        break
+            client = self._find_excel_client(client_name, dob, dos)
+            if client is not None:
+                excel_row = client.get('excel_row')
+                insurance = client.get('insurance')  # Extract insurance from Excel data
+                claim_status = client.get('claim_status')  # Extract claim status from Excel data
             
             # Get session medium and expected modifier
             session_medium = getattr(self, 'current_session_medium', None) or 'N/A'
@@ -9978,6 +10476,196 @@ class TNRefilingBot:
             self.update_status(f"Patients navigation error: {str(e)}", "#dc3545")
             return False
     
+    # Output Excel column order (columns not listed here follow in first-seen order)
+    OUTPUT_COLUMN_ORDER = [
+        'excel_row',
+        'client_name',
+        'dob',
+        'date_of_service',
+        'insurance',
+        'claim_status',
+        'status',
+        'session_medium',
+        'expected_modifier',
+        'original_modifier',
+        'new_modifier',
+        'modifier_action',
+        'payer_claim_control',
+        'primary_policy',
+        'primary_policy_member_id',
+        'primary_policy_payment_match',
+        'processing_date',
+        'reason',
+        'error_message'
+    ]
+    
+    def _legacy_output_rows(self, skipped_clients, correct_modifier_clients):
+        """Convert legacy skipped / correct-modifier entries to output rows"""
+        all_clients = []
+        for client in skipped_clients:
+            # Try to find insurance and claim status from excel_client_data
+            insurance = None
+            claim_status = None
+            client_name = client.get('client_name', 'Unknown')
+            dob = client.get('dob', '')
+            dos = client.get('date_of_service', '')
+            excel_client = self._find_excel_client(client_name, dob, dos)
+            if excel_client is not None:
+                insurance = excel_client.get('insurance')
+                claim_status = excel_client.get('claim_status')
+            
+            all_clients.append({
+                'client_name': client_name,
+                'dob': dob,
+                'date_of_service': dos,
+                'insurance': insurance or 'N/A',
+                'claim_status': claim_status or 'N/A',
+                'excel_row': 'N/A',
+                'status': 'Not Refiled - ' + client.get('reason', 'Unknown'),
+                'original_modifier': 'N/A',
+                'new_modifier': 'N/A',
+                'session_medium': 'N/A',
+                'expected_modifier': 'N/A',
+                'payer_claim_control': 'N/A',
+                'modifier_action': 'N/A',
+                'reason': client.get('reason', ''),
+                'processing_date': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'error_message': ''
+            })
+        for client in correct_modifier_clients:
+            # Try to find insurance and claim status from excel_client_data
+            insurance = None
+            claim_status = None
+            client_name = client.get('client_name', 'Unknown')
+            dob = client.get('dob', '')
+            dos = client.get('date_of_service', '')
+            excel_client = self._find_excel_client(client_name, dob, dos)
+            if excel_client is not None:
+                insurance = excel_client.get('insurance')
+                claim_status = excel_client.get('claim_status')
+            
+            all_clients.append({
+                'client_name': client_name,
+                'dob': dob,
+                'date_of_service': dos,
+                'insurance': insurance or 'N/A',
+                'claim_status': claim_status or 'N/A',
+                'excel_row': 'N/A',
+                'status': 'Not Refiled - Modifier Correct',
+                'original_modifier': 'N/A',
+                'new_modifier': 'N/A',
+                'session_medium': 'N/A',
+                'expected_modifier': 'N/A',
+                'payer_claim_control': 'N/A',
+                'modifier_action': 'Already Correct',
+                'reason': client.get('reason', 'Modifier was already correct, Not Resubmitted'),
+                'processing_date': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'error_message': ''
+            })
+        return all_clients
+    
+    def _output_excel_file(self):
+        """Output Excel path: the user's choice, else <input>_output_<timestamp>.xlsx"""
+        if self.output_excel_path:
+            # Use user-selected path
+            output_file = Path(self.output_excel_path)
+            # Ensure directory exists
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            # Generate default filename based on input filename and timestamp
+            if self.selected_excel_path:
+                input_file = Path(self.selected_excel_path)
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
+                output_file = input_file.parent / f"{input_file.stem}_output_{timestamp}.xlsx"
+            else:
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
+                output_file = Path(__file__).parent / f"tn_refiling_output_{timestamp}.xlsx"
+        return output_file
+    
+    def _journal_output_rows(self, entry):
+        """Output rows for one journal entry (tracked rows, else converted legacy rows)"""
+        if entry.get('tracked'):
+            return entry['tracked']
+        return self._legacy_output_rows(entry.get('skipped') or [], entry.get('correct') or [])
+    
+    def _save_output_excel_from_journal(self):
+        """Write the output Excel by streaming the progress journal
+        
+        Rows are read back from disk in Excel row order (latest entry per
+        client) and appended to a write-only workbook, so memory use does not
+        grow with the number of clients and a resumed run's output includes
+        the clients finished before the interruption.
+        """
+        journal = self._journal
+        try:
+            offsets = journal.latest_offsets()
+            if not offsets:
+                self.gui_log("No tracked clients to save", level="INFO")
+                return
+            
+            # Pass 1: columns and widths
+            columns = list(self.OUTPUT_COLUMN_ORDER)
+            present = set()
+            widths = {}
+            row_count = 0
+            for entry in journal.read_entries(offsets):
+                for row in self._journal_output_rows(entry):
+                    row_count += 1
+                    for column, value in row.items():
+                        if column not in present:
+                            present.add(column)
+                            if column not in columns:
+                                columns.append(column)
+                        if value is not None:
+                            widths[column] = max(widths.get(column, 0), len(str(value)))
+            columns = [column for column in columns if column in present]
+            self.gui_log(f"Saving output Excel with {row_count} tracked client(s) from {journal.path.name}...", level="INFO")
+            
+            output_file = self._output_excel_file()
+            from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font, PatternFill, Alignment
+            from openpyxl.utils import get_column_letter
+            
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet(title="Sheet1")
+            for position, column in enumerate(columns, 1):
+                width = max(widths.get(column, 0), len(column))
+                ws.column_dimensions[get_column_letter(position)].width = min(width + 2, 50)  # Cap at 50 characters
+            
+            header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
+            header_font = Font(bold=True, color="FFFFFF", size=11)
+            header = []
+            for column in columns:
+                cell = WriteOnlyCell(ws, value=column)
+                cell.fill = header_fill
+                cell.font = header_font
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+                header.append(cell)
+            ws.append(header)
+            
+            # Pass 2: rows
+            status_counts = {}
+            for entry in journal.read_entries(offsets):
+                for row in self._journal_output_rows(entry):
+                    ws.append([row.get(column) for column in columns])
+                    status = row.get('status')
+                    status_counts[status] = status_counts.get(status, 0) + 1
+            wb.save(output_file)
+            
+            self.gui_log(f"✅ Output Excel saved: {output_file}", level="INFO")
+            self.update_status(f"Output saved: {output_file.name}", "#28a745")
+            
+            summary = "Output Summary:\n"
+            for status, count in sorted(status_counts.items(), key=lambda item: -item[1]):
+                summary += f"  {status}: {count}\n"
+            self.gui_log(summary, level="INFO")
+            return True
+            
+        except Exception as e:
+            self.log_error("Error saving output Excel from progress journal", exception=e, include_traceback=True)
+            return False
+    
     def _save_output_excel(self):
         """Save comprehensive output Excel file with all tracked client information
         
@@ -9992,6 +10680,14 @@ class TNRefilingBot:
         - Processing date/time
         - Error messages (if any)
         """
+        if self.worker_id is not None:
+            # Parallel workers hand their results to the main bot, which writes one merged file
+            self.gui_log("Output Excel is written once all browser workers finish", level="DEBUG")
+            return False
+        
+        if self._journal is not None:
+            return self._save_output_excel_from_journal()
+        
         try:
             # Use comprehensive tracking if available, otherwise fall back to legacy tracking
             if self.tracked_clients:
@@ -9999,124 +10695,19 @@ class TNRefilingBot:
                 self.gui_log(f"Saving output Excel with {len(all_clients)} tracked client(s)...", level="INFO")
             elif self.skipped_clients or self.correct_modifier_clients:
                 # Legacy mode - convert to comprehensive format
-                all_clients = []
-                for client in self.skipped_clients:
-                    # Try to find insurance and claim status from excel_client_data
-                    insurance = None
-                    claim_status = None
-                    client_name = client.get('client_name', 'Unknown')
-                    dob = client.get('dob', '')
-                    dos = client.get('date_of_service', '')
-                    if self.excel_client_data:
-                        for excel_client in self.excel_client_data:
-                            if (excel_client.get('client_name') == client_name and 
-                                excel_client.get('dob') == dob and 
-                                excel_client.get('date_of_service') == dos):
-                                insurance = excel_client.get('insurance')
-                                claim_status = excel_client.get('claim_status')
-                                break
-                    
-                    all_clients.append({
-                        'client_name': client_name,
-                        'dob': dob,
-                        'date_of_service': dos,
-                        'insurance': insurance or 'N/A',
-                        'claim_status': claim_status or 'N/A',
-                        'excel_row': 'N/A',
-                        'status': 'Not Refiled - ' + client.get('reason', 'Unknown'),
-                        'original_modifier': 'N/A',
-                        'new_modifier': 'N/A',
-                        'session_medium': 'N/A',
-                        'expected_modifier': 'N/A',
-                        'payer_claim_control': 'N/A',
-                        'modifier_action': 'N/A',
-                        'reason': client.get('reason', ''),
-                        'processing_date': time.strftime("%Y-%m-%d %H:%M:%S"),
-                        'error_message': ''
-                    })
-                for client in self.correct_modifier_clients:
-                    # Try to find insurance and claim status from excel_client_data
-                    insurance = None
-                    claim_status = None
-                    client_name = client.get('client_name', 'Unknown')
-                    dob = client.get('dob', '')
-                    dos = client.get('date_of_service', '')
-                    if self.excel_client_data:
-                        for excel_client in self.excel_client_data:
-                            if (excel_client.get('client_name') == client_name and 
-                                excel_client.get('dob') == dob and 
-                                excel_client.get('date_of_service') == dos):
-                                insurance = excel_client.get('insurance')
-                                claim_status = excel_client.get('claim_status')
-                                break
-                    
-                    all_clients.append({
-                        'client_name': client_name,
-                        'dob': dob,
-                        'date_of_service': dos,
-                        'insurance': insurance or 'N/A',
-                        'claim_status': claim_status or 'N/A',
-                        'excel_row': 'N/A',
-                        'status': 'Not Refiled - Modifier Correct',
-                        'original_modifier': 'N/A',
-                        'new_modifier': 'N/A',
-                        'session_medium': 'N/A',
-                        'expected_modifier': 'N/A',
-                        'payer_claim_control': 'N/A',
-                        'modifier_action': 'Already Correct',
-                        'reason': client.get('reason', 'Modifier was already correct, Not Resubmitted'),
-                        'processing_date': time.strftime("%Y-%m-%d %H:%M:%S"),
-                        'error_message': ''
-                    })
+                all_clients = self._legacy_output_rows(self.skipped_clients, self.correct_modifier_clients)
                 self.gui_log(f"Saving output Excel with {len(all_clients)} client(s) (legacy mode)...", level="INFO")
             else:
                 self.gui_log("No tracked clients to save", level="INFO")
                 return
             
-            # Determine output file path
-            if self.output_excel_path:
-                # Use user-selected path
-                output_file = Path(self.output_excel_path)
-                # Ensure directory exists
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-            else:
-                # Generate default filename based on input filename and timestamp
-                if self.selected_excel_path:
-                    input_file = Path(self.selected_excel_path)
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    output_file = input_file.parent / f"{input_file.stem}_output_{timestamp}.xlsx"
-                else:
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    output_file = Path(__file__).parent / f"tn_refiling_output_{timestamp}.xlsx"
+            output_file = self._output_excel_file()
             
             # Create DataFrame with comprehensive columns in a logical order
             df = pd.DataFrame(all_clients)
             
-            # Define column order for better readability
-            column_order = [
-                'excel_row',
-                'client_name',
-                'dob',
-                'date_of_service',
-                'insurance',
-                'claim_status',
-                'status',
-                'session_medium',
-                'expected_modifier',
-                'original_modifier',
-                'new_modifier',
-                'modifier_action',
-                'payer_claim_control',
-                'primary_policy',
-                'primary_policy_member_id',
-                'primary_policy_payment_match',
-                'processing_date',
-                'reason',
-                'error_message'
-            ]
-            
             # Reorder columns (only include columns that exist in the DataFrame)
-            existing_columns = [col for col in column_order if col in df.columns]
+            existing_columns = [col for col in self.OUTPUT_COLUMN_ORDER if col in df.columns]
             remaining_columns = [col for col in df.columns if col not in existing_columns]
             df = df[existing_columns + remaining_columns]
             
@@ -11108,7 +11699,7 @@ class TNRefilingBot:
             self.gui_log("Login process completed. Ready for processing.")
             
             # Enable Start Processing button after successful login
-            if self.root:
+            if self.root and self.worker_id is None:
                 self.root.after(0, self._enable_processing_button)
             
             return True
@@ -7,7 +7,7 @@
 #
 # Everything else left as-is.
 
-import os, sys, re, glob, time, traceback, importlib.util, datetime
+import os, sys, re, glob, time, traceback, importlib.util, datetime, contextlib
 
 # ---------------- UX helpers ----------------
 
@@ -564,7 +564,7 @@ def _install_intake_fallback(base):
 
     base.ensure_intake_if_missing = ensure_intake_if_missing
 
-# ---------------- Combiner (unchanged) ----------------
+# ---------------- Combiner ----------------
 
 def _install_combiner(base):
     try:
@@ -579,10 +579,12 @@ def _install_combiner(base):
     def _txt(pdf, max_pages=6):
         if not PdfReader: return ""
         try:
-            r = PdfReader(pdf); chunks=[]
-            for i in range(min(len(r.pages), max_pages)):
-                try: chunks.append(r.pages[i].extract_text() or "")
-                except Exception: break
+            # Read lazily from the file: only the first pages are touched
+            with open(pdf, "rb") as fh:
+                r = PdfReader(fh); chunks=[]
+                for i in range(min(len(r.pages), max_pages)):
+                    try: chunks.append(r.pages[i].extract_text() or "")
+                    except Exception: break
             return "\n".join(chunks).lower()
         except Exception:
             return ""
@@ -595,7 +597,7 @@ def _install_combiner(base):
             if _fuzzy_contains(hay, t, max_d=1): return True
         return False
 
-    def _bucket(p):
+    def _bucket(p, stats=None):
         base = os.path.basename(p).lower()
         m = re.match(r"^(\d{2})-", base)
         if m:
@@ -603,6 +605,7 @@ def _install_combiner(base):
             for k,(num,_) in BUCKET_META.items():
                 if int(num) == idx: return k
         base_spaced = base.replace("-", " ")
+        if stats is not None: stats["extractions"] = stats.get("extractions", 0) + 1
         text = _txt(p, max_pages=4)
         hay = f"{base}\n{base_spaced}\n{text}"
         for k in ["intake","progress","tp_contact","consult","consent","roi","safety","erf"]:
@@ -610,35 +613,63 @@ def _install_combiner(base):
         if _hit_local(KEY["sra"], hay): return "sra"
         return "other"
 
-    def _order_key(p):
+    def _file_key(p):
+        try:
+            st = os.stat(p)
+            return (os.path.abspath(p), st.st_size, st.st_mtime_ns)
+        except OSError:
+            return (os.path.abspath(p), None, None)
+
+    def _classifier(stats):
+        """Per-run bucket lookup: each PDF (path, size, mtime) is read and classified once."""
+        cache = {}
+        def classify(p):
+            key = _file_key(p)
+            b = cache.get(key)
+            if b is None:
+                b = cache[key] = _bucket(p, stats)
+                stats["classified"] = stats.get("classified", 0) + 1
+            return b
+        return classify
+
+    def _order_key(p, classify=_bucket):
         bn = os.path.basename(p).lower()
         m = re.match(r"^(\d{2})-", bn)
         if m: return (int(m.group(1)), bn)
-        b = _bucket(p)
+        b = classify(p)
         return (BUCKET_ORDER.get(b, 999), bn)
 
+    def _mtime(p):
+        try: return os.path.getmtime(p)
+        except OSError: return 0
+
     def combine(folder, out_pdf_path, report_path=None, order_report_path=None):
         if not PdfReader: return False, "pypdf/PyPDF2 missing"
         files=[]
         for root,_,fns in os.walk(folder):
             for fn in fns:
                 if fn.lower().endswith(".pdf"): files.append(os.path.join(root, fn))
-        intakes = [p for p in files if _bucket(p)=="intake"]
+        stats = {"classified": 0, "extractions": 0}
+        classify = _classifier(stats)
+        intakes = [p for p in files if classify(p)=="intake"]
         if intakes:
-            newest = max(intakes, key=lambda p: os.path.getmtime(p))
+            newest = max(intakes, key=_mtime)
             if not os.path.basename(newest).startswith("01-"):
-                newest = _safe_rename(newest, f"{BUCKET_META['intake'][0]}-{BUCKET_META['intake'][1]}")
+                renamed = _safe_rename(newest, f"{BUCKET_META['intake'][0]}-{BUCKET_META['intake'][1]}")
+                if renamed != newest:
+                    # The "01-" name classifies without reading the PDF again
+                    files = [renamed if p == newest else p for p in files]
+                    intakes = [renamed if p == newest else p for p in intakes]
         chosen={}; others=[]
         for p in files:
-            b = _bucket(p)
+            b = classify(p)
             if b in ONE_EACH:
                 prev = chosen.get(b)
-                mt = os.path.getmtime(p) if os.path.exists(p) else 0
-                if (not prev) or (mt > os.path.getmtime(prev)): chosen[b]=p
+                if (not prev) or (_mtime(p) > _mtime(prev)): chosen[b]=p
             else:
                 others.append(p)
         files = list(chosen.values()) + others
-        files.sort(key=_order_key)
+        files.sort(key=lambda p: _order_key(p, classify))
         if intakes:
             take=None
             for p in files:
@@ -651,16 +682,23 @@ def _install_combiner(base):
                     of.write("Combine Order (prefix → file)\n=============================\n")
                     for p in files: of.write(f"\n{os.path.basename(p)}")
             except Exception: pass
+        part_path = out_pdf_path + ".part"
         try:
             writer = PdfWriter()
-            for p in files:
-                r = PdfReader(p)
-                for i in range(len(r.pages)):
-                    writer.add_page(r.pages[i])
-            os.makedirs(os.path.dirname(out_pdf_path), exist_ok=True)
-            with open(out_pdf_path, "wb") as f:
-                writer.write(f)
+            # Sources are read lazily from open files instead of being loaded whole;
+            # handles stay open until the write because PyPDF2 copies pages late
+            with contextlib.ExitStack() as stack:
+                for p in files:
+                    r = PdfReader(stack.enter_context(open(p, "rb")))
+                    for i in range(len(r.pages)):
+                        writer.add_page(r.pages[i])
+                os.makedirs(os.path.dirname(out_pdf_path) or ".", exist_ok=True)
+                with open(part_path, "wb") as f:
+                    writer.write(f)
+            os.replace(part_path, out_pdf_path)
         except Exception as e:
+            try: os.remove(part_path)
+            except OSError: pass
             return False, {"failures":[("combine", str(e))]}
         if report_path:
             try:
@@ -668,9 +706,10 @@ def _install_combiner(base):
                     rf.write("Combine Report\n================\n")
                     rf.write(f"Output: {out_pdf_path}\n\nIncluded ({len(files)}):\n")
                     for p in files: rf.write(f"  - {p}\n")
+                    rf.write(f"\nClassified {stats['classified']} PDF(s) with {stats['extractions']} text extraction(s)\n")
             except Exception: pass
         ok = os.path.exists(out_pdf_path) and os.path.getsize(out_pdf_path) > 1024
-        return ok, {"failures": []}
+        return ok, {"failures": [], "classified": stats["classified"], "extractions": stats["extractions"]}
 
     base.combine = combine
 
@@ -21,6 +21,7 @@ import logging
 import threading
 import time
 import os
+import sys
 import json
 import csv
 from pathlib import Path
@@ -47,6 +48,17 @@ except ImportError:
     Image = None  # type: ignore
     OCR_AVAILABLE = False
 
+# Shared OCR/PDF-text cache (lives in the installation's _system folder)
+try:
+    sys.path.append(str(Path(__file__).resolve().parents[1]))  # _bots
+    from system_path import add_system_path
+    add_system_path()
+    from ocr_cache import get_ocr_cache  # type: ignore
+    OCR_CACHE_AVAILABLE = True
+except ImportError:
+    get_ocr_cache = None  # type: ignore
+    OCR_CACHE_AVAILABLE = False
+
 try:
     import pandas as pd  # type: ignore
     EXCEL_AVAILABLE = True
@@ -1247,40 +1259,55 @@ class DocumentParser:
     def _ocr_pdf(self, file_path: Path) -> str:
         if not self.ocr_available:
             raise RuntimeError("OCR requested but pytesseract is unavailable.")
-        from pdf2image import convert_from_path  # type: ignore[import-untyped]
-        pages = convert_from_path(file_path)
+        if OCR_CACHE_AVAILABLE:
+            # Page text is cached per (file content, page, DPI, config), so a
+            # document parsed again costs no OCR at all.
+            document = get_ocr_cache().document(file_path)
+            page_count = document.page_count()
+
+            def ocr_page(page_num: int, config: str = "") -> str:
+                return document.ocr_page(page_num, dpi=200, config=config)
+        else:
+            from pdf2image import convert_from_path  # type: ignore[import-untyped]
+            pages = convert_from_path(file_path)
+            page_count = len(pages)
+
+            def ocr_page(page_num: int, config: str = "") -> str:
+                if config:
+                    return pytesseract.image_to_string(pages[page_num - 1], config=config)
+                return pytesseract.image_to_string(pages[page_num - 1])
         # Try different OCR modes for better accuracy
         # PSM 12 = Sparse text with OSD (works best for structured tables like Molina Healthcare)
         # PSM 6 = Assume a single uniform block of text (good for tables)
         # PSM 11 = Sparse text (good for documents with mixed content)
         text_blobs = []
-        for page_num, page in enumerate(pages, 1):
+        for page_num in range(1, page_count + 1):
             try:
                 # For last page (where client data usually is), try PSM 12 first (best for structured tables)
-                if page_num == len(pages):
+                if page_num == page_count:
                     # Try PSM 12 first (sparse text with OSD - works great for Molina Healthcare format)
                     try:
-                        text = pytesseract.image_to_string(page, config='--psm 12')
+                        text = ocr_page(page_num, '--psm 12')
                         if len(text.strip()) > 100:  # If we got substantial text
                             text_blobs.append(text)
                         else:
                             raise ValueError("PSM 12 didn't produce enough text")
                     except Exception:
                         # Fallback to PSM 6 (uniform block - good for tables)
-                        text = pytesseract.image_to_string(page, config='--psm 6')
+                        text = ocr_page(page_num, '--psm 6')
                         if len(text.strip()) > 50:
                             text_blobs.append(text)
                         else:
                             # Fallback to PSM 4 (single column)
-                            text = pytesseract.image_to_string(page, config='--psm 4')
+                            text = ocr_page(page_num, '--psm 4')
                             text_blobs.append(text)
                 else:
                     # For other pages, use standard OCR
-                    text = pytesseract.image_to_string(page, config='--psm 11')
+                    text = ocr_page(page_num, '--psm 11')
                     text_blobs.append(text)
             except Exception:
                 # Fallback to default
-                text_blobs.append(pytesseract.image_to_string(page))
+                text_blobs.append(ocr_page(page_num))
         return "\n".join(text_blobs)
 
     @staticmethod
@@ -1576,6 +1603,106 @@ PRIMARY_PAYER_OPTIONS = [
 ]
 
 
+# Billing table bulk read: scrolls until the number of date links stops growing
+# (in-page, so no WebDriver round-trip per scroll), then returns every row in
+# one payload.  arguments: max scroll steps, pause between steps (ms).
+BILLING_SCRIPT_TIMEOUT = 60
+BILLING_MAX_SCROLLS = 50
+BILLING_SCROLL_PAUSE_MS = 300
+BILLING_ROWS_SCRIPT = r"""
+var done = arguments[arguments.length - 1];
+var maxScrolls = arguments[0], pauseMs = arguments[1];
+var DATE_LINK = "[data-testid='billingstatementtable-paymentdate-link']";
+var STATUS_KEYWORDS = ["Pending Resubmit", "Pending", "Submitted", "Paid", "Forwarded"];
+var AMOUNT = /\(?-?\$\s?-?[\d,]+\.\d{2}\)?/;
+
+function text(el) { return el ? (el.innerText || el.textContent || "").trim() : ""; }
+function first(row, selector) { return text(row.querySelector(selector)); }
+
+function scrollBox(el) {
+    for (var node = el && el.parentElement; node && node !== document.body; node = node.parentElement) {
+        var overflow = window.getComputedStyle(node).overflowY;
+        if ((overflow === "auto" || overflow === "scroll") && node.scrollHeight > node.clientHeight) {
+            return node;
+        }
+    }
+    return null;
+}
+
+function status(row) {
+    var value = first(row, "[data-testid='billingstatementtable-insurancestatus-container']")
+        || first(row, "[data-testid='billingstatementtable-batchclaimcreator-link']");
+    if (value) { return value; }
+    var actions = row.querySelectorAll("a.action-link");
+    for (var i = 0; i < actions.length; i++) {
+        var label = text(actions[i]);
+        if (label && label !== "View" && label !== "Edit") { return label; }
+    }
+    var rowText = text(row);
+    for (var k = 0; k < STATUS_KEYWORDS.length; k++) {
+        var keyword = STATUS_KEYWORDS[k];
+        if (rowText.indexOf(keyword) === -1) { continue; }
+        var escaped = keyword.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+        var match = rowText.match(new RegExp("\\b" + escaped + "(?:\\s+\\w+)?\\b"));
+        if (match) { return match[0].trim(); }
+    }
+    return "";
+}
+
+function amount(row) {
+    var cells = row.querySelectorAll("td");
+    for (var i = 0; i < cells.length; i++) {
+        var match = text(cells[i]).match(AMOUNT);
+        if (match) { return match[0]; }
+    }
+    return "";
+}
+
+function extract() {
+    var links = document.querySelectorAll(DATE_LINK), seen = [], rows = [];
+    for (var i = 0; i < links.length; i++) {
+        var row = links[i].closest("tr");
+        if (!row || seen.indexOf(row) !== -1) { continue; }
+        seen.push(row);
+        rows.push({
+            index: rows.length,
+            row_id: row.getAttribute("id") || row.getAttribute("data-testid") || "",
+            date: text(links[i]),
+            payer: first(row, "[data-testid='billingstatementtable-payer-link']"),
+            status: status(row),
+            amount: amount(row)
+        });
+    }
+    return rows;
+}
+
+var lastCount = -1, scrolls = 0;
+function step() {
+    try {
+        var links = document.querySelectorAll(DATE_LINK);
+        if ((links.length === lastCount && scrolls > 0) || scrolls >= maxScrolls) {
+            window.scrollTo(0, 0);
+            done({rows: extract(), scrolls: scrolls});
+            return;
+        }
+        lastCount = links.length;
+        if (links.length) {
+            var last = links[links.length - 1];
+            last.scrollIntoView({block: "end"});
+            var box = scrollBox(last);
+            if (box) { box.scrollTop = box.scrollHeight; }
+        } else {
+            window.scrollBy(0, 500);
+        }
+        scrolls++;
+        setTimeout(step, pauseMs);
+    } catch (e) {
+        done({error: String(e)});
+    }
+}
+step();
+"""
+
 class TherapyNotesClientFetcher:
     """Handles Selenium-based navigation to TherapyNotes."""
 
@@ -2053,6 +2180,108 @@ class TherapyNotesClientFetcher:
             f"[BILLING] Scanning transactions for {client.name} between {start_date} and {end_date}."
         )
 
+        rows = self._extract_billing_rows()
+        if rows is None:
+            self._log("[BILLING] Bulk extraction unavailable - reading rows element by element.")
+            results = self._fetch_billing_rows_per_element(
+                client, start_date, end_date, payer_filters_norm, status_filters_norm
+            )
+        else:
+            results = []
+            for row in rows:
+                entry = self._billing_row_to_entry(
+                    client, row, start_date, end_date, payer_filters_norm, status_filters_norm
+                )
+                if entry:
+                    results.append(entry)
+
+        self._log(
+            f"[BILLING] Collected {len(results)} transactions for {client.name} within {start_date} - {end_date}."
+        )
+        return results
+
+    def _extract_billing_rows(self) -> Optional[List[Dict[str, Any]]]:
+        """Load and read the whole billing table with a single in-page script.
+
+        The script scrolls until the number of date links stops growing, then
+        returns one dict per table row (date, payer, status, amount, row_id).
+        Returns None if the script fails so the caller can fall back to
+        element-by-element extraction.
+        """
+        try:
+            self.driver.set_script_timeout(BILLING_SCRIPT_TIMEOUT)
+            result = self.driver.execute_async_script(
+                BILLING_ROWS_SCRIPT, BILLING_MAX_SCROLLS, BILLING_SCROLL_PAUSE_MS
+            )
+        except Exception as e:
+            self._log(f"[BILLING][WARN] Bulk billing table read failed: {e}")
+            return None
+        if not isinstance(result, dict) or not isinstance(result.get("rows"), list):
+            error = result.get("error") if isinstance(result, dict) else result
+            self._log(f"[BILLING][WARN] Bulk billing table read returned no rows: {error}")
+            return None
+        rows = result["rows"]
+        self._log(
+            f"[BILLING] Read {len(rows)} billing rows in one script call "
+            f"({result.get('scrolls', 0)} scroll step(s))."
+        )
+        return rows
+
+    def _billing_row_to_entry(
+        self,
+        client: ClientMetadata,
+        row: Dict[str, Any],
+        start_date: date,
+        end_date: date,
+        payer_filters_norm: List[str],
+        status_filters_norm: List[str]
+    ) -> Optional[ServiceEntry]:
+        """Apply the date, payer and status filters to one bulk-extracted billing row."""
+        raw_date = (row.get("date") or "").strip()
+        if not raw_date:
+            return None
+
+        normalized_date = DocumentParser._normalize_date(raw_date)
+        if not normalized_date:
+            self._log(f"[BILLING] Skipping row with unrecognized date '{raw_date}'.")
+            return None
+
+        dt = DocumentParser._to_datetime(normalized_date)
+        if not dt:
+            self._log(f"[BILLING] Unable to parse date '{normalized_date}'.")
+            return None
+
+        if dt.date() < start_date or dt.date() > end_date:
+            return None
+
+        payer_text = (row.get("payer") or "").strip()
+        if payer_filters_norm and payer_text.lower() not in payer_filters_norm:
+            return None
+
+        status_text = (row.get("status") or "").strip()
+        if status_filters_norm and status_text.lower() not in status_filters_norm:
+            return None
+
+        self._log(
+            f"[BILLING] Captured DOS {dt.strftime('%m/%d/%Y')} | payer='{payer_text}' status='{status_text}'."
+        )
+        return ServiceEntry(
+            client_name=client.name,
+            client_dob=client.dob,
+            service_date=dt,
+            service_type=payer_text,
+            notes=status_text
+        )
+
+    def _fetch_billing_rows_per_element(
+        self,
+        client: ClientMetadata,
+        start_date: date,
+        end_date: date,
+        payer_filters_norm: List[str],
+        status_filters_norm: List[str]
+    ) -> List[ServiceEntry]:
+        """Fallback extraction that reads each billing row through individual WebDriver calls."""
         # Wait a moment to ensure the table is fully loaded after filter application
         time.sleep(0.5)
         
@@ -2238,9 +2467,6 @@ class TherapyNotesClientFetcher:
                 else:
                     break
 
-        self._log(
-            f"[BILLING] Collected {len(results)} transactions for {client.name} within {start_date} - {end_date}."
-        )
         return results
 
     def _scroll_to_load_all_rows(self) -> None:
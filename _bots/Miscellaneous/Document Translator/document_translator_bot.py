@@ -46,6 +46,25 @@ except ImportError:
     PDF2IMAGE_AVAILABLE = False
     convert_from_path = None
 
+# Try to import the shared OCR/PDF-text cache (optional - lives in the installation's _system folder)
+try:
+    sys.path.append(str(Path(__file__).resolve().parents[2]))  # _bots
+    from system_path import add_system_path
+    add_system_path()
+    from ocr_cache import get_ocr_cache
+    OCR_CACHE_AVAILABLE = True
+except ImportError:
+    OCR_CACHE_AVAILABLE = False
+    get_ocr_cache = None
+
+# Try to import the shared translation memory (optional - same _system folder as the OCR cache)
+try:
+    from translation_memory import DeepTranslatorEngine, TranslationService, get_translation_memory
+    TRANSLATION_MEMORY_AVAILABLE = True
+except ImportError:
+    TRANSLATION_MEMORY_AVAILABLE = False
+    DeepTranslatorEngine = TranslationService = get_translation_memory = None
+
 # Try to import Word document reading
 try:
     from docx import Document
@@ -670,33 +689,49 @@ class DocumentTranslatorBot:
                         poppler_path = str(candidate)
                         break
             
-            # Use higher DPI for better OCR accuracy (400 DPI for high quality)
-            self.gui_log("   Converting PDF to high-resolution images (400 DPI)...")
-            images = convert_from_path(str(file_path), poppler_path=poppler_path, dpi=400)
-            self.gui_log(f"   Converted {len(images)} pages to images")
+            if OCR_CACHE_AVAILABLE:
+                # Pages are rendered (400 DPI) and OCR'd only on a cache miss;
+                # the same file translated again reuses the stored page text.
+                document = get_ocr_cache().document(file_path)
+                page_count = document.page_count()
+                self.gui_log(f"   {page_count} page(s) - using shared OCR cache (400 DPI)")
+                
+                def ocr_page(page_num, config=""):
+                    return document.ocr_page(page_num, dpi=400, config=config, poppler_path=poppler_path)
+            else:
+                # Use higher DPI for better OCR accuracy (400 DPI for high quality)
+                self.gui_log("   Converting PDF to high-resolution images (400 DPI)...")
+                images = convert_from_path(str(file_path), poppler_path=poppler_path, dpi=400)
+                page_count = len(images)
+                self.gui_log(f"   Converted {len(images)} pages to images")
+                
+                def ocr_page(page_num, config=""):
+                    if config:
+                        return pytesseract.image_to_string(images[page_num - 1], config=config)
+                    return pytesseract.image_to_string(images[page_num - 1])
             
             # Enhanced OCR configuration for better accuracy
             # PSM 6: Assume uniform block of text (best for documents)
             # PSM 3: Fully automatic page segmentation (fallback)
             ocr_config = '--psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,;:!?()[]{}\'"-+=*/%$#@&_|\\<>/~` '
             
-            for page_num, img in enumerate(images, 1):
-                self.gui_log(f"   Processing page {page_num}/{len(images)} with OCR...")
+            for page_num in range(1, page_count + 1):
+                self.gui_log(f"   Processing page {page_num}/{page_count} with OCR...")
                 
                 # Try PSM 6 first (uniform block), fallback to PSM 3 (auto)
                 try:
-                    page_text = pytesseract.image_to_string(img, config=ocr_config)
+                    page_text = ocr_page(page_num, ocr_config)
                     if not page_text.strip():
                         # Fallback to automatic page segmentation
                         self.gui_log(f"      Trying alternative OCR mode for page {page_num}...")
-                        page_text = pytesseract.image_to_string(img, config='--psm 3')
+                        page_text = ocr_page(page_num, '--psm 3')
                 except Exception as e:
                     self.gui_log(f"      Warning: OCR config issue on page {page_num}, using default: {e}")
-                    page_text = pytesseract.image_to_string(img)
+                    page_text = ocr_page(page_num)
                 
                 text += f"\n[Page {page_num}]\n{page_text}\n"
             
-            self.gui_log(f"✅ OCR completed: {len(text)} characters extracted from {len(images)} pages")
+            self.gui_log(f"✅ OCR completed: {len(text)} characters extracted from {page_count} pages")
             return text
             
         except Exception as e:
@@ -1061,47 +1096,11 @@ class DocumentTranslatorBot:
             chunks = smart_chunk(protected_text)
             self.gui_log(f"   Split text into {len(chunks)} intelligent chunks for better translation quality")
             
-            translated_chunks = []
-            translator_used = None
-            
-            # Try multiple translation engines with fallback
-            translation_engines = []
-            if 'google' in TRANSLATORS:
-                translation_engines.append(('Google Translate', TRANSLATORS['google']))
-            if 'deepl' in TRANSLATORS:
-                translation_engines.append(('DeepL', TRANSLATORS['deepl']))
-            if 'microsoft' in TRANSLATORS:
-                translation_engines.append(('Microsoft Translator', TRANSLATORS['microsoft']))
-            
-            if not translation_engines:
-                raise Exception("No translation engines available")
-            
-            # Use first available engine
-            engine_name, TranslatorClass = translation_engines[0]
-            translator_used = engine_name
-            self.gui_log(f"   Using {engine_name} for translation")
-            
-            for i, chunk in enumerate(chunks):
-                self.gui_log(f"   Translating chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
-                
-                try:
-                    translator = TranslatorClass(source='auto', target=target_lang_code)
-                    translated = translator.translate(chunk)
-                    translated_chunks.append(translated)
-                except Exception as e:
-                    # Try fallback engine if available
-                    if len(translation_engines) > 1:
-                        self.gui_log(f"      {engine_name} failed, trying fallback...")
-                        fallback_name, FallbackClass = translation_engines[1]
-                        try:
-                            translator = FallbackClass(source='auto', target=target_lang_code)
-                            translated = translator.translate(chunk)
-                            translated_chunks.append(translated)
-                            translator_used = fallback_name
-                        except:
-                            raise Exception(f"Translation failed with all engines: {str(e)}")
-                    else:
-                        raise Exception(f"Translation failed: {str(e)}")
+            if TRANSLATION_MEMORY_AVAILABLE:
+                # Translation memory: only chunks not translated before are sent, several at a time
+                translated_chunks, translator_used = self._translate_chunks(chunks, target_lang_code)
+            else:
+                translated_chunks, translator_used = self._translate_chunks_sequential(chunks, target_lang_code)
             
             # Join chunks with proper spacing - preserve original paragraph structure
             # Use original text structure to determine spacing
@@ -1134,6 +1133,100 @@ class DocumentTranslatorBot:
         except Exception as e:
             raise Exception(f"Translation failed: {str(e)}")
     
+    def _translation_engine_names(self, keys=('google', 'deepl', 'microsoft')):
+        """Available engine keys in fallback order"""
+        names = [key for key in keys if key in TRANSLATORS]
+        if not names:
+            raise Exception("No translation engines available")
+        return names
+
+    def _translation_service(self, keys=('google', 'deepl', 'microsoft')):
+        """Translation service (memory + concurrent requests) for these engines, built once per bot"""
+        names = tuple(self._translation_engine_names(keys))
+        services = getattr(self, '_translation_services', None)
+        if services is None:
+            services = self._translation_services = {}
+        if names not in services:
+            engines = [DeepTranslatorEngine(name, TRANSLATORS[name]) for name in names]
+            services[names] = TranslationService(engines, get_translation_memory())
+        return services[names]
+
+    def _translate_chunks(self, chunks, target_lang_code):
+        """Translate chunks through the translation memory; returns (translated chunks, engine label)"""
+        import re
+
+        service = self._translation_service()
+        self.gui_log(f"   Using {service.primary.label} for translation")
+
+        # Number placeholders are numbered across the whole document; renumber them per
+        # chunk so the same paragraph in another letter hits the same memory entry
+        placeholder = re.compile(r'__PROTECTED_([A-Z]+)_(\d+)__')
+        keyed_chunks = []
+        restore_maps = []
+        for chunk in chunks:
+            local = {}
+
+            def renumber(match, local=local):
+                key = f"__PROTECTED_{match.group(1)}_{len(local)}__"
+                original = match.group(0)
+                for existing_key, existing in local.items():
+                    if existing == original:
+                        return existing_key
+                local[key] = original
+                return key
+
+            keyed_chunks.append(placeholder.sub(renumber, chunk))
+            restore_maps.append(local)
+
+        service.engines_used = {}
+        translated = service.translate_many(
+            keyed_chunks,
+            target_lang_code,
+            on_progress=lambda done, total: self.gui_log(f"   Translated chunk {done}/{total}..."),
+        )
+        self.gui_log(f"   Translation memory: {service.last_hits} chunk(s) reused, {service.last_sent} sent")
+
+        translated_chunks = [
+            placeholder.sub(lambda match, local=local: local.get(match.group(0), match.group(0)), text)
+            for text, local in zip(translated, restore_maps)
+        ]
+        used = [engine.label for engine in service.engines if engine.name in service.engines_used]
+        return translated_chunks, ", ".join(used) or service.primary.label
+
+    def _translate_chunks_sequential(self, chunks, target_lang_code):
+        """Translate chunks one by one without the translation memory; returns (translated chunks, engine label)"""
+        labels = {'google': 'Google Translate', 'deepl': 'DeepL', 'microsoft': 'Microsoft Translator'}
+        translation_engines = [(labels[name], TRANSLATORS[name]) for name in self._translation_engine_names()]
+
+        # Use first available engine
+        engine_name, TranslatorClass = translation_engines[0]
+        translator_used = engine_name
+        self.gui_log(f"   Using {engine_name} for translation")
+        translator = TranslatorClass(source='auto', target=target_lang_code)
+        fallback = None
+
+        translated_chunks = []
+        for i, chunk in enumerate(chunks):
+            self.gui_log(f"   Translating chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
+
+            try:
+                translated_chunks.append(translator.translate(chunk))
+            except Exception as e:
+                # Try fallback engine if available
+                if len(translation_engines) > 1:
+                    self.gui_log(f"      {engine_name} failed, trying fallback...")
+                    fallback_name, FallbackClass = translation_engines[1]
+                    try:
+                        if fallback is None:
+                            fallback = FallbackClass(source='auto', target=target_lang_code)
+                        translated_chunks.append(fallback.translate(chunk))
+                        translator_used = fallback_name
+                    except:
+                        raise Exception(f"Translation failed with all engines: {str(e)}")
+                else:
+                    raise Exception(f"Translation failed: {str(e)}")
+        return translated_chunks, translator_used
+
     def _save_translated_pdf(self, text, output_path):
         """Save translated text as PDF with layout preservation"""
         # Try to preserve layout using PyMuPDF if available
@@ -1325,22 +1418,29 @@ class DocumentTranslatorBot:
             pages_blocks[page_num].append(block)
         
         # Get translation engine
-        translation_engines = []
-        if 'google' in TRANSLATORS:
-            translation_engines.append(('Google Translate', TRANSLATORS['google']))
-        if 'deepl' in TRANSLATORS:
-            translation_engines.append(('DeepL', TRANSLATORS['deepl']))
-        
-        if not translation_engines:
-            raise Exception("No translation engines available")
-        
-        engine_name, TranslatorClass = translation_engines[0]
-        translator = TranslatorClass(source='auto', target=target_lang_code)
+        engine_names = self._translation_engine_names(('google', 'deepl'))
         
         # Process each page
         total_blocks = len(self.pdf_text_blocks)
         block_count = 0
         
+        translations = {}
+        if TRANSLATION_MEMORY_AVAILABLE:
+            # Translate every block up front: repeated blocks come from the translation
+            # memory and the rest are sent several at a time instead of one by one
+            block_texts = [block["text"].strip() for block in self.pdf_text_blocks if block["text"].strip()]
+            service = self._translation_service(tuple(engine_names))
+            results = service.translate_many(
+                block_texts,
+                target_lang_code,
+                strict=False,
+                on_progress=lambda done, total: done % 10 == 0 and self.gui_log(f"   Translated {done}/{total} blocks..."),
+            )
+            translations = dict(zip(block_texts, results))
+            self.gui_log(f"   Translation memory: {service.last_hits} block(s) reused, {service.last_sent} sent")
+        else:
+            translator = TRANSLATORS[engine_names[0]](source='auto', target=target_lang_code)
+        
         for page_num in sorted(pages_blocks.keys()):
             if page_num >= len(original_doc):
                 continue
@@ -1362,12 +1462,17 @@ class DocumentTranslatorBot:
                     continue
                 
                 block_count += 1
-                if block_count % 10 == 0:
-                    self.gui_log(f"   Translated {block_count}/{total_blocks} blocks...")
                 
                 try:
-                    # Translate this block individually
-                    translated_block_text = translator.translate(original_block_text)
+                    if TRANSLATION_MEMORY_AVAILABLE:
+                        translated_block_text = translations.get(original_block_text)
+                        if translated_block_text is None:
+                            raise Exception("no engine could translate this block")
+                    else:
+                        if block_count % 10 == 0:
+                            self.gui_log(f"   Translated {block_count}/{total_blocks} blocks...")
+                        # Translate this block individually
+                        translated_block_text = translator.translate(original_block_text)
                     
                     # Render at exact position
                     self._render_text_block_precise(new_page, block, translated_block_text)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Translation Jobs - background job queue for the web translator
+
+A submitted document becomes a job that a fixed pool of worker threads runs,
+so an upload request returns right away instead of holding the HTTP request
+open through extraction, OCR and translation.  Each job keeps a numbered
+event log (progress percent + message) that the web app streams to the
+browser as Server-Sent Events; a client that reconnects resumes from the
+last event it saw.
+
+Every job owns a folder under the store directory for its upload and
+output.  The upload is deleted when the job finishes; finished jobs and
+their output are removed after ``ttl_seconds``.
+
+Usage:
+    jobs = JobQueue(store_dir, workers=2, ttl_seconds=3600)
+    job = jobs.submit(run_translation, filename="letter.pdf", language="Spanish")
+    for event in jobs.events(job.id):
+        ...
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_TTL_SECONDS = 60 * 60
+# How often expired jobs are looked for
+CLEANUP_INTERVAL = 60.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "error"
+FINISHED_STATES = (DONE, FAILED)
+
+
+@dataclass
+class JobEvent:
+    seq: int
+    status: str
+    progress: int
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seq": self.seq, "status": self.status, "progress": self.progress, "message": self.message}
+
+
+@dataclass
+class Job:
+    """One document translation; ``work_dir`` holds its upload and output."""
+
+    id: str
+    work_dir: Path
+    filename: str = ""
+    language: str = ""
+    status: str = QUEUED
+    progress: int = 0
+    message: str = "Waiting for a free worker..."
+    error: str = ""
+    input_path: Optional[Path] = None
+    output_path: Optional[Path] = None
+    output_filename: str = ""
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    events: List[JobEvent] = field(default_factory=list)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "language": self.language,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "output_filename": self.output_filename if self.status == DONE else "",
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """Runs submitted jobs on a bounded worker pool and keeps their progress (thread-safe)."""
+
+    def __init__(self, store_dir: Path, workers: int = DEFAULT_WORKERS, ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, int(workers))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="translation-job")
+        self._jobs: Dict[str, Job] = {}
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._cleaner = threading.Thread(target=self._cleanup_loop, name="translation-job-cleanup", daemon=True)
+        self._cleaner.start()
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+    def create(self, filename: str = "", language: str = "") -> Job:
+        """Register a job and its folder; the caller stores the upload before :meth:`start`."""
+        job_id = uuid.uuid4().hex
+        work_dir = self.store_dir / job_id
+        work_dir.mkdir(parents=True)
+        job = Job(id=job_id, work_dir=work_dir, filename=filename, language=language)
+        with self._changed:
+            self._jobs[job_id] = job
+            self._record(job)
+        return job
+
+    def start(self, job: Job, run: Callable[[Job, Callable[[int, str], None]], None]) -> Job:
+        """Queue ``run(job, report)``; ``report(percent, message)`` publishes progress."""
+        self._pool.submit(self._run, job, run)
+        return job
+
+    def submit(self, run: Callable[[Job, Callable[[int, str], None]], None], filename: str = "", language: str = "") -> Job:
+        return self.start(self.create(filename, language), run)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def events(self, job_id: str, after: int = 0, heartbeat: float = 15.0) -> Iterator[Optional[JobEvent]]:
+        """Yield the job's events after sequence number ``after`` until it finishes.
+
+        ``None`` is yielded when nothing happened for ``heartbeat`` seconds,
+        so the caller can keep an idle connection alive.
+        """
+        while True:
+            with self._changed:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                pending = [event for event in job.events if event.seq > after]
+                if not pending:
+                    if job.is_finished:
+                        return
+                    self._changed.wait(heartbeat)
+                    pending = [event for event in job.events if event.seq > after]
+            if not pending:
+                yield None
+                continue
+            for event in pending:
+                after = event.seq
+                yield event
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and worker utilization for the health check."""
+        with self._changed:
+            queued = sum(1 for job in self._jobs.values() if job.status == QUEUED)
+            running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+            finished = sum(1 for job in self._jobs.values() if job.is_finished)
+        return {
+            "queue_depth": queued,
+            "running": running,
+            "workers": self.workers,
+            "worker_utilization": round(running / self.workers, 2),
+            "finished_jobs_stored": finished,
+            "job_ttl_seconds": self.ttl_seconds,
+        }
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _run(self, job: Job, run: Callable[[Job, Callable[[int, str], None]], None]) -> None:
+        def report(percent: int, message: str) -> None:
+            self._update(job, progress=percent, message=message)
+
+        self._update(job, status=RUNNING, started=time.time(), message="Starting...")
+        try:
+            run(job, report)
+        except Exception as exc:
+            LOGGER.exception("Translation job %s failed", job.id)
+            self._update(job, status=FAILED, error=str(exc) or exc.__class__.__name__,
+                         message=str(exc) or "Translation failed", finished=time.time())
+        else:
+            if job.output_path is None or not Path(job.output_path).exists():
+                self._update(job, status=FAILED, error="No output file was produced",
+                             message="No output file was produced", finished=time.time())
+            else:
+                self._update(job, status=DONE, progress=100, message="Translation complete", finished=time.time())
+        finally:
+            # Only the translated file is kept for download
+            if job.input_path is not None:
+                try:
+                    Path(job.input_path).unlink()
+                except OSError:
+                    pass
+
+    def _update(self, job: Job, **changes: Any) -> None:
+        with self._changed:
+            if "progress" in changes:
+                # Progress never goes backwards, even when stages report out of order
+                changes["progress"] = max(job.progress, min(100, int(changes["progress"])))
+            for name, value in changes.items():
+                setattr(job, name, value)
+            self._record(job)
+
+    def _record(self, job: Job) -> None:
+        # Caller holds self._changed
+        job.events.append(JobEvent(len(job.events) + 1, job.status, job.progress, job.message))
+        self._changed.notify_all()
+
+    def _cleanup_loop(self) -> None:
+        while not self._stop.wait(CLEANUP_INTERVAL):
+            self.cleanup()
+
+    def cleanup(self) -> int:
+        """Drop finished jobs older than the TTL, with their files; returns how many were removed."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._changed:
+            expired = [job for job in self._jobs.values() if job.is_finished and (job.finished or 0) <= cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+        if expired:
+            LOGGER.info("Removed %s expired translation job(s)", len(expired))
+        return len(expired)
+
+
+__all__ = ["DONE", "FAILED", "Job", "JobEvent", "JobQueue", "QUEUED", "RUNNING"]
@@ -4,10 +4,12 @@ Document Translator Web Application
 Web interface for document translation service
 """
 
-from flask import Flask, render_template, request, send_file, jsonify, flash, redirect, url_for, Response
+from flask import Flask, render_template, request, send_file, jsonify, flash, redirect, url_for, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 import os
+import re
+import json
 import tempfile
 from pathlib import Path
 import sys
@@ -34,12 +36,22 @@ try:
 except ImportError:
     PYMUPDF_AVAILABLE = False
 
+from translation_jobs import JobQueue
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
 app.config['MAX_CONTENT_LENGTH'] = 200 * 1024 * 1024  # 200MB max file size (increased for large files)
 app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp()
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Don't cache files
 
+# Translations run on background workers; uploads and outputs live in per-job folders
+# that are removed TRANSLATOR_JOB_TTL_MINUTES after the job finishes
+JOBS = JobQueue(
+    Path(app.config['UPLOAD_FOLDER']) / 'jobs',
+    workers=int(os.environ.get('TRANSLATOR_WORKERS', '2')),
+    ttl_seconds=float(os.environ.get('TRANSLATOR_JOB_TTL_MINUTES', '60')) * 60,
+)
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
 
@@ -100,284 +112,268 @@ def index():
     """Main page"""
     return render_template('index.html', languages=sorted(LANGUAGES.keys()))
 
+def _wants_json():
+    """True for the page's fetch() calls, which ask for JSON instead of redirects"""
+    return request.accept_mimetypes.best == 'application/json'
+
+def _reject(message, category='error', status=400):
+    """Report a problem with the submitted form"""
+    if _wants_json():
+        return jsonify({'error': message}), status
+    flash(message, category)
+    return redirect(url_for('index'))
+
+def _print_error(title):
+    print("=" * 70)
+    print(f"{title}:")
+    print("=" * 70)
+    traceback.print_exc()
+    print("=" * 70)
+
+def _friendly_error(error_details):
+    """User-facing message for an unexpected translation error"""
+    lowered = error_details.lower()
+    if "tkinter" in lowered or "gui" in lowered:
+        return 'Server error: Please restart the server and try again.'
+    if "translation" in lowered or "google" in lowered or "api" in lowered:
+        return 'Translation service error. Please check your internet connection.'
+    if "file" in lowered or "not found" in lowered:
+        return 'File processing error. Please try a different file.'
+    return f'Error: {error_details[:150]}'
+
+# Progress lines the translator logs while it works ("Translated chunk 3/12...", "Translating chunk 3/12", "Translated 40/120 blocks...")
+_TRANSLATED_COUNT = re.compile(r'Translat(?:ed|ing) (?:chunk )?(\d+)/(\d+)')
+
 @app.route('/translate', methods=['GET', 'POST'])
 def translate():
-    """Handle document translation (POST) or redirect (GET)"""
+    """Queue a document translation (POST) or redirect (GET)"""
     if request.method == 'GET':
         # If someone tries to access /translate directly, redirect to home
         flash('Please use the form on the home page to translate documents.', 'info')
         return redirect(url_for('index'))
     
-    # Handle POST request
+    # Check if file was uploaded
+    if 'file' not in request.files:
+        return _reject('No file uploaded')
+    
+    file = request.files['file']
+    language = request.form.get('language')
+    
+    if file.filename == '':
+        return _reject('No file selected')
+    
+    if not language or language not in LANGUAGES:
+        return _reject('Please select a target language')
+    
+    if not allowed_file(file.filename):
+        return _reject('Invalid file type. Please upload PDF, Word, or text files only.')
+    
+    filename = secure_filename(file.filename)
+    file_ext = Path(filename).suffix
+    lang_code = LANGUAGES[language]
+    
+    # Check if user provided custom filename
+    custom_filename = request.form.get('outputFilename', '').strip()
+    if custom_filename:
+        # Use custom filename, but ensure it has the correct extension
+        if not custom_filename.endswith(file_ext):
+            output_filename = custom_filename + file_ext
+        else:
+            output_filename = custom_filename
+        # Sanitize filename
+        output_filename = secure_filename(output_filename)
+    else:
+        # Auto-generate filename
+        output_filename = f"{Path(filename).stem}_{lang_code}{file_ext}"
+    
+    # Save uploaded file into the job's own folder (the output goes in a subfolder,
+    # so a custom output name equal to the upload name cannot overwrite it)
+    job = JOBS.create(filename=filename, language=language)
+    job.input_path = job.work_dir / filename
+    job.output_path = job.work_dir / "output" / output_filename
+    job.output_filename = output_filename
+    file.save(str(job.input_path))
+    JOBS.start(job, _run_translation_job)
+    
+    if not _wants_json():
+        return redirect(url_for('job_status', job_id=job.id))
+    return jsonify({
+        'job_id': job.id,
+        'status_url': url_for('job_status', job_id=job.id),
+        'events_url': url_for('job_events', job_id=job.id),
+        'download_url': url_for('job_download', job_id=job.id),
+    }), 202
+
+def _run_translation_job(job, report):
+    """Translation pipeline, run by a job worker: read, translate, save"""
+    input_path = str(job.input_path)
+    output_path = str(job.output_path)
+    job.output_path.parent.mkdir(parents=True, exist_ok=True)
+    file_ext_lower = Path(job.filename).suffix.lower()
+    
+    file_size_mb = os.path.getsize(input_path) / (1024 * 1024)
+    if file_size_mb > 50:
+        report(1, f'Large file ({file_size_mb:.1f}MB). Processing may take several minutes.')
+    
+    translator = None
     try:
-        translator = None
-        # Check if file was uploaded
-        if 'file' not in request.files:
-            flash('No file uploaded', 'error')
-            return redirect(url_for('index'))
-        
-        file = request.files['file']
-        language = request.form.get('language')
-        
-        if file.filename == '':
-            flash('No file selected', 'error')
-            return redirect(url_for('index'))
-        
-        if not language or language not in LANGUAGES:
-            flash('Please select a target language', 'error')
-            return redirect(url_for('index'))
+        # Import the translator class and create a headless instance
+        from document_translator_bot import DocumentTranslatorBot
         
-        if not allowed_file(file.filename):
-            flash('Invalid file type. Please upload PDF, Word, or text files only.', 'error')
-            return redirect(url_for('index'))
+        try:
+            translator = DocumentTranslatorBot()
+            
+            # Hide the GUI window (headless mode)
+            try:
+                translator.root.withdraw()
+            except:
+                pass  # GUI might not be available in web context
+        except Exception as init_err:
+            _print_error("ERROR INITIALIZING TRANSLATOR")
+            raise Exception(f'Error initializing translator: {str(init_err)[:100]}')
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        input_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(input_path)
+        # Forward the translator's progress lines to the job; print only important messages
+        stage = {'start': 30, 'span': 60}
+        def job_log(msg):
+            match = _TRANSLATED_COUNT.search(msg)
+            if match and int(match.group(2)):
+                done, total = int(match.group(1)), int(match.group(2))
+                report(stage['start'] + stage['span'] * done // total, f'Translating... {done}/{total}')
+            elif any(keyword in msg.lower() for keyword in ['error', 'failed', 'complete', 'success']):
+                print(f"[WEB] {msg}")
+        translator.gui_log = job_log
         
-        # Create output filename
-        file_ext = Path(filename).suffix
-        lang_code = LANGUAGES[language]
+        # Set paths and language
+        translator.input_file_path = input_path
+        translator.output_file_path = output_path
+        translator.language_var.set(job.language)
         
-        # Check if user provided custom filename
-        custom_filename = request.form.get('outputFilename', '').strip()
-        if custom_filename:
-            # Use custom filename, but ensure it has the correct extension
-            if not custom_filename.endswith(file_ext):
-                output_filename = custom_filename + file_ext
+        # Read document
+        report(5, 'Reading document...')
+        try:
+            if file_ext_lower == '.pdf':
+                text = translator._read_pdf(input_path)
+            elif file_ext_lower in ['.docx', '.doc']:
+                text = translator._read_docx(input_path)
+                # Check if Word document structure was captured
+                has_structure = hasattr(translator, 'docx_structure') and translator.docx_structure
+                if not has_structure:
+                    print("[WEB] Warning: Word document structure not fully captured, using simple mode")
+            elif file_ext_lower == '.txt':
+                text = translator._read_text_file(input_path)
             else:
-                output_filename = custom_filename
-            # Sanitize filename
-            output_filename = secure_filename(output_filename)
-        else:
-            # Auto-generate filename
-            output_filename = f"{Path(filename).stem}_{lang_code}{file_ext}"
-        
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
+                raise Exception('Unsupported file type')
+        except Exception as read_err:
+            _print_error("ERROR READING DOCUMENT")
+            raise Exception(f'Error reading document: {str(read_err)[:100]}')
         
-        # Check file size and warn if very large
-        file_size = os.path.getsize(input_path)
-        file_size_mb = file_size / (1024 * 1024)
+        if not text or not text.strip():
+            raise Exception('No text could be extracted from the document')
         
-        if file_size_mb > 50:
-            flash(f'Large file detected ({file_size_mb:.1f}MB). Processing may take several minutes. Please be patient.', 'info')
+        target_lang_code = LANGUAGES[job.language]
+        report(30, 'Translating...')
         
-        # Import the translator class and create a headless instance
+        # Translate
         try:
-            from document_translator_bot import DocumentTranslatorBot
-            
-            # Create translator instance (with error handling for Tkinter)
-            try:
-                translator = DocumentTranslatorBot()
+            if file_ext_lower == '.pdf' and PYMUPDF_AVAILABLE and hasattr(translator, 'pdf_text_blocks') and translator.pdf_text_blocks:
+                # Use block-by-block translation for PDFs (translation and saving in one step)
+                stage['span'] = 65
+                translator._translate_pdf_blocks(target_lang_code, output_path)
+            else:
+                # Translate text normally
+                translated_text = translator._translate_text(text, target_lang_code)
+                report(90, 'Creating translated document...')
                 
-                # Hide the GUI window (headless mode)
-                try:
-                    translator.root.withdraw()
-                except:
-                    pass  # GUI might not be available in web context
-            except Exception as init_err:
-                print("=" * 70)
-                print("ERROR INITIALIZING TRANSLATOR:")
-                print("=" * 70)
-                traceback.print_exc()
-                print("=" * 70)
-                flash(f'Error initializing translator: {str(init_err)[:100]}', 'error')
-                return redirect(url_for('index'))
-            
-            # Disable GUI logging for web (reduce overhead for large files)
-            if hasattr(translator, 'gui_log'):
-                original_gui_log = translator.gui_log
-                def quiet_log(msg):
-                    # Only log important messages to reduce overhead
-                    if any(keyword in msg.lower() for keyword in ['error', 'failed', 'complete', 'success']):
-                        print(f"[WEB] {msg}")
-                translator.gui_log = quiet_log
-            
-            # Set paths and language
-            translator.input_file_path = input_path
-            translator.output_file_path = output_path
-            translator.language_var.set(language)
-            
-            # Read and translate document
-            file_ext_lower = file_ext.lower()
-            
-            try:
+                # Save translated document
                 if file_ext_lower == '.pdf':
-                    text = translator._read_pdf(input_path)
+                    translator._save_translated_pdf(translated_text, output_path)
                 elif file_ext_lower in ['.docx', '.doc']:
-                    text = translator._read_docx(input_path)
-                    # Check if Word document structure was captured
-                    has_structure = hasattr(translator, 'docx_structure') and translator.docx_structure
-                    if not has_structure:
-                        print("[WEB] Warning: Word document structure not fully captured, using simple mode")
-                elif file_ext_lower == '.txt':
-                    text = translator._read_text_file(input_path)
-                else:
-                    if translator:
+                    # Check if we have structure for advanced formatting
+                    if hasattr(translator, 'docx_structure') and translator.docx_structure:
                         try:
-                            translator.root.destroy()
-                        except:
-                            pass
-                    flash('Unsupported file type', 'error')
-                    return redirect(url_for('index'))
-            except Exception as read_err:
-                print("=" * 70)
-                print("ERROR READING DOCUMENT:")
-                print("=" * 70)
-                traceback.print_exc()
-                print("=" * 70)
-                if translator:
-                    try:
-                        translator.root.destroy()
-                    except:
-                        pass
-                flash(f'Error reading document: {str(read_err)[:100]}', 'error')
-                return redirect(url_for('index'))
-            
-            if not text or not text.strip():
-                if translator:
-                    try:
-                        translator.root.destroy()
-                    except:
-                        pass
-                flash('No text could be extracted from the document', 'error')
-                return redirect(url_for('index'))
-            
-            target_lang_code = LANGUAGES[language]
-            
-            # Translate
-            try:
-                if file_ext_lower == '.pdf' and PYMUPDF_AVAILABLE and hasattr(translator, 'pdf_text_blocks') and translator.pdf_text_blocks:
-                    # Use block-by-block translation for PDFs
-                    translator._translate_pdf_blocks(target_lang_code, output_path)
-                else:
-                    # Translate text normally
-                    translated_text = translator._translate_text(text, target_lang_code)
-                    
-                    # Save translated document
-                    if file_ext_lower == '.pdf':
-                        translator._save_translated_pdf(translated_text, output_path)
-                    elif file_ext_lower in ['.docx', '.doc']:
-                        # Check if we have structure for advanced formatting
-                        if hasattr(translator, 'docx_structure') and translator.docx_structure:
-                            try:
-                                translator._save_translated_docx_with_formatting(output_path)
-                            except Exception as format_err:
-                                print("=" * 70)
-                                print("ERROR SAVING WITH FORMATTING (falling back to simple mode):")
-                                print("=" * 70)
-                                traceback.print_exc()
-                                print("=" * 70)
-                                # Fallback to simple saving
-                                translator._save_translated_docx(translated_text, output_path)
-                        else:
-                            # Simple mode without structure
+                            translator._save_translated_docx_with_formatting(output_path)
+                        except Exception as format_err:
+                            _print_error("ERROR SAVING WITH FORMATTING (falling back to simple mode)")
+                            # Fallback to simple saving
                             translator._save_translated_docx(translated_text, output_path)
                     else:
-                        translator._save_translated_text(translated_text, output_path)
-            except Exception as save_err:
-                print("=" * 70)
-                print("ERROR SAVING TRANSLATED DOCUMENT:")
-                print("=" * 70)
-                traceback.print_exc()
-                print("=" * 70)
-                if translator:
-                    try:
-                        translator.root.destroy()
-                    except:
-                        pass
-                flash(f'Error saving translated document: {str(save_err)[:100]}', 'error')
-                return redirect(url_for('index'))
-        except Exception as translate_error:
-            # Log the error for debugging
-            error_details = str(translate_error)
-            print("=" * 70)
-            print("TRANSLATION ERROR:")
-            print("=" * 70)
-            traceback.print_exc()
-            print("=" * 70)
-            
-            # Clean up translator on error
-            if translator:
-                try:
-                    translator.root.destroy()
-                except:
-                    pass
-            
-            # User-friendly error messages
-            if "tkinter" in error_details.lower() or "gui" in error_details.lower():
-                flash('Server error: Please restart the server and try again.', 'error')
-            elif "translation" in error_details.lower() or "google" in error_details.lower() or "api" in error_details.lower():
-                flash('Translation service error. Please check your internet connection.', 'error')
-            elif "file" in error_details.lower() or "not found" in error_details.lower():
-                flash('File processing error. Please try a different file.', 'error')
-            else:
-                flash(f'Error: {error_details[:150]}', 'error')
-            
-            return redirect(url_for('index'))
-        finally:
-            # Clean up translator
-            if translator:
-                try:
-                    translator.root.destroy()
-                except:
-                    pass
-        
-        # Return translated file for download
-        # Use chunked response for large files to prevent memory issues
-        def generate_file():
-            with open(output_path, 'rb') as f:
-                while True:
-                    chunk = f.read(8192)  # Read in 8KB chunks
-                    if not chunk:
-                        break
-                    yield chunk
-        
-        # Check file size for chunked response
-        file_size = os.path.getsize(output_path)
-        if file_size > 10 * 1024 * 1024:  # If larger than 10MB, use chunked response
-            response = Response(generate_file(), mimetype='application/octet-stream')
-            response.headers['Content-Disposition'] = f'attachment; filename="{output_filename}"'
-            response.headers['Content-Length'] = str(file_size)
-            return response
-        else:
-            return send_file(
-                output_path,
-                as_attachment=True,
-                download_name=output_filename,
-                mimetype='application/octet-stream'
-            )
-        
-    except Exception as e:
-        # Outer exception handler for any other errors
-        error_msg = str(e)
-        print("=" * 70)
-        print("FATAL ERROR:")
-        print("=" * 70)
-        traceback.print_exc()
-        print("=" * 70)
-        
+                        # Simple mode without structure
+                        translator._save_translated_docx(translated_text, output_path)
+                else:
+                    translator._save_translated_text(translated_text, output_path)
+        except Exception as save_err:
+            _print_error("TRANSLATION ERROR")
+            raise Exception(_friendly_error(str(save_err)))
+    finally:
         # Clean up translator
         if translator:
             try:
                 translator.root.destroy()
             except:
                 pass
-        
-        flash(f'Server error: {error_msg[:150]}. Check server console for details.', 'error')
-        return redirect(url_for('index'))
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Current state of a translation job"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    status = job.to_dict()
+    if status['status'] == 'done':
+        status['download_url'] = url_for('job_download', job_id=job.id)
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream a job's progress as Server-Sent Events until it finishes"""
+    if JOBS.get(job_id) is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    # A reconnecting EventSource sends the last event id it received
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.args.get('after') or 0)
+    except ValueError:
+        after = 0
+    
+    def stream():
+        yield "retry: 3000\n\n"
+        for event in JOBS.events(job_id, after=after):
+            if event is None:
+                yield ": keep-alive\n\n"  # comment line keeps proxies from closing an idle stream
+                continue
+            data = event.to_dict()
+            if event.status == 'done':
+                data['download_url'] = url_for('job_download', job_id=job_id)
+            yield f"id: {event.seq}\nevent: {event.status}\ndata: {json.dumps(data)}\n\n"
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/jobs/<job_id>/download')
+def job_download(job_id):
+    """Translated file of a finished job (kept until the job expires)"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if job.status != 'done':
+        return jsonify({'error': f'Job is {job.status}'}), 409
+    return send_file(
+        str(job.output_path),
+        as_attachment=True,
+        download_name=job.output_filename,
+        mimetype='application/octet-stream'
+    )
 
 @app.errorhandler(RequestEntityTooLarge)
 def handle_file_too_large(e):
     """Handle file size too large error"""
-    flash('File is too large. Maximum file size is 200MB. Please try a smaller file.', 'error')
-    return redirect(url_for('index'))
+    return _reject('File is too large. Maximum file size is 200MB. Please try a smaller file.', status=413)
 
 @app.route('/health')
 def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'ok'})
+    """Health check endpoint, with job queue depth and worker utilization"""
+    return jsonify(dict(JOBS.stats(), status='ok'))
 
 if __name__ == '__main__':
     import socket
@@ -400,6 +396,7 @@ if __name__ == '__main__':
     print("Document Translator Web Application")
     print("=" * 70)
     print(f"Upload folder: {app.config['UPLOAD_FOLDER']}")
+    print(f"Translation workers: {JOBS.workers} (finished files kept {JOBS.ttl_seconds / 60:.0f} minutes)")
     print()
     print("LOCAL ACCESS:")
     print(f"  http://localhost:5000")
@@ -15,6 +15,14 @@ from datetime import datetime, timedelta
 import csv as _csv
 import re
 
+# Pre-built PDF filename index (falls back to walking the folder per row)
+try:
+    from pdf_name_index import get_pdf_index
+    PDF_INDEX_AVAILABLE = True
+except ImportError:
+    PDF_INDEX_AVAILABLE = False
+    get_pdf_index = None
+
 APP_TITLE = "IA Referral Form Uploader - Dual Tab"
 MAROON    = "#800000"
 HEADER_FG = "#ffffff"
@@ -145,6 +153,14 @@ def _find_pdf_for_client(base_folder: str, client_name: str, filter_mode: str =
     if not base_folder or not os.path.isdir(base_folder):
         return None
     
+    if PDF_INDEX_AVAILABLE:
+        accept = None
+        if filter_mode == "skip_ips":
+            accept = lambda entry: not entry.has_ips
+        elif filter_mode == "only_ips":
+            accept = lambda entry: entry.has_ips
+        return get_pdf_index(base_folder).find(client_name, accept)
+    
     want = re.sub(r"\s+", " ", client_name).strip().lower()
     want_parts = want.split()
     
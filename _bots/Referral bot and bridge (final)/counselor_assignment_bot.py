@@ -5,7 +5,7 @@
 #  Counselor Assignment Bot — Penelope Navigation to Client Profile
 # =============================================================================
 
-import os, sys, time, json, threading, queue, tempfile, traceback, re
+import os, sys, time, json, threading, queue, tempfile, traceback
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
 from dataclasses import dataclass
@@ -154,996 +154,18 @@ class LocalSlice:
         return recs
 
 # ---------------- Penelope client ----------------
-PN_DEFAULT_URL = "https://integrityseniorservices.athena-us.com/acm_loginControl"
-
-@dataclass
-class PNAuth:
-    url: str
-    username: str
-    password: str
-
-class PNClient:
-    def __init__(self, auth: PNAuth, log):
-        self.auth = auth
-        self.log = log
-        self.driver = None
-        self.wait = None
-
+# Shared Penelope client (start/login/search, warm browser sessions via the
+# driver broker) - lives in the installation's _system folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # _bots
+from system_path import add_system_path
+add_system_path()
+from penelope_client import PN_DEFAULT_URL, PNAuth, PNClient as SharedPNClient
+
+class PNClient(SharedPNClient):
     def start(self, chrome_profile_dir: Optional[str] = None):
-        webdriver, _By, _WebDriverWait, _EC, _Keys, Service, ChromeDriverManager = _lazy_import_selenium()
-        
-        # Check network connectivity first
-        try:
-            import requests
-            requests.get("https://www.google.com", timeout=5)
-            self.log(_ts() + "[NETWORK] Internet connection verified")
-        except Exception as e:
-            self.log(_ts() + f"[NETWORK][WARN] Internet check failed: {e}")
-            self.log(_ts() + "[NETWORK] Bot will try to continue anyway...")
-        
-        try:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--start-maximized")
-            if chrome_profile_dir and os.path.isdir(chrome_profile_dir):
-                options.add_argument(f"--user-data-dir={chrome_profile_dir}")
-                self.log(_ts() + f"[BROWSER] Using Chrome profile: {chrome_profile_dir}")
-            else:
-                self.log(_ts() + "[BROWSER] Using fresh Selenium profile (no saved cookies).")
-            # Try multiple methods to get ChromeDriver
-            service = None
-            
-            # Method 1: Try ChromeDriverManager with timeout
-            try:
-                self.log(_ts() + "[BROWSER] Attempting to download ChromeDriver...")
-                import threading
-                import time
-                
-                result = [None]
-                exception = [None]
-                
-                def download_driver():
-                    try:
-                        result[0] = ChromeDriverManager().install()
-                    except Exception as e:
-                        exception[0] = e
-                
-                # Start download in separate thread
-                thread = threading.Thread(target=download_driver)
-                thread.daemon = True
-                thread.start()
-                thread.join(timeout=30)  # 30 second timeout
-                
-                if thread.is_alive():
-                    self.log(_ts() + "[BROWSER][WARN] ChromeDriver download timed out after 30 seconds")
-                    raise TimeoutError("ChromeDriver download timed out")
-                
-                if exception[0]:
-                    raise exception[0]
-                
-                if result[0]:
-                    service = Service(result[0])
-                    self.log(_ts() + f"[BROWSER] ChromeDriver downloaded: {result[0]}")
-                else:
-                    raise Exception("ChromeDriver download failed")
-                    
-            except Exception as e:
-                self.log(_ts() + f"[BROWSER][WARN] ChromeDriverManager failed: {e}")
-                
-                # Method 2: Try to use system ChromeDriver
-                try:
-                    self.log(_ts() + "[BROWSER] Trying system ChromeDriver...")
-                    service = Service()  # Uses PATH
-                    self.log(_ts() + "[BROWSER] Using system ChromeDriver")
-                except Exception as e2:
-                    self.log(_ts() + f"[BROWSER][WARN] System ChromeDriver failed: {e2}")
-                    
-                    # Method 3: Try common ChromeDriver locations
-                    common_paths = [
-                        r"C:\Program Files\Google\Chrome\Application\chromedriver.exe",
-                        r"C:\Program Files (x86)\Google\Chrome\Application\chromedriver.exe",
-                        r"C:\chromedriver\chromedriver.exe",
-                        r"C:\Windows\System32\chromedriver.exe"
-                    ]
-                    
-                    for path in common_paths:
-                        if os.path.exists(path):
-                            try:
-                                service = Service(path)
-                                self.log(_ts() + f"[BROWSER] Using ChromeDriver at: {path}")
-                                break
-                            except Exception as e3:
-                                self.log(_ts() + f"[BROWSER][WARN] ChromeDriver at {path} failed: {e3}")
-                                continue
-            
-            if service is None:
-                raise Exception("Could not find or download ChromeDriver. Please check your internet connection or install ChromeDriver manually.")
-            
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.wait = _WebDriverWait(self.driver, 20)
-        except Exception as e:
-            self.log(_ts() + f"[BROWSER][ERR] Could not start Chrome: {e}")
-            raise
-
-    def login(self) -> bool:
-        d, w = self.driver, self.wait
-        url = (self.auth.url or PN_DEFAULT_URL).strip()
-        self.log(_ts() + f"[PN] Opening {url} …")
-        try:
-            d.get(url)
-        except Exception as e:
-            self.log(_ts() + f"[PN][ERR] Could not open URL: {e}")
-            return False
-
-        # Locate the login iframe and the user/password inputs
-        def _switch_login_iframe():
-            try:
-                d.switch_to.default_content()
-                frames = d.find_elements("css selector", "iframe, frame")
-                for fr in frames:
-                    try:
-                        src = (fr.get_attribute("src") or "").lower()
-                        idv = (fr.get_attribute("id") or "").lower()
-                        namev = (fr.get_attribute("name") or "").lower()
-                        if "acm_login" in src or "login" in src or "acm_login" in idv or "acm_login" in namev:
-                            d.switch_to.frame(fr); return True
-                    except Exception:
-                        continue
-                # try a direct known id
-                try:
-                    fr = d.find_element("id", "acm_loginControl")
-                    d.switch_to.frame(fr); return True
-                except Exception:
-                    pass
-                return False
-            except Exception:
-                return False
-
-        try:
-            _switch_login_iframe()
-        except Exception:
-            pass
-
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.common.keys import Keys
-
-        # Try to find fields in current context (iframe or default)
-        def try_login_in_ctx():
-            try:
-                users = d.find_elements(By.CSS_SELECTOR, "input[type='text'],input[type='email']")
-                pwds  = d.find_elements(By.CSS_SELECTOR, "input[type='password']")
-                if not users or not pwds:
-                    return False
-                u = users[0]; p = pwds[0]
-                try: u.clear(); u.click()
-                except Exception: pass
-                try: u.send_keys(self.auth.username)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", u, self.auth.username)
-                try: p.clear(); p.click()
-                except Exception: pass
-                try: p.send_keys(self.auth.password)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", p, self.auth.password)
-                # Click submit or press Enter
-                for by, sel in [
-                    (By.CSS_SELECTOR, "button[type='submit']"),
-                    (By.CSS_SELECTOR, "input[type='submit']"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'sign in')]"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'log in')]"),
-                    (By.XPATH, "//input[@type='submit']"),
-                ]:
-                    try:
-                        btn = d.find_element(by, sel)
-                        try: btn.click()
-                        except Exception: d.execute_script("arguments[0].click();", btn)
-                        return True
-                    except Exception:
-                        continue
-                p.send_keys(Keys.ENTER)
-                return True
-            except Exception:
-                return False
-
-        if not try_login_in_ctx():
-            _switch_login_iframe()
-            try_login_in_ctx()
-
-        try:
-            w.until(lambda drv: drv.current_url != url)
-        except Exception:
-            pass
-        self.log(_ts() + "[PN] Login appears successful.")
-        return True
-
-    def go_to_search(self) -> bool:
-        """Open the Search UI and ensure the content frame is focused."""
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
-        import time
-        d, w = self.driver, self.wait
-        log = getattr(self, "log", lambda s: None)
-        
-        try:
-            d.switch_to.default_content()
-            log("[NAV] Attempting to navigate to Search page...")
-            
-            # First, try using the more robust toolbar search method
-            # This method switches to frame first, then clicks the search button inside
-            try:
-                log("[NAV] Trying click_toolbar_search_with_wait method...")
-                if self.click_toolbar_search_with_wait(timeout=8):
-                    log("[NAV] Successfully clicked toolbar search button")
-                    time.sleep(1)  # Wait for page to load
-                    # Now switch to the frame
-                    ok = self._switch_to_search_content_frame()
-                    if ok:
-                        log("[NAV] Successfully switched to search frame")
-                        return True
-                    else:
-                        log("[NAV][WARN] Toolbar search clicked but frame switch failed, trying fallback...")
-            except Exception as e:
-                log(f"[NAV][WARN] click_toolbar_search_with_wait failed: {e}, trying fallback methods...")
-            
-            # Fallback: Try clicking a nav item in default content
-            clicked = False
-            for by, sel in [
-                (By.XPATH, "//a[contains(.,'Search') and @href]"),
-                (By.CSS_SELECTOR, "a[href*='acm_searchControl']"),
-            ]:
-                try:
-                    log(f"[NAV] Trying to find search link with selector: {sel}")
-                    el = WebDriverWait(d, 5).until(EC.element_to_be_clickable((by, sel)))
-                    try: 
-                        el.click()
-                        log("[NAV] Clicked search link")
-                    except Exception: 
-                        d.execute_script("arguments[0].click();", el)
-                        log("[NAV] Clicked search link via JavaScript")
-                    clicked = True
-                    time.sleep(1)  # Wait for page to respond
-                    break
-                except Exception as e:
-                    log(f"[NAV][WARN] Could not click search link with {sel}: {e}")
-                    continue
-            
-            if not clicked:
-                # Direct URL fallback
-                try:
-                    log("[NAV] Trying direct URL navigation...")
-                    origin = re.match(r'^(https?://[^/]+)', d.current_url)
-                    if origin:
-                        search_url = origin.group(1) + "/acm_searchControl?actionType=view"
-                        log(f"[NAV] Navigating directly to: {search_url}")
-                        d.get(search_url)
-                        time.sleep(2)  # Wait for page to load
-                        log("[NAV] Direct navigation completed")
-                except Exception as e:
-                    log(f"[NAV][WARN] Direct URL navigation failed: {e}")
-            
-            # Now ensure frame is available and switch to it
-            log("[NAV] Attempting to switch to search content frame...")
-            ok = self._switch_to_search_content_frame()
-            if not ok:
-                # Retry once with longer wait
-                log("[NAV] Frame switch failed, retrying after 2 seconds...")
-                time.sleep(2)
-                ok = self._switch_to_search_content_frame()
-            
-            if ok:
-                log("[NAV] Successfully navigated to Search page and switched to frame")
-            else:
-                log("[NAV][ERROR] Failed to switch to search frame after all attempts")
-            
-            return ok
-        except Exception as e:
-            log(f"[NAV][ERROR] go_to_search failed: {e}")
-            import traceback
-            log(f"[NAV][ERROR] Traceback: {traceback.format_exc()}")
-            return False
-
-    def _switch_to_search_content_frame(self) -> bool:
-        """Switch to the search content frame with retry logic."""
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
-        import time
-        d = self.driver
-        log = getattr(self, "log", lambda s: None)
-        max_retries = 3
-        timeout_per_attempt = 8  # Reduced from 10 to 8 seconds
-        
-        for retry in range(max_retries):
-            try:
-                d.switch_to.default_content()
-                log(f"[NAV] Attempt {retry + 1}/{max_retries}: Waiting for frm_content_id frame (timeout: {timeout_per_attempt}s)...")
-                
-                # Wait for frame to be available and switch to it
-                WebDriverWait(d, timeout_per_attempt).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-                
-                if retry > 0:
-                    log(f"[NAV] Successfully switched to search frame on retry {retry + 1}")
-                else:
-                    log("[NAV] Successfully switched to search frame")
-                return True
-            except Exception as e:
-                if retry < max_retries - 1:
-                    log(f"[NAV][WARN] Frame switch attempt {retry + 1} failed: {e}, retrying...")
-                    time.sleep(1)  # Increased wait between retries
-                    try:
-                        d.switch_to.default_content()
-                    except Exception:
-                        pass
-                else:
-                    log(f"[NAV][ERROR] Could not switch to search frame after {max_retries} attempts: {e}")
-                    # Try to check if frame exists at all
-                    try:
-                        d.switch_to.default_content()
-                        frames = d.find_elements(By.ID, "frm_content_id")
-                        if frames:
-                            log("[NAV][DEBUG] Frame element exists but may not be ready")
-                        else:
-                            log("[NAV][DEBUG] Frame element not found in DOM")
-                    except Exception as check_e:
-                        log(f"[NAV][DEBUG] Could not check for frame: {check_e}")
-                    try:
-                        d.switch_to.default_content()
-                    except Exception:
-                        pass
-                    return False
-        return False
-
-    def enter_individual_id_and_go(self, indiv_id: str, timeout: int = 12) -> bool:
-        """
-        Individual > Individual ID: enter ID # > Press Go > WAIT for dropdown/results.
-        """
-        try:
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
-        except Exception:
-            return False
-
-        d = self.driver
-        log = getattr(self, "log", lambda s: None)
-
-        def _open_search_if_needed() -> bool:
-            """Open Search only if the content frame isn't present yet."""
-            import time
-            try:
-                d.switch_to.default_content()
-                # Check if frame is already available
-                try:
-                    WebDriverWait(d, 3).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-                    d.switch_to.default_content()
-                    log("[INDIV] Search frame already available")
-                    return True
-                except Exception:
-                    pass
-                
-                # Frame not available, need to click search button
-                log("[INDIV] Search frame not found, clicking toolbar search button...")
-                try:
-                    nav = WebDriverWait(d, timeout).until(EC.element_to_be_clickable((By.ID, "navSearch")))
-                    # Use JavaScript click for reliability
-                    try:
-                        d.execute_script("arguments[0].click();", nav)
-                    except Exception:
-                        nav.click()
-                    log("[INDIV] Toolbar search button clicked")
-                    time.sleep(0.5)  # Wait for page to respond
-                    
-                    # Wait for frame to become available
-                    WebDriverWait(d, timeout).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-                    d.switch_to.default_content()
-                    log("[INDIV] Search frame loaded successfully")
-                    time.sleep(0.3)  # Brief pause for frame to stabilize
-                    return True
-                except Exception as e:
-                    log(f"[INDIV][ERROR] Failed to open search: {e}")
-                    d.switch_to.default_content()
-                    return False
-            except Exception as e:
-                log(f"[INDIV][ERROR] _open_search_if_needed error: {e}")
-                try: 
-                    d.switch_to.default_content()
-                except Exception: 
-                    pass
-                return False
-
-        def _into_frame() -> bool:
-            """Switch to the search content frame with retry logic."""
-            import time
-            max_retries = 3
-            for retry in range(max_retries):
-                try:
-                    d.switch_to.default_content()
-                    WebDriverWait(d, timeout).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-                    if retry > 0:
-                        log(f"[INDIV] Successfully entered frame on retry {retry + 1}")
-                    return True
-                except Exception as e:
-                    if retry < max_retries - 1:
-                        log(f"[INDIV][WARN] Frame switch failed (attempt {retry + 1}/{max_retries}): {e}, retrying...")
-                        time.sleep(0.5)
-                        try:
-                            d.switch_to.default_content()
-                        except Exception:
-                            pass
-                    else:
-                        log(f"[INDIV][ERROR] Could not enter frame after {max_retries} attempts: {e}")
-                        try: 
-                            d.switch_to.default_content()
-                        except Exception: 
-                            pass
-                        return False
-            return False
-
-        def _activate_individual_tab() -> bool:
-            """Use JS goTab + click fallback; confirm txtKIndID is present and ready for input."""
-            import time
-            try:
-                # Step 1: Activate tab using JavaScript (most reliable)
-                try:
-                    d.execute_script("if (typeof goTab==='function') { goTab('tabIndiv'); }")
-                    log("[INDIV] goTab('tabIndiv') called via JavaScript")
-                    time.sleep(0.5)  # Wait for tab to activate
-                except Exception as e:
-                    log(f"[INDIV][WARN] goTab() failed: {e}, trying tab click...")
-                
-                # Step 2: Fallback - click tab element if JavaScript didn't work
-                try:
-                    tab = WebDriverWait(d, 4).until(EC.presence_of_element_located((By.CSS_SELECTOR, "li#tabIndiv_li")))
-                    # Use JavaScript click to avoid stale element issues
-                    d.execute_script("arguments[0].click();", tab)
-                    log("[INDIV] Individual tab clicked via JavaScript")
-                    time.sleep(0.5)  # Wait for tab to activate
-                except Exception as e:
-                    log(f"[INDIV][WARN] Tab click fallback failed: {e}")
-                
-                # Step 3: Wait for the Individual ID field to be present (use presence, not clickable to avoid stale issues)
-                try:
-                    id_input = WebDriverWait(d, 8).until(EC.presence_of_element_located((By.NAME, "txtKIndID")))
-                    log("[INDIV] Individual ID field found")
-                except Exception as e:
-                    log(f"[INDIV][ERROR] Could not find Individual ID field: {e}")
-                    return False
-                
-                # Step 4: Clear and focus using ONLY JavaScript to avoid stale element errors
-                try:
-                    # Use JavaScript to clear and focus - completely bypasses Selenium element methods
-                    d.execute_script("""
-                        var elem = arguments[0];
-                        if (elem) {
-                            elem.value = '';
-                            elem.focus();
-                            // Trigger focus event to ensure field is ready
-                            elem.dispatchEvent(new Event('focus', { bubbles: true, cancelable: true }));
-                        }
-                    """, id_input)
-                    log("[INDIV] Individual tab activated - ID field cleared and focused via JavaScript")
-                    time.sleep(0.3)  # Brief pause for field to be ready
-                    return True
-                except Exception as e:
-                    log(f"[INDIV][WARN] JavaScript clear/focus failed: {e}, trying Selenium fallback...")
-                    # Fallback to Selenium methods (but re-find element first)
-                    try:
-                        id_input = WebDriverWait(d, 4).until(EC.presence_of_element_located((By.NAME, "txtKIndID")))
-                        id_input.clear()
-                        id_input.click()
-                        log("[INDIV] Individual tab activated - ID field cleared via Selenium fallback")
-                        return True
-                    except Exception as e2:
-                        log(f"[INDIV][ERROR] All methods failed to clear ID field: {e2}")
-                        return False
-                
-            except Exception as e:
-                log(f"[INDIV][ERROR] _activate_individual_tab failed: {e}")
-                return False
-
-        def _wait_results(wait_secs: int) -> bool:
-            """Accept either a dropdown or a populated #results area."""
-            LOCS = [
-                (By.CSS_SELECTOR, "ul[role='listbox'] li[role='option']"),
-                (By.XPATH, "//li[contains(@class,'select2-results__option') or @role='option']"),
-                (By.CSS_SELECTOR, ".ui-autocomplete li"),
-                (By.CSS_SELECTOR, ".dropdown-menu.show .dropdown-item"),
-                (By.XPATH, "//div[@id='results']//a[normalize-space(text())!='']"),
-                (By.ID, "results"),
-            ]
-            def _has_any(_):
-                try:
-                    for by, sel in LOCS:
-                        els = d.find_elements(by, sel)
-                        if not els:
-                            continue
-                        if by == By.ID and sel == "results":
-                            try:
-                                txt = (d.find_element(By.ID, "results").text or "").strip()
-                                if txt:
-                                    return True
-                            except Exception:
-                                continue
-                        else:
-                            for el in els:
-                                try:
-                                    if el.is_displayed():
-                                        return True
-                                except Exception:
-                                    continue
-                    return False
-                except StaleElementReferenceException:
-                    return False
-            try:
-                WebDriverWait(d, wait_secs).until(_has_any)
-                return True
-            except Exception:
-                return False
-
-        max_attempts = 3
-        for attempt in range(1, max_attempts + 1):
-            try:
-                log(f"[INDIV] Attempt {attempt}/{max_attempts}: open search (if needed), Individual tab, ID, GO, wait…")
-
-                if not _open_search_if_needed():
-                    raise TimeoutException("Search toolbar/frame not reachable")
-
-                if not _into_frame():
-                    raise TimeoutException("Could not enter frm_content_id")
-
-                if not _activate_individual_tab():
-                    log("[INDIV][WARN] First tab activation attempt failed, retrying...")
-                    if not _into_frame():
-                        raise TimeoutException("Could not re-enter frame for retry")
-                    if not _activate_individual_tab():
-                        raise TimeoutException("Could not activate Individual tab after retry")
-
-                # Fix: Ensure client ID is treated as integer without decimal points
-                # Convert to int first to remove any decimal, then back to string
-                try:
-                    _id = str(int(float(indiv_id))).strip()
-                except (ValueError, TypeError):
-                    # If conversion fails, use original string but remove .0 if present
-                    _id = str(indiv_id).strip()
-                    if _id.endswith('.0'):
-                        _id = _id[:-2]
-                
-                log(f"[INDIV] Entering Individual ID: {_id}")
-                
-                # CRITICAL: Use JavaScript-only approach to avoid stale element issues
-                # Re-find element fresh each time and use JavaScript to set value
-                import time
-                id_entered_successfully = False
-                for retry in range(3):
-                    try:
-                        # Always re-find the element fresh to avoid stale references
-                        id_input = WebDriverWait(d, 8).until(EC.presence_of_element_located((By.NAME, "txtKIndID")))
-                        
-                        # Use JavaScript to set value - completely bypasses Selenium input methods
-                        d.execute_script("""
-                            var elem = arguments[0];
-                            var val = arguments[1];
-                            if (elem) {
-                                elem.value = '';
-                                elem.focus();
-                                elem.value = val;
-                                // Trigger all relevant events to ensure value is registered
-                                ['input', 'change', 'keyup', 'keydown'].forEach(function(eventType) {
-                                    elem.dispatchEvent(new Event(eventType, { bubbles: true, cancelable: true }));
-                                });
-                            }
-                        """, id_input, _id)
-                        
-                        # Wait for value to register
-                        time.sleep(0.4)
-                        
-                        # VERIFY the ID was actually entered by re-finding element and checking value
-                        id_input = WebDriverWait(d, 4).until(EC.presence_of_element_located((By.NAME, "txtKIndID")))
-                        entered_value = id_input.get_attribute("value") or ""
-                        
-                        if entered_value.strip() == _id:
-                            log(f"[INDIV] ✓ VERIFIED: ID '{_id}' successfully entered (field shows: '{entered_value}')")
-                            id_entered_successfully = True
-                            break
-                        else:
-                            log(f"[INDIV][WARN] ID mismatch! Expected '{_id}', but field shows '{entered_value}'. Retry {retry + 1}/3")
-                            if retry < 2:
-                                time.sleep(0.5)
-                                if not _into_frame():
-                                    raise TimeoutException("Could not re-enter frame for retry")
-                                # Re-activate tab before retrying
-                                if not _activate_individual_tab():
-                                    log("[INDIV][WARN] Could not re-activate tab for retry")
-                                continue
-                            else:
-                                log(f"[INDIV][ERROR] Failed to enter correct ID after 3 attempts!")
-                                raise ValueError(f"ID entry verification failed: expected '{_id}', got '{entered_value}'")
-                        
-                    except StaleElementReferenceException:
-                        if retry < 2:
-                            log(f"[INDIV][WARN] Stale element on retry {retry + 1}, re-finding...")
-                            if not _into_frame():
-                                raise TimeoutException("Could not re-enter frame after stale element")
-                            # Re-activate tab
-                            if not _activate_individual_tab():
-                                log("[INDIV][WARN] Could not re-activate tab after stale element")
-                            time.sleep(0.5)
-                            continue
-                        else:
-                            raise
-                    except Exception as e:
-                        if retry < 2:
-                            log(f"[INDIV][WARN] Input error on retry {retry + 1}: {e}, re-finding...")
-                            if not _into_frame():
-                                raise TimeoutException("Could not re-enter frame after error")
-                            # Re-activate tab
-                            if not _activate_individual_tab():
-                                log("[INDIV][WARN] Could not re-activate tab after error")
-                            time.sleep(0.5)
-                            continue
-                        else:
-                            raise
-                
-                if not id_entered_successfully:
-                    log(f"[INDIV][ERROR] Could not verify ID entry for: {_id}")
-                    raise ValueError(f"Failed to enter and verify Individual ID: {_id}")
-
-                go = None
-                try:
-                    go = WebDriverWait(d, 6).until(EC.element_to_be_clickable((By.ID, "goButton")))
-                except Exception:
-                    for how, sel in [
-                        (By.XPATH, "//button[normalize-space()='GO']"),
-                        (By.CSS_SELECTOR, "button[type='submit']"),
-                        (By.CSS_SELECTOR, "input[type='submit']"),
-                    ]:
-                        try:
-                            go = WebDriverWait(d, 4).until(EC.element_to_be_clickable((how, sel)))
-                            break
-                        except Exception:
-                            continue
-
-                if go is not None:
-                    try:
-                        go.click()
-                    except Exception:
-                        d.execute_script("arguments[0].click();", go)
-                else:
-                    try:
-                        id_input.send_keys("\ue007")
-                    except Exception:
-                        pass
-
-                if not _into_frame():
-                    raise TimeoutException("No frame after GO (reload expected)")
-
-                if not _wait_results(wait_secs=max(6, min(12, timeout))):
-                    try:
-                        d.execute_script("if (typeof searchForCurrentTab==='function') { searchForCurrentTab(); }")
-                    except Exception:
-                        pass
-                    if not _wait_results(wait_secs=max(5, min(10, timeout))):
-                        raise TimeoutException("Results did not render in time")
-
-                # VERIFY and LOG what results were found
-                try:
-                    # Try to get the results text to verify what the search found
-                    results_elem = d.find_element(By.ID, "results")
-                    results_text = (results_elem.text or "").strip()
-                    if results_text:
-                        # Extract just the first line or first 150 chars for logging
-                        first_line = results_text.split('\n')[0][:150]
-                        log(f"[INDIV] ✓ Search results found: '{first_line}...'")
-                except Exception:
-                    pass
-                
-                try: 
-                    d.switch_to.default_content()
-                except Exception: 
-                    pass
-                log("[INDIV] Results detected; ready to select client.")
-                return True
-
-            except Exception as e:
-                log(f"[INDIV][WARN] Attempt {attempt} failed: {e}")
-                if attempt < max_attempts:
-                    import time
-                    time.sleep(1)
-                    continue
-                else:
-                    log("[INDIV][ERR] All attempts failed.")
-                    try: 
-                        d.switch_to.default_content()
-                    except Exception: 
-                        pass
-                    return False
-        
-        log("[INDIV][ERR] Failed to render dropdown/results after retries.")
-        try: 
-            d.switch_to.default_content()
-        except Exception: 
-            pass
-        return False
-
-    def click_first_result_name(self, first_name: str = None, last_name: str = None, timeout: int = 12) -> bool:
-        '''
-        After pressing Go on the Search page, click the patient's first or last name
-        in the results dropdown/table to open their profile.
-        '''
-        try:
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-        except Exception:
-            return False
-
-        d = self.driver
-        try:
-            d.switch_to.default_content()
-            WebDriverWait(d, timeout).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-
-            try:
-                WebDriverWait(d, timeout).until(EC.presence_of_element_located((By.ID, "results")))
-            except Exception:
-                pass
-
-            def _find_name_link():
-                anchors = []
-                try:
-                    anchors.extend(d.find_elements(By.XPATH, "//div[@id='results']//a[normalize-space(text())!='']"))
-                except Exception:
-                    pass
-                try:
-                    anchors.extend(d.find_elements(By.XPATH, "//a[contains(translate(@href,'INDIV','indiv') or contains(translate(@href,'INDIVIDUAL','individual'),'individual')]"))
-                except Exception:
-                    pass
-                try:
-                    anchors.extend(d.find_elements(By.XPATH, "//table//a[normalize-space(text())!='']"))
-                except Exception:
-                    pass
-                seen = set()
-                uniq = []
-                for a in anchors:
-                    try:
-                        key = (a.get_attribute("href") or "") + "|" + (a.text or "")
-                    except Exception:
-                        key = id(a)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    try:
-                        if a.is_displayed():
-                            uniq.append(a)
-                    except Exception:
-                        pass
-                if not uniq:
-                    return None
-
-                def norm(s):
-                    return (s or "").strip().lower()
-                
-                def is_ips_link_local(link):
-                    """Check if a link is for an IPS profile"""
-                    try:
-                        href = (link.get_attribute("href") or "").lower()
-                        text = (link.text or "").lower()
-                        # Check parent row for IPS indicator
-                        try:
-                            parent_row = link.find_element(By.XPATH, "./ancestor::tr[1]")
-                            row_text = (parent_row.text or "").lower()
-                            if "ips" in row_text:
-                                return True
-                        except Exception:
-                            pass
-                        # Check if href or text contains IPS indicators
-                        if "ips" in href or "ips" in text:
-                            return True
-                        return False
-                    except Exception:
-                        return False
-                
-                fn = norm(first_name)
-                ln = norm(last_name)
-
-                # Separate links into ISWS and IPS categories
-                matching_links = []
-                if fn or ln:
-                    for a in uniq:
-                        t = norm(a.text)
-                        if not t:
-                            continue
-                        if (fn and fn in t) or (ln and ln in t):
-                            matching_links.append(a)
-                else:
-                    matching_links = uniq
-                
-                if not matching_links:
-                    return uniq[0] if uniq else None
-                
-                # Prefer ISWS (non-IPS) links over IPS links
-                isws_links = [link for link in matching_links if not is_ips_link_local(link)]
-                ips_links = [link for link in matching_links if is_ips_link_local(link)]
-                
-                # Log what we found
-                log = getattr(self, "log", lambda s: None)
-                if isws_links and ips_links:
-                    log(f"[SEARCH-RESULT] Found {len(isws_links)} ISWS link(s) and {len(ips_links)} IPS link(s). Preferring ISWS.")
-                elif ips_links:
-                    log(f"[SEARCH-RESULT] Found only IPS link(s): {len(ips_links)}")
-                elif isws_links:
-                    log(f"[SEARCH-RESULT] Found only ISWS link(s): {len(isws_links)}")
-                
-                # Return first ISWS link if available, otherwise first IPS link
-                if isws_links:
-                    return isws_links[0]
-                elif ips_links:
-                    return ips_links[0]
-                
-                return matching_links[0]
-
-            link = None
-            try:
-                link = WebDriverWait(d, timeout).until(lambda drv: _find_name_link())
-            except Exception:
-                link = _find_name_link()
-
-            if not link:
-                d.switch_to.default_content()
-                return False
-
-            # Log which link we're clicking
-            log = getattr(self, "log", lambda s: None)
-            try:
-                link_text = link.text.strip()
-                link_href = link.get_attribute("href") or ""
-                # Simple IPS detection
-                is_ips = "ips" in (link_href or "").lower() or "ips" in (link_text or "").lower()
-                profile_type = "IPS" if is_ips else "ISWS"
-                log(f"[SEARCH-RESULT] Clicking link: '{link_text}' ({profile_type} profile)")
-            except Exception:
-                pass
-
-            try:
-                link.click()
-            except Exception:
-                d.execute_script("arguments[0].click();", link)
-
-            # VERIFY: Wait for client profile to load and check it's the right one
-            import time
-            time.sleep(1)  # Brief pause for page transition
-            
-            try:
-                d.switch_to.default_content()
-                # Switch to main content frame where client name appears
-                try:
-                    WebDriverWait(d, 5).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-                except Exception:
-                    pass
-                
-                # Try to read the client name from the loaded profile page
-                try:
-                    # Common locations for client name on profile page
-                    name_selectors = [
-                        (By.XPATH, "//h1[contains(@class,'client') or contains(@class,'name')]"),
-                        (By.XPATH, "//div[contains(@class,'client-name')]"),
-                        (By.XPATH, "//span[contains(@class,'client-name')]"),
-                        (By.XPATH, "//h1"),
-                        (By.XPATH, "//h2"),
-                    ]
-                    
-                    loaded_name = None
-                    for by, sel in name_selectors:
-                        try:
-                            elem = d.find_element(by, sel)
-                            loaded_name = elem.text.strip()
-                            if loaded_name:
-                                break
-                        except Exception:
-                            continue
-                    
-                    if loaded_name:
-                        log(f"[SEARCH-RESULT] ✓ Profile loaded: '{loaded_name}'")
-                        # Basic verification: check if first or last name matches
-                        fn = (first_name or "").strip().lower()
-                        ln = (last_name or "").strip().lower()
-                        loaded_lower = loaded_name.lower()
-                        
-                        if (fn and fn in loaded_lower) or (ln and ln in loaded_lower):
-                            log(f"[SEARCH-RESULT] ✓ VERIFIED: Profile matches expected client")
-                        else:
-                            log(f"[SEARCH-RESULT][WARN] Profile name '{loaded_name}' may not match expected '{first_name} {last_name}'")
-                    else:
-                        log(f"[SEARCH-RESULT][WARN] Could not read client name from profile page")
-                        
-                except Exception as e:
-                    log(f"[SEARCH-RESULT][WARN] Could not verify profile loaded: {e}")
-                    
-            except Exception as e:
-                log(f"[SEARCH-RESULT][WARN] Profile verification error: {e}")
-
-            d.switch_to.default_content()
-            return True
-        except Exception:
-            try: d.switch_to.default_content()
-            except Exception: pass
-            return False
-
-    def click_toolbar_search_with_wait(self, timeout: int = 20) -> bool:
-        '''
-        Click the toolbar Search button (#navSearch) that lives in frame_1 (frm_content_id)
-        after login, waiting for overlays to disappear and the frame to be ready.
-        '''
-        try:
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-        except Exception:
-            return False
-
-        d = self.driver
-        try:
-            # Always start from default content
-            d.switch_to.default_content()
-            # Wait for content frame to be present and switch in
-            fr = WebDriverWait(d, timeout).until(EC.presence_of_element_located((By.ID, "frm_content_id")))
-            d.switch_to.frame(fr)
-
-            # Wait for document readiness
-            try:
-                WebDriverWait(d, timeout).until(lambda drv: drv.execute_script("return document.readyState") == "complete")
-            except Exception:
-                pass
-
-            # Wait for overlays to be gone inside the frame
-            def _overlay_gone(driver):
-                try:
-                    gray = driver.find_elements(By.ID, "mainFrameCoverGray")
-                    white = driver.find_elements(By.ID, "mainFrameCoverWhite")
-                    # Consider overlays "gone" if none present or all are hidden/not displayed
-                    def hidden(el):
-                        try:
-                            if not el.is_displayed(): return True
-                            disp = el.value_of_css_property("display") or ""
-                            vis  = el.value_of_css_property("visibility") or ""
-                            op   = el.value_of_css_property("opacity") or "1"
-                            return disp == "none" or vis == "hidden" or float(op) == 0.0
-                        except Exception:
-                            return True
-                    covers = (gray or []) + (white or [])
-                    return all(hidden(el) for el in covers) if covers else True
-                except Exception:
-                    return True
-            try:
-                WebDriverWait(d, timeout).until(_overlay_gone)
-            except Exception:
-                pass
-
-            # Now click the toolbar Search li#navSearch
-            btn = WebDriverWait(d, timeout).until(EC.element_to_be_clickable((By.ID, "navSearch")))
-            try:
-                btn.click()
-            except Exception:
-                d.execute_script("arguments[0].click();", btn)
-
-            # Leave frame; let caller proceed
-            d.switch_to.default_content()
-            return True
-        except Exception:
-            # Fallback: direct open the Search page route on same origin
-            try:
-                d.switch_to.default_content()
-                origin = d.execute_script("return location.origin")
-            except Exception:
-                import re as _re
-                cur = d.current_url or ""
-                m = _re.match(r"^(https?://[^/]+)", cur)
-                origin = m.group(1) if m else "https://integrityseniorservices.athena-us.com"
-            try:
-                d.get(origin + "/acm_searchControl?actionType=view")
-                return True
-            except Exception:
-                return False
+        # The workflow steps use the module-level By/WebDriverWait/EC/Keys
+        _lazy_import_selenium()
+        super().start(chrome_profile_dir)
 
     def click_individual_tab(self, timeout: int = 8) -> bool:
         '''
@@ -1228,7 +250,7 @@ class PNClient:
 
         # Find the frame that actually defines goOpenEdit()
         target = None  # (handle, frame_web_element_or_None)
-        for h in d.window_handles:
+        for h in self.own_window_handles():
             try:
                 d.switch_to.window(h); d.switch_to.default_content()
                 # Try root first
@@ -1254,7 +276,7 @@ class PNClient:
         if not target:
             self.log("[EDIT][WARN] goOpenEdit() not found in any frame; trying navEdit element.")
             clicked = False
-            for h in d.window_handles:
+            for h in self.own_window_handles():
                 try:
                     d.switch_to.window(h); d.switch_to.default_content()
                     frames = [None] + d.find_elements(By.CSS_SELECTOR, "iframe,frame")
@@ -1340,7 +362,7 @@ class PNClient:
     
         # Find edit overlay + dynamic iframe (or alt)
         dyn_ifr = None; alt_used = False
-        for h in d.window_handles:
+        for h in self.own_window_handles():
             try:
                 d.switch_to.window(h); d.switch_to.default_content()
                 frames = [None] + d.find_elements(By.CSS_SELECTOR, "iframe,frame")
@@ -1577,7 +599,7 @@ class PNClient:
                 from selenium.webdriver.common.by import By
                 d = self.driver
                 owner = None
-                for h in d.window_handles:
+                for h in self.own_window_handles():
                     try:
                         d.switch_to.window(h); d.switch_to.default_content()
                         frames = [None] + d.find_elements(By.CSS_SELECTOR, "iframe,frame")
@@ -184,124 +184,18 @@ class LocalSlice:
         return recs
 
 # ---------------- Penelope client ----------------
-PN_DEFAULT_URL = "https://integrityseniorservices.athena-us.com/acm_loginControl"
-
-@dataclass
-class PNAuth:
-    url: str
-    username: str
-    password: str
-
-class PNClient:
-    def __init__(self, auth: PNAuth, log):
-        self.auth = auth
-        self.log = log
-        self.driver = None
-        self.wait = None
-
+# Shared Penelope client (start/login/search, warm browser sessions via the
+# driver broker) - lives in the installation's _system folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # _bots
+from system_path import add_system_path
+add_system_path()
+from penelope_client import PN_DEFAULT_URL, PNAuth, PNClient as SharedPNClient
+
+class PNClient(SharedPNClient):
     def start(self, chrome_profile_dir: Optional[str] = None):
-        webdriver, _By, _WebDriverWait, _EC, _Keys, Service, ChromeDriverManager = _lazy_import_selenium()
-        try:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--start-maximized")
-            if chrome_profile_dir and os.path.isdir(chrome_profile_dir):
-                options.add_argument(f"--user-data-dir={chrome_profile_dir}")
-                self.log(_ts() + f"[BROWSER] Using Chrome profile: {chrome_profile_dir}")
-            else:
-                self.log(_ts() + "[BROWSER] Using fresh Selenium profile (no saved cookies).")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.wait = _WebDriverWait(self.driver, 20)
-        except Exception as e:
-            self.log(_ts() + f"[BROWSER][ERR] Could not start Chrome: {e}")
-            raise
-
-    def login(self) -> bool:
-        d, w = self.driver, self.wait
-        url = (self.auth.url or PN_DEFAULT_URL).strip()
-        self.log(_ts() + f"[PN] Opening {url} …")
-        try:
-            d.get(url)
-        except Exception as e:
-            self.log(_ts() + f"[PN][ERR] Could not open URL: {e}")
-            return False
-
-        def _switch_login_iframe():
-            try:
-                d.switch_to.default_content()
-                frames = d.find_elements("css selector", "iframe, frame")
-                for fr in frames:
-                    try:
-                        src = (fr.get_attribute("src") or "").lower()
-                        idv = (fr.get_attribute("id") or "").lower()
-                        namev = (fr.get_attribute("name") or "").lower()
-                        if "acm_login" in src or "login" in src or "acm_login" in idv or "acm_login" in namev:
-                            d.switch_to.frame(fr); return True
-                    except Exception:
-                        continue
-                try:
-                    fr = d.find_element("id", "acm_loginControl")
-                    d.switch_to.frame(fr); return True
-                except Exception:
-                    pass
-                return False
-            except Exception:
-                return False
-
-        try:
-            _switch_login_iframe()
-        except Exception:
-            pass
-
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.common.keys import Keys
-
-        def try_login_in_ctx():
-            try:
-                users = d.find_elements(By.CSS_SELECTOR, "input[type='text'],input[type='email']")
-                pwds  = d.find_elements(By.CSS_SELECTOR, "input[type='password']")
-                if not users or not pwds:
-                    return False
-                u = users[0]; p = pwds[0]
-                try: u.clear(); u.click()
-                except Exception: pass
-                try: u.send_keys(self.auth.username)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", u, self.auth.username)
-                try: p.clear(); p.click()
-                except Exception: pass
-                try: p.send_keys(self.auth.password)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", p, self.auth.password)
-                for by, sel in [
-                    (By.CSS_SELECTOR, "button[type='submit']"),
-                    (By.CSS_SELECTOR, "input[type='submit']"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'sign in')]"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'log in')]"),
-                    (By.XPATH, "//input[@type='submit']"),
-                ]:
-                    try:
-                        btn = d.find_element(by, sel)
-                        try: btn.click()
-                        except Exception: d.execute_script("arguments[0].click();", btn)
-                        return True
-                    except Exception:
-                        continue
-                p.send_keys(Keys.ENTER)
-                return True
-            except Exception:
-                return False
-
-        if not try_login_in_ctx():
-            _switch_login_iframe()
-            try_login_in_ctx()
-
-        try:
-            w.until(lambda drv: drv.current_url != url)
-        except Exception:
-            pass
-        self.log(_ts() + "[PN] Login appears successful.")
-        return True
+        # The workflow steps use the module-level By/WebDriverWait/EC/Keys
+        _lazy_import_selenium()
+        super().start(chrome_profile_dir)
 
     def _switch_to_search_content_frame(self) -> bool:
         from selenium.webdriver.common.by import By
@@ -316,6 +210,7 @@ class PNClient:
 
     def go_to_search(self) -> bool:
         """Open the Search UI and ensure the content frame is focused."""
+        self.ensure_session()
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
@@ -349,6 +244,7 @@ class PNClient:
         """
         Individual > Individual ID: enter ID # > Press Go > WAIT for dropdown/results.
         """
+        self.ensure_session()
         try:
             from selenium.webdriver.common.by import By
             from selenium.webdriver.support.ui import WebDriverWait
@@ -2833,71 +2729,6 @@ class PNClient:
                 pass
             return False
 
-    def click_toolbar_search_with_wait(self, timeout: int = 20) -> bool:
-        '''Click the toolbar Search button (#navSearch) that lives in frame_1 (frm_content_id)'''
-        try:
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-        except Exception:
-            return False
-
-        d = self.driver
-        try:
-            d.switch_to.default_content()
-            fr = WebDriverWait(d, timeout).until(EC.presence_of_element_located((By.ID, "frm_content_id")))
-            d.switch_to.frame(fr)
-
-            try:
-                WebDriverWait(d, timeout).until(lambda drv: drv.execute_script("return document.readyState") == "complete")
-            except Exception:
-                pass
-
-            def _overlay_gone(driver):
-                try:
-                    gray = driver.find_elements(By.ID, "mainFrameCoverGray")
-                    white = driver.find_elements(By.ID, "mainFrameCoverWhite")
-                    def hidden(el):
-                        try:
-                            if not el.is_displayed(): return True
-                            disp = el.value_of_css_property("display") or ""
-                            vis  = el.value_of_css_property("visibility") or ""
-                            op   = el.value_of_css_property("opacity") or "1"
-                            return disp == "none" or vis == "hidden" or float(op) == 0.0
-                        except Exception:
-                            return True
-                    covers = (gray or []) + (white or [])
-                    return all(hidden(el) for el in covers) if covers else True
-                except Exception:
-                    return True
-            try:
-                WebDriverWait(d, timeout).until(_overlay_gone)
-            except Exception:
-                pass
-
-            btn = WebDriverWait(d, timeout).until(EC.element_to_be_clickable((By.ID, "navSearch")))
-            try:
-                btn.click()
-            except Exception:
-                d.execute_script("arguments[0].click();", btn)
-
-            d.switch_to.default_content()
-            return True
-        except Exception:
-            try:
-                d.switch_to.default_content()
-                origin = d.execute_script("return location.origin")
-            except Exception:
-                import re as _re
-                cur = d.current_url or ""
-                m = _re.match(r"^(https?://[^/]+)", cur)
-                origin = m.group(1) if m else "https://integrityseniorservices.athena-us.com"
-            try:
-                d.get(origin + "/acm_searchControl?actionType=view")
-                return True
-            except Exception:
-                return False
-
     def click_search_button_to_return_to_search(self, timeout: int = 10) -> bool:
         """Click the search button at the top of the screen to return to the search page."""
         if not self.driver:
@@ -4619,7 +4450,7 @@ class PNClient:
             time.sleep(1)  # Reduced from 2 to 1 second
             
             # Store current window handles before clicking Print
-            original_windows = d.window_handles
+            original_windows = self.own_window_handles()
             self.log(f"[PRINT-BUTTON] Current windows before Print click: {len(original_windows)}")
             
             # Try multiple strategies to find the Print button (with shorter timeouts)
@@ -4656,7 +4487,7 @@ class PNClient:
                     new_window_opened = False
                     for i in range(max_wait):
                         time.sleep(0.5)
-                        current_windows = d.window_handles
+                        current_windows = self.own_window_handles()
                         if len(current_windows) > len(original_windows):
                             new_window_opened = True
                             self.log(f"[PRINT-BUTTON] ✓ New window/tab opened! Total windows: {len(current_windows)} (was {len(original_windows)})")
@@ -4742,7 +4573,7 @@ class PNClient:
                 new_window_opened = False
                 for i in range(max_wait):
                     time.sleep(0.5)
-                    current_windows = d.window_handles
+                    current_windows = self.own_window_handles()
                     if len(current_windows) > len(original_windows):
                         new_window_opened = True
                         self.log(f"[PRINT-BUTTON] ✓ New window/tab opened! Total windows: {len(current_windows)} (was {len(original_windows)})")
@@ -4836,7 +4667,7 @@ class PNClient:
             # CRITICAL: Switch to the new window/tab that opened after clicking Print
             # The new window contains the document, not the Penelope page
             self.log("[PDF-SAVE] Checking for new document window...")
-            current_windows = d.window_handles
+            current_windows = self.own_window_handles()
             original_window = d.current_window_handle
             
             self.log(f"[PDF-SAVE][DEBUG] Current window handles: {len(current_windows)} windows open")
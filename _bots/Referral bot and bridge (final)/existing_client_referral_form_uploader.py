@@ -26,6 +26,14 @@ except ImportError:
     PANDAS_AVAILABLE = False
     pd = None
 
+# Pre-built PDF filename index (falls back to walking the folder per row)
+try:
+    from pdf_name_index import get_pdf_index
+    PDF_INDEX_AVAILABLE = True
+except ImportError:
+    PDF_INDEX_AVAILABLE = False
+    get_pdf_index = None
+
 APP_TITLE = "Existing Client Referral Form Uploader - Dual Tab"
 MAROON    = "#800000"
 HEADER_FG = "#ffffff"
@@ -157,6 +165,37 @@ def _extract_full_name_from_csv(row, client_name_idx):
     return client_name
 
 
+def _normalize_referral_pdf_name(fn: str) -> str:
+    """Lower-case filename stem with the referral/reassignment prefix and '- no ia' suffix removed."""
+    # Extract base filename without extension for matching
+    name_norm = re.sub(r"[\s_]+", " ", os.path.splitext(fn)[0].lower())
+    
+    # Remove common prefixes for matching (but don't require them)
+    # This allows files with or without these prefixes to be found
+    prefixes_to_remove = [
+        "ips reassignment",
+        "reassignment",
+        "ips referral",
+        "referral",
+        "referral form",
+        "ips referral form"
+    ]
+    for prefix in prefixes_to_remove:
+        if name_norm.startswith(prefix):
+            name_norm = name_norm[len(prefix):].strip()
+            break  # Only remove one prefix
+    
+    # Remove common suffixes for matching
+    if name_norm.endswith("- no ia"):
+        name_norm = name_norm[:-len("- no ia")].strip()
+    return name_norm
+
+
+def _is_ips_referral_file(filename_lower: str) -> bool:
+    """Files explicitly marked as IPS referral/reassignment forms"""
+    return "ips" in filename_lower and ("reassignment" in filename_lower or "referral" in filename_lower)
+
+
 def _find_pdf_for_client(base_folder: str, client_name: str, is_ips_counselor: bool):
     """
     Find PDF for client with improved matching logic.
@@ -165,6 +204,12 @@ def _find_pdf_for_client(base_folder: str, client_name: str, is_ips_counselor: b
     if not base_folder or not os.path.isdir(base_folder):
         return None
     
+    if PDF_INDEX_AVAILABLE:
+        accept = None
+        if not is_ips_counselor:
+            accept = lambda entry: not _is_ips_referral_file(entry.filename_lower)
+        return get_pdf_index(base_folder, _normalize_referral_pdf_name).find(client_name, accept)
+    
     want = re.sub(r"\s+", " ", client_name).strip().lower()
     want_parts = want.split()
     
@@ -184,31 +229,10 @@ def _find_pdf_for_client(base_folder: str, client_name: str, is_ips_counselor: b
             if not is_ips_counselor:
                 # For non-IPS counselors, skip files that explicitly have "ips" in the name
                 # (to avoid uploading IPS-specific files to non-IPS counselors)
-                if "ips" in filename_lower and ("reassignment" in filename_lower or "referral" in filename_lower):
+                if _is_ips_referral_file(filename_lower):
                     continue
             
-            # Extract base filename without extension for matching
-            name_norm = re.sub(r"[\s_]+", " ", os.path.splitext(fn)[0].lower())
-            
-            # Remove common prefixes for matching (but don't require them)
-            # This allows files with or without these prefixes to be found
-            prefixes_to_remove = [
-                "ips reassignment",
-                "reassignment",
-                "ips referral",
-                "referral",
-                "referral form",
-                "ips referral form"
-            ]
-            for prefix in prefixes_to_remove:
-                if name_norm.startswith(prefix):
-                    name_norm = name_norm[len(prefix):].strip()
-                    break  # Only remove one prefix
-            
-            # Remove common suffixes for matching
-            if name_norm.endswith("- no ia"):
-                name_norm = name_norm[:-len("- no ia")].strip()
-            
+            name_norm = _normalize_referral_pdf_name(fn)
             name_parts = name_norm.split()
             
             # Score based on how well the filename matches the client name
@@ -10,6 +10,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext
 from dataclasses import dataclass
 from typing import Optional, Dict, List
+from pathlib import Path
 import requests
 import argparse
 
@@ -256,13 +257,12 @@ class LocalSlice:
         return recs
 
 # ---------------- Penelope client ----------------
-PN_DEFAULT_URL = "https://integrityseniorservices.athena-us.com/acm_loginControl"
-
-@dataclass
-class PNAuth:
-    url: str
-    username: str
-    password: str
+# Shared Penelope client (start/login/search, warm browser sessions via the
+# driver broker) - lives in the installation's _system folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # _bots
+from system_path import add_system_path
+add_system_path()
+from penelope_client import PN_DEFAULT_URL, PNAuth, PNClient as SharedPNClient
 
 def _pick_profile_dir(user_data_dir: str) -> tuple[str, str]:
     if not user_data_dir or not os.path.isdir(user_data_dir):
@@ -282,129 +282,16 @@ def _pick_profile_dir(user_data_dir: str) -> tuple[str, str]:
         return user_data_dir, ""
 
 
-class PNClient:
-    def __init__(self, auth: PNAuth, log):
-        self.auth = auth
-        self.log = log
-        self.driver = None
-        self.wait = None
-
+class PNClient(SharedPNClient):
     def start(self, chrome_profile_dir: Optional[str] = None):
-        webdriver, _By, _WebDriverWait, _EC, _Keys, Service, ChromeDriverManager = _lazy_import_selenium()
-        try:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--start-maximized")
-            # Only attach Chrome profile if explicitly provided (OneDrive mode). CSV/XLSX local runs pass None.
-            if chrome_profile_dir and os.path.isdir(chrome_profile_dir):
-                ud_dir, prof_name = _pick_profile_dir(chrome_profile_dir)
-                options.add_argument(f"--user-data-dir={ud_dir}")
-                if prof_name:
-                    options.add_argument(f"--profile-directory={prof_name}")
-                    self.log(_ts() + f"[BROWSER] Using Chrome profile: {ud_dir}\\{prof_name}")
-                else:
-                    self.log(_ts() + f"[BROWSER] Using Chrome user-data: {ud_dir}")
-            else:
-                self.log(_ts() + "[BROWSER] Using fresh Selenium profile (no saved cookies).")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.wait = _WebDriverWait(self.driver, 20)  # match Welcome bot timing
-        except Exception as e:
-            self.log(_ts() + f"[BROWSER][ERR] Could not start Chrome: {e}")
-            raise
-
-    def login(self) -> bool:
-        d, w = self.driver, self.wait
-        url = (self.auth.url or PN_DEFAULT_URL).strip()
-        self.log(_ts() + f"[PN] Opening {url} …")
-        try:
-            d.get(url)
-        except Exception as e:
-            self.log(_ts() + f"[PN][ERR] Could not open URL: {e}")
-            return False
-
-        # Locate the login iframe and the user/password inputs
-        def _switch_login_iframe():
-            try:
-                d.switch_to.default_content()
-                frames = d.find_elements("css selector", "iframe, frame")
-                for fr in frames:
-                    try:
-                        src = (fr.get_attribute("src") or "").lower()
-                        idv = (fr.get_attribute("id") or "").lower()
-                        namev = (fr.get_attribute("name") or "").lower()
-                        if "acm_login" in src or "login" in src or "acm_login" in idv or "acm_login" in namev:
-                            d.switch_to.frame(fr); return True
-                    except Exception:
-                        continue
-                # try a direct known id
-                try:
-                    fr = d.find_element("id", "acm_loginControl")
-                    d.switch_to.frame(fr); return True
-                except Exception:
-                    pass
-                return False
-            except Exception:
-                return False
-
-        # Some tenants show an interstitial; be tolerant
-        try:
-            _switch_login_iframe()
-        except Exception:
-            pass
-
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.common.keys import Keys
-
-        # Try to find fields in current context (iframe or default)
-        def try_login_in_ctx():
-            try:
-                users = d.find_elements(By.CSS_SELECTOR, "input[type='text'],input[type='email']")
-                pwds  = d.find_elements(By.CSS_SELECTOR, "input[type='password']")
-                if not users or not pwds:
-                    return False
-                u = users[0]; p = pwds[0]
-                try: u.clear(); u.click()
-                except Exception: pass
-                try: u.send_keys(self.auth.username)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", u, self.auth.username)
-                try: p.clear(); p.click()
-                except Exception: pass
-                try: p.send_keys(self.auth.password)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", p, self.auth.password)
-                # Click submit or press Enter
-                for by, sel in [
-                    (By.CSS_SELECTOR, "button[type='submit']"),
-                    (By.CSS_SELECTOR, "input[type='submit']"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'sign in')]"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'log in')]"),
-                    (By.XPATH, "//input[@type='submit']"),
-                ]:
-                    try:
-                        btn = d.find_element(by, sel)
-                        try: btn.click()
-                        except Exception: d.execute_script("arguments[0].click();", btn)
-                        return True
-                    except Exception:
-                        continue
-                p.send_keys(Keys.ENTER)
-                return True
-            except Exception:
-                return False
-
-        if not try_login_in_ctx():
-            # Try switching iframe and re-attempt
-            _switch_login_iframe()
-            try_login_in_ctx()
-
-        try:
-            # Wait for URL change or presence of a logout control
-            w.until(lambda drv: drv.current_url != url)
-        except Exception:
-            pass
-        self.log(_ts() + "[PN] Login appears successful.")
-        return True
+        # The workflow steps use the module-level By/WebDriverWait/EC/Keys
+        _lazy_import_selenium()
+        # Only attach Chrome profile if explicitly provided (OneDrive mode). CSV/XLSX local runs pass None.
+        if chrome_profile_dir and os.path.isdir(chrome_profile_dir):
+            ud_dir, prof_name = _pick_profile_dir(chrome_profile_dir)
+            super().start(ud_dir, profile_directory=prof_name or None)
+        else:
+            super().start()
 
     def _switch_to_search_content_frame(self) -> bool:
         from selenium.webdriver.common.by import By
@@ -419,6 +306,7 @@ class PNClient:
 
     def go_to_search(self) -> bool:
         """Open the Search UI and ensure the content frame is focused."""
+        self.ensure_session()
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
@@ -476,6 +364,7 @@ class PNClient:
 
     def enter_individual_id_and_go(self, indiv_id: str) -> bool:
         # Ensure we are on the Search page
+        self.ensure_session()
         self.go_to_search()
         if not self._switch_to_search_content_frame():
             self.log(_ts() + "[SEARCH][ERR] Could not switch to the Search content frame.")
@@ -528,82 +417,6 @@ class PNClient:
         except Exception:
             return False
 
-    def click_toolbar_search_with_wait(self, timeout: int = 20) -> bool:
-        '''
-        Click the toolbar Search button (#navSearch) that lives in frame_1 (frm_content_id)
-        after login, waiting for overlays to disappear and the frame to be ready.
-        '''
-        try:
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-        except Exception:
-            return False
-
-        d = self.driver
-        try:
-            # Always start from default content
-            d.switch_to.default_content()
-            # Wait for content frame to be present and switch in
-            fr = WebDriverWait(d, timeout).until(EC.presence_of_element_located((By.ID, "frm_content_id")))
-            d.switch_to.frame(fr)
-
-            # Wait for document readiness
-            try:
-                WebDriverWait(d, timeout).until(lambda drv: drv.execute_script("return document.readyState") == "complete")
-            except Exception:
-                pass
-
-            # Wait for overlays to be gone inside the frame
-            def _overlay_gone(driver):
-                try:
-                    gray = driver.find_elements(By.ID, "mainFrameCoverGray")
-                    white = driver.find_elements(By.ID, "mainFrameCoverWhite")
-                    # Consider overlays "gone" if none present or all are hidden/not displayed
-                    def hidden(el):
-                        try:
-                            if not el.is_displayed(): return True
-                            disp = el.value_of_css_property("display") or ""
-                            vis  = el.value_of_css_property("visibility") or ""
-                            op   = el.value_of_css_property("opacity") or "1"
-                            return disp == "none" or vis == "hidden" or float(op) == 0.0
-                        except Exception:
-                            return True
-                    covers = (gray or []) + (white or [])
-                    return all(hidden(el) for el in covers) if covers else True
-                except Exception:
-                    return True
-            try:
-                WebDriverWait(d, timeout).until(_overlay_gone)
-            except Exception:
-                pass
-
-            # Now click the toolbar Search li#navSearch
-            btn = WebDriverWait(d, timeout).until(EC.element_to_be_clickable((By.ID, "navSearch")))
-            try:
-                btn.click()
-            except Exception:
-                d.execute_script("arguments[0].click();", btn)
-
-            # Leave frame; let caller proceed
-            d.switch_to.default_content()
-            return True
-        except Exception:
-            # Fallback: direct open the Search page route on same origin
-            try:
-                d.switch_to.default_content()
-                origin = d.execute_script("return location.origin")
-            except Exception:
-                import re as _re
-                cur = d.current_url or ""
-                m = _re.match(r"^(https?://[^/]+)", cur)
-                origin = m.group(1) if m else "https://integrityseniorservices.athena-us.com"
-            try:
-                d.get(origin + "/acm_searchControl?actionType=view")
-                return True
-            except Exception:
-                return False
-
     def click_individual_tab(self, timeout: int = 8) -> bool:
         '''
         FAST: force-switch to "Individual" tab on the Search page inside frm_content_id.
@@ -641,6 +454,7 @@ class PNClient:
         Individual > Individual ID: enter ID # > Press Go > WAIT for dropdown/results.
         Only this step is modified. No other flow is touched.
         """
+        self.ensure_session()
         try:
             from selenium.webdriver.common.by import By
             from selenium.webdriver.support.ui import WebDriverWait
@@ -1258,25 +1072,19 @@ class PNClient:
             return False
 
         main = d.current_window_handle
-        handles_before = set(d.window_handles)
+        # Only this bot's windows: the shared browser also holds other bots' tabs
+        handles_before = set(self.own_window_handles())
         try: d.execute_script("arguments[0].scrollIntoView({block:'center'});", anchor)
         except Exception: pass
         try: anchor.click()
         except Exception: d.execute_script("arguments[0].click();", anchor)
 
         # Wait for new report window
-        def _new_win(driver): return len(driver.window_handles) > len(handles_before)
+        def _new_win(driver): return [h for h in self.own_window_handles() if h not in handles_before]
         try:
-            WebDriverWait(d, timeout).until(_new_win)
+            new_handle = WebDriverWait(d, timeout).until(_new_win)[0]
         except Exception:
             return False
-
-        new_handle = None
-        for h in d.window_handles:
-            if h not in handles_before:
-                new_handle = h; break
-        if not new_handle:
-            new_handle = d.window_handles[-1]
         try:
             d.switch_to.window(new_handle)
         except Exception:
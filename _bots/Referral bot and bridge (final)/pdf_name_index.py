@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+In-memory filename index for finding a client's referral PDF.
+
+The uploaders used to ``os.walk`` the whole PDF folder and score every
+filename for every CSV row.  ``PdfNameIndex`` scans the folder once, keeps
+each PDF's normalized name tokens in an inverted index (token trigrams ->
+tokens -> files) and afterwards only re-lists directories whose mtime
+changed.  A lookup scores just the files that share a token fragment with
+the client name, using the same scoring rules as the old scan, so it returns
+the same file.
+"""
+
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_EMPTY: Set[str] = frozenset()
+
+
+def normalize_pdf_name(filename: str) -> str:
+    """Lower-case stem with runs of whitespace/underscores collapsed to one space."""
+    return re.sub(r"[\s_]+", " ", os.path.splitext(filename)[0].lower())
+
+
+def normalize_client_name(client_name: str) -> str:
+    return re.sub(r"\s+", " ", client_name).strip().lower()
+
+
+def score_name(want: str, want_parts: List[str], name_norm: str) -> int:
+    """Match score of a normalized filename against a normalized client name (0 = no match)."""
+    name_parts = name_norm.split()
+    if want in name_norm or name_norm in want:
+        return 100
+    if all(part in name_norm for part in want_parts):
+        return 90
+    if any(part in name_norm for part in want_parts if len(part) > 2):
+        matching_words = sum(1 for part in want_parts if part in name_norm and len(part) > 2)
+        return 50 + (matching_words * 10)
+    if any(part in want for part in name_parts if len(part) > 2):
+        matching_words = sum(1 for part in name_parts if part in want and len(part) > 2)
+        return 40 + (matching_words * 10)
+    return 0
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PdfEntry:
+    """One indexed PDF"""
+
+    __slots__ = ("path", "filename_lower", "name_norm", "tokens", "mtime", "has_ips", "order")
+
+    def __init__(self, path: str, filename: str, name_norm: str, mtime: float, order: Tuple):
+        self.path = path
+        self.filename_lower = filename.lower()
+        self.name_norm = name_norm
+        self.tokens = set(name_norm.split())
+        self.mtime = mtime
+        self.has_ips = "ips" in self.filename_lower
+        # os.walk visiting order, used to break exact ties the way the old scan did
+        self.order = order
+
+
+class PdfNameIndex:
+    """
+    Filename index for one PDF folder (including subfolders).
+
+    ``normalize`` turns a filename into the string that is scored against
+    the client name; the uploaders differ in which prefixes they strip.
+    """
+
+    def __init__(self, base_folder: str, normalize: Callable[[str], str] = normalize_pdf_name):
+        self.base_folder = os.path.abspath(base_folder)
+        self.normalize = normalize
+        self.entries: Dict[str, PdfEntry] = {}
+        # directory -> (mtime, walk-order key, files, subdirectories)
+        self._dirs: Dict[str, Tuple[float, Tuple, List[str], List[str]]] = {}
+        self._token_files: Dict[str, Set[str]] = {}
+        self._gram_tokens: Dict[str, Set[str]] = {}
+        # Files without a token longer than 2 characters can match any name
+        # ("name_norm in want"), so they are always candidates
+        self._short_names: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+    def refresh(self) -> int:
+        """Re-list directories whose mtime changed; returns how many were rescanned."""
+        with self._lock:
+            if not os.path.isdir(self.base_folder):
+                self._clear()
+                return 0
+            return self._refresh_dir(self.base_folder, ())
+
+    def _refresh_dir(self, directory: str, order: Tuple) -> int:
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            self._forget_dir(directory)
+            return 0
+
+        rescanned = 0
+        state = self._dirs.get(directory)
+        if state is not None and state[0] == mtime and state[1] != order:
+            # A sibling folder appeared or vanished: only the walk order moved
+            for position, name in enumerate(state[2]):
+                entry = self.entries.get(os.path.join(directory, name))
+                if entry is not None:
+                    entry.order = (order, position)
+            state = self._dirs[directory] = (mtime, order, state[2], state[3])
+        if state is None or state[0] != mtime:
+            self._forget_files(directory)
+            files: List[str] = []
+            subdirs: List[str] = []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                # os.walk does not descend into directory symlinks
+                                if not entry.is_symlink():
+                                    subdirs.append(entry.name)
+                            elif entry.name.lower().endswith(".pdf"):
+                                files.append(entry.name)
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            for position, name in enumerate(files):
+                path = os.path.join(directory, name)
+                try:
+                    file_mtime = os.path.getmtime(path)
+                except OSError:
+                    file_mtime = 0
+                self._add(PdfEntry(path, name, self.normalize(name), file_mtime, (order, position)))
+            if state is not None:
+                for gone in set(state[3]) - set(subdirs):
+                    self._forget_dir(os.path.join(directory, gone))
+            state = (mtime, order, files, subdirs)
+            self._dirs[directory] = state
+            rescanned += 1
+
+        # Subdirectory contents change without touching the parent's mtime
+        for position, name in enumerate(state[3]):
+            rescanned += self._refresh_dir(os.path.join(directory, name), order + (position,))
+        return rescanned
+
+    def _add(self, entry: PdfEntry) -> None:
+        self.entries[entry.path] = entry
+        long_tokens = [token for token in entry.tokens if len(token) > 2]
+        if not long_tokens:
+            self._short_names.add(entry.path)
+        for token in entry.tokens:
+            files = self._token_files.get(token)
+            if files is None:
+                files = self._token_files[token] = set()
+                for gram in _trigrams(token):
+                    self._gram_tokens.setdefault(gram, set()).add(token)
+            files.add(entry.path)
+
+    def _remove(self, path: str) -> None:
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return
+        self._short_names.discard(path)
+        for token in entry.tokens:
+            files = self._token_files.get(token)
+            if files is None:
+                continue
+            files.discard(path)
+            if not files:
+                del self._token_files[token]
+                for gram in _trigrams(token):
+                    tokens = self._gram_tokens.get(gram)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self._gram_tokens[gram]
+
+    def _forget_files(self, directory: str) -> None:
+        state = self._dirs.get(directory)
+        if state is None:
+            return
+        for name in state[2]:
+            self._remove(os.path.join(directory, name))
+
+    def _forget_dir(self, directory: str) -> None:
+        state = self._dirs.get(directory)
+        if state is None:
+            return
+        self._forget_files(directory)
+        del self._dirs[directory]
+        for name in state[3]:
+            self._forget_dir(os.path.join(directory, name))
+
+    def _clear(self) -> None:
+        self.entries.clear()
+        self._dirs.clear()
+        self._token_files.clear()
+        self._gram_tokens.clear()
+        self._short_names.clear()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def candidates(self, want: str, want_parts: List[str]) -> Iterable[PdfEntry]:
+        """Every entry that can score above 0 for ``want``."""
+        long_parts = [part for part in want_parts if len(part) > 2]
+        if not long_parts:
+            # Only one- and two-letter parts: no trigram to look up
+            return list(self.entries.values())
+
+        tokens: Set[str] = set()
+        # A client-name part contained in a filename token
+        for part in long_parts:
+            posting_lists = sorted((self._gram_tokens.get(gram, _EMPTY) for gram in _trigrams(part)), key=len)
+            matches = set(posting_lists[0]).intersection(*posting_lists[1:])
+            tokens.update(token for token in matches if part in token)
+        # A filename token contained in the client name
+        for gram in _trigrams(want):
+            tokens.update(token for token in self._gram_tokens.get(gram, _EMPTY) if token in want)
+
+        paths = set(self._short_names)
+        for token in tokens:
+            paths.update(self._token_files.get(token, _EMPTY))
+        return [self.entries[path] for path in paths]
+
+    def find(self, client_name: str, accept: Optional[Callable[[PdfEntry], bool]] = None) -> Optional[str]:
+        """Best-scoring PDF for ``client_name`` (newest file wins a tie), or None."""
+        want = normalize_client_name(client_name)
+        want_parts = want.split()
+        with self._lock:
+            best_score = 0
+            best: List[PdfEntry] = []
+            for entry in self.candidates(want, want_parts):
+                if accept is not None and not accept(entry):
+                    continue
+                score = score_name(want, want_parts, entry.name_norm)
+                if score > best_score:
+                    best_score = score
+                    best = [entry]
+                elif score and score == best_score:
+                    best.append(entry)
+            if not best:
+                return None
+            # Files can be overwritten in place without changing the directory mtime
+            for entry in best:
+                try:
+                    entry.mtime = os.path.getmtime(entry.path)
+                except OSError:
+                    entry.mtime = 0
+            winner = min(best, key=lambda entry: (-entry.mtime, entry.order))
+            return winner.path
+
+
+_indexes: Dict[Tuple[str, Callable[[str], str]], PdfNameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_pdf_index(base_folder: str, normalize: Callable[[str], str] = normalize_pdf_name) -> PdfNameIndex:
+    """Shared, refreshed index for ``base_folder`` (built on first use)."""
+    key = (os.path.abspath(base_folder), normalize)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = PdfNameIndex(base_folder, normalize)
+    index.refresh()
+    return index
+
+
+__all__ = ["PdfEntry", "PdfNameIndex", "get_pdf_index", "normalize_pdf_name", "score_name"]
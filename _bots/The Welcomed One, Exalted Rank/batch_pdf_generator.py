@@ -0,0 +1,667 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch PDF generation for the consent and welcome bots.
+
+``fill_and_flatten_pdf`` (consent bot) and ``stamp_letter_pdf`` /
+``stamp_packet_pdf`` (welcome bot) re-read the template for every client,
+write a reportlab overlay to a temp file and merge it.  Here each template
+is parsed once: the field rectangles, existing values and the field every
+value lands in are worked out up front with the same matching rules, so a
+client only costs drawing its overlay in memory and writing the output.
+``generate_batch`` spreads a list of jobs over a process pool; each worker
+keeps its own template cache.
+
+Benchmark against the per-client path:
+    python batch_pdf_generator.py benchmark --template "<consent.pdf>" --count 300
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from pdfrw import IndirectPdfDict, PdfArray, PdfDict, PdfName, PdfReader, PdfWriter
+    from pdfrw.buildxobj import pagexobj
+    from reportlab.lib.colors import black
+    from reportlab.pdfgen import canvas as rl_canvas
+    BATCH_PDF_AVAILABLE = True
+except ImportError:
+    BATCH_PDF_AVAILABLE = False
+
+# Keys tried against the consent templates, in the order the consent bot tries them
+CONSENT_FIELD_KEYS: Tuple[Tuple[str, str], ...] = (
+    ("Client name print", "client_name"),
+    ("Client Name Print", "client_name"),
+    ("Nombre del Cliente", "client_name"),  # Spanish: Client Name
+    ("Nombre", "client_name"),  # Spanish: Name
+    ("Date", "date"),
+    ("Fecha", "date"),  # Spanish: Date
+)
+
+# Catalog entries carried into the output.  The structure tree and outlines
+# point at the template's own page objects and would pull a second copy of
+# every page into each file.
+_CATALOG_KEEP = ("/Lang", "/Metadata", "/OCProperties", "/PageLayout", "/ViewerPreferences")
+
+OVERLAY_XOBJECT = "/ClientOverlay"
+
+# Below this many jobs per worker a pool costs more to start than it saves
+MIN_JOBS_PER_WORKER = 20
+MAX_WORKERS = 8
+
+
+def _norm(s) -> str:
+    return " ".join(str(s or "").strip().lower().split())
+
+
+def _text(obj) -> str:
+    try:
+        return obj.to_unicode() if hasattr(obj, "to_unicode") else str(obj)
+    except Exception:
+        return str(obj)
+
+
+@dataclass
+class Widget:
+    """One form widget of a template page"""
+    page: int
+    rect: Optional[Tuple[float, ...]]
+    name: Optional[str]
+    value: Optional[str]  # value already stored in the template
+
+
+class CachedTemplate:
+    """
+    A template PDF parsed once.
+
+    The flattened template (widgets and AcroForm removed, as the per-client
+    functions do) is serialized once.  A client's file is those bytes plus
+    an incremental update holding the overlay and the pages it is drawn on,
+    so the template's fonts, images and content streams are never written
+    again.
+    """
+
+    def __init__(self, path: str):
+        if not BATCH_PDF_AVAILABLE:
+            raise RuntimeError("pdfrw and reportlab are required (pip install pdfrw reportlab)")
+        self.path = path
+        reader = PdfReader(path)
+        if not reader.pages:
+            raise ValueError(f"Template has no pages: {path}")
+
+        self.widgets: List[Widget] = []
+        self.page_sizes: List[Tuple[float, float]] = []
+        pages_node = IndirectPdfDict(Type=PdfName.Pages)
+        kids = PdfArray()
+        for index, page in enumerate(reader.pages):
+            inheritable = page.inheritable
+            mb = inheritable.MediaBox
+            llx, lly, urx, ury = [float(x) for x in (mb[0], mb[1], mb[2], mb[3])]
+            self.page_sizes.append((urx - llx, ury - lly))
+
+            for annot in page.Annots or []:
+                if annot.Subtype != PdfName.Widget:
+                    continue
+                rect = annot.Rect
+                try:
+                    rect = tuple(float(v) for v in rect) if rect else None
+                except (TypeError, ValueError):
+                    rect = None
+                name = str(_text(annot.T)).strip("()") if annot.T else None
+                value = _text(annot.V) if annot.V is not None else None
+                self.widgets.append(Widget(index, rect, name, value))
+
+            flat = IndirectPdfDict(
+                page,
+                Parent=pages_node,
+                Resources=inheritable.Resources,
+                MediaBox=inheritable.MediaBox,
+                CropBox=inheritable.CropBox,
+                Rotate=inheritable.Rotate,
+            )
+            flat.Annots = None
+            flat.StructParents = None
+            kids.append(flat)
+        pages_node.Kids = kids
+        pages_node.Count = len(kids)
+
+        # The structure tree and outlines point at the template's own pages
+        root = IndirectPdfDict(Type=PdfName.Catalog, Pages=pages_node)
+        for key in _CATALOG_KEEP:
+            if reader.Root.get(key) is not None:
+                root[PdfName(key[1:])] = reader.Root.get(key)
+        trailer = PdfDict(Root=root, Info=reader.Info)
+        buf = io.BytesIO()
+        PdfWriter(buf, trailer=trailer).write()
+        self._base = buf.getvalue()
+
+        # Object numbers of the flattened file, for the incremental update
+        base = PdfReader(fdata=self._base)
+        base.read_all()
+        self._base_refs = {id(obj): key for key, obj in base.indirect_objects.items()}
+        self._base_pages = list(base.pages)
+        self._base_size = int(base.Size)
+        self._base_root = base.Root.indirect
+        self._base_info = base.Info.indirect if base.Info is not None else None
+        tail = self._base[self._base.rindex(b"startxref"):].split()
+        self._base_xref = int(tail[1])
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+    def _overlays(self, drawings: Dict[int, List[Tuple[float, float, float, str]]]) -> Dict[int, PdfDict]:
+        """Draw ``{page: [(font_size, x, y, text), ...]}`` in memory; one Form XObject per page."""
+        buf = io.BytesIO()
+        c = rl_canvas.Canvas(buf)
+        order = sorted(drawings)
+        for index in order:
+            c.setPageSize(self.page_sizes[index])
+            c.setFillColor(black)
+            for font_size, x, y, text in drawings[index]:
+                c.setFont("Helvetica", font_size)
+                c.drawString(x, y, text)
+            c.showPage()
+        c.save()
+        overlay = PdfReader(fdata=buf.getvalue())
+        return {index: pagexobj(page) for index, page in zip(order, overlay.pages)}
+
+    def render_bytes(self, drawings: Dict[int, List[Tuple[float, float, float, str]]]) -> bytes:
+        if not drawings:
+            return self._base
+        update = _IncrementalUpdate(self._base_refs, self._base_size)
+        for index, xobj in self._overlays(drawings).items():
+            page = self._base_pages[index]
+            entries = [(key, value) for key, value in page.iteritems() if key not in ("/Contents", "/Resources")]
+
+            resources = page.Resources or PdfDict()
+            xobjects = [(key, value) for key, value in (resources.XObject or PdfDict()).iteritems()]
+            xobjects.append((OVERLAY_XOBJECT, update.ref(xobj)))
+            res_entries = [(key, value) for key, value in resources.iteritems() if key != "/XObject"]
+            res_entries.append(("/XObject", update.raw_dict(xobjects)))
+            entries.append(("/Resources", update.raw_dict(res_entries)))
+
+            contents = page.Contents
+            if contents is None:
+                contents = []
+            elif isinstance(contents, PdfDict):
+                contents = [contents]
+            streams = [PdfDict(indirect=True, stream="q")] + list(contents)
+            streams.append(PdfDict(indirect=True, stream=f"Q\n{OVERLAY_XOBJECT} Do"))
+            entries.append(("/Contents", "[" + " ".join(update.token(obj) for obj in streams) + "]"))
+
+            update.replace(page.indirect, update.raw_dict(entries))
+        return update.build(self._base, self._base_xref, self._base_root, self._base_info)
+
+    def write(self, output_path: str, drawings: Dict[int, List[Tuple[float, float, float, str]]]) -> None:
+        data = self.render_bytes(drawings)
+        out_dir = os.path.dirname(output_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(data)
+
+
+class _IncrementalUpdate:
+    """
+    Objects appended to a finished PDF, with their own xref section.
+
+    Objects of the base file are referenced by their existing numbers; any
+    other indirect object (or stream) reached while serializing is numbered
+    after the base file's /Size.
+    """
+
+    def __init__(self, base_refs: Dict[int, Tuple[int, int]], base_size: int):
+        self.base_refs = base_refs
+        self.next_num = base_size
+        # id -> (number, object); holding the object keeps its id from being reused
+        self.numbers: Dict[int, Tuple[int, object]] = {}
+        self.bodies: Dict[Tuple[int, int], str] = {}
+        self._pending: List[Tuple[int, object]] = []
+
+    def ref(self, obj) -> str:
+        key = self.base_refs.get(id(obj))
+        if key is not None:
+            return f"{key[0]} {key[1]} R"
+        known = self.numbers.get(id(obj))
+        if known is not None:
+            return f"{known[0]} 0 R"
+        num = self.next_num
+        self.next_num += 1
+        self.numbers[id(obj)] = (num, obj)
+        self._pending.append((num, obj))
+        return f"{num} 0 R"
+
+    def token(self, obj) -> str:
+        if id(obj) in self.base_refs or getattr(obj, "indirect", False) or getattr(obj, "stream", None) is not None:
+            return self.ref(obj)
+        if isinstance(obj, PdfDict):
+            return self.raw_dict(obj.iteritems())
+        if isinstance(obj, list):
+            return "[" + " ".join(self.token(v) for v in obj) + "]"
+        if isinstance(obj, bool):
+            return "true" if obj else "false"
+        return str(obj)
+
+    def raw_dict(self, entries) -> str:
+        return "<<" + " ".join(f"{key} {self.token(value)}" for key, value in entries) + ">>"
+
+    def replace(self, key: Tuple[int, int], body: str) -> None:
+        self.bodies[key] = body
+
+    def _flush(self) -> None:
+        while self._pending:
+            num, obj = self._pending.pop()
+            stream = getattr(obj, "stream", None)
+            if isinstance(obj, PdfDict):
+                entries = [(k, v) for k, v in obj.iteritems() if k != "/Length"]
+                if stream is not None:
+                    entries.append(("/Length", len(stream)))
+                body = self.raw_dict(entries)
+                if stream is not None:
+                    body = f"{body}\nstream\n{stream}\nendstream"
+            else:
+                body = self.token(PdfArray(obj) if isinstance(obj, list) else str(obj))
+            self.bodies[(num, 0)] = body
+
+    def build(self, base: bytes, base_xref: int, root: Tuple[int, int], info: Optional[Tuple[int, int]]) -> bytes:
+        self._flush()
+        parts = [base]
+        offset = len(base)
+        if not base.endswith(b"\n"):
+            parts.append(b"\n")
+            offset += 1
+        offsets = {}
+        for key in sorted(self.bodies):
+            chunk = f"{key[0]} {key[1]} obj\n{self.bodies[key]}\nendobj\n".encode("latin-1")
+            offsets[key] = offset
+            parts.append(chunk)
+            offset += len(chunk)
+
+        xref = ["xref"]
+        keys = sorted(offsets)
+        start = 0
+        while start < len(keys):
+            end = start
+            while end + 1 < len(keys) and keys[end + 1][0] == keys[end][0] + 1:
+                end += 1
+            xref.append(f"{keys[start][0]} {end - start + 1}")
+            xref.extend(f"{offsets[k]:010d} {k[1]:05d} n\r" for k in keys[start:end + 1])
+            start = end + 1
+        size = max(self.next_num, max(k[0] for k in keys) + 1)
+        trailer = f"/Size {size} /Root {root[0]} {root[1]} R /Prev {base_xref}"
+        if info is not None:
+            trailer += f" /Info {info[0]} {info[1]} R"
+        xref.append(f"trailer\n<<{trailer}>>\nstartxref\n{offset}\n%%EOF\n")
+        parts.append("\n".join(xref).encode("latin-1"))
+        return b"".join(parts)
+
+
+class ConsentTemplate(CachedTemplate):
+    """
+    Consent / NPP template (ISWS and IPS, English and Spanish).
+
+    ``fill_and_flatten_pdf`` matches each key of ``CONSENT_FIELD_KEYS`` to
+    the template's fields (exact, partial, word and name/date fallbacks),
+    fills the topmost match and then draws every widget that has a value.
+    The matching depends only on field names, so it is done here once.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.field_names = [w.name for w in self.widgets if w.name is not None]
+        self.unmatched: List[str] = []
+        # (value name, widget index) in the order the per-client path writes them
+        self.plan: List[Tuple[str, int]] = []
+
+        norm_to_widgets: Dict[str, List[int]] = {}
+        for i, widget in enumerate(self.widgets):
+            if widget.name is not None:
+                norm_to_widgets.setdefault(_norm(widget.name), []).append(i)
+
+        wanted: Dict[str, Tuple[str, str]] = {}
+        for key, value_name in CONSENT_FIELD_KEYS:
+            wanted[_norm(key)] = (key, value_name)
+
+        for want_norm, (orig_key, value_name) in wanted.items():
+            targets = self._match(want_norm, norm_to_widgets)
+            if not targets:
+                self.unmatched.append(orig_key)
+                continue
+            first = self._topmost(targets)
+            if first is not None:
+                self.plan.append((value_name, first))
+
+    @staticmethod
+    def _match(want_norm: str, norm_to_widgets: Dict[str, List[int]]) -> List[int]:
+        targets: List[int] = []
+        if want_norm in norm_to_widgets:
+            targets.extend(norm_to_widgets[want_norm])
+        if not targets:
+            for k_norm, found in norm_to_widgets.items():
+                if want_norm in k_norm or k_norm in want_norm:
+                    targets.extend(found)
+        if not targets:
+            want_words = want_norm.split()
+            for k_norm, found in norm_to_widgets.items():
+                k_words = k_norm.split()
+                if any(word in k_words or word in k_norm for word in want_words if len(word) > 2):
+                    targets.extend(found)
+        if not targets:
+            if "name" in want_norm or "nombre" in want_norm or "cliente" in want_norm:
+                for k_norm, found in norm_to_widgets.items():
+                    if any(word in k_norm for word in ["name", "nombre", "cliente", "print", "imprimir"]):
+                        targets.extend(found)
+            elif "date" in want_norm or "fecha" in want_norm:
+                for k_norm, found in norm_to_widgets.items():
+                    if any(word in k_norm for word in ["date", "fecha"]):
+                        targets.extend(found)
+        return targets
+
+    def _topmost(self, targets: List[int]) -> Optional[int]:
+        """The target the per-client path fills.
+
+        That path sorts ``(top, annot)`` pairs: targets without a Rect drop
+        out, and two targets at the same height make the sort raise, which
+        leaves the match order untouched.
+        """
+        keyed = []
+        for i in targets:
+            rect = self.widgets[i].rect
+            if rect and len(rect) >= 4:
+                keyed.append((rect[3], i))
+        if len({top for top, _ in keyed}) < len(keyed):
+            return targets[0]
+        keyed.sort(reverse=True)
+        return keyed[0][1] if keyed else None
+
+    def render(self, output_path: str, client_name: str, date: str) -> None:
+        values = {"client_name": client_name, "date": date}
+        filled: Dict[int, str] = {}
+        for value_name, i in self.plan:
+            value = values.get(value_name)
+            if value is not None:
+                filled[i] = str(value)
+
+        drawings: Dict[int, List[Tuple[float, float, float, str]]] = {}
+        for i, widget in enumerate(self.widgets):
+            val = filled.get(i, widget.value)
+            if val is None or not widget.rect or len(widget.rect) != 4:
+                continue
+            x0, y0, x1, y1 = widget.rect
+            h = max(1.0, y1 - y0)
+            val = str(val).strip().strip("()")
+            font_size = max(8, min(14, h * 0.6))
+            y_baseline = y0 + max(2, (h - font_size) * 0.75)
+            drawings.setdefault(widget.page, []).append((font_size, x0 + 2, y_baseline, val))
+        self.write(output_path, drawings)
+
+
+class LetterTemplate(CachedTemplate):
+    """Welcome letter: name and address drawn at fixed positions on page 1 (``stamp_letter_pdf``)"""
+
+    LEFT_MARGIN = 72
+    LINE_HEIGHT = 16
+
+    def render(self, output_path: str, client_name: str, address_block: Sequence[str]) -> None:
+        """``address_block`` is the three lines from ``format_address_for_pdf``"""
+        w, h = self.page_sizes[0]
+        y_start = h - 150
+        lines = []
+        nm = (client_name or "").strip()
+        if nm:
+            lines.append((12, self.LEFT_MARGIN, y_start, nm))
+        for i, ln in enumerate(address_block):
+            if ln:
+                lines.append((12, self.LEFT_MARGIN, y_start - ((i + 1) * self.LINE_HEIGHT), ln))
+        self.write(output_path, {0: lines})
+
+
+class PacketTemplate(CachedTemplate):
+    """Welcome packet: date, client name and initials drawn over the page-1 fields (``stamp_packet_pdf``)"""
+
+    FONT_SIZE = 13
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        widgets = []
+        for widget in self.widgets:
+            if widget.page != 0 or not widget.rect or len(widget.rect) != 4:
+                continue
+            x0, y0, x1, y1 = widget.rect
+            widgets.append({
+                "name": (widget.name or "").strip(),
+                "rect": widget.rect,
+                "mid": ((x0 + x1) / 2.0, (y0 + y1) / 2.0),
+                "w": abs(x1 - x0),
+            })
+        if not widgets:
+            raise ValueError("No fillable fields found on page 1.")
+        self.fields = widgets
+        _, ph = self.page_sizes[0]
+
+        def pick_by_name(cands, *substrings):
+            subs = [s.lower() for s in substrings]
+            return [w for w in cands if any(s in (w["name"] or "").lower() for s in subs)]
+
+        date_fields = pick_by_name(widgets, "date", "dt")
+        name_fields = pick_by_name(widgets, "client", "name")
+        init_fields = pick_by_name(widgets, "initial", "initials", "init")
+        widgets_sorted_top = sorted(widgets, key=lambda w: w["mid"][1], reverse=True)
+        widgets_sorted_bot = sorted(widgets, key=lambda w: w["mid"][1])
+
+        date_w = date_fields[0] if date_fields else widgets_sorted_top[0]
+        remaining = [w for w in widgets if w is not date_w]
+        if name_fields:
+            name_w = name_fields[0]
+        else:
+            below_date = [w for w in remaining if w["mid"][1] < date_w["mid"][1]]
+            if below_date:
+                name_w = sorted(below_date, key=lambda w: (-w["w"], -w["mid"][1]))[0]
+            else:
+                upper_half = [w for w in remaining if w["mid"][1] > ph * 0.5]
+                name_w = (sorted(upper_half, key=lambda w: (-w["w"], -w["mid"][1]))[0]
+                          if upper_half else sorted(remaining, key=lambda w: -w["w"])[0])
+        remaining2 = [w for w in remaining if w is not name_w]
+        init_w = init_fields[0] if init_fields else (widgets_sorted_bot[0] if remaining2 == [] else
+                                                     sorted(remaining2, key=lambda w: w["mid"][1])[0])
+        self.date_rect = date_w["rect"]
+        self.name_rect = name_w["rect"]
+        self.initials_rect = init_w["rect"]
+
+    def _in_rect(self, text: str, rect: Tuple[float, ...]) -> Tuple[float, float, float, str]:
+        x0, y0, x1, y1 = rect
+        mid_y = (y0 + y1) / 2.0
+        return (self.FONT_SIZE, x0 + 4, mid_y - (self.FONT_SIZE * 0.35), text)
+
+    def render(self, output_path: str, client_name: str, initials: str, today_str: str) -> None:
+        self.write(output_path, {0: [
+            self._in_rect(today_str or "", self.date_rect),
+            self._in_rect(client_name or "", self.name_rect),
+            self._in_rect((initials or "").upper(), self.initials_rect),
+        ]})
+
+
+TEMPLATE_KINDS = {"consent": ConsentTemplate, "letter": LetterTemplate, "packet": PacketTemplate}
+
+_templates: Dict[Tuple[str, str], Tuple[Tuple[int, int], CachedTemplate]] = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(kind: str, path: str) -> CachedTemplate:
+    """Parsed template for ``path``; parsed again only when the file changes."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = (kind, path)
+    with _templates_lock:
+        cached = _templates.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        template = TEMPLATE_KINDS[kind](path)
+        _templates[key] = (stamp, template)
+        return template
+
+
+# ----------------------------------------------------------------------
+# Batches
+# ----------------------------------------------------------------------
+@dataclass
+class PdfJob:
+    """One output file.  ``values`` are the keyword arguments of the template's ``render``."""
+    kind: str
+    template_path: str
+    output_path: str
+    values: Dict[str, object] = field(default_factory=dict)
+
+
+def render_job(job: PdfJob) -> Optional[str]:
+    """Render one job in this process; returns an error message or None."""
+    try:
+        get_template(job.kind, job.template_path).render(job.output_path, **job.values)
+        return None
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def _pool_size(job_count: int, workers: Optional[int]) -> int:
+    if workers is None:
+        workers = min(os.cpu_count() or 1, MAX_WORKERS)
+    return max(1, min(workers, job_count // MIN_JOBS_PER_WORKER))
+
+
+def generate_batch(
+    jobs: Sequence[PdfJob],
+    workers: Optional[int] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> List[Optional[str]]:
+    """
+    Render ``jobs``; returns one error message (or None) per job, in order.
+
+    Large batches go to a process pool sized by ``workers`` (default: CPU
+    count, at most 8).  If the pool cannot be used the batch is rendered in
+    this process instead.
+    """
+    jobs = list(jobs)
+    log = log or (lambda msg: None)
+    if not jobs:
+        return []
+    pool_size = _pool_size(len(jobs), workers)
+    if pool_size > 1:
+        try:
+            chunksize = max(1, len(jobs) // (pool_size * 4))
+            with ProcessPoolExecutor(max_workers=pool_size) as pool:
+                return list(pool.map(render_job, jobs, chunksize=chunksize))
+        except Exception as e:
+            log(f"[PDF][WARN] Process pool unavailable ({e}); rendering in this process")
+    return [render_job(job) for job in jobs]
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def _legacy_renderer(kind: str):
+    """The bots' per-client function for ``kind`` (imports the bot module)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    if kind == "consent":
+        from integrity_consent_bot_v2 import fill_and_flatten_pdf
+        return lambda out, v, log: fill_and_flatten_pdf(v["template"], out, v["client_name"], v["date"], log)
+    from isws_welcome_DEEPFIX2_NOTEFORCE_v14 import _stamp_letter_pdf_per_client, _stamp_packet_pdf_per_client
+    if kind == "letter":
+        return lambda out, v, log: _stamp_letter_pdf_per_client(v["template"], out, v["client_name"], v["address_lines"], log)
+    return lambda out, v, log: _stamp_packet_pdf_per_client(v["template"], out, v["client_name"], v["initials"], v["today_str"], log)
+
+
+def benchmark(kind: str, template: str, count: int, workers: Optional[int] = None) -> None:
+    today = time.strftime("%m/%d/%Y")
+    names = [f"Client{i:04d} Example" for i in range(count)]
+    address = ["123 Main St", "Apt 4", "Springfield, IL", "USA 62701"]
+    if kind == "consent":
+        values = [{"client_name": nm, "date": today} for nm in names]
+    elif kind == "letter":
+        values = [{"client_name": nm, "address_block": ["123 Main St - Apt 4", "Springfield, IL", "USA 62701"]}
+                  for nm in names]
+    else:
+        values = [{"client_name": nm, "initials": "ab", "today_str": today} for nm in names]
+
+    out_root = tempfile.mkdtemp(prefix="pdf_batch_bench_")
+    try:
+        results = []
+        try:
+            legacy = _legacy_renderer(kind)
+        except Exception as e:
+            legacy = None
+            print(f"per-client path unavailable ({type(e).__name__}: {e})")
+        if legacy is not None:
+            legacy_dir = os.path.join(out_root, "per_client")
+            os.makedirs(legacy_dir, exist_ok=True)
+            legacy_values = [dict(v, template=template, address_lines=address) for v in values]
+            start = time.perf_counter()
+            for i, v in enumerate(legacy_values):
+                legacy(os.path.join(legacy_dir, f"{i:04d}.pdf"), v, lambda msg: None)
+            results.append(("per-client (current)", time.perf_counter() - start))
+
+        for label, pool_workers in (("cached, 1 process", 1), ("cached, process pool", workers)):
+            out_dir = os.path.join(out_root, label.replace(",", "").replace(" ", "_"))
+            os.makedirs(out_dir, exist_ok=True)
+            jobs = [PdfJob(kind, template, os.path.join(out_dir, f"{i:04d}.pdf"), v) for i, v in enumerate(values)]
+            _templates.clear()  # count the one-time parse
+            start = time.perf_counter()
+            errors = [e for e in generate_batch(jobs, workers=pool_workers) if e]
+            elapsed = time.perf_counter() - start
+            if errors:
+                print(f"{label}: {len(errors)} failed, first: {errors[0]}")
+            if pool_workers != 1:
+                label = f"{label} ({_pool_size(count, pool_workers)} workers)"
+            results.append((label, elapsed))
+
+        print(f"{count} {kind} PDFs from {os.path.basename(template)}")
+        baseline = results[0][1]
+        for label, elapsed in results:
+            print(f"  {label:<40} {elapsed:8.2f} s  {count / elapsed:8.1f} PDFs/s  x{baseline / elapsed:.1f}")
+    finally:
+        shutil.rmtree(out_root, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("benchmark", help="compare the per-client path with the cached batch path")
+    bench.add_argument("--template", required=True)
+    bench.add_argument("--kind", choices=sorted(TEMPLATE_KINDS), default="consent")
+    bench.add_argument("--count", type=int, default=300)
+    bench.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    if not BATCH_PDF_AVAILABLE:
+        print("pdfrw and reportlab are required (pip install pdfrw reportlab)")
+        return 1
+    benchmark(args.kind, args.template, args.count, args.workers)
+    return 0
+
+
+__all__ = [
+    "BATCH_PDF_AVAILABLE",
+    "CONSENT_FIELD_KEYS",
+    "CachedTemplate",
+    "ConsentTemplate",
+    "LetterTemplate",
+    "PacketTemplate",
+    "PdfJob",
+    "generate_batch",
+    "get_template",
+    "render_job",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,6 @@ Extracts client data from Penelope, creates consent forms, and uploads to Therap
 import os, sys, re, time, tempfile, threading, queue, json
 import datetime
 from datetime import datetime as DT
-from dataclasses import dataclass
 from typing import Optional, Dict, List
 from pathlib import Path
 import pandas as pd
@@ -25,7 +24,12 @@ except Exception as e:
 
 APP_TITLE = "Consent Form Bot"
 MAROON = "#800000"
-PN_DEFAULT_URL = "https://integrityseniorservices.athena-us.com/acm_loginControl"
+
+# Consent PDFs are rendered in one batch from templates parsed once
+try:
+    from batch_pdf_generator import BATCH_PDF_AVAILABLE, PdfJob, generate_batch
+except ImportError:
+    BATCH_PDF_AVAILABLE = False
 
 # Selenium lazy imports
 By = WebDriverWait = EC = Keys = None
@@ -54,207 +58,22 @@ def ensure_output_dir():
     return output_dir
 
 # ===================== PENELOPE CLIENT CLASS =====================
-@dataclass
-class PNAuth:
-    url: str
-    username: str
-    password: str
-
-class PNClient:
-    def __init__(self, auth: PNAuth, log):
-        self.auth = auth
-        self.log = log
-        self.driver = None
-        self.wait = None
+# Shared Penelope client (start/login/search, warm browser sessions via the
+# driver broker) - lives in the installation's _system folder
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # _bots
+from system_path import add_system_path
+add_system_path()
+from penelope_client import PN_DEFAULT_URL, PNAuth, PNClient as SharedPNClient
 
+class PNClient(SharedPNClient):
     def start(self, chrome_profile_dir: Optional[str] = None):
-        webdriver, _By, _WebDriverWait, _EC, _Keys, Service, ChromeDriverManager = _lazy_import_selenium()
-        
-        # Check network connectivity first
-        try:
-            import requests
-            requests.get("https://www.google.com", timeout=5)
-            self.log(_ts() + "[NETWORK] Internet connection verified")
-        except Exception as e:
-            self.log(_ts() + f"[NETWORK][WARN] Internet check failed: {e}")
-            self.log(_ts() + "[NETWORK] Bot will try to continue anyway...")
-        
-        try:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--start-maximized")
-            if chrome_profile_dir and os.path.isdir(chrome_profile_dir):
-                options.add_argument(f"--user-data-dir={chrome_profile_dir}")
-                self.log(_ts() + f"[BROWSER] Using Chrome profile: {chrome_profile_dir}")
-            else:
-                self.log(_ts() + "[BROWSER] Using fresh Selenium profile (no saved cookies).")
-            # Try multiple methods to get ChromeDriver
-            service = None
-            
-            # Method 1: Try ChromeDriverManager with timeout
-            try:
-                self.log(_ts() + "[BROWSER] Attempting to download ChromeDriver...")
-                import threading
-                import time
-                
-                result = [None]
-                exception = [None]
-                
-                def download_driver():
-                    try:
-                        result[0] = ChromeDriverManager().install()
-                    except Exception as e:
-                        exception[0] = e
-                
-                # Start download in separate thread
-                thread = threading.Thread(target=download_driver)
-                thread.daemon = True
-                thread.start()
-                thread.join(timeout=30)  # 30 second timeout
-                
-                if thread.is_alive():
-                    self.log(_ts() + "[BROWSER][WARN] ChromeDriver download timed out after 30 seconds")
-                    raise TimeoutError("ChromeDriver download timed out")
-                
-                if exception[0]:
-                    raise exception[0]
-                
-                if result[0]:
-                    service = Service(result[0])
-                    self.log(_ts() + f"[BROWSER] ChromeDriver downloaded: {result[0]}")
-                else:
-                    raise Exception("ChromeDriver download failed")
-                    
-            except Exception as e:
-                self.log(_ts() + f"[BROWSER][WARN] ChromeDriverManager failed: {e}")
-                
-                # Method 2: Try to use system ChromeDriver
-                try:
-                    self.log(_ts() + "[BROWSER] Trying system ChromeDriver...")
-                    service = Service()  # Uses PATH
-                    self.log(_ts() + "[BROWSER] Using system ChromeDriver")
-                except Exception as e2:
-                    self.log(_ts() + f"[BROWSER][WARN] System ChromeDriver failed: {e2}")
-                    
-                    # Method 3: Try common ChromeDriver locations
-                    common_paths = [
-                        r"C:\Program Files\Google\Chrome\Application\chromedriver.exe",
-                        r"C:\Program Files (x86)\Google\Chrome\Application\chromedriver.exe",
-                        r"C:\chromedriver\chromedriver.exe",
-                        r"C:\Windows\System32\chromedriver.exe"
-                    ]
-                    
-                    for path in common_paths:
-                        if os.path.exists(path):
-                            try:
-                                service = Service(path)
-                                self.log(_ts() + f"[BROWSER] Using ChromeDriver at: {path}")
-                                break
-                            except Exception as e3:
-                                self.log(_ts() + f"[BROWSER][WARN] ChromeDriver at {path} failed: {e3}")
-                                continue
-            
-            if service is None:
-                raise Exception("Could not find or download ChromeDriver. Please check your internet connection or install ChromeDriver manually.")
-            
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.wait = _WebDriverWait(self.driver, 20)
-        except Exception as e:
-            self.log(_ts() + f"[BROWSER][ERR] Could not start Chrome: {e}")
-            raise
-
-    def login(self) -> bool:
-        d, w = self.driver, self.wait
-        url = (self.auth.url or PN_DEFAULT_URL).strip()
-        self.log(_ts() + f"[PN] Opening {url} …")
-        try:
-            d.get(url)
-        except Exception as e:
-            self.log(_ts() + f"[PN][ERR] Could not open URL: {e}")
-            return False
-
-        # Locate the login iframe and the user/password inputs
-        def _switch_login_iframe():
-            try:
-                d.switch_to.default_content()
-                frames = d.find_elements("css selector", "iframe, frame")
-                for fr in frames:
-                    try:
-                        src = (fr.get_attribute("src") or "").lower()
-                        idv = (fr.get_attribute("id") or "").lower()
-                        namev = (fr.get_attribute("name") or "").lower()
-                        if "acm_login" in src or "login" in src or "acm_login" in idv or "acm_login" in namev:
-                            d.switch_to.frame(fr); return True
-                    except Exception:
-                        continue
-                # try a direct known id
-                try:
-                    fr = d.find_element("id", "acm_loginControl")
-                    d.switch_to.frame(fr); return True
-                except Exception:
-                    pass
-                return False
-            except Exception:
-                return False
-
-        try:
-            _switch_login_iframe()
-        except Exception:
-            pass
-
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.common.keys import Keys
-
-        # Try to find fields in current context (iframe or default)
-        def try_login_in_ctx():
-            try:
-                users = d.find_elements(By.CSS_SELECTOR, "input[type='text'],input[type='email']")
-                pwds  = d.find_elements(By.CSS_SELECTOR, "input[type='password']")
-                if not users or not pwds:
-                    return False
-                u = users[0]; p = pwds[0]
-                try: u.clear(); u.click()
-                except Exception: pass
-                try: u.send_keys(self.auth.username)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", u, self.auth.username)
-                try: p.clear(); p.click()
-                except Exception: pass
-                try: p.send_keys(self.auth.password)
-                except Exception:
-                    d.execute_script("arguments[0].value = arguments[1];", p, self.auth.password)
-                # Click submit or press Enter
-                for by, sel in [
-                    (By.CSS_SELECTOR, "button[type='submit']"),
-                    (By.CSS_SELECTOR, "input[type='submit']"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'sign in')]"),
-                    (By.XPATH, "//button[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'log in')]"),
-                    (By.XPATH, "//input[@type='submit']"),
-                ]:
-                    try:
-                        btn = d.find_element(by, sel)
-                        try: btn.click()
-                        except Exception: d.execute_script("arguments[0].click();", btn)
-                        return True
-                    except Exception:
-                        continue
-                p.send_keys(Keys.ENTER)
-                return True
-            except Exception:
-                return False
-
-        if not try_login_in_ctx():
-            _switch_login_iframe()
-            try_login_in_ctx()
-
-        try:
-            w.until(lambda drv: drv.current_url != url)
-        except Exception:
-            pass
-        self.log(_ts() + "[PN] Login appears successful.")
-        return True
+        # The workflow steps use the module-level By/WebDriverWait/EC/Keys
+        _lazy_import_selenium()
+        super().start(chrome_profile_dir)
 
     def go_to_search(self) -> bool:
         """Find and click the navSearch button in any available frame."""
+        self.ensure_session()
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
@@ -334,6 +153,7 @@ class PNClient:
         Individual > Individual ID: enter ID # > Press Go > WAIT for dropdown/results.
         EXACT COPY FROM COUNSELOR ASSIGNMENT BOT
         """
+        self.ensure_session()
         try:
             from selenium.webdriver.common.by import By
             from selenium.webdriver.support.ui import WebDriverWait
@@ -614,210 +434,6 @@ class PNClient:
         except Exception: pass
         return False
 
-    def click_first_result_name(self, first_name: str = None, last_name: str = None, timeout: int = 12) -> bool:
-        '''
-        After pressing Go on the Search page, click the patient's first or last name
-        in the results dropdown/table to open their profile.
-        EXACT COPY FROM COUNSELOR ASSIGNMENT BOT
-        '''
-        try:
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-        except Exception:
-            return False
-
-        d = self.driver
-        try:
-            d.switch_to.default_content()
-            WebDriverWait(d, timeout).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-
-            try:
-                WebDriverWait(d, timeout).until(EC.presence_of_element_located((By.ID, "results")))
-            except Exception:
-                pass
-
-            def _find_name_link():
-                anchors = []
-                try:
-                    anchors.extend(d.find_elements(By.XPATH, "//div[@id='results']//a[normalize-space(text())!='']"))
-                except Exception:
-                    pass
-                try:
-                    anchors.extend(d.find_elements(By.XPATH, "//a[contains(translate(@href,'INDIV','indiv') or contains(translate(@href,'INDIVIDUAL','individual'),'individual')]"))
-                except Exception:
-                    pass
-                try:
-                    anchors.extend(d.find_elements(By.XPATH, "//table//a[normalize-space(text())!='']"))
-                except Exception:
-                    pass
-                seen = set()
-                uniq = []
-                for a in anchors:
-                    try:
-                        key = (a.get_attribute("href") or "") + "|" + (a.text or "")
-                    except Exception:
-                        key = id(a)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    try:
-                        if a.is_displayed():
-                            uniq.append(a)
-                    except Exception:
-                        pass
-                if not uniq:
-                    return None
-
-                def norm(s):
-                    return (s or "").strip().lower()
-                
-                def is_ips_link_local(link):
-                    """Check if a link is for an IPS profile"""
-                    try:
-                        href = (link.get_attribute("href") or "").lower()
-                        text = (link.text or "").lower()
-                        # Check parent row for IPS indicator
-                        try:
-                            parent_row = link.find_element(By.XPATH, "./ancestor::tr[1]")
-                            row_text = (parent_row.text or "").lower()
-                            if "ips" in row_text:
-                                return True
-                        except Exception:
-                            pass
-                        # Check if href or text contains IPS indicators
-                        if "ips" in href or "ips" in text:
-                            return True
-                        return False
-                    except Exception:
-                        return False
-                
-                fn = norm(first_name)
-                ln = norm(last_name)
-
-                # Separate links into ISWS and IPS categories
-                matching_links = []
-                if fn or ln:
-                    for a in uniq:
-                        t = norm(a.text)
-                        if not t:
-                            continue
-                        if (fn and fn in t) or (ln and ln in t):
-                            matching_links.append(a)
-                else:
-                    matching_links = uniq
-                
-                if not matching_links:
-                    return uniq[0] if uniq else None
-                
-                # Prefer ISWS (non-IPS) links over IPS links
-                isws_links = [link for link in matching_links if not is_ips_link_local(link)]
-                ips_links = [link for link in matching_links if is_ips_link_local(link)]
-                
-                # Log what we found
-                log = getattr(self, "log", lambda s: None)
-                if isws_links and ips_links:
-                    log(f"[SEARCH-RESULT] Found {len(isws_links)} ISWS link(s) and {len(ips_links)} IPS link(s). Preferring ISWS.")
-                elif ips_links:
-                    log(f"[SEARCH-RESULT] Found only IPS link(s): {len(ips_links)}")
-                elif isws_links:
-                    log(f"[SEARCH-RESULT] Found only ISWS link(s): {len(isws_links)}")
-                
-                # Return first ISWS link if available, otherwise first IPS link
-                if isws_links:
-                    return isws_links[0]
-                elif ips_links:
-                    return ips_links[0]
-                
-                return matching_links[0]
-
-            link = None
-            try:
-                link = WebDriverWait(d, timeout).until(lambda drv: _find_name_link())
-            except Exception:
-                link = _find_name_link()
-
-            if not link:
-                d.switch_to.default_content()
-                return False
-
-            # Log which link we're clicking
-            log = getattr(self, "log", lambda s: None)
-            try:
-                link_text = link.text.strip()
-                link_href = link.get_attribute("href") or ""
-                # Simple IPS detection
-                is_ips = "ips" in (link_href or "").lower() or "ips" in (link_text or "").lower()
-                profile_type = "IPS" if is_ips else "ISWS"
-                log(f"[SEARCH-RESULT] Clicking link: '{link_text}' ({profile_type} profile)")
-            except Exception:
-                pass
-
-            try:
-                link.click()
-            except Exception:
-                d.execute_script("arguments[0].click();", link)
-
-            # VERIFY: Wait for client profile to load and check it's the right one
-            import time
-            time.sleep(1)  # Brief pause for page transition
-            
-            try:
-                d.switch_to.default_content()
-                # Switch to main content frame where client name appears
-                try:
-                    WebDriverWait(d, 5).until(EC.frame_to_be_available_and_switch_to_it((By.ID, "frm_content_id")))
-                except Exception:
-                    pass
-                
-                # Try to read the client name from the loaded profile page
-                try:
-                    # Common locations for client name on profile page
-                    name_selectors = [
-                        (By.XPATH, "//h1[contains(@class,'client') or contains(@class,'name')]"),
-                        (By.XPATH, "//div[contains(@class,'client-name')]"),
-                        (By.XPATH, "//span[contains(@class,'client-name')]"),
-                        (By.XPATH, "//h1"),
-                        (By.XPATH, "//h2"),
-                    ]
-                    
-                    loaded_name = None
-                    for by, sel in name_selectors:
-                        try:
-                            elem = d.find_element(by, sel)
-                            loaded_name = elem.text.strip()
-                            if loaded_name:
-                                break
-                        except Exception:
-                            continue
-                    
-                    if loaded_name:
-                        log(f"[SEARCH-RESULT] ✓ Profile loaded: '{loaded_name}'")
-                        # Basic verification: check if first or last name matches
-                        fn = (first_name or "").strip().lower()
-                        ln = (last_name or "").strip().lower()
-                        loaded_lower = loaded_name.lower()
-                        
-                        if (fn and fn in loaded_lower) or (ln and ln in loaded_lower):
-                            log(f"[SEARCH-RESULT] ✓ VERIFIED: Profile matches expected client")
-                        else:
-                            log(f"[SEARCH-RESULT][WARN] Profile name '{loaded_name}' may not match expected '{first_name} {last_name}'")
-                    else:
-                        log(f"[SEARCH-RESULT][WARN] Could not read client name from profile page")
-                        
-                except Exception as e:
-                    log(f"[SEARCH-RESULT][WARN] Could not verify profile loaded: {e}")
-                    
-            except Exception as e:
-                log(f"[SEARCH-RESULT][WARN] Profile verification error: {e}")
-
-            d.switch_to.default_content()
-            return True
-        except Exception:
-            try: d.switch_to.default_content()
-            except Exception: pass
-            return False
-
     def extract_client_data(self) -> Dict[str, str]:
         """Extract language, date, and name from the current client profile page"""
         try:
@@ -2189,6 +1805,9 @@ class ConsentBotGUI:
         self.stop_btn.config(state="disabled")
 
     def _run_bot(self):
+        # (log row index, client ID, filename, job) rendered after the last client
+        pdf_jobs = []
+        log_rows = []
         try:
             self.log(_ts() + "[BOT] Starting...")
             
@@ -2363,9 +1982,13 @@ class ConsentBotGUI:
                 # Get client name for PDF filling
                 client_name = data.get("client_name", "Unknown Client")
                 
-                # Fill and flatten PDF
+                # Fill and flatten PDF (queued for the batch when available)
                 success = False
-                if fill_and_flatten_pdf(template, output_path, client_name, date, self.log):
+                if BATCH_PDF_AVAILABLE:
+                    pdf_jobs.append((len(log_rows), client_id, filename, PdfJob(
+                        "consent", template, output_path, {"client_name": client_name, "date": date})))
+                    self.log(_ts() + f"[BOT] Queued: {filename}")
+                elif fill_and_flatten_pdf(template, output_path, client_name, date, self.log):
                     self.log(_ts() + f"[BOT] Created: {filename}")
                     success = True
                 else:
@@ -2420,6 +2043,10 @@ class ConsentBotGUI:
                     except Exception as e:
                         self.log(_ts() + f"[BOT][WARN] Could not click search button: {e}")
             
+            if pdf_jobs:
+                self._generate_queued_pdfs(pdf_jobs, log_rows)
+                pdf_jobs = []
+            
             # Generate Excel log
             if log_rows:
                 try:
@@ -2442,10 +2069,37 @@ class ConsentBotGUI:
             self.log(_ts() + f"[BOT][ERR] {e}")
             import traceback
             self.log(traceback.format_exc())
+            # Clients extracted before the error still get their PDFs
+            if pdf_jobs:
+                try:
+                    self._generate_queued_pdfs(pdf_jobs, log_rows)
+                except Exception as pdf_error:
+                    self.log(_ts() + f"[BOT][ERR] {pdf_error}")
             self.start_btn.config(state="normal")
             self.stop_btn.config(state="disabled")
             self.is_running = False
     
+    def _generate_queued_pdfs(self, pdf_jobs, log_rows):
+        """Render the consent PDFs queued by the extractor and fill in their log rows"""
+        self.log(_ts() + f"[BOT] Creating {len(pdf_jobs)} consent PDF(s)...")
+        started = time.time()
+        errors = generate_batch([job for _, _, _, job in pdf_jobs], log=self.log)
+        created = 0
+        for (row_index, client_id, filename, job), error in zip(pdf_jobs, errors):
+            success = error is None
+            if not success:
+                self.log(_ts() + f"[PDF][WARN] Batch render failed for {filename} ({error}); retrying per client")
+                success = fill_and_flatten_pdf(job.template_path, job.output_path,
+                                               job.values["client_name"], job.values["date"], self.log)
+            if success:
+                created += 1
+                self.log(_ts() + f"[BOT] Created: {filename}")
+            else:
+                self.log(_ts() + f"[BOT][WARN] Failed to create PDF for {client_id}")
+            log_rows[row_index]['PDF Created'] = 'Yes' if success else 'No'
+            log_rows[row_index]['PDF Filename'] = filename if success else ''
+        self.log(_ts() + f"[BOT] {created}/{len(pdf_jobs)} PDF(s) created in {time.time() - started:.1f}s")
+    
     def _build_uploader_tab(self):
         """Build the ISWS Uploader tab"""
         # Create scrollable frame for uploader
@@ -22,6 +22,12 @@ try:
 except ImportError:
     SELENIUM_AVAILABLE = False
 
+# Letters and packets from templates parsed once per run
+try:
+    from batch_pdf_generator import BATCH_PDF_AVAILABLE, get_template
+except ImportError:
+    BATCH_PDF_AVAILABLE = False
+
 APP_TITLE = "ISWS Welcome Letter Bot"
 PN_DEFAULT_URL = "https://integrityseniorservices.athena-us.com/acm_loginControl"
 MAROON = "#800000"
@@ -163,6 +169,16 @@ def pick_welcome_template(lang_norm: str, en_path: str, es_path: str) -> str:
 
 # ------------------------ PDF (robust, flattened) ------------------------
 def stamp_letter_pdf(template_path, out_path, client_name, address_lines, log):
+    """Letter from the cached template (batch_pdf_generator); falls back to the per-client path."""
+    if BATCH_PDF_AVAILABLE and os.path.isfile(template_path):
+        try:
+            get_template("letter", template_path).render(out_path, client_name, format_address_for_pdf(address_lines))
+            return True
+        except Exception as e:
+            log(f"[PDF][WARN] Cached template failed ({e}); using the per-client path")
+    return _stamp_letter_pdf_per_client(template_path, out_path, client_name, address_lines, log)
+
+def _stamp_letter_pdf_per_client(template_path, out_path, client_name, address_lines, log):
     try:
         from PyPDF2 import PdfReader, PdfWriter
         from PyPDF2.generic import NameObject, NullObject
@@ -242,6 +258,17 @@ def stamp_letter_pdf(template_path, out_path, client_name, address_lines, log):
         except Exception: pass
 
 def stamp_packet_pdf(template_path, out_path, client_name, initials, today_str, log):
+    """Packet from the cached template (batch_pdf_generator); falls back to the per-client path."""
+    if BATCH_PDF_AVAILABLE and os.path.isfile(template_path):
+        try:
+            get_template("packet", template_path).render(out_path, client_name, initials, today_str)
+            log(f"[PDF2] Saved: {out_path}")
+            return True
+        except Exception as e:
+            log(f"[PDF2][WARN] Cached template failed ({e}); using the per-client path")
+    return _stamp_packet_pdf_per_client(template_path, out_path, client_name, initials, today_str, log)
+
+def _stamp_packet_pdf_per_client(template_path, out_path, client_name, initials, today_str, log):
     """
     Robust packet filler:
       1) Read all widget fields from page 1 (with PyPDF2).
@@ -0,0 +1,21 @@
+"""
+System Path - put the installation's _system folder on sys.path
+
+Bots are started as plain scripts from their own folders, so the shared
+helpers in _system (OCR cache, Penelope client, ...) are not importable until
+that folder is on sys.path.  Bots add the _bots folder once and call
+add_system_path() instead of each searching for _system themselves.
+"""
+
+import sys
+from pathlib import Path
+
+# _system sits next to _bots in the installation folder
+SYSTEM_DIR = Path(__file__).resolve().parent.parent / "_system"
+
+
+def add_system_path() -> Path:
+    """Append the _system folder to sys.path (once) and return it"""
+    if SYSTEM_DIR.is_dir() and str(SYSTEM_DIR) not in sys.path:
+        sys.path.append(str(SYSTEM_DIR))
+    return SYSTEM_DIR
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Adaptive Wait - condition-based waits with per-call-site timing telemetry
+
+Bots historically paused with fixed ``time.sleep`` calls after every click.
+An :class:`AdaptiveWaiter` instead polls the browser for the condition the
+sleep was standing in for - document loaded, no XHR/fetch in flight, element
+no longer moving, or any custom predicate - and returns as soon as it holds.
+Passing the old sleep as ``baseline`` caps the wait at that duration, so a
+converted call site is never slower than before.
+
+Every wait is recorded in a :class:`WaitTelemetry` under its call-site name
+(observed time until the condition was met, timeouts, seconds saved against
+the baseline).  Telemetry is kept as JSON (default
+``_secure_data/wait_telemetry/<name>.json``) and accumulates across runs so
+budgets can be tuned from real p95 values.
+
+Usage:
+    from adaptive_wait import AdaptiveWaiter, get_wait_telemetry
+
+    waiter = AdaptiveWaiter(driver, telemetry=get_wait_telemetry("tn_refiling_bot"))
+    waiter.network_idle(site="billing_tab.tab_loaded", baseline=2)
+    waiter.element_stable(element, site="billing_tab.scroll", baseline=0.5)
+    waiter.until(lambda d: d.find_elements(By.ID, "popup"), site="date.popup", baseline=2)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TELEMETRY_DIR = Path(__file__).resolve().parent.parent / "_secure_data" / "wait_telemetry"
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_POLL_INTERVAL = 0.1
+
+# Samples kept per call site for percentile estimates
+MAX_SAMPLES = 200
+# Telemetry is written to disk after this many new records (and on save())
+AUTOSAVE_EVERY = 100
+
+# Installs XHR/fetch counters on first use (per document) and reports
+# [readyState, requests in flight, resource timing entries, element rect].
+# arguments[0] is an optional element whose bounding box should be returned.
+_PROBE_SCRIPT = """
+var w = window;
+if (!w.__adaptiveWaitRequests) {
+    var state = w.__adaptiveWaitRequests = {pending: 0};
+    var settle = function () { state.pending = Math.max(0, state.pending - 1); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.pending++;
+        var done = false;
+        this.addEventListener('loadend', function () { if (!done) { done = true; settle(); } });
+        try { return send.apply(this, arguments); }
+        catch (e) { if (!done) { done = true; settle(); } throw e; }
+    };
+    if (w.fetch) {
+        var fetch = w.fetch;
+        w.fetch = function () {
+            state.pending++;
+            var promise;
+            try { promise = fetch.apply(this, arguments); } catch (e) { settle(); throw e; }
+            promise.then(settle, settle);
+            return promise;
+        };
+    }
+}
+var pending = w.__adaptiveWaitRequests.pending + ((w.jQuery && w.jQuery.active) || 0);
+var resources = (w.performance && performance.getEntriesByType) ? performance.getEntriesByType('resource').length : 0;
+var el = arguments[0], rect = null;
+if (el) {
+    if (!el.isConnected) { rect = 'detached'; }
+    else { var r = el.getBoundingClientRect(); rect = [r.top, r.left, r.width, r.height]; }
+}
+return [document.readyState, pending, resources, rect];
+"""
+
+
+class WaitTelemetry:
+    """Per-call-site timing of adaptive waits (thread-safe), persisted as JSON."""
+
+    def __init__(self, path: Optional[Path] = None, autosave_every: int = AUTOSAVE_EVERY) -> None:
+        self.path = Path(path) if path else DEFAULT_TELEMETRY_DIR / "wait_telemetry.json"
+        self.autosave_every = max(1, int(autosave_every))
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, Any]] = {}
+        self._unsaved = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def record(self, site: str, elapsed: float, met: bool, baseline: float = 0.0) -> None:
+        """Record one wait: seconds spent, whether the condition held, and the sleep it replaced."""
+        with self._lock:
+            entry = self._sites.get(site)
+            if entry is None:
+                entry = self._sites[site] = self._new_entry()
+            entry["count"] += 1
+            entry["total_seconds"] += elapsed
+            if met:
+                entry["met"] += 1
+                entry["samples"].append(round(elapsed, 4))
+            else:
+                entry["timeouts"] += 1
+            if baseline:
+                entry["baseline"] = baseline
+                entry["saved_seconds"] += baseline - elapsed
+            self._unsaved += 1
+            autosave = self._unsaved >= self.autosave_every
+        if autosave:
+            self.save()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-site counts, timing percentiles and a suggested timeout."""
+        with self._lock:
+            result = {}
+            for site, entry in self._sites.items():
+                samples = sorted(entry["samples"])
+                p95 = _percentile(samples, 0.95)
+                result[site] = {
+                    "count": entry["count"],
+                    "met": entry["met"],
+                    "timeouts": entry["timeouts"],
+                    "mean_seconds": round(entry["total_seconds"] / entry["count"], 3) if entry["count"] else 0.0,
+                    "p50_seconds": round(_percentile(samples, 0.5), 3),
+                    "p95_seconds": round(p95, 3),
+                    "max_seconds": round(samples[-1], 3) if samples else 0.0,
+                    "baseline_seconds": entry["baseline"],
+                    "saved_seconds": round(entry["saved_seconds"], 3),
+                    # Headroom over the observed p95; never below one poll cycle
+                    "suggested_timeout": round(max(p95 * 1.5, 0.5), 2) if samples else None,
+                }
+            return result
+
+    def save(self) -> None:
+        """Write the telemetry file (atomically); failures are logged, not raised."""
+        with self._lock:
+            payload = {
+                "version": 1,
+                "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "sites": {
+                    site: dict(entry, samples=list(entry["samples"]))
+                    for site, entry in self._sites.items()
+                },
+            }
+            self._unsaved = 0
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(temp_path, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as exc:
+            LOGGER.warning("Could not save wait telemetry to %s: %s", self.path, exc)
+
+    def reset(self) -> None:
+        """Forget every recorded wait."""
+        with self._lock:
+            self._sites = {}
+            self._unsaved = 0
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _new_entry() -> Dict[str, Any]:
+        return {
+            "count": 0,
+            "met": 0,
+            "timeouts": 0,
+            "total_seconds": 0.0,
+            "saved_seconds": 0.0,
+            "baseline": 0.0,
+            "samples": deque(maxlen=MAX_SAMPLES),
+        }
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+            for site, stored in payload.get("sites", {}).items():
+                entry = self._new_entry()
+                for key in ("count", "met", "timeouts", "total_seconds", "saved_seconds", "baseline"):
+                    entry[key] = stored.get(key, entry[key])
+                entry["samples"].extend(stored.get("samples", []))
+                self._sites[site] = entry
+        except (OSError, ValueError, AttributeError) as exc:
+            LOGGER.warning("Ignoring unreadable wait telemetry %s: %s", self.path, exc)
+            self._sites = {}
+
+
+class AdaptiveWaiter:
+    """Condition-based waits against one Selenium WebDriver.
+
+    Every wait returns as soon as its condition holds and gives up after
+    ``timeout`` seconds (defaulting to ``baseline`` when one is given, else
+    ``DEFAULT_TIMEOUT``).  Timeouts never raise: the wait returns ``None`` /
+    ``False`` and the caller carries on exactly as after the old fixed sleep.
+    """
+
+    def __init__(
+        self,
+        driver,
+        telemetry: Optional[WaitTelemetry] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        self.driver = driver
+        self.telemetry = telemetry
+        self.poll_interval = poll_interval
+        self.should_stop = should_stop
+        # Seconds saved against baselines by this waiter (for per-client reporting)
+        self.saved_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def until(
+        self,
+        predicate: Callable[[Any], Any],
+        timeout: Optional[float] = None,
+        site: Optional[str] = None,
+        baseline: float = 0.0,
+    ) -> Any:
+        """Poll ``predicate(driver)`` until it returns a truthy value; return it (``None`` on timeout).
+
+        Exceptions raised by the predicate (stale elements, missing elements,
+        scripts run mid-navigation) count as "not yet".
+        """
+        site = site or self._caller_site()
+        timeout = self._timeout(timeout, baseline)
+        started = time.perf_counter()
+        deadline = started + timeout
+        result = None
+        while True:
+            try:
+                result = predicate(self.driver)
+            except Exception:
+                result = None
+            if result:
+                break
+            now = time.perf_counter()
+            if now >= deadline or (self.should_stop is not None and self.should_stop()):
+                result = None
+                break
+            time.sleep(min(self.poll_interval, deadline - now))
+        self._record(site, time.perf_counter() - started, bool(result), baseline)
+        return result
+
+    def dom_ready(self, timeout: Optional[float] = None, site: Optional[str] = None, baseline: float = 0.0) -> bool:
+        """Wait for ``document.readyState == 'complete'``."""
+        return bool(self.until(
+            lambda driver: self._probe()[0] == "complete",
+            timeout=timeout, site=site or self._caller_site(), baseline=baseline,
+        ))
+
+    def network_idle(
+        self,
+        timeout: Optional[float] = None,
+        site: Optional[str] = None,
+        baseline: float = 0.0,
+        quiet_period: float = 0.3,
+    ) -> bool:
+        """Wait until the document is loaded and no XHR/fetch has been in flight for ``quiet_period``.
+
+        Request counters are installed by the first probe on each document, so
+        any earlier waiter call on the page (e.g. :meth:`element_stable` before
+        a click) lets the requests started by that click be seen.
+        """
+        quiet: Dict[str, Any] = {"since": None, "resources": None}
+
+        def idle(driver) -> bool:
+            ready_state, pending, resources, _ = self._probe()
+            now = time.perf_counter()
+            if ready_state != "complete" or pending or resources != quiet["resources"]:
+                quiet["since"] = None if (ready_state != "complete" or pending) else now
+                quiet["resources"] = resources
+                return False
+            if quiet["since"] is None:
+                quiet["since"] = now
+            return now - quiet["since"] >= quiet_period
+
+        return bool(self.until(idle, timeout=timeout, site=site or self._caller_site(), baseline=baseline))
+
+    def element_stable(
+        self,
+        target,
+        timeout: Optional[float] = None,
+        site: Optional[str] = None,
+        baseline: float = 0.0,
+        stable_for: float = 0.2,
+    ):
+        """Wait until an element is rendered and its bounding box stops changing.
+
+        ``target`` is a WebElement or a ``(By, value)`` locator.  Returns the
+        element once stable (e.g. after a smooth ``scrollIntoView``), else ``None``.
+        """
+        state: Dict[str, Any] = {"rect": None, "since": None}
+
+        def stable(driver):
+            element = driver.find_element(*target) if isinstance(target, tuple) else target
+            rect = self._probe(element)[3]
+            now = time.perf_counter()
+            if not isinstance(rect, list) or rect[2] <= 0 or rect[3] <= 0:
+                state["rect"] = None
+                return None
+            if rect != state["rect"]:
+                state["rect"], state["since"] = rect, now
+                return None
+            return element if now - state["since"] >= stable_for else None
+
+        return self.until(stable, timeout=timeout, site=site or self._caller_site(), baseline=baseline)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _probe(self, element=None) -> List[Any]:
+        return self.driver.execute_script(_PROBE_SCRIPT, element)
+
+    @staticmethod
+    def _timeout(timeout: Optional[float], baseline: float) -> float:
+        if timeout is not None:
+            return max(0.0, timeout)
+        return baseline if baseline else DEFAULT_TIMEOUT
+
+    def _record(self, site: str, elapsed: float, met: bool, baseline: float) -> None:
+        if baseline:
+            self.saved_seconds += baseline - elapsed
+        if self.telemetry is not None:
+            self.telemetry.record(site, elapsed, met, baseline)
+
+    @staticmethod
+    def _caller_site() -> str:
+        # Skip this helper and the AdaptiveWaiter method that called it
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        if frame is None:
+            return "unknown"
+        return f"{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+def _percentile(sorted_samples: List[float], fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+_shared_telemetry: Dict[str, WaitTelemetry] = {}
+_shared_telemetry_lock = threading.Lock()
+
+
+def get_wait_telemetry(name: str = "wait_telemetry") -> WaitTelemetry:
+    """Process-wide telemetry store for one bot, ``<WAIT_TELEMETRY_DIR>/<name>.json``."""
+    with _shared_telemetry_lock:
+        telemetry = _shared_telemetry.get(name)
+        if telemetry is None:
+            directory = os.environ.get("WAIT_TELEMETRY_DIR") or None
+            base = Path(directory) if directory else DEFAULT_TELEMETRY_DIR
+            telemetry = _shared_telemetry[name] = WaitTelemetry(base / f"{name}.json")
+        return telemetry
+
+
+__all__ = ["AdaptiveWaiter", "WaitTelemetry", "get_wait_telemetry"]
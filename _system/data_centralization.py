@@ -8,9 +8,10 @@ Works with OneDrive cloud sync to aggregate data from all locations.
 import os
 import json
 import sqlite3
+import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import logging
 import shutil
 
@@ -22,6 +23,16 @@ except ImportError:
     USER_REGISTRATION_AVAILABLE = False
     UserRegistration = None
 
+# Rows read from a source table per executemany batch
+AGGREGATION_BATCH_SIZE = 5000
+
+# Columns that identify an already-aggregated row (matches the old per-row existence checks)
+UNIQUE_KEYS = {
+    "aggregated_bot_executions": ("user_hash", "bot_name", "execution_timestamp"),
+    "aggregated_ai_prompts": ("user_hash", "prompt_timestamp"),
+    "aggregated_workflow_patterns": ("user_hash", "bot_name", "pattern_timestamp"),
+}
+
 
 class DataCentralization:
     """
@@ -115,6 +126,33 @@ class DataCentralization:
             )
         """)
         
+        # Per-source, per-computer high-water marks (last source row id aggregated)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS aggregation_watermarks (
+                source TEXT NOT NULL,
+                computer_id TEXT NOT NULL,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT,
+                PRIMARY KEY (source, computer_id)
+            )
+        """)
+        
+        for table, key_columns in UNIQUE_KEYS.items():
+            index_name = f"uq_{table}"
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index_name,)
+            ).fetchone()
+            if exists:
+                continue
+            # Databases from before the unique indexes may hold duplicates; keep the first copy
+            key_list = ", ".join(key_columns)
+            cursor.execute(f"""
+                DELETE FROM {table} WHERE id NOT IN (
+                    SELECT MIN(id) FROM {table} GROUP BY {key_list}
+                )
+            """)
+            cursor.execute(f"CREATE UNIQUE INDEX {index_name} ON {table} ({key_list})")
+        
         conn.commit()
         conn.close()
     
@@ -170,195 +208,176 @@ class DataCentralization:
             "aggregated_at": datetime.now().isoformat()
         }
     
-    def _aggregate_bot_executions(self) -> Dict:
-        """Aggregate bot execution data from all computers"""
-        from secure_data_collector import SecureDataCollector
-        
-        collector = SecureDataCollector(self.installation_dir)
-        history = collector.get_workflow_history(days=365)  # Get all data
-        
-        # Get user registration info
+    def _local_computer(self) -> Tuple[Optional[Dict], str]:
+        """Local user registration (if any) and this computer's id"""
         user_reg = UserRegistration(self.installation_dir) if USER_REGISTRATION_AVAILABLE else None
         local_user = user_reg.get_local_user() if user_reg else None
         computer_id = local_user.get("computer_id") if local_user else "unknown"
+        return local_user, computer_id or "unknown"
+    
+    def _aggregate_bot_executions(self) -> Dict:
+        """Aggregate bot execution data from all computers"""
+        local_user, computer_id = self._local_computer()
+        local_hash = local_user.get("user_hash", "unknown") if local_user else "unknown"
+        aggregated_at = datetime.now().isoformat()
+        
+        def to_row(row):
+            user_hash, bot_name, execution_time, success, timestamp = row
+            if (not user_hash or user_hash == "unknown") and local_user:
+                user_hash = local_hash
+            return (
+                user_hash or "unknown",
+                computer_id,
+                bot_name or "",
+                execution_time or 0,
+                1 if success else 0,
+                timestamp or aggregated_at,
+                aggregated_at,
+            )
         
-        # Aggregate to central database
-        conn = sqlite3.connect(self.central_db)
-        cursor = conn.cursor()
-        
-        aggregated = 0
-        for record in history:
-            user_hash = record.get("user_hash") or record.get("user_name", "unknown")
-            if user_hash == "unknown" and local_user:
-                user_hash = local_user.get("user_hash", "unknown")
-            
-            # Check if already aggregated
-            cursor.execute("""
-                SELECT id FROM aggregated_bot_executions
-                WHERE user_hash = ? AND bot_name = ? AND execution_timestamp = ?
-            """, (
-                user_hash,
-                record.get("bot_name", ""),
-                record.get("timestamp", "")
-            ))
-            
-            if not cursor.fetchone():
-                cursor.execute("""
-                    INSERT INTO aggregated_bot_executions
-                    (user_hash, computer_id, bot_name, execution_time, success, execution_timestamp, aggregated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    user_hash,
-                    computer_id,
-                    record.get("bot_name", ""),
-                    record.get("execution_time", 0),
-                    1 if record.get("success") else 0,
-                    record.get("timestamp", datetime.now().isoformat()),
-                    datetime.now().isoformat()
-                ))
-                aggregated += 1
-        
-        conn.commit()
-        conn.close()
-        
-        return {"aggregated": aggregated, "total": len(history)}
+        return self._aggregate_source(
+            source="bot_executions",
+            local_db=self.installation_dir / "_secure_data" / "secure_collection.db",
+            table="bot_executions",
+            columns="user_hash, bot_name, execution_time, success, timestamp",
+            insert_sql="""
+                INSERT INTO aggregated_bot_executions
+                (user_hash, computer_id, bot_name, execution_time, success, execution_timestamp, aggregated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+            """,
+            to_row=to_row,
+            computer_id=computer_id,
+        )
     
     def _aggregate_ai_prompts(self) -> Dict:
         """Aggregate AI prompt data from all computers"""
-        # Get AI prompts from local database
-        local_db = self.installation_dir / "_secure_data" / "secure_collection.db"
-        if not local_db.exists():
-            return {"aggregated": 0, "total": 0}
-        
-        conn_local = sqlite3.connect(local_db)
-        cursor_local = conn_local.cursor()
-        
-        try:
-            cursor_local.execute("""
-                SELECT timestamp, user_hash, prompt_text, response_data, bot_selected, confidence_score
-                FROM ai_prompts
-                ORDER BY timestamp DESC
-            """)
-            
-            prompts = cursor_local.fetchall()
-        except:
-            prompts = []
-        finally:
-            conn_local.close()
-        
-        # Get user registration info
-        user_reg = UserRegistration(self.installation_dir) if USER_REGISTRATION_AVAILABLE else None
-        local_user = user_reg.get_local_user() if user_reg else None
-        computer_id = local_user.get("computer_id") if local_user else "unknown"
-        
-        # Aggregate to central database
-        conn_central = sqlite3.connect(self.central_db)
-        cursor_central = conn_central.cursor()
-        
-        aggregated = 0
-        for prompt in prompts:
-            timestamp, user_hash, prompt_text, response_data, bot_selected, confidence = prompt
-            
-            # Parse response data
-            try:
-                response_dict = json.loads(response_data) if response_data else {}
-            except:
-                response_dict = {}
-            
-            # Check if already aggregated
-            cursor_central.execute("""
-                SELECT id FROM aggregated_ai_prompts
-                WHERE user_hash = ? AND prompt_timestamp = ?
-            """, (user_hash or "unknown", timestamp))
-            
-            if not cursor_central.fetchone():
-                cursor_central.execute("""
-                    INSERT INTO aggregated_ai_prompts
-                    (user_hash, computer_id, prompt_text, bot_selected, confidence_score, prompt_timestamp, aggregated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    user_hash or "unknown",
-                    computer_id,
-                    prompt_text,
-                    bot_selected,
-                    confidence,
-                    timestamp,
-                    datetime.now().isoformat()
-                ))
-                aggregated += 1
-        
-        conn_central.commit()
-        conn_central.close()
-        
-        return {"aggregated": aggregated, "total": len(prompts)}
+        _, computer_id = self._local_computer()
+        aggregated_at = datetime.now().isoformat()
+        
+        def to_row(row):
+            timestamp, user_hash, prompt_text, bot_selected, confidence = row
+            return (user_hash or "unknown", computer_id, prompt_text, bot_selected, confidence, timestamp, aggregated_at)
+        
+        return self._aggregate_source(
+            source="ai_prompts",
+            local_db=self.installation_dir / "_secure_data" / "secure_collection.db",
+            table="ai_prompts",
+            columns="timestamp, user_hash, prompt_text, bot_selected, confidence_score",
+            insert_sql="""
+                INSERT INTO aggregated_ai_prompts
+                (user_hash, computer_id, prompt_text, bot_selected, confidence_score, prompt_timestamp, aggregated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+            """,
+            to_row=to_row,
+            computer_id=computer_id,
+        )
     
     def _aggregate_workflow_patterns(self) -> Dict:
         """Aggregate workflow pattern data from all computers"""
-        # Get workflow patterns from local database
-        local_db = self.installation_dir / "_ai_intelligence" / "workflow_database.db"
+        _, computer_id = self._local_computer()
+        aggregated_at = datetime.now().isoformat()
+        user_hashes: Dict[str, str] = {}
+        
+        def to_row(row):
+            user_name, bot_name, parameters, files_used, timestamp = row
+            if user_name:
+                user_hash = user_hashes.get(user_name)
+                if user_hash is None:
+                    user_hash = user_hashes[user_name] = hashlib.sha256(user_name.encode()).hexdigest()
+            else:
+                user_hash = "unknown"
+            return (user_hash, computer_id, bot_name, parameters, files_used, 1, timestamp, aggregated_at)
+        
+        return self._aggregate_source(
+            source="workflow_executions",
+            local_db=self.installation_dir / "_ai_intelligence" / "workflow_database.db",
+            table="workflow_executions",
+            columns="user_name, bot_name, parameters, files_used, timestamp",
+            insert_sql="""
+                INSERT INTO aggregated_workflow_patterns
+                (user_hash, computer_id, bot_name, parameter_pattern, file_pattern, frequency, pattern_timestamp, aggregated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+            """,
+            to_row=to_row,
+            computer_id=computer_id,
+        )
+    
+    def _aggregate_source(
+        self,
+        source: str,
+        local_db: Path,
+        table: str,
+        columns: str,
+        insert_sql: str,
+        to_row: Callable[[tuple], tuple],
+        computer_id: str,
+    ) -> Dict:
+        """
+        Copy rows added to ``table`` since the last run into the central database.
+        
+        Only rows with ``id`` above the stored high-water mark for
+        ``(source, computer_id)`` are read.  They are inserted in batches with
+        ``ON CONFLICT DO NOTHING`` (the unique indexes drop copies that are
+        already aggregated) and the new mark is saved in the same transaction,
+        so an interrupted run is simply redone.
+        """
         if not local_db.exists():
             return {"aggregated": 0, "total": 0}
         
         conn_local = sqlite3.connect(local_db)
-        cursor_local = conn_local.cursor()
-        
+        conn_central = sqlite3.connect(self.central_db)
         try:
-            cursor_local.execute("""
-                SELECT user_name, bot_name, parameters, files_used, timestamp
-                FROM workflow_executions
-                ORDER BY timestamp DESC
-            """)
+            watermark = self._get_watermark(conn_central, source, computer_id)
+            try:
+                max_id = conn_local.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0
+            except sqlite3.Error:
+                return {"aggregated": 0, "total": 0}
+            if max_id < watermark:
+                # Source database was recreated; rescan it and let the unique indexes skip known rows
+                self.logger.info(f"{source}: source ids restarted ({max_id} < {watermark}), rescanning")
+                watermark = 0
+            if max_id == watermark:
+                return {"aggregated": 0, "total": 0}
             
-            patterns = cursor_local.fetchall()
-        except:
-            patterns = []
+            cursor_local = conn_local.execute(
+                f"SELECT id, {columns} FROM {table} WHERE id > ? AND id <= ? ORDER BY id",
+                (watermark, max_id),
+            )
+            total = 0
+            changes_before = conn_central.total_changes
+            with conn_central:
+                while True:
+                    rows = cursor_local.fetchmany(AGGREGATION_BATCH_SIZE)
+                    if not rows:
+                        break
+                    total += len(rows)
+                    conn_central.executemany(insert_sql, [to_row(row[1:]) for row in rows])
+                aggregated = conn_central.total_changes - changes_before
+                conn_central.execute(
+                    """
+                    INSERT INTO aggregation_watermarks (source, computer_id, last_id, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(source, computer_id) DO UPDATE SET
+                        last_id = excluded.last_id,
+                        updated_at = excluded.updated_at
+                    """,
+                    (source, computer_id, max_id, datetime.now().isoformat()),
+                )
+            return {"aggregated": aggregated, "total": total}
         finally:
             conn_local.close()
-        
-        # Get user registration info
-        user_reg = UserRegistration(self.installation_dir) if USER_REGISTRATION_AVAILABLE else None
-        local_user = user_reg.get_local_user() if user_reg else None
-        computer_id = local_user.get("computer_id") if local_user else "unknown"
-        
-        # Aggregate to central database
-        conn_central = sqlite3.connect(self.central_db)
-        cursor_central = conn_central.cursor()
-        
-        aggregated = 0
-        for pattern in patterns:
-            user_name, bot_name, parameters, files_used, timestamp = pattern
-            
-            # Hash user name
-            import hashlib
-            user_hash = hashlib.sha256(user_name.encode()).hexdigest() if user_name else "unknown"
-            
-            # Check if already aggregated
-            cursor_central.execute("""
-                SELECT id FROM aggregated_workflow_patterns
-                WHERE user_hash = ? AND bot_name = ? AND pattern_timestamp = ?
-            """, (user_hash, bot_name, timestamp))
-            
-            if not cursor_central.fetchone():
-                cursor_central.execute("""
-                    INSERT INTO aggregated_workflow_patterns
-                    (user_hash, computer_id, bot_name, parameter_pattern, file_pattern, frequency, pattern_timestamp, aggregated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    user_hash,
-                    computer_id,
-                    bot_name,
-                    parameters,
-                    files_used,
-                    1,
-                    timestamp,
-                    datetime.now().isoformat()
-                ))
-                aggregated += 1
-        
-        conn_central.commit()
-        conn_central.close()
-        
-        return {"aggregated": aggregated, "total": len(patterns)}
+            conn_central.close()
+    
+    @staticmethod
+    def _get_watermark(conn: sqlite3.Connection, source: str, computer_id: str) -> int:
+        row = conn.execute(
+            "SELECT last_id FROM aggregation_watermarks WHERE source = ? AND computer_id = ?",
+            (source, computer_id),
+        ).fetchone()
+        return row[0] if row else 0
     
     def _record_aggregation_metadata(self, aggregation_type: str, records_aggregated: int, duration: float):
         """Record aggregation metadata"""
@@ -449,3 +468,60 @@ class DataCentralization:
         thread.start()
         self.logger.info(f"Automated aggregation started (interval: {interval_hours} hours)")
 
+
+
+def benchmark(rows: int = 1_000_000) -> Dict:
+    """Time a full, an empty and a small incremental bot-execution aggregation"""
+    import tempfile
+    import time
+    
+    results: Dict = {"rows": rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        installation_dir = Path(tmp)
+        source_dir = installation_dir / "_secure_data"
+        source_dir.mkdir()
+        source = sqlite3.connect(source_dir / "secure_collection.db")
+        source.execute("""
+            CREATE TABLE bot_executions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                user_hash TEXT NOT NULL,
+                bot_name TEXT NOT NULL,
+                bot_path TEXT NOT NULL,
+                success INTEGER,
+                execution_time REAL
+            )
+        """)
+        
+        def add_rows(start: int, count: int) -> None:
+            base = datetime(2024, 1, 1)
+            with source:
+                source.executemany(
+                    "INSERT INTO bot_executions (timestamp, user_hash, bot_name, bot_path, success, execution_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        ((base + timedelta(seconds=i)).isoformat(), f"user{i % 50}", f"bot{i % 20}", "bot.py", i % 7 != 0, 1.5)
+                        for i in range(start, start + count)
+                    ),
+                )
+        
+        add_rows(0, rows)
+        centralizer = DataCentralization(installation_dir)
+        for label, new_rows in (("full", 0), ("no_new_rows", 0), ("incremental_1000", 1000)):
+            if new_rows:
+                add_rows(rows, new_rows)
+            started = time.perf_counter()
+            outcome = centralizer._aggregate_bot_executions()
+            results[label] = {"seconds": round(time.perf_counter() - started, 4), **outcome}
+        source.close()
+        logging.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark incremental data aggregation")
+    parser.add_argument("rows", nargs="?", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.rows), indent=2))
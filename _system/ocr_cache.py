@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+OCR Cache - content-addressed cache of PDF page text shared by all bots
+
+Page text from pdfplumber and from Tesseract OCR is stored on disk keyed by
+the SHA-256 of the PDF's bytes, the page number, the render DPI and the full
+Tesseract config string (PSM and any -c options).  A renamed or re-downloaded
+copy of the same file therefore hits the same entries, and looking up many
+clients in one remittance PDF costs a single OCR pass.
+
+The store is a single SQLite file (default
+``_secure_data/ocr_cache/ocr_cache.db``) with least-recently-used eviction
+once it grows past its size limit.  Any cache failure degrades to plain,
+uncached extraction - the cache never stops a bot from reading a PDF.
+
+Usage:
+    from ocr_cache import get_ocr_cache
+
+    doc = get_ocr_cache().document(pdf_path)
+    texts = doc.text_pages()                      # pdfplumber text per page
+    ocr = doc.ocr_pages(dpi=300, last_page=5)     # Tesseract text per page
+    last = doc.ocr_page(doc.page_count(), dpi=200, config="--psm 12")
+
+    # Or, for one-off calls through the shared cache:
+    texts = pdf_page_texts(pdf_path)
+    ocr = ocr_pdf_pages(pdf_path, poppler_path, last_page=5)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+KIND_TEXT = "text"  # pdfplumber page.extract_text()
+KIND_OCR = "ocr"    # pytesseract.image_to_string() of a rendered page
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "_secure_data" / "ocr_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Eviction trims the cache to this fraction of max_bytes so it does not run
+# on every insert once the limit is reached.
+EVICTION_TARGET_RATIO = 0.9
+
+
+class OCRCache:
+    """Disk-backed page-text cache with LRU size eviction (thread-safe)."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.db_path = self.cache_dir / "ocr_cache.db"
+        self.max_bytes = max(1, int(max_bytes))
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._open()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def document(self, pdf_path) -> "CachedPdf":
+        """Return a cached view of one PDF file."""
+        return CachedPdf(self, Path(pdf_path))
+
+    def file_digest(self, path) -> str:
+        """SHA-256 of the file's bytes, memoized per (path, size, mtime)."""
+        path = Path(path)
+        stat = path.stat()
+        memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(memo_key)
+        if digest:
+            return digest
+        hasher = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with self._lock:
+            self._digests[memo_key] = digest
+        return digest
+
+    def get(self, digest: str, page: int, kind: str, dpi: int = 0, config: str = "") -> Optional[str]:
+        """Return cached text for one page, or ``None`` on a miss."""
+        with self._lock:
+            if self._conn is None:
+                self.misses += 1
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT text FROM page_text WHERE digest = ? AND page = ? AND kind = ? AND dpi = ? AND config = ?",
+                    (digest, page, kind, dpi, config),
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE page_text SET last_access = ? WHERE digest = ? AND page = ? AND kind = ? AND dpi = ? AND config = ?",
+                        (time.time(), digest, page, kind, dpi, config),
+                    )
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as exc:
+                self._disable(exc)
+                self.misses += 1
+                return None
+
+    def put(self, digest: str, page: int, kind: str, text: str, dpi: int = 0, config: str = "") -> None:
+        """Store text for one page, evicting least recently used pages if needed."""
+        text = text or ""
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    previous = self._conn.execute(
+                        "SELECT size FROM page_text WHERE digest = ? AND page = ? AND kind = ? AND dpi = ? AND config = ?",
+                        (digest, page, kind, dpi, config),
+                    ).fetchone()
+                    self._conn.execute(
+                        """
+                        INSERT OR REPLACE INTO page_text (digest, page, kind, dpi, config, text, size, last_access)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (digest, page, kind, dpi, config, text, size, time.time()),
+                    )
+                self._total_bytes += size - (previous[0] if previous else 0)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+            except sqlite3.Error as exc:
+                self._disable(exc)
+
+    def get_page_count(self, digest: str) -> Optional[int]:
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT page_count FROM documents WHERE digest = ?", (digest,)
+                ).fetchone()
+                return int(row[0]) if row else None
+            except sqlite3.Error as exc:
+                self._disable(exc)
+                return None
+
+    def put_page_count(self, digest: str, page_count: int) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO documents (digest, page_count) VALUES (?, ?)",
+                        (digest, int(page_count)),
+                    )
+            except sqlite3.Error as exc:
+                self._disable(exc)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            entries = 0
+            if self._conn is not None:
+                try:
+                    entries = self._conn.execute("SELECT COUNT(*) FROM page_text").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "db_path": str(self.db_path),
+            }
+
+    def clear(self) -> None:
+        """Remove every cached page."""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM page_text")
+                    self._conn.execute("DELETE FROM documents")
+                self._total_bytes = 0
+            except sqlite3.Error as exc:
+                self._disable(exc)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error:
+                pass
+            with conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS page_text (
+                        digest TEXT NOT NULL,
+                        page INTEGER NOT NULL,
+                        kind TEXT NOT NULL,
+                        dpi INTEGER NOT NULL DEFAULT 0,
+                        config TEXT NOT NULL DEFAULT '',
+                        text TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_access REAL NOT NULL,
+                        PRIMARY KEY (digest, page, kind, dpi, config)
+                    ) WITHOUT ROWID
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_page_text_last_access ON page_text(last_access)")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS documents (
+                        digest TEXT PRIMARY KEY,
+                        page_count INTEGER NOT NULL
+                    )
+                    """
+                )
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_text").fetchone()[0]
+            self._conn = conn
+        except (OSError, sqlite3.Error) as exc:
+            LOGGER.warning("OCR cache disabled - could not open %s: %s", self.db_path, exc)
+            self._conn = None
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        evicted = 0
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT digest, page, kind, dpi, config, size FROM page_text ORDER BY last_access"
+            )
+            doomed = []
+            for digest, page, kind, dpi, config, size in rows:
+                if self._total_bytes <= target:
+                    break
+                doomed.append((digest, page, kind, dpi, config))
+                self._total_bytes -= size
+                evicted += 1
+            self._conn.executemany(
+                "DELETE FROM page_text WHERE digest = ? AND page = ? AND kind = ? AND dpi = ? AND config = ?",
+                doomed,
+            )
+            # Drop page counts of documents that no longer have any cached page
+            self._conn.execute(
+                "DELETE FROM documents WHERE digest NOT IN (SELECT DISTINCT digest FROM page_text)"
+            )
+        LOGGER.info("OCR cache: evicted %s page(s), %s bytes remain", evicted, self._total_bytes)
+
+    def _disable(self, exc: Exception) -> None:
+        LOGGER.warning("OCR cache disabled after database error: %s", exc)
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        except sqlite3.Error:
+            pass
+        self._conn = None
+
+
+class CachedPdf:
+    """One PDF file seen through an :class:`OCRCache`.
+
+    Only the most recently rendered single page is kept in memory, so trying
+    several Tesseract configs on a page renders it once; pages rendered by
+    :meth:`ocr_pages` are dropped as soon as their text is cached.
+    """
+
+    def __init__(self, cache: OCRCache, path: Path) -> None:
+        self.cache = cache
+        self.path = path
+        self.digest = cache.file_digest(path)
+        self._last_image: Optional[Tuple[int, int, Any]] = None  # (page, dpi, image)
+
+    def page_count(self, pdf=None) -> int:
+        """Number of pages (``pdf`` is an optional already-open pdfplumber document)."""
+        count = self.cache.get_page_count(self.digest)
+        if count is not None:
+            return count
+        if pdf is not None:
+            count = len(pdf.pages)
+        else:
+            try:
+                import pdfplumber
+                with pdfplumber.open(str(self.path)) as opened:
+                    count = len(opened.pages)
+            except ImportError:
+                from pdf2image import pdfinfo_from_path
+                count = int(pdfinfo_from_path(str(self.path))["Pages"])
+        self.cache.put_page_count(self.digest, count)
+        return count
+
+    def text_pages(self, pdf=None) -> List[str]:
+        """pdfplumber text of every page (``''`` for pages without a text layer).
+
+        ``pdf`` may be an already-open pdfplumber document; otherwise the file is
+        only opened when at least one page is missing from the cache.
+        """
+        count = self.page_count(pdf)
+        texts: List[Optional[str]] = [self.cache.get(self.digest, page, KIND_TEXT) for page in range(1, count + 1)]
+        missing = [index for index, text in enumerate(texts) if text is None]
+        if missing:
+            if pdf is not None:
+                self._fill_text(pdf, texts, missing)
+            else:
+                import pdfplumber
+                with pdfplumber.open(str(self.path)) as opened:
+                    self._fill_text(opened, texts, missing)
+        return [text or "" for text in texts]
+
+    def ocr_page(
+        self,
+        page: int,
+        dpi: int = 300,
+        config: str = "",
+        lang: Optional[str] = None,
+        poppler_path: Optional[str] = None,
+    ) -> str:
+        """Tesseract text of one 1-based page rendered at ``dpi``."""
+        key_config = self._key_config(config, lang)
+        text = self.cache.get(self.digest, page, KIND_OCR, dpi, key_config)
+        if text is not None:
+            return text
+        if self._last_image is not None and self._last_image[:2] == (page, dpi):
+            image = self._last_image[2]
+        else:
+            image = self._render(page, page, dpi, poppler_path)[0]
+            self._last_image = (page, dpi, image)
+        text = self._tesseract(image, config, lang)
+        self.cache.put(self.digest, page, KIND_OCR, text, dpi, key_config)
+        return text
+
+    def ocr_pages(
+        self,
+        first_page: int = 1,
+        last_page: Optional[int] = None,
+        dpi: int = 300,
+        config: str = "",
+        lang: Optional[str] = None,
+        poppler_path: Optional[str] = None,
+        on_page: Optional[Callable[[int, int], None]] = None,
+    ) -> List[str]:
+        """Tesseract text for pages ``first_page..last_page`` (inclusive, 1-based).
+
+        Pages already in the cache are not rendered; consecutive missing pages
+        are rendered with one pdf2image call.  ``on_page(page, last_page)`` is
+        called before each page that actually needs OCR.
+        """
+        count = self.page_count()
+        last_page = count if last_page is None else min(last_page, count)
+        key_config = self._key_config(config, lang)
+        pages = list(range(first_page, last_page + 1))
+        texts = {page: self.cache.get(self.digest, page, KIND_OCR, dpi, key_config) for page in pages}
+
+        for run_start, run_end in self._missing_runs(pages, texts):
+            images = self._render(run_start, run_end, dpi, poppler_path)
+            for page in range(run_start, run_end + 1):
+                if on_page:
+                    on_page(page, last_page)
+                text = self._tesseract(images[page - run_start], config, lang)
+                self.cache.put(self.digest, page, KIND_OCR, text, dpi, key_config)
+                texts[page] = text
+                images[page - run_start] = None  # text is cached; free the 300-dpi bitmap
+        return [texts[page] or "" for page in pages]
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _fill_text(self, pdf, texts: List[Optional[str]], missing: List[int]) -> None:
+        for index in missing:
+            text = pdf.pages[index].extract_text() or ""
+            self.cache.put(self.digest, index + 1, KIND_TEXT, text)
+            texts[index] = text
+
+    @staticmethod
+    def _key_config(config: str, lang: Optional[str]) -> str:
+        config = config or ""
+        return f"{config} lang={lang}" if lang else config
+
+    @staticmethod
+    def _missing_runs(pages: List[int], texts: Dict[int, Optional[str]]) -> List[Tuple[int, int]]:
+        runs: List[Tuple[int, int]] = []
+        for page in pages:
+            if texts[page] is not None:
+                continue
+            if runs and runs[-1][1] == page - 1:
+                runs[-1] = (runs[-1][0], page)
+            else:
+                runs.append((page, page))
+        return runs
+
+    def _render(self, first_page: int, last_page: int, dpi: int, poppler_path: Optional[str]) -> List[Any]:
+        from pdf2image import convert_from_path
+        kwargs: Dict[str, Any] = {"first_page": first_page, "last_page": last_page, "dpi": dpi}
+        if poppler_path:
+            kwargs["poppler_path"] = poppler_path
+        return convert_from_path(str(self.path), **kwargs)
+
+    @staticmethod
+    def _tesseract(image, config: str, lang: Optional[str]) -> str:
+        import pytesseract
+        kwargs: Dict[str, Any] = {}
+        if config:
+            kwargs["config"] = config
+        if lang:
+            kwargs["lang"] = lang
+        return pytesseract.image_to_string(image, **kwargs)
+
+
+_shared_cache: Optional[OCRCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRCache:
+    """Process-wide cache instance.
+
+    ``OCR_CACHE_DIR`` and ``OCR_CACHE_MAX_MB`` override the default location
+    and size limit.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            cache_dir = os.environ.get("OCR_CACHE_DIR") or None
+            try:
+                max_bytes = int(float(os.environ.get("OCR_CACHE_MAX_MB", "")) * 1024 * 1024)
+            except ValueError:
+                max_bytes = DEFAULT_MAX_BYTES
+            _shared_cache = OCRCache(Path(cache_dir) if cache_dir else None, max_bytes=max_bytes)
+        return _shared_cache
+
+
+def pdf_page_texts(pdf_path, pdf=None) -> List[str]:
+    """pdfplumber text of every page of ``pdf_path`` through the shared cache.
+
+    ``pdf`` may be an already-open pdfplumber document for the same file.
+    """
+    return get_ocr_cache().document(pdf_path).text_pages(pdf)
+
+
+def ocr_pdf_pages(
+    pdf_path,
+    poppler_path: Optional[str] = None,
+    last_page: Optional[int] = None,
+    dpi: int = 300,
+) -> List[str]:
+    """Tesseract text of pages 1..``last_page`` (all pages if ``None``) through the shared cache."""
+    return get_ocr_cache().document(pdf_path).ocr_pages(last_page=last_page, dpi=dpi, poppler_path=poppler_path)
+
+
+__all__ = [
+    "CachedPdf",
+    "KIND_OCR",
+    "KIND_TEXT",
+    "OCRCache",
+    "get_ocr_cache",
+    "ocr_pdf_pages",
+    "pdf_page_texts",
+]
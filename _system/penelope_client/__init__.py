@@ -0,0 +1,12 @@
+"""
+Penelope Client - shared Selenium client for the Penelope (Athena) bots
+
+``PNClient`` holds the start / login / search steps every Penelope bot needs.
+Browsers come from the local driver broker, which keeps one logged-in Chrome
+per account alive between bot runs (see ``broker.py``).
+"""
+
+from .broker import BrokerClient, BrokerError, DriverBroker
+from .client import PN_DEFAULT_URL, PNAuth, PNClient
+
+__all__ = ["BrokerClient", "BrokerError", "DriverBroker", "PN_DEFAULT_URL", "PNAuth", "PNClient"]
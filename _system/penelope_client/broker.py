@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Penelope driver broker - keeps logged-in Chrome sessions alive between bot runs
+
+Every bot used to start its own ChromeDriver-controlled Chrome and log in to
+Penelope through the login iframe, once per run.  The broker is a small local
+process that owns long-lived Chrome instances instead: one per Penelope
+account, each with a persistent profile under
+``_secure_data/penelope_broker/profiles``.  Chrome is started with a DevTools
+port on 127.0.0.1, and a bot attaches Selenium to it
+(``debuggerAddress``), opens its own tab and reuses the logged-in session.
+
+The first bot that needs the broker starts it in the background; it exits
+(closing its browsers) after ``PENELOPE_BROKER_IDLE_HOURS`` (default 0.5)
+without any bot attached.  The DevTools port has no authentication of its
+own, so a logged-in browser should not outlive the work that needs it.
+
+A recorded login is only handed to a bot running as the same Windows user
+with the same password: the broker keeps a salted verifier of the client's
+credential digest and refuses the browser to anyone else.  When the last
+bot detaches, every tab is closed and the browser is left on one blank tab,
+so no client record stays open for the next bot to find.
+
+Protocol: one JSON object per line over TCP on 127.0.0.1
+(``PENELOPE_BROKER_PORT``, default 47653).  Requests carry the token from
+``broker.json``; each gets one JSON reply with ``ok`` set.
+
+Usage:
+    python broker.py serve     # normally started on demand by PNClient.start()
+    python broker.py status
+    python broker.py stop
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from .chrome import devtools_version, find_chrome, free_port, launch_chrome
+except ImportError:
+    from chrome import devtools_version, find_chrome, free_port, launch_chrome
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BROKER_DIR = Path(__file__).resolve().parents[2] / "_secure_data" / "penelope_broker"
+DEFAULT_PORT = 47653
+DEFAULT_IDLE_HOURS = 0.5
+# How often dead leases and exited browsers are cleaned up
+REAP_INTERVAL = 30.0
+
+
+class BrokerError(RuntimeError):
+    """The broker could not be reached or refused a request."""
+
+
+def broker_dir() -> Path:
+    return Path(os.environ.get("PENELOPE_BROKER_DIR") or DEFAULT_BROKER_DIR)
+
+
+def broker_port() -> int:
+    try:
+        return int(os.environ.get("PENELOPE_BROKER_PORT") or DEFAULT_PORT)
+    except ValueError:
+        return DEFAULT_PORT
+
+
+def profile_key(origin: str, username: str) -> str:
+    """Stable profile folder name for one Penelope account."""
+    digest = hashlib.sha1(f"{origin.strip().lower()}|{username.strip().lower()}".encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def credential_digest(origin: str, username: str, password: str) -> str:
+    """Slow digest of a Penelope password, so the plain password never reaches the broker."""
+    salt = f"penelope-broker|{origin.strip().lower()}|{username.strip().lower()}".encode("utf-8")
+    return hashlib.pbkdf2_hmac("sha256", (password or "").encode("utf-8"), salt, 100_000).hex()
+
+
+def pid_alive(pid: int) -> bool:
+    if not pid or pid <= 0:
+        return False
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000 | 0x00100000, False, int(pid))  # QUERY_LIMITED_INFORMATION | SYNCHRONIZE
+        if not handle:
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == 0x102  # WAIT_TIMEOUT: still running
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _verifier(salt: bytes, credential: str) -> bytes:
+    return hmac.new(salt, credential.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _public_session(session: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    if not session:
+        return None
+    return {key: session[key] for key in ("username", "origin", "landing_url", "logged_in_at") if key in session}
+
+
+# ----------------------------------------------------------------------
+# Server side
+# ----------------------------------------------------------------------
+class _Browser:
+    """One broker-owned Chrome instance and the bots attached to it."""
+
+    def __init__(self, key: str, process: subprocess.Popen, port: int):
+        self.key = key
+        self.process = process
+        self.port = port
+        self.started = datetime.now().isoformat(timespec="seconds")
+        # lease id -> {"pid": client pid, "tab": window handle or None}
+        self.leases: Dict[str, Dict[str, Any]] = {}
+        # Penelope login recorded by the client: username, origin, landing_url,
+        # logged_in_at, plus os_user/salt/verifier (never sent back to clients)
+        self.session: Optional[Dict[str, str]] = None
+
+    def alive(self) -> bool:
+        return self.process.poll() is None and devtools_version(self.port) is not None
+
+    def _devtools(self, path: str, method: str = "GET"):
+        request = urllib.request.Request(f"http://127.0.0.1:{self.port}{path}", method=method)
+        with urllib.request.urlopen(request, timeout=2) as response:
+            body = response.read().decode("utf-8")
+        return json.loads(body) if body.strip().startswith(("{", "[")) else None
+
+    def _pages(self) -> List[str]:
+        return [target.get("id") for target in self._devtools("/json/list") or [] if target.get("type") == "page"]
+
+    def _open_blank(self) -> None:
+        try:
+            # Chrome 111+ only accepts PUT here; older builds only GET
+            self._devtools("/json/new?about:blank", method="PUT")
+        except OSError:
+            self._devtools("/json/new?about:blank")
+
+    def close_tab(self, tab: Optional[str]) -> None:
+        """Close a finished bot's tab; a blank tab is opened first if it was the last one."""
+        if not tab:
+            return
+        # Older ChromeDrivers prefix window handles with "CDwindow-"
+        tab = tab.split("CDwindow-", 1)[-1]
+        try:
+            pages = self._pages()
+            if tab not in pages:
+                return
+            if len(pages) == 1:
+                self._open_blank()
+            self._devtools(f"/json/close/{tab}")
+        except (OSError, ValueError):
+            pass
+
+    def reset_tabs(self) -> None:
+        """Close every tab and leave the window on a single blank one.
+
+        Only called once no bot holds a lease, so nothing closed here is in use.
+        """
+        try:
+            stale = self._pages()
+            self._open_blank()
+            for page in stale:
+                self._devtools(f"/json/close/{page}")
+        except (OSError, ValueError):
+            pass
+
+    def release(self, lease_id: str) -> None:
+        lease = self.leases.pop(lease_id, None)
+        if self.leases:
+            if lease is not None:
+                self.close_tab(lease.get("tab"))
+        else:
+            self.reset_tabs()
+
+    def session_matches(self, credential: str, os_user: str) -> bool:
+        """True if the recorded login belongs to this Windows user and password."""
+        session = self.session
+        if not session or not credential:
+            return False
+        if session.get("os_user", "").lower() != (os_user or "").lower():
+            return False
+        expected = bytes.fromhex(session.get("verifier") or "")
+        actual = _verifier(bytes.fromhex(session.get("salt") or ""), credential)
+        return hmac.compare_digest(expected, actual)
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "profile": self.key,
+            "debugger_address": f"127.0.0.1:{self.port}",
+            "started": self.started,
+            "leases": len(self.leases),
+            "session": _public_session(self.session),
+        }
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    # SO_REUSEADDR would let a second broker bind the same port on Windows
+    allow_reuse_address = False
+    daemon_threads = True
+
+
+class DriverBroker:
+    """Hands out attachable Chrome sessions, one browser per profile key."""
+
+    def __init__(self, directory: Optional[Path] = None, port: Optional[int] = None, idle_hours: Optional[float] = None):
+        self.directory = Path(directory) if directory else broker_dir()
+        self.port = port or broker_port()
+        if idle_hours is None:
+            try:
+                idle_hours = float(os.environ.get("PENELOPE_BROKER_IDLE_HOURS") or DEFAULT_IDLE_HOURS)
+            except ValueError:
+                idle_hours = DEFAULT_IDLE_HOURS
+        self.idle_timeout = idle_hours * 3600.0
+        self.token = secrets.token_hex(16)
+        self._browsers: Dict[str, _Browser] = {}
+        self._lock = threading.RLock()
+        self._last_activity = time.monotonic()
+        self._stop_event = threading.Event()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    @property
+    def state_path(self) -> Path:
+        return self.directory / "broker.json"
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def serve_forever(self) -> None:
+        broker = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line.decode("utf-8"))
+                        reply = broker.handle(request)
+                    except Exception as exc:  # never let one bad request kill the connection thread
+                        reply = {"ok": False, "error": str(exc)}
+                    self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+        # Binding the fixed port is what keeps a second broker from starting
+        self._server = _Server(("127.0.0.1", self.port), Handler)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(
+            json.dumps({"pid": os.getpid(), "port": self.port, "token": self.token,
+                        "started": datetime.now().isoformat(timespec="seconds")}, indent=2),
+            encoding="utf-8",
+        )
+        LOGGER.info("Penelope broker listening on 127.0.0.1:%s (pid %s)", self.port, os.getpid())
+        reaper = threading.Thread(target=self._reap_loop, name="penelope-broker-reaper", daemon=True)
+        reaper.start()
+        try:
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self._shutdown_browsers()
+            self._server.server_close()
+            try:
+                state = json.loads(self.state_path.read_text(encoding="utf-8"))
+                if state.get("pid") == os.getpid():
+                    self.state_path.unlink()
+            except (OSError, ValueError):
+                pass
+            LOGGER.info("Penelope broker stopped")
+
+    def shutdown(self) -> None:
+        self._stop_event.set()
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get("token") != self.token:
+            return {"ok": False, "error": "invalid broker token"}
+        op = request.get("op")
+        handler = getattr(self, f"_op_{op}", None) if isinstance(op, str) else None
+        if handler is None:
+            return {"ok": False, "error": f"unknown operation {op!r}"}
+        with self._lock:
+            self._last_activity = time.monotonic()
+            reply = handler(request)
+        reply.setdefault("ok", True)
+        return reply
+
+    def _op_ping(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "browsers": len(self._browsers)}
+
+    def _op_status(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "browsers": [browser.describe() for browser in self._browsers.values()]}
+
+    def _op_acquire(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        key = str(request.get("profile") or "default")
+        browser = self._browsers.get(key)
+        warm = browser is not None and browser.alive()
+        if not warm:
+            if browser is not None:
+                browser.stop()
+            chrome_path = find_chrome()
+            if not chrome_path:
+                return {"ok": False, "error": "Chrome executable not found (set PENELOPE_CHROME_PATH)"}
+            port = free_port()
+            try:
+                process = launch_chrome(chrome_path, self.directory / "profiles" / key, port)
+            except (OSError, RuntimeError) as exc:
+                self._browsers.pop(key, None)
+                return {"ok": False, "error": f"Could not start Chrome: {exc}"}
+            browser = self._browsers[key] = _Browser(key, process, port)
+            LOGGER.info("Started Chrome for profile %s on port %s", key, port)
+        elif browser.session and not browser.session_matches(str(request.get("credential") or ""),
+                                                             str(request.get("os_user") or "")):
+            # Someone else's live login: hand it out only to the same user and password
+            return {"ok": False, "error": "the shared browser is signed in with different credentials"}
+        lease = secrets.token_hex(8)
+        browser.leases[lease] = {"pid": int(request.get("pid") or 0), "tab": None}
+        return {
+            "lease": lease,
+            "debugger_address": f"127.0.0.1:{browser.port}",
+            "warm": warm,
+            "session": _public_session(browser.session),
+        }
+
+    def _op_attach(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Record which tab a lease drives, so it can be closed when the bot is done."""
+        browser, lease = self._find_lease(request.get("lease"))
+        if lease is None:
+            return {"ok": False, "error": "unknown lease"}
+        lease["tab"] = request.get("tab")
+        return {}
+
+    def _op_release(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        browser, lease = self._find_lease(request.get("lease"))
+        if browser is not None:
+            browser.release(request.get("lease"))
+        return {}
+
+    def _op_mark_login(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        browser = self._browsers.get(str(request.get("profile") or "default"))
+        if browser is None:
+            return {"ok": False, "error": "no browser for profile"}
+        salt = secrets.token_bytes(16)
+        browser.session = {
+            "username": str(request.get("username") or ""),
+            "origin": str(request.get("origin") or ""),
+            # Page the login landed on; a new tab opens here instead of the login form
+            "landing_url": str(request.get("landing_url") or ""),
+            "logged_in_at": datetime.now().isoformat(timespec="seconds"),
+            "os_user": str(request.get("os_user") or ""),
+            "salt": salt.hex(),
+            "verifier": _verifier(salt, str(request.get("credential") or "")).hex(),
+        }
+        return {}
+
+    def _op_mark_logout(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        browser = self._browsers.get(str(request.get("profile") or "default"))
+        if browser is not None:
+            browser.session = None
+        return {}
+
+    def _op_shutdown(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.shutdown()
+        return {}
+
+    # ------------------------------------------------------------------
+    # Housekeeping
+    # ------------------------------------------------------------------
+    def _find_lease(self, lease_id: Any):
+        for browser in self._browsers.values():
+            lease = browser.leases.get(lease_id)
+            if lease is not None:
+                return browser, lease
+        return None, None
+
+    def _reap_loop(self) -> None:
+        while not self._stop_event.wait(REAP_INTERVAL):
+            with self._lock:
+                for key, browser in list(self._browsers.items()):
+                    if browser.process.poll() is not None:
+                        LOGGER.info("Chrome for profile %s exited; forgetting it", key)
+                        del self._browsers[key]
+                        continue
+                    for lease_id, lease in list(browser.leases.items()):
+                        if not pid_alive(lease["pid"]):
+                            browser.release(lease_id)
+                in_use = any(browser.leases for browser in self._browsers.values())
+                idle_for = time.monotonic() - self._last_activity
+            if not in_use and idle_for >= self.idle_timeout:
+                LOGGER.info("Idle for %.1f hours; shutting down", idle_for / 3600.0)
+                self.shutdown()
+                return
+
+    def _shutdown_browsers(self) -> None:
+        with self._lock:
+            for browser in self._browsers.values():
+                browser.stop()
+            self._browsers.clear()
+
+
+# ----------------------------------------------------------------------
+# Client side
+# ----------------------------------------------------------------------
+class BrokerClient:
+    """Talks to the local broker, starting it in the background when needed."""
+
+    def __init__(self, directory: Optional[Path] = None, port: Optional[int] = None, timeout: float = 60.0):
+        self.directory = Path(directory) if directory else broker_dir()
+        self.port = port or broker_port()
+        # Covers a Chrome cold start inside "acquire"
+        self.timeout = timeout
+
+    def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        try:
+            token = json.loads((self.directory / "broker.json").read_text(encoding="utf-8")).get("token")
+        except (OSError, ValueError) as exc:
+            raise BrokerError(f"Broker state not readable: {exc}") from exc
+        payload = dict(fields, op=op, token=token)
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=self.timeout) as sock:
+                sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+                with sock.makefile("rb") as stream:
+                    line = stream.readline()
+        except OSError as exc:
+            raise BrokerError(f"Broker not reachable on port {self.port}: {exc}") from exc
+        if not line:
+            raise BrokerError("Broker closed the connection")
+        reply = json.loads(line.decode("utf-8"))
+        if not reply.get("ok"):
+            raise BrokerError(reply.get("error") or "request failed")
+        return reply
+
+    def is_running(self) -> bool:
+        try:
+            self.request("ping")
+            return True
+        except BrokerError:
+            return False
+
+    def ensure_running(self, startup_timeout: float = 15.0) -> bool:
+        """Ping the broker, starting a background broker process if none answers."""
+        if self.is_running():
+            return True
+        self._spawn()
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.25)
+            if self.is_running():
+                return True
+        return False
+
+    def _spawn(self) -> None:
+        python_executable = sys.executable
+        creation_flags = 0
+        if os.name == "nt":
+            pythonw_exe = sys.executable.replace("python.exe", "pythonw.exe")
+            if Path(pythonw_exe).exists():
+                python_executable = pythonw_exe
+            else:
+                creation_flags = getattr(subprocess, "CREATE_NO_WINDOW", 0x08000000)
+            creation_flags |= getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+
+        env = os.environ.copy()
+        env["PENELOPE_BROKER_DIR"] = str(self.directory)
+        env["PENELOPE_BROKER_PORT"] = str(self.port)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "broker.log", "ab") as log_file:
+            subprocess.Popen(
+                [python_executable, str(Path(__file__).resolve()), "serve"],
+                cwd=str(self.directory),
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=log_file,
+                creationflags=creation_flags,
+                start_new_session=(os.name != "nt"),
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Penelope driver broker")
+    parser.add_argument("command", choices=["serve", "status", "stop"])
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+        try:
+            DriverBroker().serve_forever()
+        except OSError as exc:
+            # Usually another broker already holds the port
+            LOGGER.error("Broker not started: %s", exc)
+            return 1
+        return 0
+
+    client = BrokerClient()
+    try:
+        if args.command == "status":
+            print(json.dumps(client.request("status"), indent=2))
+        else:
+            client.request("shutdown")
+            print("Broker stopping")
+    except BrokerError as exc:
+        print(f"Broker not running ({exc})")
+        return 1
+    return 0
+
+
+__all__ = ["BrokerClient", "BrokerError", "DriverBroker", "credential_digest", "pid_alive", "profile_key"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
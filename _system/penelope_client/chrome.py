@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Locating and launching Chrome / ChromeDriver for the Penelope client."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Checked in order after $PENELOPE_CHROME_PATH
+CHROME_CANDIDATES = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe"),
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+CHROME_COMMANDS = ["chrome", "google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]
+
+CHROMEDRIVER_CANDIDATES = [
+    r"C:\Program Files\Google\Chrome\Application\chromedriver.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chromedriver.exe",
+    r"C:\chromedriver\chromedriver.exe",
+    r"C:\Windows\System32\chromedriver.exe",
+]
+
+
+def find_chrome() -> Optional[str]:
+    """Path of the Chrome executable, or None if it cannot be found."""
+    configured = os.environ.get("PENELOPE_CHROME_PATH")
+    if configured and os.path.isfile(configured):
+        return configured
+    for path in CHROME_CANDIDATES:
+        if path and os.path.isfile(path):
+            return path
+    for command in CHROME_COMMANDS:
+        found = shutil.which(command)
+        if found:
+            return found
+    return None
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def devtools_version(port: int, timeout: float = 2.0) -> Optional[dict]:
+    """``/json/version`` of the browser listening on ``port``, or None if none answers."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def launch_chrome(
+    chrome_path: str,
+    user_data_dir: Path,
+    port: int,
+    extra_args: Optional[List[str]] = None,
+    startup_timeout: float = 30.0,
+) -> subprocess.Popen:
+    """Start Chrome with a DevTools port Selenium can attach to and wait until it answers.
+
+    The port is bound to 127.0.0.1 only.  Raises ``RuntimeError`` if the
+    browser exits or does not answer within ``startup_timeout`` seconds.
+    """
+    user_data_dir = Path(user_data_dir)
+    user_data_dir.mkdir(parents=True, exist_ok=True)
+    args = [
+        chrome_path,
+        f"--remote-debugging-port={port}",
+        "--remote-debugging-address=127.0.0.1",
+        f"--user-data-dir={user_data_dir}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--start-maximized",
+    ]
+    args.extend(extra_args or [])
+    args.append("about:blank")
+
+    creation_flags = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0) if os.name == "nt" else 0
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        creationflags=creation_flags,
+    )
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Chrome exited during startup (code {process.returncode})")
+        if devtools_version(port, timeout=1.0) is not None:
+            return process
+        time.sleep(0.25)
+    process.kill()
+    raise RuntimeError(f"Chrome did not open its DevTools port within {startup_timeout:.0f} seconds")
+
+
+def chromedriver_service(log: Callable[[str], None], download_timeout: float = 30.0):
+    """Selenium ``Service`` for ChromeDriver.
+
+    Tries webdriver-manager (bounded by ``download_timeout``), then a
+    chromedriver on PATH, then the usual install folders.
+    """
+    from selenium.webdriver.chrome.service import Service
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        log("[BROWSER] Attempting to download ChromeDriver...")
+        result: List[Optional[str]] = [None]
+        error: List[Optional[BaseException]] = [None]
+
+        def download_driver():
+            try:
+                result[0] = ChromeDriverManager().install()
+            except Exception as exc:
+                error[0] = exc
+
+        thread = threading.Thread(target=download_driver, daemon=True)
+        thread.start()
+        thread.join(timeout=download_timeout)
+        if thread.is_alive():
+            log(f"[BROWSER][WARN] ChromeDriver download timed out after {download_timeout:.0f} seconds")
+            raise TimeoutError("ChromeDriver download timed out")
+        if error[0]:
+            raise error[0]
+        if not result[0]:
+            raise RuntimeError("ChromeDriver download failed")
+        log(f"[BROWSER] ChromeDriver downloaded: {result[0]}")
+        return Service(result[0])
+    except Exception as exc:
+        log(f"[BROWSER][WARN] ChromeDriverManager failed: {exc}")
+
+    if shutil.which("chromedriver"):
+        log("[BROWSER] Using system ChromeDriver")
+        return Service()
+    for path in CHROMEDRIVER_CANDIDATES:
+        if os.path.exists(path):
+            log(f"[BROWSER] Using ChromeDriver at: {path}")
+            return Service(path)
+    # Selenium Manager (Selenium 4.6+) can still resolve a driver on its own
+    log("[BROWSER] Falling back to Selenium's own ChromeDriver lookup")
+    return Service()
+
+
+__all__ = ["chromedriver_service", "devtools_version", "find_chrome", "free_port", "launch_chrome"]
@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+Translation Memory - persistent cache of machine translations
+
+Translated segments are stored on disk keyed by the SHA-256 of the
+normalized source text (whitespace runs collapsed), the target language and
+the engine name.  Letters and forms that repeat the same headers,
+disclaimers and boilerplate only send the segments that have not been
+translated before.
+
+The store is a single SQLite file (default
+``_secure_data/translation_memory/translation_memory.db``) with
+least-recently-used eviction once it grows past its size limit.  Any cache
+failure degrades to plain, uncached translation.
+
+Engines sit behind :class:`TranslationEngine`, so the deep-translator
+services and the local :class:`StubEngine` (for tests and benchmarks) are
+interchangeable.  :class:`TranslationService` sends the cache misses through
+a bounded thread pool, with a request-rate limit per engine.
+
+Usage:
+    from translation_memory import DeepTranslatorEngine, TranslationService
+
+    service = TranslationService([DeepTranslatorEngine("google", GoogleTranslator)])
+    spanish = service.translate_many(chunks, "es")
+
+Benchmark with the stub engine:
+    python translation_memory.py --segments 400 --latency 0.2
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "_secure_data" / "translation_memory"
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 4
+
+# Eviction trims the cache to this fraction of max_bytes so it does not run
+# on every insert once the limit is reached.
+EVICTION_TARGET_RATIO = 0.9
+
+# Requests per second per engine; the free web endpoints throttle bursts
+DEFAULT_RATE_LIMITS = {"google": 5.0, "deepl": 3.0, "microsoft": 5.0}
+
+
+def normalize_source(text: str) -> str:
+    """Source text as it is keyed: surrounding whitespace stripped, inner runs collapsed to one space."""
+    return " ".join((text or "").split())
+
+
+def source_digest(text: str) -> str:
+    return hashlib.sha256(normalize_source(text).encode("utf-8")).hexdigest()
+
+
+class TranslationError(Exception):
+    """A segment could not be translated by any engine."""
+
+
+# ----------------------------------------------------------------------
+# Engines
+# ----------------------------------------------------------------------
+class TranslationEngine:
+    """One translation backend.
+
+    ``name`` is part of the cache key.  ``rate_limit`` is the most requests
+    per second the service sends to it (``0`` = unlimited) and
+    ``max_concurrency`` the most requests in flight at once.
+    """
+
+    name = "engine"
+    label = "Translation engine"
+    rate_limit = 0.0
+    max_concurrency = DEFAULT_MAX_WORKERS
+
+    def translate(self, text: str, target: str) -> str:
+        raise NotImplementedError
+
+
+class DeepTranslatorEngine(TranslationEngine):
+    """A deep-translator class (``GoogleTranslator``, ``DeepL``, ...) with source language ``auto``.
+
+    Translator objects are built once per thread and target language
+    instead of once per request.
+    """
+
+    LABELS = {"google": "Google Translate", "deepl": "DeepL", "microsoft": "Microsoft Translator"}
+
+    def __init__(
+        self,
+        name: str,
+        translator_class,
+        rate_limit: Optional[float] = None,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        **translator_kwargs: Any,
+    ) -> None:
+        self.name = name
+        self.label = self.LABELS.get(name, name)
+        self.translator_class = translator_class
+        self.rate_limit = DEFAULT_RATE_LIMITS.get(name, 0.0) if rate_limit is None else rate_limit
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.translator_kwargs = translator_kwargs
+        self._local = threading.local()
+
+    def translate(self, text: str, target: str) -> str:
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get(target)
+        if translator is None:
+            translator = translators[target] = self.translator_class(
+                source="auto", target=target, **self.translator_kwargs
+            )
+        return translator.translate(text)
+
+
+class StubEngine(TranslationEngine):
+    """Local engine for tests and benchmarks: tags the text with the target language.
+
+    ``latency`` seconds are slept per request to stand in for a network
+    round trip; ``fail`` makes every request raise.
+    """
+
+    def __init__(
+        self,
+        name: str = "stub",
+        latency: float = 0.0,
+        rate_limit: float = 0.0,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        fail: bool = False,
+    ) -> None:
+        self.name = name
+        self.label = f"Stub ({name})"
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.fail = fail
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text: str, target: str) -> str:
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is unavailable")
+        return f"[{target}] {text}"
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart (thread-safe; ``rate <= 0`` = no limit)."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# ----------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------
+class TranslationMemory:
+    """Disk-backed translation cache with LRU size eviction (thread-safe)."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.db_path = self.cache_dir / "translation_memory.db"
+        self.max_bytes = max(1, int(max_bytes))
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._open()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def get(self, source: str, target: str, engine: str) -> Optional[str]:
+        """Cached translation of ``source``, or ``None`` on a miss."""
+        return self.get_many([source], target, engine).get(source_digest(source))
+
+    def get_many(
+        self, sources: Iterable[str], target: str, engine: Union[str, Sequence[str]]
+    ) -> Dict[str, str]:
+        """Cached translations of ``sources`` keyed by :func:`source_digest`.
+
+        ``engine`` may be a list of engine names in order of preference; a
+        segment cached under several of them comes from the first one.
+        """
+        engines = [engine] if isinstance(engine, str) else list(engine)
+        rank = {name: position for position, name in enumerate(engines)}
+        digests = list(dict.fromkeys(source_digest(source) for source in sources))
+        found: Dict[str, str] = {}
+        found_engine: Dict[str, str] = {}
+        with self._lock:
+            if self._conn is None:
+                self.misses += len(digests)
+                return found
+            try:
+                engine_marks = ",".join("?" * len(engines))
+                for start in range(0, len(digests), 500):
+                    batch = digests[start:start + 500]
+                    marks = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT digest, engine, translation FROM translations "
+                        f"WHERE target = ? AND engine IN ({engine_marks}) AND digest IN ({marks})",
+                        [target, *engines, *batch],
+                    ).fetchall()
+                    for digest, name, translation in rows:
+                        if digest not in found_engine or rank[name] < rank[found_engine[digest]]:
+                            found[digest] = translation
+                            found_engine[digest] = name
+                if found:
+                    now = time.time()
+                    with self._conn:
+                        self._conn.executemany(
+                            "UPDATE translations SET last_access = ? WHERE digest = ? AND target = ? AND engine = ?",
+                            [(now, digest, target, name) for digest, name in found_engine.items()],
+                        )
+            except sqlite3.Error as exc:
+                self._disable(exc)
+                found = {}
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def put(self, source: str, target: str, engine: str, translation: str) -> None:
+        self.put_many([(source, translation)], target, engine)
+
+    def put_many(self, pairs: Sequence[Tuple[str, str]], target: str, engine: str) -> None:
+        """Store ``(source, translation)`` pairs, evicting least recently used entries if needed."""
+        rows = {}
+        for source, translation in pairs:
+            translation = translation or ""
+            rows[source_digest(source)] = (translation, len(translation.encode("utf-8")))
+        if not rows:
+            return
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                now = time.time()
+                with self._conn:
+                    for digest, (translation, size) in rows.items():
+                        previous = self._conn.execute(
+                            "SELECT size FROM translations WHERE digest = ? AND target = ? AND engine = ?",
+                            (digest, target, engine),
+                        ).fetchone()
+                        self._conn.execute(
+                            """
+                            INSERT OR REPLACE INTO translations (digest, target, engine, translation, size, last_access)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            """,
+                            (digest, target, engine, translation, size, now),
+                        )
+                        self._total_bytes += size - (previous[0] if previous else 0)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+            except sqlite3.Error as exc:
+                self._disable(exc)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            entries = 0
+            if self._conn is not None:
+                try:
+                    entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "db_path": str(self.db_path),
+            }
+
+    def clear(self) -> None:
+        """Remove every cached translation."""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM translations")
+                self._total_bytes = 0
+            except sqlite3.Error as exc:
+                self._disable(exc)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error:
+                pass
+            with conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS translations (
+                        digest TEXT NOT NULL,
+                        target TEXT NOT NULL,
+                        engine TEXT NOT NULL,
+                        translation TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_access REAL NOT NULL,
+                        PRIMARY KEY (digest, target, engine)
+                    ) WITHOUT ROWID
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_access ON translations(last_access)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+            self._conn = conn
+        except (OSError, sqlite3.Error) as exc:
+            LOGGER.warning("Translation memory disabled - could not open %s: %s", self.db_path, exc)
+            self._conn = None
+
+    def _evict(self) -> None:
+        target_bytes = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        evicted = 0
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT digest, target, engine, size FROM translations ORDER BY last_access"
+            )
+            doomed = []
+            for digest, target, engine, size in rows:
+                if self._total_bytes <= target_bytes:
+                    break
+                doomed.append((digest, target, engine))
+                self._total_bytes -= size
+                evicted += 1
+            self._conn.executemany(
+                "DELETE FROM translations WHERE digest = ? AND target = ? AND engine = ?",
+                doomed,
+            )
+        LOGGER.info("Translation memory: evicted %s segment(s), %s bytes remain", evicted, self._total_bytes)
+
+    def _disable(self, exc: Exception) -> None:
+        LOGGER.warning("Translation memory disabled after database error: %s", exc)
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        except sqlite3.Error:
+            pass
+        self._conn = None
+
+
+# ----------------------------------------------------------------------
+# Service
+# ----------------------------------------------------------------------
+class TranslationService:
+    """Translate segments through the memory, sending only the misses.
+
+    ``engines`` are tried in order: the first one is used, the next ones
+    take over a segment the previous engine failed on.  Each translation is
+    cached under the engine that produced it, and lookups check every
+    configured engine in the same order, so a segment a fallback engine
+    translated is reused instead of being sent again.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[TranslationEngine],
+        memory: Optional[TranslationMemory] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        if not engines:
+            raise ValueError("at least one translation engine is required")
+        self.engines = list(engines)
+        self.memory = memory
+        self.max_workers = max(1, int(max_workers))
+        self._limiters = {engine.name: RateLimiter(engine.rate_limit) for engine in self.engines}
+        self._slots = {engine.name: threading.BoundedSemaphore(engine.max_concurrency) for engine in self.engines}
+        self.last_hits = 0
+        self.last_sent = 0
+        self.engines_used: Dict[str, int] = {}
+
+    @property
+    def primary(self) -> TranslationEngine:
+        return self.engines[0]
+
+    def translate(self, text: str, target: str) -> str:
+        return self.translate_many([text], target)[0]
+
+    def translate_many(
+        self,
+        texts: Sequence[str],
+        target: str,
+        strict: bool = True,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Optional[str]]:
+        """Translations of ``texts`` in order.
+
+        Blank texts come back unchanged.  Identical segments (after
+        whitespace normalization) are sent once.  A segment no engine could
+        translate raises :class:`TranslationError` when ``strict``, otherwise
+        it comes back as ``None``.  ``on_progress(done, total)`` is called as
+        sent segments finish.
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                results[index] = text
+            else:
+                pending.setdefault(source_digest(text), []).append(index)
+
+        cached: Dict[str, str] = {}
+        if pending and self.memory is not None:
+            cached = self.memory.get_many(
+                (texts[indexes[0]] for indexes in pending.values()),
+                target,
+                [engine.name for engine in self.engines],
+            )
+        for digest, translation in cached.items():
+            for index in pending.pop(digest):
+                results[index] = translation
+        self.last_hits = len(cached)
+        self.last_sent = len(pending)
+        if not pending:
+            return results
+
+        errors: Dict[str, Exception] = {}
+        done = [0]
+        done_lock = threading.Lock()
+        stored: Dict[str, List[Tuple[str, str]]] = {}
+
+        def send(digest: str) -> None:
+            source = texts[pending[digest][0]]
+            try:
+                engine_name, translation = self._send(source, target)
+            except Exception as exc:
+                errors[digest] = exc
+            else:
+                for index in pending[digest]:
+                    results[index] = translation
+                with done_lock:
+                    stored.setdefault(engine_name, []).append((source, translation))
+                    self.engines_used[engine_name] = self.engines_used.get(engine_name, 0) + 1
+            with done_lock:
+                done[0] += 1
+                count = done[0]
+            if on_progress:
+                on_progress(count, len(pending))
+
+        workers = min(self.max_workers, len(pending))
+        if workers == 1:
+            for digest in list(pending):
+                send(digest)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate") as pool:
+                list(pool.map(send, list(pending)))
+
+        if self.memory is not None:
+            for engine_name, pairs in stored.items():
+                self.memory.put_many(pairs, target, engine_name)
+        if errors and strict:
+            first = next(iter(errors.values()))
+            raise TranslationError(f"Translation failed with all engines: {first}") from first
+        return results
+
+    def _send(self, text: str, target: str) -> Tuple[str, str]:
+        last_error: Optional[Exception] = None
+        for engine in self.engines:
+            try:
+                with self._slots[engine.name]:
+                    self._limiters[engine.name].wait()
+                    return engine.name, engine.translate(text, target)
+            except Exception as exc:
+                LOGGER.warning("%s failed on a segment: %s", engine.label, exc)
+                last_error = exc
+        raise last_error if last_error else TranslationError("no engine available")
+
+
+_shared_memory: Optional[TranslationMemory] = None
+_shared_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory:
+    """Process-wide memory instance.
+
+    ``TRANSLATION_MEMORY_DIR`` and ``TRANSLATION_MEMORY_MAX_MB`` override the
+    default location and size limit.
+    """
+    global _shared_memory
+    with _shared_memory_lock:
+        if _shared_memory is None:
+            cache_dir = os.environ.get("TRANSLATION_MEMORY_DIR") or None
+            try:
+                max_bytes = int(float(os.environ.get("TRANSLATION_MEMORY_MAX_MB", "")) * 1024 * 1024)
+            except ValueError:
+                max_bytes = DEFAULT_MAX_BYTES
+            _shared_memory = TranslationMemory(Path(cache_dir) if cache_dir else None, max_bytes=max_bytes)
+        return _shared_memory
+
+
+def _benchmark(segments: int, repeat_ratio: float, latency: float, workers: int) -> None:
+    import tempfile
+
+    unique = max(1, int(segments * (1 - repeat_ratio)))
+    texts = [f"Paragraph {i % unique} of the standard letter, with its disclaimer." for i in range(segments)]
+    print(f"{segments} segments ({unique} unique), stub latency {latency:.2f}s")
+
+    start = time.perf_counter()
+    engine = StubEngine(latency=latency)
+    for text in texts:
+        engine.translate(text, "es")
+    sequential = time.perf_counter() - start
+    print(f"  one request per segment, in order   {sequential:7.2f} s  {engine.requests} requests")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = TranslationMemory(Path(tmp))
+        for label in ("memory, cold", "memory, warm"):
+            engine = StubEngine(latency=latency)
+            service = TranslationService([engine], memory, max_workers=workers)
+            start = time.perf_counter()
+            service.translate_many(texts, "es")
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<36} {elapsed:7.2f} s  {engine.requests} requests  x{sequential / elapsed:.1f}")
+        memory._conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the translation memory with the stub engine")
+    parser.add_argument("--segments", type=int, default=400)
+    parser.add_argument("--repeat", type=float, default=0.6, help="fraction of segments that repeat earlier ones")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stub request")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    args = parser.parse_args()
+    _benchmark(args.segments, args.repeat, args.latency, args.workers)
+
+
+__all__ = [
+    "DeepTranslatorEngine",
+    "RateLimiter",
+    "StubEngine",
+    "TranslationEngine",
+    "TranslationError",
+    "TranslationMemory",
+    "TranslationService",
+    "get_translation_memory",
+    "normalize_source",
+    "source_digest",
+]
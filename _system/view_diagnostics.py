@@ -5,7 +5,6 @@ View real-time diagnostic results from automatic diagnostic monitoring.
 """
 
 import sys
-import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 import time
@@ -20,6 +19,9 @@ else:
         installation_dir = installation_dir.parent
 
 secure_data_dir = installation_dir / "_secure_data"
+
+sys.path.insert(0, str(installation_dir / "AI" / "monitoring"))
+from partitioned_store import open_monitoring_reader
 log_file = secure_data_dir / "diagnostic_monitor.log"
 
 def view_diagnostic_summary():
@@ -36,7 +38,7 @@ def view_diagnostic_summary():
         return
     
     try:
-        conn = sqlite3.connect(db_path)
+        conn = open_monitoring_reader(db_path)
         cursor = conn.cursor()
         
         # Check recent sessions